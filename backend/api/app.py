@@ -4,15 +4,33 @@ Main application entry point for the GuardianLink API.
 """
 
 import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 
 from guardianlink.api.routes import router, disaster_router, mental_health_router
+from guardianlink.core.serialization import FastJSONResponse
+from guardianlink.services.ai_engine import DISASTER_WARM_ENABLED, disaster_cache_warmer, gaia_client
+from guardianlink.services.database import chat_store
 
 # Load environment variables
 load_dotenv()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open shared resources on startup and release them on shutdown."""
+    await gaia_client.start()
+    await chat_store.start()
+    if DISASTER_WARM_ENABLED:
+        disaster_cache_warmer.start()
+    try:
+        yield
+    finally:
+        await disaster_cache_warmer.stop()
+        await chat_store.aclose()
+        await gaia_client.aclose()
+
 def create_app() -> FastAPI:
     """
     Create and configure the FastAPI application.
@@ -25,6 +43,8 @@ def create_app() -> FastAPI:
         title="GuardianLink API",
         description="AI-Driven Crisis Response & Mental Health Protocol",
         version="0.1.0",
+        lifespan=lifespan,
+        default_response_class=FastJSONResponse,
     )
     
     # Configure CORS
@@ -35,6 +55,7 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["ETag", "X-Next-Cursor"],
     )
     
     # Include routers
@@ -3,27 +3,56 @@ GuardianLink API Routes
 Defines the FastAPI routes for the GuardianLink platform.
 """
 
+import asyncio
+import logging
+import os
+import time
 from datetime import datetime
-from typing import Dict, List, Optional, Union
+from typing import Awaitable, Dict, List, Optional, Set, Union
 
-from fastapi import APIRouter, HTTPException, Depends, Request, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response, BackgroundTasks
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
+from guardianlink.core.concurrency import map_as_completed
+from guardianlink.core.serialization import FastJSONResponse, dumps
+from guardianlink.core.versioning import ConditionalGets
 from guardianlink.services.ai_engine import (
+    gaia_client,
+    conversation_summarizer,
+    dedupe_disaster_queries,
+    disaster_cache,
+    disaster_cache_warmer,
     predict_disaster_risk,
     get_disaster_recommendations,
-    get_mental_health_response
+    get_mental_health_response,
+    get_mental_health_response_stream,
+    prompt_token_stats,
+    update_conversation_summary
 )
 from guardianlink.services.blockchain import (
     verify_delegation,
     create_aid_stream,
     subscribe_to_mental_health_service,
-    get_stream_status
+    get_stream_etag,
+    get_stream_status,
+    get_stream_statuses,
+    stream_table
 )
 from guardianlink.services.database import (
     get_user_chat_history, 
     save_chat_message, 
-    get_disaster_data
+    InvalidCursorError,
+    chat_store,
+    recent_chat_cache,
+    get_chat_history_etag,
+    get_chat_history_page,
+    iter_chat_history,
+    MessageNotFoundError,
+    get_recent_chat_history,
+    get_disasters,
+    get_disasters_etag,
+    get_disasters_near
 )
 from guardianlink.models.schemas import (
     User,
@@ -31,10 +60,69 @@ from guardianlink.models.schemas import (
     AidStreamRequest,
     MentalHealthSubscription,
     ChatMessage,
-    DisasterRiskQuery
+    DisasterRiskQuery,
+    DisasterBatchQuery,
+    StreamStatusQuery,
+    AidStreamCreated,
+    ChatHistoryMessage,
+    ChatResponse,
+    DelegationResult,
+    DisasterPrediction,
+    DisasterProjection,
+    NearbyDisaster,
+    SubscriptionResult
 )
 from guardianlink.utils.auth import verify_wallet
 
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Batch prediction limits
+DISASTER_BATCH_MAX_QUERIES = int(os.getenv('DISASTER_BATCH_MAX_QUERIES', '100'))
+DISASTER_BATCH_CONCURRENCY = int(os.getenv('DISASTER_BATCH_CONCURRENCY', '8'))
+DISASTER_NEARBY_MAX_K = int(os.getenv('DISASTER_NEARBY_MAX_K', '100'))
+
+# Most stream IDs per /disaster/streams/status request
+STREAM_STATUS_MAX_IDS = int(os.getenv('STREAM_STATUS_MAX_IDS', '10000'))
+
+# /disaster/active page sizes
+DISASTER_PAGE_SIZE = int(os.getenv('DISASTER_PAGE_SIZE', '50'))
+DISASTER_PAGE_MAX_SIZE = int(os.getenv('DISASTER_PAGE_MAX_SIZE', '500'))
+
+# /mental-health/history page sizes
+CHAT_HISTORY_PAGE_SIZE = int(os.getenv('CHAT_HISTORY_PAGE_SIZE', '100'))
+CHAT_HISTORY_PAGE_MAX_SIZE = int(os.getenv('CHAT_HISTORY_PAGE_MAX_SIZE', '1000'))
+
+# If-None-Match handling for the polled GET endpoints
+conditional_gets = ConditionalGets()
+
+# Work started by handlers that outlives the request; the event loop only holds
+# tasks weakly, so keep a reference until each one finishes
+background_tasks: Set[asyncio.Task] = set()
+
+def run_in_background(coro: Awaitable, description: str) -> asyncio.Task:
+    """
+    Run a coroutine after the request without awaiting it, logging any failure.
+    
+    Args:
+        coro: The work to run
+        description: What it does, for the error log
+        
+    Returns:
+        The tracked task
+    """
+    task = asyncio.ensure_future(coro)
+    background_tasks.add(task)
+    
+    def finished(task: asyncio.Task) -> None:
+        background_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Background {description} failed: {task.exception()}")
+    
+    task.add_done_callback(finished)
+    return task
+
 # Create routers
 router = APIRouter()
 disaster_router = APIRouter(prefix="/disaster", tags=["disaster"])
@@ -45,8 +133,24 @@ mental_health_router = APIRouter(prefix="/mental-health", tags=["mental-health"]
 def read_root():
     return {"message": "Welcome to GuardianLink API"}
 
+@router.get("/metrics")
+def get_metrics():
+    """Get in-process performance counters."""
+    return {
+        "gaia": gaia_client.stats(),
+        "disaster_cache": disaster_cache.stats(),
+        "disaster_cache_warmer": disaster_cache_warmer.stats(),
+        "conversation_summaries": conversation_summarizer.stats(),
+        "mental_health_prompts": prompt_token_stats.stats(),
+        "conditional_gets": conditional_gets.stats(),
+        "chat_store": chat_store.stats(),
+        "recent_chat_cache": recent_chat_cache.stats(),
+        "stream_table": stream_table.stats(),
+        "process": {"cpu_seconds": time.process_time()}
+    }
+
 # Disaster Response Module
-@disaster_router.post("/delegate")
+@disaster_router.post("/delegate", response_model=DelegationResult)
 async def delegate_disaster_permissions(request: DelegationRequest):
     """Delegate ERC-7710 permissions to Gaia AI for disaster response."""
     try:
@@ -59,7 +163,7 @@ async def delegate_disaster_permissions(request: DelegationRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@disaster_router.post("/create-stream")
+@disaster_router.post("/create-stream", response_model=AidStreamCreated)
 async def create_new_aid_stream(request: AidStreamRequest):
     """Create an ERC-7715 aid stream for disaster relief."""
     try:
@@ -80,42 +184,178 @@ async def create_new_aid_stream(request: AidStreamRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @disaster_router.get("/stream/{stream_id}")
-async def get_aid_stream_status(stream_id: str):
+async def get_aid_stream_status(stream_id: str, request: Request, response: Response):
     """Get the status of an ERC-7715 aid stream."""
+    etag = get_stream_etag(stream_id)
+    if etag is not None:
+        not_modified = conditional_gets.check(request, etag)
+        if not_modified is not None:
+            return not_modified
+        response.headers["ETag"] = etag
+    
     try:
         status = await get_stream_status(stream_id)
         return status
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@disaster_router.post("/predict")
+@disaster_router.post("/streams/status")
+async def get_aid_streams_status(query: StreamStatusQuery):
+    """
+    Get the status of many aid streams and subscriptions in one request.
+    
+    Returns one entry per requested ID, in order, with released and
+    remaining amounts in ETH and, exactly, in wei (as decimal strings).
+    Unknown IDs get `"status": "not_found"`.
+    """
+    if len(query.stream_ids) > STREAM_STATUS_MAX_IDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {STREAM_STATUS_MAX_IDS} stream IDs are allowed per request"
+        )
+    
+    try:
+        statuses = await get_stream_statuses(query.stream_ids)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    # Plain JSON types already: render directly instead of running thousands of entries through jsonable_encoder
+    return FastJSONResponse(statuses)
+
+async def build_prediction(location: str, disaster_type: Optional[str]) -> Dict:
+    """Assess a location and build the /disaster/predict response body."""
+    risk_assessment = await predict_disaster_risk(location, disaster_type)
+    recommendations = await get_disaster_recommendations(risk_assessment)
+    
+    return {
+        "location": location,
+        "disaster_type": disaster_type,
+        "risk_assessment": risk_assessment,
+        "recommendations": recommendations,
+        "timestamp": datetime.now().isoformat()
+    }
+
+@disaster_router.post("/predict", response_model=DisasterPrediction)
 async def predict_disaster(query: DisasterRiskQuery):
     """Predict disaster risk for a location."""
     try:
-        risk_assessment = await predict_disaster_risk(query.location, query.disaster_type)
-        recommendations = await get_disaster_recommendations(risk_assessment)
-        
-        return {
-            "location": query.location,
-            "disaster_type": query.disaster_type,
-            "risk_assessment": risk_assessment,
-            "recommendations": recommendations,
-            "timestamp": datetime.now().isoformat()
-        }
+        return await build_prediction(query.location, query.disaster_type)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@disaster_router.post("/predict/batch")
+async def predict_disaster_batch(batch: DisasterBatchQuery):
+    """
+    Predict disaster risk for many locations, streaming results as NDJSON.
+    
+    Queries are normalized and deduplicated, then run with at most
+    DISASTER_BATCH_CONCURRENCY predictions in flight. Each line is one
+    distinct query, written as soon as it finishes, with `indices` listing the
+    request positions it answers. A failed query is reported on its own line
+    with `"status": "error"` and does not affect the others.
+    """
+    if len(batch.queries) > DISASTER_BATCH_MAX_QUERIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {DISASTER_BATCH_MAX_QUERIES} queries are allowed per batch"
+        )
+    
+    unique = dedupe_disaster_queries([(query.location, query.disaster_type) for query in batch.queries])
+    
+    async def predict_one(query):
+        location, disaster_type, _ = query
+        if not location:
+            raise ValueError("Location not provided")
+        return await build_prediction(location, disaster_type)
+    
+    async def results():
+        async for (location, disaster_type, indices), prediction, error in map_as_completed(
+            predict_one, unique, DISASTER_BATCH_CONCURRENCY
+        ):
+            line = {"indices": indices, "location": location, "disaster_type": disaster_type}
+            if error is None:
+                line.update(status="ok", result=prediction)
+            else:
+                line.update(status="error", error=str(error))
+            yield dumps(line) + b"\n"
+    
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+@disaster_router.get("/active", response_model=List[DisasterProjection], response_model_exclude_unset=True)
+async def get_active_disasters(
+    request: Request,
+    response: Response,
+    status: str = "active",
+    disaster_type: Optional[str] = Query(None, alias="type"),
+    severity: Optional[str] = None,
+    fields: Optional[str] = None,
+    limit: int = Query(DISASTER_PAGE_SIZE, ge=1, le=DISASTER_PAGE_MAX_SIZE),
+    cursor: Optional[str] = None
+):
+    """
+    Get a page of disasters from our database, active ones by default.
+    
+    Filter with `status` ("all" for any status), `type` and `severity`, and
+    limit the returned fields with a comma-separated `fields` list ("id" is
+    always included). When more results remain, the `X-Next-Cursor` response
+    header carries the `cursor` for the next page.
+    
+    Responses carry a weak ETag that changes whenever any disaster does;
+    send it back in If-None-Match to get a 304 while nothing has changed.
+    """
+    projection = None
+    if fields:
+        projection = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = set(projection) - set(DisasterProjection.model_fields)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    
+    # Read the version before the data, so a concurrent change can only make the tag stale, never the body
+    etag = get_disasters_etag()
+    not_modified = conditional_gets.check(request, etag)
+    if not_modified is not None:
+        return not_modified
+    response.headers["ETag"] = etag
+    
+    try:
+        disasters, next_cursor = await get_disasters(
+            status=None if status == "all" else status.lower(),
+            disaster_type=disaster_type.lower() if disaster_type else None,
+            severity=severity.lower() if severity else None,
+            fields=projection,
+            limit=limit,
+            cursor=cursor
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return disasters
 
-@disaster_router.get("/active")
-async def get_active_disasters():
-    """Get a list of active disasters from our database."""
+@disaster_router.get("/nearby", response_model=List[NearbyDisaster])
+async def get_nearby_disasters(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radius_km: Optional[float] = Query(None, gt=0),
+    k: Optional[int] = Query(None, ge=1, le=DISASTER_NEARBY_MAX_K)
+):
+    """
+    Get disasters near a point, nearest first, with their distance in km.
+    
+    `radius_km` alone returns every disaster within the radius; `k` returns
+    the k nearest, limited to `radius_km` when both are given.
+    """
+    if radius_km is None and k is None:
+        raise HTTPException(status_code=400, detail="Provide radius_km, k or both")
     try:
-        disasters = await get_disaster_data()
-        return disasters
+        return await get_disasters_near(lat, lng, radius_km, k)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 # Mental Health Module
-@mental_health_router.post("/subscribe")
+@mental_health_router.post("/subscribe", response_model=SubscriptionResult)
 async def subscribe_to_mental_health(request: MentalHealthSubscription):
     """Subscribe to mental health services using ERC-7715 streams."""
     try:
@@ -134,18 +374,19 @@ async def subscribe_to_mental_health(request: MentalHealthSubscription):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@mental_health_router.post("/chat")
+@mental_health_router.post("/chat", response_model=ChatResponse)
 async def chat_with_ai(message: ChatMessage, background_tasks: BackgroundTasks):
     """Chat with the mental health AI agent."""
     try:
         # Get user's chat history for context
-        chat_history = await get_user_chat_history(message.wallet_address)
+        chat_history = await get_recent_chat_history(message.wallet_address)
         
         # Get AI response
         response = await get_mental_health_response(
             message.message, 
             chat_history,
-            message.language
+            message.language,
+            message.wallet_address
         )
         
         # Save the conversation to database
@@ -163,6 +404,9 @@ async def chat_with_ai(message: ChatMessage, background_tasks: BackgroundTasks):
             response
         )
         
+        # Fold older turns into the rolling summary once the exchange is saved
+        background_tasks.add_task(update_conversation_summary, message.wallet_address)
+        
         return {
             "response": response,
             "timestamp": datetime.now().isoformat()
@@ -170,11 +414,109 @@ async def chat_with_ai(message: ChatMessage, background_tasks: BackgroundTasks):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@mental_health_router.get("/history/{wallet_address}")
-async def get_chat_history(wallet_address: str):
-    """Get chat history for a user."""
+@mental_health_router.post("/chat/stream")
+async def chat_with_ai_stream(message: ChatMessage):
+    """
+    Chat with the mental health AI agent, streaming the reply as server-sent events.
+    
+    Each token is sent as a `data: {"token": ...}` event as soon as Gaia produces
+    it, followed by a final `done` event carrying the full response. The exchange
+    is saved to the chat history once the stream finishes.
+    """
+    try:
+        chat_history = await get_recent_chat_history(message.wallet_address)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    async def save_exchange(response: str):
+        await save_chat_message(message.wallet_address, "user", message.message)
+        await save_chat_message(message.wallet_address, "ai", response)
+        run_in_background(update_conversation_summary(message.wallet_address), "conversation summary update")
+    
+    async def event_stream():
+        parts = []
+        save = None
+        try:
+            async for token in get_mental_health_response_stream(
+                message.message,
+                chat_history,
+                message.language,
+                message.wallet_address
+            ):
+                parts.append(token)
+                yield b"data: " + dumps({"token": token}) + b"\n\n"
+            
+            response = "".join(parts)
+            # Shielded: a disconnect during the save must not stop it halfway (the user
+            # message stored, the reply not) and have the partial save below store it again
+            save = run_in_background(save_exchange(response), "save of a chat exchange")
+            await asyncio.shield(save)
+            
+            done = {"response": response, "timestamp": datetime.now().isoformat()}
+            yield b"event: done\ndata: " + dumps(done) + b"\n\n"
+        finally:
+            # The client disconnected mid-stream: keep what it has already seen
+            if save is None and parts:
+                run_in_background(save_exchange("".join(parts)), "save of a partial chat exchange")
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@mental_health_router.get("/history/{wallet_address}", response_model=List[ChatHistoryMessage])
+async def get_chat_history(
+    wallet_address: str,
+    request: Request,
+    response: Response,
+    limit: int = Query(CHAT_HISTORY_PAGE_SIZE, ge=1, le=CHAT_HISTORY_PAGE_MAX_SIZE),
+    before: Optional[str] = None,
+    after: Optional[str] = None
+):
+    """
+    Get a page of chat history for a user, oldest message first.
+    
+    Without a cursor this is the newest page. Pass a message ID as `before`
+    to page back through older messages, or as `after` to page forward
+    through newer ones; when more messages remain in that direction, the
+    `X-Next-Cursor` response header carries the ID to pass next. Use
+    /history/{wallet_address}/export for the whole history.
+    """
+    if before and after:
+        raise HTTPException(status_code=400, detail="Pass either before or after, not both")
+    
+    etag = await get_chat_history_etag(wallet_address)
+    not_modified = conditional_gets.check(request, etag)
+    if not_modified is not None:
+        return not_modified
+    response.headers["ETag"] = etag
+    
     try:
-        history = await get_user_chat_history(wallet_address)
-        return history
+        history, next_cursor = await get_chat_history_page(wallet_address, limit, before=before, after=after)
+    except MessageNotFoundError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return history
+
+@mental_health_router.get("/history/{wallet_address}/export")
+async def export_chat_history(wallet_address: str):
+    """
+    Export a user's whole chat history as NDJSON, one message per line, oldest first.
+    
+    Messages are streamed as they are read from the chat store, so memory
+    use stays flat however long the history is.
+    """
+    async def messages():
+        async for message in iter_chat_history(wallet_address):
+            yield dumps(message) + b"\n"
+    
+    return StreamingResponse(
+        messages(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="chat-history-{wallet_address}.ndjson"'}
+    )
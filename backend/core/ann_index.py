@@ -0,0 +1,410 @@
+"""
+GuardianLink Approximate Nearest-Neighbour Index
+IVF (inverted file) index in pure NumPy for large resource corpora. Vectors
+are clustered with spherical k-means and each query only scores the
+documents in its `nprobe` closest clusters.
+"""
+
+import json
+import logging
+import os
+import uuid
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from guardianlink.core.vector_store import _Partition, normalize_rows, top_k
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class _Doc:
+    """Minimal document restored from a snapshot."""
+    
+    def __init__(self, page_content: str, metadata: Dict[str, Any]):
+        self.page_content = page_content
+        self.metadata = metadata
+
+def spherical_kmeans(vectors: np.ndarray, clusters: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """
+    Cluster unit vectors by cosine similarity.
+    
+    Args:
+        vectors: (n, dim) L2-normalized training vectors
+        clusters: Number of centroids
+        iterations: Lloyd iterations
+        seed: Random seed for initialization and empty-cluster reseeding
+    
+    Returns:
+        (clusters, dim) L2-normalized centroids
+    """
+    rng = np.random.default_rng(seed)
+    clusters = min(clusters, len(vectors))
+    centroids = vectors[rng.choice(len(vectors), clusters, replace=False)].copy()
+    
+    for _ in range(iterations):
+        labels = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, vectors)
+        counts = np.bincount(labels, minlength=clusters)
+        
+        empty = np.flatnonzero(counts == 0)
+        if len(empty):
+            sums[empty] = vectors[rng.choice(len(vectors), len(empty), replace=False)]
+        centroids = normalize_rows(sums)
+    return centroids
+
+class IVFIndex:
+    """
+    IVF-Flat approximate nearest-neighbour index.
+    
+    Exposes the same add_documents/delete/search/partition_size interface as
+    VectorStore, so it can back the same retriever. Partitions (e.g. language)
+    and other metadata are filtered with bitmaps over the shared row storage.
+    
+    Until the index is trained (explicitly with train(), or automatically once
+    train_threshold vectors were added) searches fall back to an exact scan.
+    After training new vectors are assigned to their nearest centroid as they
+    are inserted; call train() again to rebalance after heavy growth.
+    
+    Knobs:
+        nlist: number of clusters; more clusters mean shorter lists to scan
+        nprobe: clusters scanned per query; higher means better recall, more latency
+    """
+    
+    def __init__(
+        self,
+        dim: int,
+        nlist: int = 1024,
+        nprobe: int = 16,
+        partition_field: str = "language",
+        train_threshold: Optional[int] = None,
+        initial_capacity: int = 64
+    ):
+        self.dim = dim
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.partition_field = partition_field
+        self.train_threshold = train_threshold if train_threshold is not None else nlist * 39
+        
+        self.storage = _Partition(dim, initial_capacity)
+        self.assign = np.full(initial_capacity, -1, dtype=np.int32)
+        self.centroids: Optional[np.ndarray] = None
+        # Inverted lists as chunks of row numbers, merged lazily on search
+        self._lists: List[List[np.ndarray]] = []
+        self._dirty = set()  # Lists holding rows that were deleted since the last merge
+        self._documents: Dict[str, Tuple[int, Any]] = {}
+    
+    def __len__(self) -> int:
+        return len(self._documents)
+    
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+    
+    @property
+    def partitions(self) -> Dict[Hashable, int]:
+        """Live document count per partition value."""
+        return {
+            value: int((bitmap[:self.storage.size] & self.storage.live[:self.storage.size]).sum())
+            for (field, value), bitmap in self.storage.bitmaps.items()
+            if field == self.partition_field
+        }
+    
+    def partition_size(self, key: Hashable) -> int:
+        """Number of live documents in a partition."""
+        bitmap = self.storage.bitmaps.get((self.partition_field, key))
+        if bitmap is None:
+            return 0
+        return int((bitmap[:self.storage.size] & self.storage.live[:self.storage.size]).sum())
+    
+    def train(self, sample_size: int = 100_000, iterations: int = 10) -> None:
+        """
+        Learn cluster centroids from the stored vectors and rebuild the lists.
+        
+        Args:
+            sample_size: Maximum number of vectors used for k-means
+            iterations: k-means iterations
+        """
+        rows = np.flatnonzero(self.storage.live[:self.storage.size])
+        if len(rows) == 0:
+            raise ValueError("Cannot train an empty index")
+        
+        rng = np.random.default_rng(0)
+        sample = rows if len(rows) <= sample_size else rng.choice(rows, sample_size, replace=False)
+        self.centroids = spherical_kmeans(self.storage.matrix[sample], self.nlist, iterations)
+        
+        self._lists = [[] for _ in range(len(self.centroids))]
+        self._dirty.clear()
+        self.assign[:] = -1
+        self._assign_rows(rows)
+        # Merge each list into one row array now rather than on the first searches
+        for list_id in range(len(self._lists)):
+            self._list_rows(list_id)
+        logger.info(f"Trained IVF index: {len(self.centroids)} lists over {len(rows)} vectors")
+    
+    def _assign_rows(self, rows: np.ndarray, chunk: int = 65536) -> None:
+        """Put rows on the inverted list of their nearest centroid."""
+        for start in range(0, len(rows), chunk):
+            part = rows[start:start + chunk]
+            labels = np.argmax(self.storage.matrix[part] @ self.centroids.T, axis=1).astype(np.int32)
+            self.assign[part] = labels
+            order = np.argsort(labels, kind="stable")
+            sorted_labels = labels[order]
+            boundaries = np.flatnonzero(np.diff(sorted_labels)) + 1
+            for group in np.split(order, boundaries):
+                self._lists[int(labels[group[0]])].append(part[group])
+    
+    def _list_rows(self, list_id: int) -> np.ndarray:
+        """Rows on an inverted list, merging chunks and dropping stale entries."""
+        chunks = self._lists[list_id]
+        if not chunks:
+            return np.empty(0, dtype=np.int64)
+        if len(chunks) > 1 or list_id in self._dirty:
+            rows = np.concatenate(chunks)
+            rows = rows[self.assign[rows] == list_id]
+            if list_id in self._dirty:
+                # A deleted row may have been reused on this same list
+                rows = np.unique(rows)
+                self._dirty.discard(list_id)
+            self._lists[list_id] = chunks = [rows]
+        return chunks[0]
+    
+    def add_documents(self, documents: Sequence[Any], vectors: Any, ids: Optional[Sequence[str]] = None) -> List[str]:
+        """
+        Insert documents incrementally.
+        
+        Args:
+            documents: Objects with a `metadata` dict (e.g. Document)
+            vectors: One embedding per document
+            ids: Optional ids; random ids are generated when omitted
+        
+        Returns:
+            The ids of the added documents
+        """
+        matrix = normalize_rows(vectors)
+        if matrix.shape != (len(documents), self.dim):
+            raise ValueError(f"Expected {len(documents)} vectors of dimension {self.dim}, got {matrix.shape}")
+        ids = list(ids) if ids is not None else [uuid.uuid4().hex for _ in documents]
+        self.delete([doc_id for doc_id in ids if doc_id in self._documents])
+        
+        rows = self.storage.allocate(len(documents))
+        if len(self.assign) < len(self.storage.live):
+            self.assign = np.concatenate([self.assign, np.full(len(self.storage.live) - len(self.assign), -1, dtype=np.int32)])
+        
+        self.storage.matrix[rows] = matrix
+        self.storage.live[rows] = True
+        for row, document, doc_id in zip(rows, documents, ids):
+            self.storage.ids[row] = doc_id
+            for field, value in document.metadata.items():
+                if isinstance(value, Hashable):
+                    self.storage.bitmap(field, value)[row] = True
+            self._documents[doc_id] = (int(row), document)
+        
+        if self.is_trained:
+            self._assign_rows(rows)
+        elif len(self._documents) >= self.train_threshold:
+            self.train()
+        return ids
+    
+    def delete(self, ids: Iterable[str]) -> int:
+        """
+        Remove documents by id (their rows are tombstoned and reused).
+        
+        Args:
+            ids: Ids of documents to remove
+        
+        Returns:
+            Number of documents removed
+        """
+        removed = 0
+        for doc_id in ids:
+            entry = self._documents.pop(doc_id, None)
+            if entry is None:
+                continue
+            row, document = entry
+            self.storage.live[row] = False
+            self.storage.ids[row] = None
+            for field, value in document.metadata.items():
+                if isinstance(value, Hashable) and (field, value) in self.storage.bitmaps:
+                    self.storage.bitmaps[(field, value)][row] = False
+            if self.assign[row] >= 0:
+                self._dirty.add(int(self.assign[row]))
+            self.assign[row] = -1
+            self.storage.free.append(row)
+            removed += 1
+        return removed
+    
+    def _conditions(self, partition: Optional[Hashable], filters: Optional[Dict[str, Any]]) -> Dict[str, Sequence[Any]]:
+        """Partition and metadata filters as {field: accepted values}."""
+        conditions = dict(filters or {})
+        if partition is not None:
+            conditions[self.partition_field] = partition
+        return {
+            field: wanted if isinstance(wanted, (set, frozenset, list, tuple)) else [wanted]
+            for field, wanted in conditions.items()
+        }
+    
+    def _mask(self, conditions: Dict[str, Sequence[Any]]) -> np.ndarray:
+        """Live rows matching every condition, as a mask over all rows (for exact scans)."""
+        size = self.storage.size
+        mask = self.storage.live[:size].copy()
+        for field, values in conditions.items():
+            field_mask = np.zeros(size, dtype=bool)
+            for value in values:
+                bitmap = self.storage.bitmaps.get((field, value))
+                if bitmap is not None:
+                    field_mask |= bitmap[:size]
+            mask &= field_mask
+        return mask
+    
+    def _select(self, rows: np.ndarray, conditions: Dict[str, Sequence[Any]]) -> np.ndarray:
+        """The live rows among rows that match every condition, reading only those rows."""
+        keep = self.storage.live[rows]
+        for field, values in conditions.items():
+            field_keep = np.zeros(len(rows), dtype=bool)
+            for value in values:
+                bitmap = self.storage.bitmaps.get((field, value))
+                if bitmap is not None:
+                    field_keep |= bitmap[rows]
+            keep &= field_keep
+        return rows[keep]
+    
+    def search(
+        self,
+        query_vectors: Any,
+        k: int = 4,
+        partition: Optional[Hashable] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        nprobe: Optional[int] = None
+    ) -> List[List[Tuple[Any, float]]]:
+        """
+        Find approximately the k most similar documents for each query.
+        
+        Args:
+            query_vectors: A query vector or a matrix of query vectors
+            k: Number of results per query
+            partition: Optional partition value to restrict the search to
+            filters: Optional {field: value or collection of values} metadata filter
+            nprobe: Clusters scanned per query (defaults to the index setting)
+        
+        Returns:
+            For each query, a list of (document, cosine similarity) pairs, best first
+        """
+        queries = normalize_rows(query_vectors)
+        if self.storage.size == 0:
+            return [[] for _ in range(queries.shape[0])]
+        
+        conditions = self._conditions(partition, filters)
+        needs_filter = bool(conditions) or len(self._documents) < self.storage.size
+        
+        if not self.is_trained:
+            scores = queries @ self.storage.matrix[:self.storage.size].T
+            if needs_filter:
+                scores[:, ~self._mask(conditions)] = -np.inf
+            candidates = np.broadcast_to(np.arange(self.storage.size), scores.shape)
+            return [self._results(candidates[i], scores[i], k) for i in range(queries.shape[0])]
+        
+        nprobe = min(nprobe or self.nprobe, len(self.centroids))
+        probes, _ = top_k(queries @ self.centroids.T, nprobe)
+        
+        # Only the probed lists' rows are read, so a query costs O(candidates) rather than O(rows)
+        results = []
+        for query, lists in zip(queries, probes):
+            rows = np.concatenate([self._list_rows(list_id) for list_id in lists])
+            if needs_filter and len(rows):
+                rows = self._select(rows, conditions)
+            scores = self.storage.matrix[rows] @ query
+            results.append(self._results(rows, scores, k))
+        return results
+    
+    def _results(self, rows: np.ndarray, scores: np.ndarray, k: int) -> List[Tuple[Any, float]]:
+        if len(rows) == 0:
+            return []
+        order, values = top_k(scores[np.newaxis, :], k)
+        return [
+            (self._documents[self.storage.ids[rows[i]]][1], float(score))
+            for i, score in zip(order[0], values[0])
+            if np.isfinite(score)
+        ]
+    
+    def save(self, path: str) -> None:
+        """
+        Write a snapshot of the index to a directory.
+        
+        Args:
+            path: Directory to write index.npz and documents.json into
+        """
+        os.makedirs(path, exist_ok=True)
+        rows = np.asarray([row for row, _ in self._documents.values()], dtype=np.int64)
+        np.savez(
+            os.path.join(path, "index.npz"),
+            vectors=self.storage.matrix[rows] if len(rows) else np.empty((0, self.dim), dtype=np.float32),
+            centroids=self.centroids if self.is_trained else np.empty((0, self.dim), dtype=np.float32)
+        )
+        with open(os.path.join(path, "documents.json"), "w") as f:
+            json.dump({
+                "dim": self.dim,
+                "nlist": self.nlist,
+                "nprobe": self.nprobe,
+                "partition_field": self.partition_field,
+                "train_threshold": self.train_threshold,
+                "documents": [
+                    {"id": doc_id, "page_content": document.page_content, "metadata": document.metadata}
+                    for doc_id, (_, document) in self._documents.items()
+                ]
+            }, f)
+    
+    @classmethod
+    def load(cls, path: str, document_factory=None) -> "IVFIndex":
+        """
+        Restore an index written by save().
+        
+        Args:
+            path: Snapshot directory
+            document_factory: Optional callable(page_content, metadata) building documents
+        
+        Returns:
+            The restored index, with the saved centroids (no retraining)
+        """
+        with open(os.path.join(path, "documents.json")) as f:
+            meta = json.load(f)
+        arrays = np.load(os.path.join(path, "index.npz"))
+        
+        index = cls(
+            meta["dim"],
+            nlist=meta["nlist"],
+            nprobe=meta["nprobe"],
+            partition_field=meta["partition_field"],
+            train_threshold=meta["train_threshold"],
+            initial_capacity=max(len(meta["documents"]), 1)
+        )
+        if len(arrays["centroids"]):
+            index.centroids = arrays["centroids"]
+            index._lists = [[] for _ in range(len(index.centroids))]
+        
+        factory = document_factory or _Doc
+        documents = [factory(doc["page_content"], doc["metadata"]) for doc in meta["documents"]]
+        if documents:
+            index.add_documents(documents, arrays["vectors"], ids=[doc["id"] for doc in meta["documents"]])
+        return index
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get index metrics.
+        
+        Returns:
+            Document count, training state, list sizes and knobs
+        """
+        sizes = [sum(len(chunk) for chunk in chunks) for chunks in self._lists]
+        return {
+            "documents": len(self._documents),
+            "dim": self.dim,
+            "trained": self.is_trained,
+            "nlist": len(self._lists) if self.is_trained else self.nlist,
+            "nprobe": self.nprobe,
+            "max_list_size": max(sizes) if sizes else 0,
+            "partitions": {str(key): count for key, count in self.partitions.items()},
+            "matrix_bytes": self.storage.matrix.nbytes
+        }
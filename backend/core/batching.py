@@ -0,0 +1,144 @@
+"""
+GuardianLink Micro-Batching
+Collects concurrent single-item async requests into batches so that a
+batch-capable upstream (such as an embeddings endpoint) is called once
+per batch instead of once per item.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class MicroBatcher:
+    """
+    Groups submitted items into batches of up to max_batch_size items.
+    
+    A batch is sent as soon as it is full, or max_wait_ms after its first item
+    was queued, whichever comes first. The batch function must return one
+    result per input item, in the same order.
+    """
+    
+    def __init__(
+        self,
+        fn: Callable[[List[Any]], Awaitable[List[Any]]],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        
+        self.fn = fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        
+        self._pending: List[Tuple[Any, asyncio.Future, float]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+        
+        self.batches = 0
+        self.items = 0
+        self.failed_batches = 0
+        self.total_queue_wait = 0.0
+        self.max_queue_wait = 0.0
+        self.batch_size_histogram: Dict[int, int] = {}
+        
+    async def submit(self, item: Any) -> Any:
+        """
+        Queue an item and wait for its result.
+        
+        Args:
+            item: A single input for the batch function
+            
+        Returns:
+            The result for this item
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future, time.perf_counter()))
+        
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_ms / 1000, self._flush)
+        
+        return await future
+    
+    async def submit_many(self, items: List[Any]) -> List[Any]:
+        """
+        Queue several items and wait for all of their results.
+        
+        Args:
+            items: Inputs for the batch function
+            
+        Returns:
+            Results in the same order as items
+        """
+        return list(await asyncio.gather(*(self.submit(item) for item in items)))
+    
+    def _flush(self) -> None:
+        """Send everything queued so far, in chunks of max_batch_size."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        
+        while self._pending:
+            batch = self._pending[:self.max_batch_size]
+            del self._pending[:self.max_batch_size]
+            task = asyncio.ensure_future(self._run(batch))
+            # Keep a reference so the task is not garbage collected mid-flight
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+    
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future, float]]) -> None:
+        """Call the batch function and hand each waiter its own result."""
+        sent_at = time.perf_counter()
+        for _, _, queued_at in batch:
+            wait = sent_at - queued_at
+            self.total_queue_wait += wait
+            self.max_queue_wait = max(self.max_queue_wait, wait)
+        
+        size = len(batch)
+        self.batches += 1
+        self.items += size
+        self.batch_size_histogram[size] = self.batch_size_histogram.get(size, 0) + 1
+        
+        try:
+            results = await self.fn([item for item, _, _ in batch])
+            if len(results) != size:
+                raise ValueError(f"Batch function returned {len(results)} results for {size} items")
+        except Exception as e:
+            self.failed_batches += 1
+            logger.error(f"Error processing batch of {size} items: {str(e)}")
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for (_, future, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get batching metrics.
+        
+        Returns:
+            Batch counts, batch size distribution and queue wait times
+        """
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "failed_batches": self.failed_batches,
+            "pending": len(self._pending),
+            "avg_batch_size": self.items / self.batches if self.batches else 0.0,
+            "batch_size_histogram": dict(sorted(self.batch_size_histogram.items())),
+            "avg_queue_wait_ms": self.total_queue_wait / self.items * 1000 if self.items else 0.0,
+            "max_queue_wait_ms": self.max_queue_wait * 1000,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms
+        }
@@ -0,0 +1,204 @@
+"""
+GuardianLink Result Cache
+Bounded in-process cache with per-entry TTL and LRU eviction by entry count
+and approximate memory footprint.
+"""
+
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def approximate_size(key: Hashable, value: Any) -> int:
+    """
+    Estimate the memory cost of a cache entry in bytes.
+    
+    Uses the length of the JSON encoding, which tracks the real footprint of
+    the small dict/list/str payloads cached here closely enough for sizing.
+    
+    Args:
+        key: The cache key
+        value: The cached value
+        
+    Returns:
+        Approximate size in bytes
+    """
+    return len(repr(key)) + len(json.dumps(value, default=str))
+
+class TTLCache:
+    """
+    LRU cache whose entries expire after a time-to-live.
+    
+    Entries are evicted least-recently-used first whenever either max_entries
+    or max_bytes would be exceeded. Expired entries are dropped lazily when
+    they are read or reach the LRU end.
+    """
+    
+    def __init__(
+        self,
+        ttl_seconds: float,
+        max_entries: int,
+        max_bytes: Optional[int] = None,
+        sizeof: Callable[[Hashable, Any], int] = approximate_size,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.clock = clock
+        
+        # key -> (expires_at, size, value), ordered from least to most recently used
+        self._entries: "OrderedDict[Hashable, Tuple[float, int, Any]]" = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and entry[0] > self.clock()
+        
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Get a cached value and mark it as recently used.
+        
+        Args:
+            key: The cache key
+            default: Value returned on a miss
+            
+        Returns:
+            The cached value, or default if missing or expired
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        
+        if entry[0] <= self.clock():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return default
+        
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[2]
+    
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """
+        Store a value, evicting older entries if the cache is full.
+        
+        Args:
+            key: The cache key
+            value: The value to cache
+            ttl_seconds: Optional TTL overriding the cache default
+        """
+        size = self.sizeof(key, value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            logger.warning(f"Not caching entry of {size} bytes, larger than max_bytes={self.max_bytes}")
+            return
+        
+        if key in self._entries:
+            self._remove(key)
+        
+        expires_at = self.clock() + (self.ttl_seconds if ttl_seconds is None else ttl_seconds)
+        self._entries[key] = (expires_at, size, value)
+        self.bytes += size
+        
+        while len(self._entries) > self.max_entries or (self.max_bytes is not None and self.bytes > self.max_bytes):
+            oldest, (oldest_expiry, _, _) = next(iter(self._entries.items()))
+            self._remove(oldest)
+            if oldest_expiry <= self.clock():
+                self.expirations += 1
+            else:
+                self.evictions += 1
+    
+    def expires_in(self, key: Hashable) -> Optional[float]:
+        """
+        Get the remaining lifetime of an entry without touching its LRU position.
+        
+        Args:
+            key: The cache key
+            
+        Returns:
+            Seconds until expiry, or None if the key is not cached
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        return max(entry[0] - self.clock(), 0.0)
+    
+    def invalidate(self, key: Hashable) -> bool:
+        """
+        Remove a single entry.
+        
+        Args:
+            key: The cache key
+            
+        Returns:
+            True if an entry was removed
+        """
+        if key not in self._entries:
+            return False
+        self._remove(key)
+        self.invalidations += 1
+        return True
+    
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """
+        Remove every entry whose key matches a predicate.
+        
+        Args:
+            predicate: Function called with each key
+            
+        Returns:
+            Number of entries removed
+        """
+        matched = [key for key in self._entries if predicate(key)]
+        for key in matched:
+            self._remove(key)
+        self.invalidations += len(matched)
+        return len(matched)
+    
+    def clear(self) -> None:
+        """Remove every entry."""
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+        self.bytes = 0
+        
+    def _remove(self, key: Hashable) -> None:
+        _, size, _ = self._entries.pop(key)
+        self.bytes -= size
+        
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache sizing metrics.
+        
+        Returns:
+            Hit/miss counts and ratios, eviction counts and current size
+        """
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "miss_ratio": self.misses / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations
+        }
@@ -0,0 +1,203 @@
+"""
+GuardianLink Cache Warmer
+Background refresh of hot cache entries shortly before they expire, plus a
+bounded tracker of the most requested keys whose counts decay over time.
+"""
+
+import asyncio
+import heapq
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+from guardianlink.core.concurrency import map_as_completed
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Largest relative weight before HotKeyTracker rebases its counts (2**64, about 64 half-lives)
+_MAX_WEIGHT = 2.0 ** 64
+
+class HotKeyTracker:
+    """
+    Approximate request counts per key, decaying with a half-life in seconds.
+    
+    A request counts for 1 when it is recorded and for half as much every
+    `half_life` seconds after, so keys that were popular an hour ago but are
+    no longer requested fade out however often the counts are read. Decay is
+    measured on `clock` (monotonic by default), not per call. Keys whose
+    count falls below `min_count` are forgotten by decay(). At most
+    `max_keys` keys are kept; the least requested are pruned first.
+    
+    Counts are stored relative to a reference time: a request at time t adds
+    2 ** ((t - reference) / half_life), so recording stays O(1) and ranking
+    needs no rescaling. The reference is moved forward by decay() and before
+    the weights grow large.
+    """
+    
+    def __init__(
+        self,
+        max_keys: int = 1000,
+        half_life: float = 300.0,
+        min_count: float = 0.1,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        if half_life <= 0:
+            raise ValueError("half_life must be positive")
+        self.max_keys = max_keys
+        self.half_life = half_life
+        self.min_count = min_count
+        self.clock = clock
+        self.counts: Dict[Hashable, float] = {}
+        self._reference = clock()
+    
+    def __len__(self) -> int:
+        return len(self.counts)
+    
+    def _scale(self, now: float) -> float:
+        """Weight of a request made now, relative to the reference time."""
+        return 2.0 ** ((now - self._reference) / self.half_life)
+    
+    def count(self, key: Hashable) -> float:
+        """Current decayed count of key."""
+        return self.counts.get(key, 0.0) / self._scale(self.clock())
+    
+    def record(self, key: Hashable) -> None:
+        """Count one request for key."""
+        now = self.clock()
+        weight = self._scale(now)
+        if weight > _MAX_WEIGHT:
+            self._rebase(now)
+            weight = 1.0
+        self.counts[key] = self.counts.get(key, 0.0) + weight
+        # Prune in bulk so that recording stays O(1) amortized
+        if len(self.counts) > 2 * self.max_keys:
+            self.counts = dict(heapq.nlargest(self.max_keys, self.counts.items(), key=lambda item: item[1]))
+    
+    def top(self, n: int, min_count: float = 0.0) -> List[Hashable]:
+        """Get up to n of the most requested keys with a current count of at least min_count, most requested first."""
+        threshold = min_count * self._scale(self.clock())
+        ranked = heapq.nlargest(n, self.counts.items(), key=lambda item: item[1])
+        return [key for key, count in ranked if count >= threshold]
+    
+    def decay(self) -> None:
+        """Forget keys whose count has decayed below min_count. How fast counts age does not depend on how often this runs."""
+        self._rebase(self.clock())
+    
+    def _rebase(self, now: float) -> None:
+        """Move the reference time to now, dividing stored counts by the elapsed decay."""
+        scale = self._scale(now)
+        rebased = ((key, count / scale) for key, count in self.counts.items())
+        self.counts = {key: count for key, count in rebased if count >= self.min_count}
+        self._reference = now
+
+class CacheWarmer:
+    """
+    Periodically recomputes cache entries for a set of hot keys.
+    
+    Every `interval` seconds (randomized by +/- `jitter`), `targets()` lists
+    the keys worth keeping warm. Keys that are missing or expire within
+    `refresh_ahead` seconds, according to `expires_in(key)`, are recomputed
+    with `warm(key)`, at most `concurrency` at a time and each started after a
+    random delay of up to `jitter * interval` so refreshes do not burst.
+    Keep `refresh_ahead` above `interval * (1 + jitter)` plus the time a
+    refresh takes, so that a key is always refreshed before it goes cold.
+    """
+    
+    def __init__(
+        self,
+        targets: Callable[[], Awaitable[List[Hashable]]],
+        warm: Callable[[Hashable], Awaitable[Any]],
+        expires_in: Callable[[Hashable], Optional[float]],
+        interval: float = 30.0,
+        refresh_ahead: float = 60.0,
+        concurrency: int = 4,
+        jitter: float = 0.2,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+        rng: Optional[random.Random] = None
+    ):
+        self.targets = targets
+        self.warm = warm
+        self.expires_in = expires_in
+        self.interval = interval
+        self.refresh_ahead = refresh_ahead
+        self.concurrency = concurrency
+        self.jitter = jitter
+        self.sleep = sleep
+        self.random = rng or random.Random()
+        self._task: Optional[asyncio.Task] = None
+        self.cycles = 0
+        self.refreshed = 0
+        self.skipped = 0
+        self.failures = 0
+    
+    def is_due(self, key: Hashable) -> bool:
+        """Whether key is missing from the cache or about to expire."""
+        remaining = self.expires_in(key)
+        return remaining is None or remaining <= self.refresh_ahead
+    
+    async def run_once(self) -> int:
+        """
+        Refresh every target key that is due.
+        
+        Returns:
+            Number of keys refreshed successfully
+        """
+        self.cycles += 1
+        keys = await self.targets()
+        due = [key for key in keys if self.is_due(key)]
+        self.skipped += len(keys) - len(due)
+        
+        async def refresh(key: Hashable) -> Any:
+            if self.jitter > 0:
+                await self.sleep(self.random.uniform(0, self.jitter * self.interval))
+            return await self.warm(key)
+        
+        refreshed = 0
+        async for key, _, error in map_as_completed(refresh, due, self.concurrency):
+            if error is None:
+                refreshed += 1
+            else:
+                self.failures += 1
+                logger.warning(f"Could not warm cache entry {key!r}: {str(error)}")
+        self.refreshed += refreshed
+        return refreshed
+    
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Cache warming cycle failed: {str(e)}")
+            await self.sleep(self.interval * (1 + self.random.uniform(-self.jitter, self.jitter)))
+    
+    def start(self) -> None:
+        """Start warming in the background on the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+    
+    async def stop(self) -> None:
+        """Stop the background task, cancelling any refreshes in progress."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+    
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "cycles": self.cycles,
+            "refreshed": self.refreshed,
+            "skipped": self.skipped,
+            "failures": self.failures
+        }
@@ -0,0 +1,140 @@
+"""
+GuardianLink Circuit Breaker
+Fails calls fast while an upstream is unhealthy instead of letting every
+request wait out its full timeout.
+"""
+
+import logging
+import time
+from typing import Any, Callable, Dict, Optional
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the upstream while the circuit is open."""
+
+class CircuitBreaker:
+    """
+    Classic three-state circuit breaker.
+    
+    After `failure_threshold` consecutive failures the circuit opens and
+    calls are rejected immediately. Once `reset_timeout` seconds have passed a
+    single probe call is let through (half-open): success closes the circuit,
+    failure opens it again for another `reset_timeout`.
+    
+    allow() returns a token naming the state period the call was admitted in
+    (every state change starts a new one), which the caller passes back to
+    record(). Outcomes of calls admitted before the last state change are
+    ignored, so a slow call from before the circuit opened can neither close
+    it nor release the half-open probe slot.
+    """
+    
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        name: str = "upstream",
+        clock: Optional[Callable[[], float]] = None
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.name = name
+        self.clock = clock or time.monotonic
+        
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._generation = 0
+        
+        self.rejected = 0
+        self.opened = 0
+        self.stale = 0
+    
+    def allow(self) -> int:
+        """
+        Check whether a call may proceed.
+        
+        Returns:
+            Token to pass to record() with the call's outcome
+        
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with the probe already running
+        """
+        if self.state == OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+            self._set_state(HALF_OPEN)
+            logger.info(f"Circuit for {self.name} half-open, sending probe")
+        
+        if self.state == CLOSED:
+            return self._generation
+        if self.state == HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return self._generation
+        
+        self.rejected += 1
+        raise CircuitOpenError(f"Circuit for {self.name} is open")
+    
+    def record(self, token: int, success: Optional[bool]) -> None:
+        """
+        Report the outcome of an allowed call.
+        
+        Args:
+            token: The value allow() returned for the call
+            success: True on success, False on an upstream failure, None for
+                outcomes that say nothing about upstream health (cancellation,
+                client errors)
+        """
+        if token != self._generation:
+            # Admitted before the last state change: says nothing about the current period
+            self.stale += 1
+            return
+        
+        probe = self.state == HALF_OPEN
+        if probe:
+            self._probe_in_flight = False
+        
+        if success is None:
+            return
+        if success:
+            if self.state != CLOSED:
+                logger.info(f"Circuit for {self.name} closed")
+                self._set_state(CLOSED)
+            self.consecutive_failures = 0
+            return
+        
+        self.consecutive_failures += 1
+        if probe or self.consecutive_failures >= self.failure_threshold:
+            self._open()
+    
+    def _set_state(self, state: str) -> None:
+        self.state = state
+        self._generation += 1
+        self._probe_in_flight = False
+    
+    def _open(self) -> None:
+        self._set_state(OPEN)
+        self._opened_at = self.clock()
+        self.opened += 1
+        logger.warning(f"Circuit for {self.name} opened after {self.consecutive_failures} consecutive failures")
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get circuit breaker metrics.
+        
+        Returns:
+            Current state, consecutive failures and counters (stale: outcomes ignored
+            because the call was admitted before the last state change)
+        """
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "rejected": self.rejected,
+            "opened": self.opened,
+            "stale": self.stale
+        }
@@ -0,0 +1,290 @@
+"""
+GuardianLink Adaptive Concurrency
+AIMD concurrency limiter with a priority wait queue, plus helpers for
+jittered exponential retry that honours upstream Retry-After hints.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Lower values are served first when the limit is reached
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+class ConcurrencyLimitExceeded(Exception):
+    """Raised when a request is shed because the wait queue is full or timed out."""
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Limits in-flight upstream calls with an adaptive (AIMD) limit.
+    
+    The limit grows by roughly one per round trip while the short-term average
+    latency stays within `latency_tolerance` times the long-term average, and
+    is cut by `backoff_ratio` when the upstream signals overload (429/503,
+    timeouts) or the short-term average climbs past that tolerance. Comparing
+    two averages rather than single samples against the best latency seen
+    keeps ordinary latency jitter from being mistaken for congestion. Callers beyond the limit wait in a
+    priority queue; when the queue is full the lowest-priority request is shed.
+    """
+    
+    def __init__(
+        self,
+        initial_limit: int = 20,
+        min_limit: int = 1,
+        max_limit: int = 200,
+        max_queue: int = 1000,
+        queue_timeout: Optional[float] = None,
+        latency_tolerance: float = 2.0,
+        backoff_ratio: float = 0.9,
+        short_window: int = 10,
+        long_window: int = 100
+    ):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.latency_tolerance = latency_tolerance
+        self.backoff_ratio = backoff_ratio
+        self.short_alpha = 2.0 / (short_window + 1)
+        self.long_alpha = 2.0 / (long_window + 1)
+        
+        self.in_flight = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._last_decrease = 0.0
+        self.samples = 0
+        self.short_latency: Optional[float] = None
+        self.long_latency: Optional[float] = None
+        
+        self.accepted = 0
+        self.rejected = 0
+        self.overloads = 0
+        self.decreases = 0
+        
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+    
+    async def acquire(self, priority: int = PRIORITY_NORMAL) -> None:
+        """
+        Wait for a slot.
+        
+        Args:
+            priority: Queue priority, lower is served first
+            
+        Raises:
+            ConcurrencyLimitExceeded: If the request was shed
+        """
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            self.accepted += 1
+            return
+        
+        if len(self._waiters) >= self.max_queue:
+            worst = max(self._waiters)
+            if worst[0] <= priority:
+                self.rejected += 1
+                raise ConcurrencyLimitExceeded("Gaia request queue is full")
+            # Shed the least important queued request to make room
+            self._remove(worst)
+            self.rejected += 1
+            worst[2].set_exception(ConcurrencyLimitExceeded("Shed for a higher-priority request"))
+        
+        entry = (priority, next(self._sequence), asyncio.get_running_loop().create_future())
+        heapq.heappush(self._waiters, entry)
+        try:
+            if self.queue_timeout is None:
+                await entry[2]
+            else:
+                await asyncio.wait_for(asyncio.shield(entry[2]), self.queue_timeout)
+        except asyncio.TimeoutError:
+            if self._abandon(entry):
+                self.rejected += 1
+                raise ConcurrencyLimitExceeded(f"Waited more than {self.queue_timeout}s for a Gaia slot")
+        except asyncio.CancelledError:
+            if not self._abandon(entry):
+                # The slot was granted just as we were cancelled: hand it back
+                self.release()
+            raise
+        self.accepted += 1
+    
+    def _remove(self, entry: Tuple[int, int, asyncio.Future]) -> None:
+        self._waiters.remove(entry)
+        heapq.heapify(self._waiters)
+    
+    def _abandon(self, entry: Tuple[int, int, asyncio.Future]) -> bool:
+        """
+        Leave the queue after a timeout or cancellation.
+        
+        Returns:
+            True if the waiter was still queued, False if it had already been
+            granted a slot
+        """
+        future = entry[2]
+        if future.done() and not future.cancelled() and future.exception() is None:
+            return False
+        if entry in self._waiters:
+            self._remove(entry)
+        if not future.done():
+            future.cancel()
+        return True
+    
+    def release(self) -> None:
+        """Return a slot and wake queued callers."""
+        self.in_flight -= 1
+        self._wake()
+    
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < int(self.limit):
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self.in_flight += 1
+            future.set_result(None)
+    
+    def record(self, latency: Optional[float], overloaded: bool = False) -> None:
+        """
+        Feed an observation back into the limit.
+        
+        Args:
+            latency: Duration of the call in seconds, or None to skip latency tracking
+            overloaded: Whether the upstream signalled overload
+        """
+        now = time.monotonic()
+        if latency is not None and not overloaded:
+            # Plain running means until each window has filled, so a lucky first sample cannot skew the baseline
+            self.samples += 1
+            if self.long_latency is None:
+                self.short_latency = self.long_latency = latency
+            else:
+                self.short_latency += max(self.short_alpha, 1.0 / self.samples) * (latency - self.short_latency)
+                self.long_latency += max(self.long_alpha, 1.0 / self.samples) * (latency - self.long_latency)
+        
+        congested = overloaded or (
+            latency is not None
+            and self.long_latency is not None
+            and self.short_latency > self.long_latency * self.latency_tolerance
+        )
+        if overloaded:
+            self.overloads += 1
+        
+        if congested:
+            # Decrease at most once per round trip so one burst is one signal
+            if now - self._last_decrease >= (latency or 0.0):
+                self.limit = max(self.min_limit, self.limit * self.backoff_ratio)
+                self._last_decrease = now
+                self.decreases += 1
+        else:
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            self._wake()
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get limiter metrics.
+        
+        Returns:
+            Current limit, in-flight and queued requests, and counters
+        """
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "overloads": self.overloads,
+            "limit_decreases": self.decreases,
+            "short_latency_ms": self.short_latency * 1000 if self.short_latency is not None else None,
+            "long_latency_ms": self.long_latency * 1000 if self.long_latency is not None else None
+        }
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header.
+    
+    Args:
+        value: Header value, either delta-seconds or an HTTP date
+        
+    Returns:
+        Seconds to wait, or None if absent or unparseable
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+def backoff_delay(attempt: int, base: float, cap: float, retry_after: Optional[float] = None) -> float:
+    """
+    Full-jitter exponential backoff, never shorter than a Retry-After hint.
+    
+    Args:
+        attempt: Zero-based retry attempt
+        base: Delay scale in seconds
+        cap: Maximum delay in seconds
+        retry_after: Optional server-requested delay in seconds
+        
+    Returns:
+        Seconds to sleep before the next attempt
+    """
+    delay = random.uniform(0, min(cap, base * (2 ** attempt)))
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, cap))
+    return delay
+
+async def map_as_completed(
+    fn: Callable[[Any], Awaitable[Any]],
+    items: Iterable[Any],
+    limit: int
+) -> AsyncIterator[Tuple[Any, Any, Optional[Exception]]]:
+    """
+    Run fn over items with at most `limit` calls in flight, yielding as each finishes.
+    
+    A failing call does not stop the others; its exception is yielded in
+    place of a result. Closing the generator early cancels outstanding calls.
+    
+    Args:
+        fn: Coroutine function applied to each item
+        items: Inputs
+        limit: Maximum concurrent calls
+        
+    Yields:
+        (item, result, exception) tuples in completion order, where exactly
+        one of result and exception is meaningful
+    """
+    semaphore = asyncio.Semaphore(max(1, limit))
+    
+    async def run(item):
+        async with semaphore:
+            try:
+                return item, await fn(item), None
+            except Exception as e:
+                return item, None, e
+    
+    tasks = [asyncio.ensure_future(run(item)) for item in items]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,355 @@
+"""
+GuardianLink Embedding Cache
+Persistent, content-addressed embedding cache. Vectors are stored in a
+memory-mapped float32 file with a compact binary key index, so lookups are
+zero-copy and several worker processes share the same page cache.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows has no fcntl
+    fcntl = None
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+KEY_SIZE = 16  # Bytes of BLAKE2b digest stored per row
+
+def embedding_key(model: str, text: str) -> bytes:
+    """
+    Content address of an embedding.
+    
+    Args:
+        model: Embedding model name
+        text: Embedded text
+    
+    Returns:
+        16-byte digest of (model, text)
+    """
+    return hashlib.blake2b(f"{model}\0{text}".encode("utf-8"), digest_size=KEY_SIZE).digest()
+
+class EmbeddingCache:
+    """
+    On-disk embedding cache for a single (model, version) namespace.
+    
+    Layout of <directory>/<model>-v<version>/:
+        meta.json    model, version, dimension and compaction generation
+        keys.bin     16-byte key per row, append-only
+        vectors.f32  row-major float32 matrix, one row per key
+        .lock        advisory lock serializing writers across processes
+    
+    Rows are only ever appended, so readers in other processes pick up new
+    entries by reading the tail of keys.bin. Bumping `version` (for example
+    when the embedding model changes) starts a fresh namespace; stale ones can
+    be removed with purge_other_versions().
+    
+    Methods do blocking file I/O and may wait on the writer lock, so async
+    callers should run them in an executor. They are safe to call from
+    several threads at once.
+    """
+    
+    def __init__(
+        self,
+        directory: str,
+        model: str,
+        version: int = 1,
+        dim: Optional[int] = None,
+        max_entries: Optional[int] = None
+    ):
+        self.model = model
+        # Size cap: put_many() compacts to the newest max_entries once a quarter more have accumulated
+        self.max_entries = max_entries
+        self.version = version
+        self.root = directory
+        self.path = os.path.join(directory, f"{model.replace('/', '_')}-v{version}")
+        os.makedirs(self.path, exist_ok=True)
+        
+        self.meta_path = os.path.join(self.path, "meta.json")
+        self.keys_path = os.path.join(self.path, "keys.bin")
+        self.vectors_path = os.path.join(self.path, "vectors.f32")
+        self.lock_path = os.path.join(self.path, ".lock")
+        
+        self.dim = dim
+        self.generation = 0
+        self._index: Dict[bytes, int] = {}
+        self._rows = 0
+        self._vectors: Optional[np.memmap] = None
+        
+        self.hits = 0
+        self.misses = 0
+        # Serializes threads of this process; the file lock only covers other processes
+        self._mutex = threading.RLock()
+        self._lock_held = False
+        
+        with self._locked():
+            meta = self._read_meta()
+            if meta is None:
+                self._write_meta()
+            elif meta["dim"] is not None and dim is not None and meta["dim"] != dim:
+                raise ValueError(f"Embedding cache {self.path} holds {meta['dim']}-d vectors, not {dim}-d")
+        self._reload()
+    
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Hold the cross-process writer lock."""
+        with self._mutex, open(self.lock_path, "a+") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            held, self._lock_held = self._lock_held, True
+            try:
+                yield
+            finally:
+                self._lock_held = held
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+    
+    @contextmanager
+    def _shared(self) -> Iterator[None]:
+        """Hold the file lock shared, unless this process already holds it exclusively."""
+        # A second flock on a new descriptor would wait on the exclusive one we hold
+        if self._lock_held or fcntl is None:
+            yield
+            return
+        with open(self.lock_path, "a+") as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+    
+    def _read_meta(self) -> Optional[Dict]:
+        if not os.path.exists(self.meta_path):
+            return None
+        with open(self.meta_path) as f:
+            return json.load(f)
+    
+    def _write_meta(self) -> None:
+        tmp_path = f"{self.meta_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"model": self.model, "version": self.version, "dim": self.dim, "generation": self.generation}, f)
+        os.replace(tmp_path, self.meta_path)
+    
+    def _reload(self) -> None:
+        """Rebuild the in-memory index from disk."""
+        meta = self._read_meta() or {}
+        self.dim = meta.get("dim") or self.dim
+        self.generation = meta.get("generation", 0)
+        self._index = {}
+        self._rows = 0
+        self._vectors = None
+        self._read_tail()
+    
+    def _refresh(self) -> None:
+        """Pick up rows appended by other processes since the last read."""
+        # Shared lock: a compaction must not swap the files between reading meta and keys
+        with self._shared():
+            meta = self._read_meta() or {}
+            if meta.get("generation", 0) != self.generation:
+                # Another process compacted the files, so row numbers changed
+                self._reload()
+                return
+            self.dim = meta.get("dim") or self.dim
+            self._read_tail()
+    
+    def _read_tail(self) -> None:
+        """Index the keys appended since the last read."""
+        if not os.path.exists(self.keys_path):
+            return
+        size = os.path.getsize(self.keys_path)
+        rows = size // KEY_SIZE
+        if rows > self._rows:
+            with open(self.keys_path, "rb") as f:
+                f.seek(self._rows * KEY_SIZE)
+                tail = f.read((rows - self._rows) * KEY_SIZE)
+            for offset in range(0, len(tail), KEY_SIZE):
+                # Keep the first row written for a key; later duplicates are dead
+                self._index.setdefault(tail[offset:offset + KEY_SIZE], self._rows + offset // KEY_SIZE)
+            self._rows = rows
+        
+        if self._rows and (self._vectors is None or self._vectors.shape[0] < self._rows):
+            self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(self._rows, self.dim))
+    
+    def __len__(self) -> int:
+        return len(self._index)
+    
+    def get(self, text: str) -> Optional[np.ndarray]:
+        """
+        Look up the embedding for a text.
+        
+        Args:
+            text: The embedded text
+        
+        Returns:
+            Read-only float32 view into the memory map, or None on a miss
+        """
+        return self.get_many([text])[0]
+    
+    def get_many(self, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """
+        Look up embeddings for several texts.
+        
+        Args:
+            texts: The embedded texts
+        
+        Returns:
+            One read-only float32 view (or None on a miss) per text
+        """
+        keys = [embedding_key(self.model, text) for text in texts]
+        with self._mutex:
+            if any(key not in self._index for key in keys):
+                self._refresh()
+            
+            results = []
+            for key in keys:
+                row = self._index.get(key)
+                if row is None:
+                    self.misses += 1
+                    results.append(None)
+                else:
+                    self.hits += 1
+                    results.append(self._vectors[row])
+            return results
+    
+    def put_many(self, texts: Sequence[str], vectors: Iterable[Sequence[float]]) -> int:
+        """
+        Store embeddings for texts that are not cached yet.
+        
+        Args:
+            texts: The embedded texts
+            vectors: One embedding per text
+        
+        Returns:
+            Number of rows appended
+        """
+        if len(texts) == 0:
+            return 0
+        matrix = np.asarray(list(vectors), dtype=np.float32)
+        if matrix.ndim != 2 or matrix.shape[0] != len(texts):
+            raise ValueError("put_many expects one vector per text")
+        
+        with self._locked():
+            self._refresh()
+            if self.dim is None:
+                self.dim = int(matrix.shape[1])
+                self._write_meta()
+            elif matrix.shape[1] != self.dim:
+                raise ValueError(f"Expected {self.dim}-d vectors, got {matrix.shape[1]}-d")
+            
+            new_keys = []
+            new_rows = []
+            seen = set()
+            for text, vector in zip(texts, matrix):
+                key = embedding_key(self.model, text)
+                if key in self._index or key in seen:
+                    continue
+                seen.add(key)
+                new_keys.append(key)
+                new_rows.append(vector)
+            if not new_keys:
+                return 0
+            
+            # Vectors first, then keys: a key is never visible before its vector
+            with open(self.vectors_path, "r+b" if os.path.exists(self.vectors_path) else "wb") as f:
+                f.seek(self._rows * self.dim * 4)
+                f.write(np.ascontiguousarray(new_rows, dtype=np.float32).tobytes())
+            with open(self.keys_path, "ab") as f:
+                f.write(b"".join(new_keys))
+            
+            self._refresh()
+        
+        # Outside the file lock: compact() takes it again on a new descriptor
+        if self.max_entries is not None and len(self) > self.max_entries + self.max_entries // 4:
+            self.compact(max_entries=self.max_entries)
+        return len(new_keys)
+    
+    def compact(self, keep: Optional[Iterable[str]] = None, max_entries: Optional[int] = None) -> int:
+        """
+        Rewrite the cache files, evicting entries and dropping dead rows.
+        
+        With neither argument nothing is evicted: only dead rows (a key
+        appended twice by racing processes) and vector data left past the
+        last key by an interrupted write are removed, so the files shrink only
+        if those exist.
+        
+        Args:
+            keep: Optional texts to keep; when given every other entry is dropped
+            max_entries: Optional cap; the most recently added entries are kept
+        
+        Returns:
+            Number of rows removed
+        """
+        with self._locked():
+            self._refresh()
+            live = sorted(self._index.items(), key=lambda item: item[1])
+            if keep is not None:
+                wanted = {embedding_key(self.model, text) for text in keep}
+                live = [(key, row) for key, row in live if key in wanted]
+            if max_entries is not None:
+                live = live[max(len(live) - max_entries, 0):]
+            
+            removed = self._rows - len(live)
+            vector_bytes = os.path.getsize(self.vectors_path) if os.path.exists(self.vectors_path) else 0
+            if removed == 0 and vector_bytes <= self._rows * (self.dim or 0) * 4:
+                return 0
+            
+            rows = [row for _, row in live]
+            matrix = np.asarray(self._vectors[rows]) if rows else np.empty((0, self.dim or 0), dtype=np.float32)
+            
+            with open(f"{self.vectors_path}.tmp", "wb") as f:
+                f.write(np.ascontiguousarray(matrix, dtype=np.float32).tobytes())
+            with open(f"{self.keys_path}.tmp", "wb") as f:
+                f.write(b"".join(key for key, _ in live))
+            os.replace(f"{self.vectors_path}.tmp", self.vectors_path)
+            os.replace(f"{self.keys_path}.tmp", self.keys_path)
+            
+            self.generation += 1
+            self._write_meta()
+            self._reload()
+        logger.info(f"Compacted embedding cache {self.path}: removed {removed} rows")
+        return removed
+    
+    def purge_other_versions(self) -> List[str]:
+        """
+        Delete namespaces of this model with a different version.
+        
+        Returns:
+            Paths that were removed
+        """
+        prefix = f"{self.model.replace('/', '_')}-v"
+        removed = []
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if name.startswith(prefix) and path != self.path and os.path.isdir(path):
+                shutil.rmtree(path)
+                removed.append(path)
+        return removed
+    
+    def stats(self) -> Dict:
+        """
+        Get cache metrics.
+        
+        Returns:
+            Entry count, on-disk rows and hit/miss counts
+        """
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._index),
+            "rows": self._rows,
+            "dim": self.dim,
+            "version": self.version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0
+        }
@@ -0,0 +1,231 @@
+"""
+GuardianLink Geospatial Index
+In-memory index over (lat, lng) points: a fixed-size lat/lng grid of buckets
+narrows each query to nearby cells, and distances are computed for the
+candidates with a vectorized NumPy haversine.
+"""
+
+import logging
+import math
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+
+import numpy as np
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0088
+# Half the Earth's circumference: no two points are further apart than this
+MAX_DISTANCE_KM = math.pi * EARTH_RADIUS_KM
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """
+    Great-circle distance in kilometres; arguments in degrees.
+    
+    Works element-wise on NumPy arrays as well as on scalars.
+    """
+    lat1, lng1, lat2, lng2 = map(np.radians, (lat1, lng1, lat2, lng2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+class GeoIndex:
+    """
+    Grid-bucketed spatial index supporting radius and k-nearest queries.
+    
+    Points live in contiguous NumPy arrays (radians, with cos(lat) cached),
+    and each grid cell of `cell_degrees` x `cell_degrees` keeps the set of
+    rows inside it. upsert() and remove() update both in O(1), so the index
+    can follow inserts and edits without rebuilding. A query gathers the rows
+    of the cells overlapping its bounding box (wrapping at the antimeridian)
+    and computes exact haversine distances for those rows only; when the box
+    covers more cells than are occupied, every row is scanned instead.
+    """
+    
+    def __init__(self, cell_degrees: float = 1.0, initial_capacity: int = 64):
+        self.cell_degrees = cell_degrees
+        self._lng_cells = math.ceil(360.0 / cell_degrees)
+        self._lat = np.zeros(initial_capacity)
+        self._lng = np.zeros(initial_capacity)
+        self._cos_lat = np.zeros(initial_capacity)
+        self._ids: List[Hashable] = []
+        self._rows: Dict[Hashable, int] = {}
+        self._cell_of: List[Tuple[int, int]] = []
+        self._cells: Dict[Tuple[int, int], Set[int]] = {}
+    
+    def __len__(self) -> int:
+        return len(self._ids)
+    
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._rows
+    
+    def _cell(self, lat: float, lng: float) -> Tuple[int, int]:
+        lat_cell = min(int(math.floor((lat + 90.0) / self.cell_degrees)), math.ceil(180.0 / self.cell_degrees) - 1)
+        lng_cell = int(math.floor((lng + 180.0) / self.cell_degrees)) % self._lng_cells
+        return lat_cell, lng_cell
+    
+    def _grow(self) -> None:
+        capacity = self._lat.shape[0] * 2
+        for name in ("_lat", "_lng", "_cos_lat"):
+            grown = np.zeros(capacity)
+            grown[:len(self._ids)] = getattr(self, name)[:len(self._ids)]
+            setattr(self, name, grown)
+    
+    def upsert(self, key: Hashable, lat: float, lng: float) -> None:
+        """
+        Add a point or move an existing one.
+        
+        Args:
+            key: Point identifier, e.g. a disaster id
+            lat: Latitude in degrees (-90 to 90)
+            lng: Longitude in degrees (-180 to 180)
+        """
+        if not (-90.0 <= lat <= 90.0 and -180.0 <= lng <= 180.0):
+            raise ValueError(f"Invalid coordinates ({lat}, {lng})")
+        
+        row = self._rows.get(key)
+        if row is None:
+            row = len(self._ids)
+            if row == self._lat.shape[0]:
+                self._grow()
+            self._ids.append(key)
+            self._cell_of.append(None)
+            self._rows[key] = row
+        else:
+            self._cells[self._cell_of[row]].discard(row)
+        
+        self._lat[row] = math.radians(lat)
+        self._lng[row] = math.radians(lng)
+        self._cos_lat[row] = math.cos(self._lat[row])
+        cell = self._cell(lat, lng)
+        self._cell_of[row] = cell
+        self._cells.setdefault(cell, set()).add(row)
+    
+    def remove(self, key: Hashable) -> bool:
+        """
+        Remove a point, moving the last row into its place.
+        
+        Returns:
+            True if the point was indexed
+        """
+        row = self._rows.pop(key, None)
+        if row is None:
+            return False
+        
+        self._discard_from_cell(row)
+        last = len(self._ids) - 1
+        if row != last:
+            moved = self._ids[last]
+            self._discard_from_cell(last)
+            for name in ("_lat", "_lng", "_cos_lat"):
+                array = getattr(self, name)
+                array[row] = array[last]
+            self._ids[row] = moved
+            self._cell_of[row] = self._cell_of[last]
+            self._cells.setdefault(self._cell_of[row], set()).add(row)
+            self._rows[moved] = row
+        self._ids.pop()
+        self._cell_of.pop()
+        return True
+    
+    def _discard_from_cell(self, row: int) -> None:
+        cell = self._cell_of[row]
+        members = self._cells[cell]
+        members.discard(row)
+        if not members:
+            del self._cells[cell]
+    
+    def _candidate_rows(self, lat: float, lng: float, radius_km: float) -> Optional[np.ndarray]:
+        """Rows in the cells overlapping the query's bounding box, or None to scan everything."""
+        dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+        lat_min, lat_max = lat - dlat, lat + dlat
+        if lat_min <= -90.0 or lat_max >= 90.0:
+            return None  # The circle contains a pole: every longitude qualifies
+        
+        # Widest longitude span of the circle, reached at its highest latitude
+        dlng = math.degrees(radius_km / (EARTH_RADIUS_KM * math.cos(math.radians(max(abs(lat_min), abs(lat_max))))))
+        if dlng >= 180.0:
+            return None
+        
+        lat_first, _ = self._cell(lat_min, 0.0)
+        lat_last, _ = self._cell(lat_max, 0.0)
+        lng_first = int(math.floor((lng - dlng + 180.0) / self.cell_degrees))
+        lng_last = int(math.floor((lng + dlng + 180.0) / self.cell_degrees))
+        lng_span = min(lng_last - lng_first + 1, self._lng_cells)
+        if (lat_last - lat_first + 1) * lng_span > len(self._cells):
+            return None
+        
+        rows: List[int] = []
+        for lat_cell in range(lat_first, lat_last + 1):
+            for offset in range(lng_span):
+                members = self._cells.get((lat_cell, (lng_first + offset) % self._lng_cells))
+                if members:
+                    rows.extend(members)
+        return np.fromiter(rows, dtype=np.int64, count=len(rows))
+    
+    def _distances(self, lat: float, lng: float, rows: Optional[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        size = len(self._ids)
+        if rows is None:
+            rows = np.arange(size)
+            lats, lngs, cos_lats = self._lat[:size], self._lng[:size], self._cos_lat[:size]
+        else:
+            lats, lngs, cos_lats = self._lat[rows], self._lng[rows], self._cos_lat[rows]
+        lat_r, lng_r = math.radians(lat), math.radians(lng)
+        a = np.sin((lats - lat_r) / 2) ** 2 + math.cos(lat_r) * cos_lats * np.sin((lngs - lng_r) / 2) ** 2
+        return rows, 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+    
+    def near(self, lat: float, lng: float, radius_km: float, limit: Optional[int] = None) -> List[Tuple[Hashable, float]]:
+        """
+        Find the points within a radius, nearest first.
+        
+        Args:
+            lat: Query latitude in degrees
+            lng: Query longitude in degrees
+            radius_km: Search radius in kilometres
+            limit: Optional maximum number of results
+        
+        Returns:
+            (key, distance_km) pairs sorted by distance
+        """
+        rows, distances = self._distances(lat, lng, self._candidate_rows(lat, lng, radius_km))
+        inside = distances <= radius_km
+        rows, distances = rows[inside], distances[inside]
+        if limit is not None and limit < len(rows):
+            nearest = np.argpartition(distances, limit)[:limit]
+            rows, distances = rows[nearest], distances[nearest]
+        order = np.argsort(distances, kind="stable")
+        return [(self._ids[row], float(distance)) for row, distance in zip(rows[order], distances[order])]
+    
+    def nearest(self, lat: float, lng: float, k: int, max_radius_km: Optional[float] = None) -> List[Tuple[Hashable, float]]:
+        """
+        Find the k nearest points, optionally no further than max_radius_km.
+        
+        Searches a growing radius, starting at about one grid cell, until k
+        points are inside it; every point closer than the k-th must then also
+        be inside, so the result is exact.
+        
+        Args:
+            lat: Query latitude in degrees
+            lng: Query longitude in degrees
+            k: Number of points to return
+            max_radius_km: Optional distance limit
+        
+        Returns:
+            Up to k (key, distance_km) pairs sorted by distance
+        """
+        limit = MAX_DISTANCE_KM if max_radius_km is None else min(max_radius_km, MAX_DISTANCE_KM)
+        if k <= 0 or not self._ids:
+            return []
+        radius = min(math.radians(self.cell_degrees) * EARTH_RADIUS_KM, limit)
+        while True:
+            found = self.near(lat, lng, radius, limit=k)
+            if len(found) >= k or radius >= limit:
+                return found
+            radius = min(radius * 4, limit)
+    
+    def stats(self) -> Dict[str, float]:
+        return {
+            "points": len(self._ids),
+            "occupied_cells": len(self._cells),
+            "cell_degrees": self.cell_degrees
+        }
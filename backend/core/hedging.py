@@ -0,0 +1,152 @@
+"""
+GuardianLink Request Hedging
+Issues a duplicate of a slow async call once it has run longer than the
+observed tail latency, and returns whichever copy answers first.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import numpy as np
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class LatencyTracker:
+    """Rolling window of call latencies with percentile lookup."""
+    
+    def __init__(self, window: int = 512):
+        self._samples = deque(maxlen=window)
+        
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+        
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Get the q-th percentile of the recorded latencies.
+        
+        Args:
+            q: Percentile between 0 and 100
+            
+        Returns:
+            Latency in seconds, or None if nothing has been recorded
+        """
+        if not self._samples:
+            return None
+        return float(np.percentile(np.fromiter(self._samples, dtype=np.float64), q))
+    
+    def __len__(self) -> int:
+        return len(self._samples)
+
+class Hedger:
+    """
+    Hedges calls that outlive the observed p95 (by default) latency.
+    
+    Until `min_samples` latencies have been seen calls run unhedged. After
+    that, if the primary call has not finished within the hedge delay a second
+    copy is started and the first successful result wins; the loser is
+    cancelled. Cancelled attempts record their elapsed time so slow replies
+    stay visible in the latency window and the delay does not drift down.
+    """
+    
+    def __init__(self, percentile: float = 95.0, window: int = 512, min_samples: int = 20, min_delay: float = 0.0):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.latencies = LatencyTracker(window)
+        
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        
+    def delay(self) -> Optional[float]:
+        """
+        Get the current hedge delay.
+        
+        Returns:
+            Seconds to wait before hedging, or None while still warming up
+        """
+        if len(self.latencies) < self.min_samples:
+            return None
+        return max(self.min_delay, self.latencies.percentile(self.percentile))
+    
+    async def _timed(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        started = time.monotonic()
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            self.latencies.record(time.monotonic() - started)
+            raise
+        self.latencies.record(time.monotonic() - started)
+        return result
+        
+    async def run(
+        self,
+        fn: Callable[[], Awaitable[Any]],
+        hedge_fn: Optional[Callable[[], Awaitable[Any]]] = None,
+        should_hedge: Optional[Callable[[], bool]] = None
+    ) -> Any:
+        """
+        Run fn(), hedging it with hedge_fn() if it is slow.
+        
+        Args:
+            fn: Zero-argument coroutine function performing the call
+            hedge_fn: Coroutine function for the duplicate (defaults to fn)
+            should_hedge: Optional check made at hedge time, e.g. to skip
+                hedging while the upstream is saturated
+            
+        Returns:
+            The result of whichever attempt succeeds first
+        """
+        self.calls += 1
+        delay = self.delay()
+        if delay is None:
+            return await self._timed(fn)
+        
+        primary = asyncio.ensure_future(self._timed(fn))
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done or (should_hedge is not None and not should_hedge()):
+                return await primary
+            
+            self.hedges += 1
+            hedge = asyncio.ensure_future(self._timed(hedge_fn or fn))
+            tasks.append(hedge)
+            
+            pending = set(tasks)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get hedging metrics.
+        
+        Returns:
+            Call, hedge and hedge-win counts and the current hedge delay
+        """
+        delay = self.delay()
+        return {
+            "calls": self.calls,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "hedge_rate": self.hedges / self.calls if self.calls else 0.0,
+            "hedge_delay_ms": delay * 1000 if delay is not None else None,
+            "samples": len(self.latencies)
+        }
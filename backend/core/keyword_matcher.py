@@ -0,0 +1,149 @@
+"""
+GuardianLink Keyword Matcher
+Single-pass multilingual keyword/intent matching with a precompiled,
+trie-shaped regular expression.
+"""
+
+import itertools
+import json
+import logging
+import re
+import unicodedata
+from typing import Any, Dict, Iterable, List, Set
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def _mark_ranges() -> str:
+    """Character-class ranges for Unicode combining marks (categories Mn, Mc, Me)."""
+    ranges = []
+    start = previous = None
+    # Above U+1FFFF the only marks are the variation selectors supplement
+    for code in itertools.chain(range(0x20000), range(0xE0100, 0xE01F0)):
+        if unicodedata.category(chr(code)).startswith("M"):
+            if start is None:
+                start = code
+            elif code != previous + 1:
+                ranges.append((start, previous))
+                start = code
+            previous = code
+    if start is not None:
+        ranges.append((start, previous))
+    return "".join(f"\\U{a:08x}-\\U{b:08x}" if a != b else f"\\U{a:08x}" for a, b in ranges)
+
+# Word characters including combining marks, so that scripts such as
+# Devanagari (where vowel signs are marks) are not split mid-word
+WORD_CHARS = f"\\w{_mark_ranges()}"
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """
+    Build a regex alternation shaped like a prefix trie.
+    
+    Python's regex engine tries alternatives one by one, so a flat
+    `a|b|c|...` costs O(keywords) per text position. Factoring common
+    prefixes makes each position cost roughly O(keyword length) instead.
+    """
+    trie: Dict[str, Any] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+    
+    def build(node: Dict[str, Any]) -> str:
+        optional = "" in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        if len(branches) == 1 and not optional:
+            return branches[0]
+        body = "(?:" + "|".join(branches) + ")"
+        return body + "?" if optional else body
+    
+    return build(trie)
+
+class KeywordMatcher:
+    """
+    Maps keywords in free text to intents in one regex pass.
+    
+    Keywords are matched case-insensitively on whole words. A keyword ending
+    in "*" also matches longer words starting with it (e.g. "worr*" matches
+    "worried" and "worrying"). Keywords from every language are compiled into
+    the same pattern, so mixed-language messages are handled in one scan.
+    """
+    
+    def __init__(self, intent_keywords: Dict[str, Iterable[str]]):
+        """
+        Args:
+            intent_keywords: Intent name -> keywords that signal it
+        """
+        self.exact: Dict[str, Set[str]] = {}
+        self.prefixes: Dict[str, Set[str]] = {}
+        for intent, keywords in intent_keywords.items():
+            for keyword in keywords:
+                keyword = keyword.strip().lower()
+                if keyword.endswith("*"):
+                    self.prefixes.setdefault(keyword[:-1], set()).add(intent)
+                elif keyword:
+                    self.exact.setdefault(keyword, set()).add(intent)
+        
+        alternatives = []
+        if self.exact:
+            alternatives.append(_trie_pattern(self.exact))
+        if self.prefixes:
+            alternatives.append(f"(?:{_trie_pattern(self.prefixes)})[{WORD_CHARS}]*")
+        pattern = "|".join(f"(?:{alternative})" for alternative in alternatives) or "(?!)"
+        self.pattern = re.compile(f"(?<![{WORD_CHARS}])(?:{pattern})(?![{WORD_CHARS}])")
+        self._max_prefix = max(map(len, self.prefixes), default=0)
+    
+    @classmethod
+    def from_config(cls, config: Dict[str, Dict[str, List[str]]]) -> "KeywordMatcher":
+        """
+        Build a matcher from {intent: {language: [keywords]}} configuration.
+        
+        Args:
+            config: Multilingual keyword lists per intent
+        
+        Returns:
+            KeywordMatcher over the keywords of all languages
+        """
+        return cls({
+            intent: [keyword for keywords in languages.values() for keyword in keywords]
+            for intent, languages in config.items()
+        })
+    
+    @classmethod
+    def from_file(cls, path: str) -> "KeywordMatcher":
+        """Build a matcher from a JSON file in the from_config() format."""
+        with open(path, encoding="utf-8") as f:
+            return cls.from_config(json.load(f))
+    
+    def _intents_for(self, word: str) -> Set[str]:
+        intents = self.exact.get(word)
+        if intents is not None:
+            return intents
+        for length in range(min(len(word), self._max_prefix), 0, -1):
+            intents = self.prefixes.get(word[:length])
+            if intents is not None:
+                return intents
+        return set()
+    
+    def match(self, text: str) -> Set[str]:
+        """
+        Find the intents whose keywords occur in text.
+        
+        Args:
+            text: Free text, e.g. a user message
+        
+        Returns:
+            Set of matched intent names
+        """
+        intents: Set[str] = set()
+        for found in self.pattern.finditer(text.lower()):
+            intents |= self._intents_for(found.group(0))
+        return intents
+    
+    @property
+    def keyword_count(self) -> int:
+        return len(self.exact) + len(self.prefixes)
@@ -0,0 +1,64 @@
+"""
+GuardianLink Serialization
+Fast JSON encoding and decoding for API responses and Gaia output, using
+orjson when it is installed and the standard library otherwise.
+"""
+
+import json
+import logging
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional speed-up
+    orjson = None
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+def _dumps_stdlib(obj: Any) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+def dumps(obj: Any) -> bytes:
+    """
+    Encode an object as compact UTF-8 JSON.
+    
+    Handles datetimes, dataclasses and NumPy values natively; anything else
+    unknown is encoded with str(). Integers beyond 64 bits (e.g. large wei
+    amounts) fall back to the standard library, which encodes them exactly.
+    
+    Args:
+        obj: JSON-compatible object
+    
+    Returns:
+        Encoded JSON bytes
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=str, option=_ORJSON_OPTIONS)
+        except TypeError:
+            pass
+    return _dumps_stdlib(obj)
+
+def loads(data: Any) -> Any:
+    """
+    Decode JSON from str or bytes.
+    
+    Raises:
+        json.JSONDecodeError: If data is not valid JSON (orjson's error is a subclass)
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with dumps(), used as the app's default response class."""
+    
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
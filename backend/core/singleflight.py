@@ -0,0 +1,89 @@
+"""
+GuardianLink Single-Flight
+Coalesces concurrent identical async calls so that they share a single
+upstream request instead of each issuing their own.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def canonical_key(payload: Any) -> str:
+    """
+    Build a stable hash for a JSON-compatible payload.
+    
+    Keys are sorted and whitespace is stripped so that logically identical
+    payloads hash to the same value regardless of dict ordering.
+    
+    Args:
+        payload: JSON-compatible value (dicts, lists, strings, numbers)
+        
+    Returns:
+        Hex SHA-256 digest of the canonical JSON encoding
+    """
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+class SingleFlight:
+    """
+    Shares one in-flight call between all concurrent callers with the same key.
+    
+    The first caller for a key starts the call; callers arriving while it is
+    still running await the same future. Once it finishes the key is released,
+    so later callers start a fresh call. Results are shared objects and must be
+    treated as read-only by callers.
+    """
+    
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.issued = 0
+        self.coalesced = 0
+        
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn() for key, or join the call already in flight for key.
+        
+        Args:
+            key: Coalescing key, usually from canonical_key()
+            fn: Zero-argument coroutine function performing the real call
+            
+        Returns:
+            The result of the shared call
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            self.issued += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._release(key, done))
+        else:
+            self.coalesced += 1
+        
+        # Shield so that one cancelled caller does not cancel the shared call
+        return await asyncio.shield(task)
+    
+    def _release(self, key: str, task: asyncio.Future) -> None:
+        """Forget a finished call and mark its exception as retrieved."""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug(f"Single-flight call {key[:12]} failed: {task.exception()}")
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Get coalescing counters.
+        
+        Returns:
+            Issued and coalesced request counts and the number in flight
+        """
+        return {
+            "issued": self.issued,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight)
+        }
@@ -0,0 +1,175 @@
+"""
+GuardianLink Stream Table
+Columnar store of token stream amounts and times, for computing the released
+and remaining amounts of many streams at once with exact integer math.
+"""
+
+import logging
+from typing import Dict, Hashable, Iterable, List, Tuple
+
+import numpy as np
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+MICROS_PER_SECOND = 1_000_000
+# Amounts are stored as two 64-bit words and multiplied in 32-bit limbs, which is exact below 2**96 wei
+MAX_AMOUNT_WEI = 2 ** 96 - 1
+# Durations must fit in one 32-bit limb (about 136 years)
+MAX_DURATION_SECONDS = 2 ** 32 - 1
+
+_LIMB_MASK = np.uint64(2 ** 32 - 1)
+_LIMB_BITS = np.uint64(32)
+_WORD_BITS = 64
+
+def released_wei(amount_wei: int, start: int, end: int, now: int) -> int:
+    """
+    Wei a stream has released at a time: amount * elapsed // duration over whole seconds.
+    
+    Args:
+        amount_wei: Total amount of the stream
+        start: Start time in epoch microseconds
+        end: End time in epoch microseconds
+        now: Time in epoch microseconds
+    
+    Returns:
+        Released wei (the whole amount once the stream has ended)
+    """
+    duration = (end - start) // MICROS_PER_SECOND
+    if now >= end or duration <= 0:
+        return amount_wei
+    elapsed = min(max((now - start) // MICROS_PER_SECOND, 0), duration)
+    return amount_wei * elapsed // duration
+
+def _to_ints(high: np.ndarray, low: np.ndarray) -> List[int]:
+    """Combine 64-bit high and low words into Python ints."""
+    if not high.any():
+        return low.tolist()
+    return [(h << _WORD_BITS) | l for h, l in zip(high.tolist(), low.tolist())]
+
+class StreamTable:
+    """
+    Start, end, amount and status of streams in contiguous NumPy arrays.
+    
+    Times are epoch microseconds (int64). Amounts are integer wei in two
+    uint64 words (high, low) and statuses are small integer codes whose
+    meaning is up to the caller. amounts_at() computes
+    amount * elapsed // duration for any set of rows in one pass: the amount
+    is split into three 32-bit limbs, multiplied by the elapsed seconds with
+    carries, and long-divided by the duration, so every intermediate fits in
+    64 bits and the result is exact. Streams release per whole second, as an
+    ERC-7715 stream does on chain.
+    """
+    
+    def __init__(self, initial_capacity: int = 1024):
+        self._start = np.zeros(initial_capacity, dtype=np.int64)
+        self._end = np.zeros(initial_capacity, dtype=np.int64)
+        self._amount_high = np.zeros(initial_capacity, dtype=np.uint64)
+        self._amount_low = np.zeros(initial_capacity, dtype=np.uint64)
+        self._status = np.zeros(initial_capacity, dtype=np.uint8)
+        self._keys: List[Hashable] = []
+        self._rows: Dict[Hashable, int] = {}
+    
+    def __len__(self) -> int:
+        return len(self._keys)
+    
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._rows
+    
+    def _grow(self) -> None:
+        capacity = self._start.shape[0] * 2
+        for name in ("_start", "_end", "_amount_high", "_amount_low", "_status"):
+            array = getattr(self, name)
+            grown = np.zeros(capacity, dtype=array.dtype)
+            grown[:len(self._keys)] = array[:len(self._keys)]
+            setattr(self, name, grown)
+    
+    def upsert(self, key: Hashable, start: int, end: int, amount_wei: int, status: int = 0) -> None:
+        """
+        Add a stream or update an existing one.
+        
+        Args:
+            key: Stream identifier
+            start: Start time in epoch microseconds
+            end: End time in epoch microseconds
+            amount_wei: Total amount in wei, below 2**96
+            status: Status code (0-255)
+        """
+        if not 0 <= amount_wei <= MAX_AMOUNT_WEI:
+            raise ValueError(f"Stream amount must be between 0 and {MAX_AMOUNT_WEI} wei")
+        if not 0 <= (end - start) // MICROS_PER_SECOND <= MAX_DURATION_SECONDS:
+            raise ValueError(f"Stream duration must be between 0 and {MAX_DURATION_SECONDS} seconds")
+        
+        row = self._rows.get(key)
+        if row is None:
+            row = len(self._keys)
+            if row == self._start.shape[0]:
+                self._grow()
+            self._keys.append(key)
+            self._rows[key] = row
+        
+        self._start[row] = start
+        self._end[row] = end
+        self._amount_high[row] = amount_wei >> _WORD_BITS
+        self._amount_low[row] = amount_wei & (2 ** _WORD_BITS - 1)
+        self._status[row] = status
+    
+    def rows(self, keys: Iterable[Hashable]) -> np.ndarray:
+        """Row of each key, or -1 for keys not in the table."""
+        rows = self._rows
+        return np.fromiter((rows.get(key, -1) for key in keys), dtype=np.int64)
+    
+    def statuses(self, rows: np.ndarray) -> np.ndarray:
+        """Stored status codes of the given rows."""
+        return self._status[rows]
+    
+    def amounts_at(self, rows: np.ndarray, now: int) -> Tuple[np.ndarray, List[int], List[int]]:
+        """
+        Released and remaining amounts of the given rows at a time.
+        
+        Args:
+            rows: Row indices (from rows(), without the -1 entries)
+            now: Time in epoch microseconds
+        
+        Returns:
+            (whether each stream has ended, released wei, remaining wei)
+        """
+        start, end = self._start[rows], self._end[rows]
+        high, low = self._amount_high[rows], self._amount_low[rows]
+        duration = (end - start) // MICROS_PER_SECOND
+        ended = now >= end
+        # Ended (and sub-second) streams release everything: elapsed = duration. Times stay
+        # int64 until here, since mixing int64 and uint64 would promote to float
+        released_all = ended | (duration <= 0)
+        duration = np.maximum(duration, 1)
+        elapsed = np.where(released_all, duration, np.clip((now - start) // MICROS_PER_SECOND, 0, duration)).astype(np.uint64)
+        divisor = duration.astype(np.uint64)
+        
+        # amount * elapsed as four 32-bit limbs, most significant first
+        limbs = (high, low >> _LIMB_BITS, low & _LIMB_MASK)
+        product = [None] * 4
+        carry = np.zeros(len(rows), dtype=np.uint64)
+        for i in (2, 1, 0):
+            partial = limbs[i] * elapsed + carry  # < 2**64: both factors and the carry are below 2**32
+            product[i + 1] = partial & _LIMB_MASK
+            carry = partial >> _LIMB_BITS
+        product[0] = carry
+        
+        # Long division by the duration; the quotient is at most the amount, so its top limb is zero
+        quotient = []
+        remainder = np.zeros(len(rows), dtype=np.uint64)
+        for limb in product:
+            current = (remainder << _LIMB_BITS) | limb  # < 2**64: the remainder is below the 32-bit divisor
+            quotient.append(current // divisor)
+            remainder = current % divisor
+        released_high = quotient[1]
+        released_low = (quotient[2] << _LIMB_BITS) | quotient[3]
+        
+        borrow = (low < released_low).astype(np.uint64)
+        remaining_low = low - released_low
+        remaining_high = high - released_high - borrow
+        return ended, _to_ints(released_high, released_low), _to_ints(remaining_high, remaining_low)
+    
+    def stats(self) -> Dict[str, int]:
+        return {"streams": len(self._keys), "capacity": int(self._start.shape[0])}
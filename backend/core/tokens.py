@@ -0,0 +1,52 @@
+"""
+GuardianLink Token Budgeting
+Cheap prompt token estimates for budgeting without a model tokenizer.
+"""
+
+import logging
+from typing import Dict, List
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# BPE tokenizers average about four UTF-8 bytes per token across scripts:
+# roughly four characters of English, one to two characters of Devanagari
+BYTES_PER_TOKEN = 4
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in text.
+    
+    Args:
+        text: Prompt text
+    
+    Returns:
+        Approximate token count (0 for empty text)
+    """
+    if not text:
+        return 0
+    return -(-len(text.encode("utf-8")) // BYTES_PER_TOKEN)
+
+def estimate_message_tokens(messages: List[Dict[str, str]]) -> int:
+    """Estimate the tokens of a chat message list, including per-message overhead."""
+    return sum(estimate_tokens(message.get("content", "")) + 4 for message in messages)
+
+def truncate_to_tokens(text: str, budget: int) -> str:
+    """
+    Cut text to fit within an estimated token budget.
+    
+    Args:
+        text: Text to shorten
+        budget: Maximum estimated tokens
+    
+    Returns:
+        The longest prefix of text within the budget, ending in "..." if cut
+    """
+    if estimate_tokens(text) <= budget:
+        return text
+    if budget <= 1:
+        return ""
+    limit = (budget - 1) * BYTES_PER_TOKEN
+    clipped = text.encode("utf-8")[:limit].decode("utf-8", errors="ignore")
+    return clipped.rstrip() + "..."
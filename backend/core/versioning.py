@@ -0,0 +1,136 @@
+"""
+GuardianLink Versioning
+Version counters for in-memory stores and the weak ETags / conditional GET
+handling built on them.
+"""
+
+import logging
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from fastapi import Request, Response
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def _base36(number: int) -> str:
+    digits = "0123456789abcdefghijklmnopqrstuvwxyz"
+    text = ""
+    while True:
+        number, digit = divmod(number, 36)
+        text = digits[digit] + text
+        if not number:
+            return text
+
+def weak_etag(*parts: Any) -> str:
+    """Build a weak entity tag (W/"...") from the given parts."""
+    return 'W/"' + "-".join(str(part) for part in parts) + '"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an entity tag.
+    
+    Uses the weak comparison RFC 9110 prescribes for If-None-Match, so
+    W/"x" and "x" match each other.
+    
+    Args:
+        if_none_match: Header value (a tag list or "*"), or None if absent
+        etag: Current entity tag of the resource
+    
+    Returns:
+        True if the client already holds the current representation
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+class VersionCounter:
+    """
+    Monotonically increasing versions per collection and per entity.
+    
+    Every change bumps one shared sequence and stamps it on both the
+    collection and the entity, so versions never repeat, even for an entity
+    that is removed and re-created. Versions start again at zero when the
+    process restarts; the epoch (the start time, in base 36) goes into every
+    ETag so that tags from an earlier process never match.
+    """
+    
+    def __init__(self, epoch: Optional[str] = None):
+        self.epoch = epoch or _base36(time.time_ns() // 1000)
+        self.sequence = 0
+        self._collections: Dict[str, int] = {}
+        self._entities: Dict[Tuple[str, Hashable], int] = {}
+    
+    def bump(self, collection: str, key: Optional[Hashable] = None) -> int:
+        """
+        Record a change to a collection, and to one of its entities if key is given.
+        
+        Returns:
+            The new version
+        """
+        self.sequence += 1
+        self._collections[collection] = self.sequence
+        if key is not None:
+            self._entities[(collection, key)] = self.sequence
+        return self.sequence
+    
+    def version(self, collection: str, key: Optional[Hashable] = None) -> int:
+        """Current version of a collection or entity (0 if it never changed)."""
+        if key is None:
+            return self._collections.get(collection, 0)
+        return self._entities.get((collection, key), 0)
+    
+    def etag(self, collection: str, key: Optional[Hashable] = None, *extra: Any) -> str:
+        """Weak ETag for the current version of a collection or entity."""
+        return weak_etag(self.epoch, self.version(collection, key), *extra)
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sequence": self.sequence,
+            "collections": dict(self._collections),
+            "entities": len(self._entities)
+        }
+
+class ConditionalGets:
+    """Answers If-None-Match requests and counts how often that saved a response body."""
+    
+    def __init__(self):
+        self.checked = 0
+        self.not_modified = 0
+    
+    def check(self, request: Request, etag: str) -> Optional[Response]:
+        """
+        Compare a request's If-None-Match header with the current ETag.
+        
+        Call this before loading or serializing anything, so a match costs
+        no more than the version lookup.
+        
+        Args:
+            request: Incoming request
+            etag: Current ETag of the requested resource
+        
+        Returns:
+            A 304 response to send instead of the body, or None if the body is needed
+        """
+        self.checked += 1
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            self.not_modified += 1
+            return Response(status_code=304, headers={"ETag": etag})
+        return None
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "checked": self.checked,
+            "not_modified": self.not_modified,
+            "hit_rate": self.not_modified / self.checked if self.checked else 0.0
+        }
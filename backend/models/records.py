@@ -0,0 +1,297 @@
+"""
+GuardianLink Records
+Compact in-memory records for chat messages, ERC-7715 streams and ERC-7710
+delegations, and their conversion to the JSON shapes the API serves.
+
+Records are frozen and slotted, so they carry no per-instance __dict__ and no
+repeated key strings. Timestamps are stored as epoch microseconds, roles and
+states as shared enum members, and IDs, hashes and lowercase hex addresses as
+raw bytes. Values that would not convert back to exactly the same string
+(custom message IDs, checksummed addresses, timestamps with a UTC offset) are
+kept as they are, so to_dict() always reproduces the original shape.
+"""
+
+import abc
+import enum
+import logging
+import sys
+import time
+import uuid
+from dataclasses import dataclass, fields
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple, Union
+
+from guardianlink.core.stream_table import released_wei
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class Role(str, enum.Enum):
+    """Sender of a chat message."""
+    USER = "user"
+    AI = "ai"
+
+class StreamState(str, enum.Enum):
+    """Lifecycle state of a stream."""
+    ACTIVE = "active"
+    COMPLETED = "completed"
+
+class DelegationState(str, enum.Enum):
+    """Lifecycle state of a delegation."""
+    ACTIVE = "active"
+
+_ROLES = {role.value: role for role in Role}
+
+WEI_PER_ETH = 10 ** 18
+
+def _value(member: Union[enum.Enum, str]) -> str:
+    return member.value if isinstance(member, enum.Enum) else member
+
+def now_micros() -> int:
+    """Current time in epoch microseconds."""
+    return time.time_ns() // 1000
+
+def to_micros(moment: datetime) -> int:
+    """Epoch microseconds of a naive local datetime."""
+    return round(moment.replace(microsecond=0).timestamp()) * 1_000_000 + moment.microsecond
+
+def format_time(micros: int) -> str:
+    """ISO 8601 local time of epoch microseconds, as datetime.now().isoformat() would give it."""
+    seconds, micro = divmod(micros, 1_000_000)
+    return datetime.fromtimestamp(seconds).replace(microsecond=micro).isoformat()
+
+def pack_time(value: str) -> Union[int, str]:
+    """Epoch microseconds of a naive local ISO timestamp; other strings are kept as they are."""
+    try:
+        moment = datetime.fromisoformat(value)
+    except ValueError:
+        return value
+    if moment.tzinfo is not None:
+        return value
+    micros = to_micros(moment)
+    return micros if format_time(micros) == value else value
+
+def unpack_time(value: Union[int, str]) -> str:
+    return format_time(value) if isinstance(value, int) else value
+
+def pack_uuid(value: str) -> Union[bytes, str]:
+    """16 bytes of a canonical (lowercase, dashed) UUID string; other IDs are kept as they are."""
+    try:
+        parsed = uuid.UUID(value)
+    except ValueError:
+        return value
+    return parsed.bytes if str(parsed) == value else value
+
+def unpack_uuid(value: Union[bytes, str]) -> str:
+    return str(uuid.UUID(bytes=value)) if isinstance(value, bytes) else value
+
+def pack_hex(value: str) -> Union[bytes, str]:
+    """Bytes of a lowercase 0x-prefixed hex string (an address or hash); anything else is kept as it is."""
+    if value.startswith("0x") and len(value) % 2 == 0:
+        try:
+            packed = bytes.fromhex(value[2:])
+        except ValueError:
+            return value
+        if packed.hex() == value[2:]:
+            return packed
+    return value
+
+def unpack_hex(value: Union[bytes, str]) -> str:
+    return "0x" + value.hex() if isinstance(value, bytes) else value
+
+def split_id(value: str) -> Optional[Tuple[str, bytes]]:
+    """
+    Split a prefixed ID such as "stream_<32 hex digits>" into its prefix and 16 bytes.
+    
+    Returns:
+        (prefix, ID bytes), or None if value is not such an ID
+    """
+    prefix, _, digits = value.rpartition("_")
+    if not prefix or len(digits) != 32:
+        return None
+    try:
+        packed = bytes.fromhex(digits)
+    except ValueError:
+        return None
+    return (prefix, packed) if packed.hex() == digits else None
+
+def sizeof(record: Any) -> int:
+    """Approximate memory held by a record and its values (enum members are shared and not counted)."""
+    return sys.getsizeof(record) + sum(
+        sys.getsizeof(value)
+        for value in (getattr(record, field.name) for field in fields(record))
+        if not isinstance(value, enum.Enum)
+    )
+
+@dataclass(frozen=True)
+class ChatMessageRecord:
+    """A saved chat message."""
+    __slots__ = ("id", "role", "content", "timestamp")
+    
+    id: Union[bytes, str]
+    role: Union[Role, str]
+    content: str
+    timestamp: Union[int, str]
+    
+    @classmethod
+    def from_dict(cls, message: Dict[str, Any]) -> "ChatMessageRecord":
+        """Build a record from a {"id", "role", "content", "timestamp"} message dict."""
+        role = message["role"]
+        return cls(pack_uuid(message["id"]), _ROLES.get(role, role), message["content"], pack_time(message["timestamp"]))
+    
+    def to_dict(self) -> Dict[str, str]:
+        return {
+            "id": unpack_uuid(self.id),
+            "role": _value(self.role),
+            "content": self.content,
+            "timestamp": unpack_time(self.timestamp)
+        }
+
+@dataclass(frozen=True)
+class StreamRecord(abc.ABC):
+    """
+    Fields shared by all ERC-7715 streams; subclasses add their own and
+    define duration_seconds. Times are epoch microseconds.
+    
+    The released and remaining amounts are not stored: they follow from the
+    time, and are computed by status_at() in whole seconds with exact integer
+    wei math (the same as StreamTable.amounts_at() does for many streams).
+    """
+    __slots__ = ("id", "sender", "recipient", "amount", "amount_wei", "start_time", "end_time", "state")
+    
+    # Prefix of the public stream ID, "<prefix>_<hex id>"
+    PREFIX = "stream"
+    
+    id: bytes
+    sender: Union[bytes, str]
+    recipient: Union[bytes, str]
+    amount: float
+    amount_wei: int
+    start_time: int
+    end_time: int
+    state: StreamState
+    
+    @property
+    def stream_id(self) -> str:
+        return f"{self.PREFIX}_{self.id.hex()}"
+    
+    @property
+    @abc.abstractmethod
+    def duration_seconds(self) -> int:
+        """Length of the stream as its type defines it (days or weeks), in seconds."""
+    
+    @property
+    def rate_per_second(self) -> float:
+        return self.amount_wei / self.duration_seconds
+    
+    def status_at(self, now: int) -> Tuple[str, float, float]:
+        """
+        State and amounts of the stream at a time.
+        
+        Args:
+            now: Epoch microseconds
+        
+        Returns:
+            (status, released amount, remaining amount)
+        """
+        # Once the stream has ended, all funds are released
+        if now >= self.end_time:
+            return StreamState.COMPLETED.value, self.amount, 0
+        released = released_wei(self.amount_wei, self.start_time, self.end_time, now)
+        return self.state.value, released / WEI_PER_ETH, (self.amount_wei - released) / WEI_PER_ETH
+
+@dataclass(frozen=True)
+class AidStreamRecord(StreamRecord):
+    """A disaster relief aid stream."""
+    __slots__ = ("aid_type", "location", "duration_days")
+    
+    aid_type: str
+    location: str
+    duration_days: int
+    
+    @property
+    def duration_seconds(self) -> int:
+        return self.duration_days * 24 * 60 * 60
+    
+    def to_dict(self, now: Optional[int] = None) -> Dict[str, Any]:
+        """Stream status as served by /disaster/stream/{stream_id}, at now (epoch microseconds) or the current time."""
+        status, released, remaining = self.status_at(now_micros() if now is None else now)
+        return {
+            "sender": unpack_hex(self.sender),
+            "recipient": unpack_hex(self.recipient),
+            "aid_type": self.aid_type,
+            "location": self.location,
+            "amount": self.amount,
+            "amount_wei": self.amount_wei,
+            "duration_days": self.duration_days,
+            "rate_per_second": self.rate_per_second,
+            "start_time": format_time(self.start_time),
+            "end_time": format_time(self.end_time),
+            "status": status,
+            "released": released,
+            "remaining": remaining
+        }
+
+@dataclass(frozen=True)
+class SubscriptionRecord(StreamRecord):
+    """A mental health service subscription, paid as a stream."""
+    __slots__ = ("service_type", "duration_weeks")
+    
+    PREFIX = "subscription"
+    
+    service_type: str
+    duration_weeks: int
+    
+    @property
+    def duration_seconds(self) -> int:
+        return self.duration_weeks * 7 * 24 * 60 * 60
+    
+    def to_dict(self, now: Optional[int] = None) -> Dict[str, Any]:
+        """Subscription status as served by /disaster/stream/{stream_id}, at now (epoch microseconds) or the current time."""
+        status, released, remaining = self.status_at(now_micros() if now is None else now)
+        return {
+            "sender": unpack_hex(self.sender),
+            "recipient": unpack_hex(self.recipient),
+            "service_type": self.service_type,
+            "amount": self.amount,
+            "amount_wei": self.amount_wei,
+            "duration_weeks": self.duration_weeks,
+            "rate_per_second": self.rate_per_second,
+            "start_time": format_time(self.start_time),
+            "end_time": format_time(self.end_time),
+            "status": status,
+            "released": released,
+            "remaining": remaining
+        }
+
+@dataclass(frozen=True)
+class DelegationRecord:
+    """An ERC-7710 delegation. Times are epoch microseconds."""
+    __slots__ = ("id", "delegator", "delegatee", "permission_type", "created_at", "expires_at", "state", "tx_hash")
+    
+    PREFIX = "delegation"
+    
+    id: bytes
+    delegator: Union[bytes, str]
+    delegatee: Union[bytes, str]
+    permission_type: str
+    created_at: int
+    expires_at: int
+    state: DelegationState
+    tx_hash: Union[bytes, str]
+    
+    @property
+    def delegation_id(self) -> str:
+        return f"{self.PREFIX}_{self.id.hex()}"
+    
+    def to_dict(self) -> Dict[str, str]:
+        return {
+            "delegator": unpack_hex(self.delegator),
+            "delegatee": unpack_hex(self.delegatee),
+            "permission_type": self.permission_type,
+            "created_at": format_time(self.created_at),
+            "expires_at": format_time(self.expires_at),
+            "status": self.state.value,
+            "tx_hash": unpack_hex(self.tx_hash)
+        }
@@ -3,7 +3,7 @@ GuardianLink Data Models
 Defines the Pydantic models for the GuardianLink platform.
 """
 
-from typing import Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Union
 from pydantic import BaseModel, Field
 
 class User(BaseModel):
@@ -41,6 +41,14 @@ class DisasterRiskQuery(BaseModel):
     location: str
     disaster_type: Optional[str] = None
     
+class DisasterBatchQuery(BaseModel):
+    """Model for batch disaster risk assessment queries."""
+    queries: List[DisasterRiskQuery]
+
+class StreamStatusQuery(BaseModel):
+    """Model for bulk stream status queries."""
+    stream_ids: List[str]
+
 class DisasterResponse(BaseModel):
     """Model for disaster risk assessment responses."""
     location: str
@@ -54,6 +62,41 @@ class ChatResponse(BaseModel):
     """Model for chat responses."""
     response: str
     timestamp: str
+
+class ChatHistoryMessage(BaseModel):
+    """Model for a saved chat history message."""
+    id: str
+    role: str
+    content: str
+    timestamp: str
+
+class DisasterPrediction(BaseModel):
+    """Model for /disaster/predict responses."""
+    location: str
+    disaster_type: Optional[str]
+    risk_assessment: Dict[str, Any]
+    recommendations: List[str] = Field(default_factory=list)
+    timestamp: str
+
+class DelegationResult(BaseModel):
+    """Model for delegation responses."""
+    success: bool
+    transaction_hash: str
+
+class AidStreamCreated(BaseModel):
+    """Model for aid stream creation responses."""
+    success: bool
+    stream_id: str
+    status: str
+    message: str
+
+class SubscriptionResult(BaseModel):
+    """Model for mental health subscription responses."""
+    success: bool
+    subscription_id: str
+    service_type: str
+    duration_weeks: int
+    message: str
     
 class StreamStatus(BaseModel):
     """Model for stream status responses."""
@@ -78,3 +121,19 @@ class DisasterData(BaseModel):
     status: str
     affected_population: int
     aid_streams: List[str] = Field(default_factory=list)
+
+class DisasterProjection(BaseModel):
+    """Model for disaster data limited to requested fields (unset fields are omitted)."""
+    id: str
+    type: Optional[str] = None
+    location: Optional[str] = None
+    coordinates: Optional[Dict[str, float]] = None
+    severity: Optional[str] = None
+    start_date: Optional[str] = None
+    status: Optional[str] = None
+    affected_population: Optional[int] = None
+    aid_streams: Optional[List[str]] = None
+    
+class NearbyDisaster(DisasterData):
+    """Model for disaster data returned by proximity queries."""
+    distance_km: float
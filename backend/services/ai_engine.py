@@ -5,54 +5,158 @@ using Gaia API for LLM interactions and vector storage for information retrieval
 """
 
 import os
+import asyncio
+import time
+import importlib.util
 import httpx
 import json
-from typing import Dict, List, Any, Optional, Tuple
+import hashlib
+import re
+import numpy as np
+from typing import AsyncIterator, Dict, List, Any, Optional, Tuple
 from datetime import datetime
 import logging
 from dotenv import load_dotenv
 
+from guardianlink.core.ann_index import IVFIndex
+from guardianlink.core.batching import MicroBatcher
+from guardianlink.core.cache import TTLCache
+from guardianlink.core.cache_warmer import CacheWarmer, HotKeyTracker
+from guardianlink.core.circuit_breaker import CircuitBreaker, CircuitOpenError
+from guardianlink.core.concurrency import (
+    PRIORITY_HIGH,
+    PRIORITY_LOW,
+    PRIORITY_NORMAL,
+    AdaptiveConcurrencyLimiter,
+    backoff_delay,
+    parse_retry_after
+)
+from guardianlink.core.embedding_cache import EmbeddingCache
+from guardianlink.core.hedging import Hedger
+from guardianlink.core.keyword_matcher import KeywordMatcher
+from guardianlink.core.serialization import loads
+from guardianlink.core.singleflight import SingleFlight, canonical_key
+from guardianlink.core.tokens import estimate_message_tokens, estimate_tokens, truncate_to_tokens
+from guardianlink.core.vector_store import VectorStore
+from guardianlink.services.database import disaster_repository, get_disasters, get_recent_chat_history
+
 # Simple Document class for storing text with metadata
 class Document:
     def __init__(self, page_content, metadata=None):
         self.page_content = page_content
         self.metadata = metadata or {}
 
-# Mock OpenAIEmbeddings class for the MVP
+# Offline stand-in for OpenAIEmbeddings used by the MVP
 class OpenAIEmbeddings:
-    def __init__(self):
-        pass
+    """
+    Deterministic feature-hashed bag-of-words embeddings.
+    
+    Each lower-cased word is hashed to one of `dim` buckets with a +/-1 sign,
+    so texts sharing words get similar vectors without calling a model.
+    """
+    
+    model = "hashed-embed"
+    
+    def __init__(self, cache=None, dim=256):
+        # Optional EmbeddingCache consulted before computing embeddings
+        self.cache = cache
+        self.dim = dim
+    
+    def _embed(self, texts):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for token in re.findall(r"\w+", text.lower()):
+                digest = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+                vectors[i, digest % self.dim] += 1.0 if digest >> 63 else -1.0
+        return vectors.tolist()
         
     def embed_documents(self, texts):
-        # Return mock embeddings (just random values for demo)
-        return [[0.1, 0.2, 0.3] for _ in texts]
+        if self.cache is None:
+            return self._embed(texts)
+        
+        cached = self.cache.get_many(texts)
+        missing = [text for text, vector in zip(texts, cached) if vector is None]
+        if missing:
+            self.cache.put_many(missing, self._embed(missing))
+            cached = self.cache.get_many(texts)
+        return [vector.tolist() for vector in cached]
         
     def embed_query(self, text):
-        # Return mock embedding for query
-        return [0.1, 0.2, 0.3]
+        # Queries are embedded on the event loop during retrieval, and each user message is
+        # new, so they skip the cache: no file I/O or locking per request, and no growth
+        return self._embed([text])[0]
+
+def create_vector_index(dim):
+    """
+    Create the retrieval index selected by VECTOR_INDEX_BACKEND ("exact" or "ivf").
+    
+    The exact VectorStore suits corpora up to roughly 100k documents; at 1M it
+    misses the 10ms query target (see benchmarks/bench_vector_store.py) and
+    "ivf" is required.
+    """
+    if VECTOR_INDEX_BACKEND == "ivf":
+        return IVFIndex(dim=dim, nlist=IVF_NLIST, nprobe=IVF_NPROBE)
+    return VectorStore(dim=dim)
 
-# Mock FAISS vector store
+# FAISS-style facade over the in-process vector indexes
 class FAISS:
     @classmethod
-    def from_documents(cls, documents, embeddings):
-        return cls(documents, embeddings)
+    def from_documents(cls, documents, embeddings, index_factory=None):
+        vectorstore = cls(embeddings, index_factory)
+        vectorstore.add_documents(documents)
+        return vectorstore
         
-    def __init__(self, documents, embeddings):
-        self.documents = documents
+    @classmethod
+    def load_local(cls, path, embeddings):
+        # Restore an IVF snapshot written by save_local()
+        vectorstore = cls(embeddings)
+        vectorstore.index = IVFIndex.load(path, document_factory=Document)
+        return vectorstore
+    
+    def __init__(self, embeddings, index_factory=None):
         self.embeddings = embeddings
+        self.index_factory = index_factory or create_vector_index
+        self.index = None  # Created on first add, once the dimension is known
+    
+    def add_documents(self, documents, ids=None):
+        vectors = self.embeddings.embed_documents([doc.page_content for doc in documents])
+        if self.index is None:
+            self.index = self.index_factory(len(vectors[0]))
+        return self.index.add_documents(documents, vectors, ids)
+    
+    def save_local(self, path):
+        if not hasattr(self.index, "save"):
+            raise ValueError("Only the ivf index backend supports snapshots")
+        self.index.save(path)
+    
+    def delete(self, ids):
+        return self.index.delete(ids) if self.index is not None else 0
+    
+    def has_partition(self, partition):
+        return self.index is not None and self.index.partition_size(partition) > 0
+    
+    def similarity_search_with_score(self, query, k=4, filter=None, partition=None, **search_params):
+        # search_params carries backend knobs such as nprobe for the ivf index
+        if self.index is None:
+            return []
+        query_vector = self.embeddings.embed_query(query)
+        return self.index.search(query_vector, k=k, partition=partition, filters=filter, **search_params)[0]
+    
+    def similarity_search(self, query, k=4, filter=None, partition=None, **search_params):
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, filter, partition, **search_params)]
         
     def as_retriever(self, search_kwargs=None):
-        return FAISSRetriever(self.documents, search_kwargs)
+        return FAISSRetriever(self, search_kwargs)
         
 class FAISSRetriever:
-    def __init__(self, documents, search_kwargs=None):
-        self.documents = documents
+    def __init__(self, vectorstore, search_kwargs=None):
+        self.vectorstore = vectorstore
         self.search_kwargs = search_kwargs or {"k": 1}
         
-    def get_relevant_documents(self, query):
-        # For mock, just return k random documents
-        k = self.search_kwargs.get("k", 1)
-        return self.documents[:min(k, len(self.documents))]
+    def get_relevant_documents(self, query, **overrides):
+        # Per-call overrides (k, filter, partition) take precedence over search_kwargs
+        search_kwargs = {"k": 1, **self.search_kwargs, **overrides}
+        return self.vectorstore.similarity_search(query, **search_kwargs)
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -65,14 +169,108 @@ load_dotenv()
 GAIA_API_KEY = os.getenv('GAIA_AGENT_API_KEY')
 GAIA_API_ENDPOINT = os.getenv('GAIA_AGENT_ENDPOINT')
 GAIA_MODEL = os.getenv('GAIA_MODEL', 'llama')  # Default to llama model
+GAIA_EMBEDDING_MODEL = os.getenv('GAIA_EMBEDDING_MODEL', 'nomic-embed')
+
+# Persistent embedding cache (disabled unless a directory is configured)
+EMBEDDING_CACHE_DIR = os.getenv('EMBEDDING_CACHE_DIR')
+EMBEDDING_CACHE_VERSION = int(os.getenv('EMBEDDING_CACHE_VERSION', '1'))  # Bump when embeddings change
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv('EMBEDDING_CACHE_MAX_ENTRIES', '100000'))  # Oldest entries are evicted past this
+
+# Retrieval index backend: "exact" brute force or "ivf" approximate search
+VECTOR_INDEX_BACKEND = os.getenv('VECTOR_INDEX_BACKEND', 'exact').lower()
+IVF_NLIST = int(os.getenv('IVF_NLIST', '1024'))
+IVF_NPROBE = int(os.getenv('IVF_NPROBE', '16'))
+
+# Gaia HTTP connection pool configuration
+GAIA_HTTP2 = os.getenv('GAIA_HTTP2', 'False').lower() == 'true'
+GAIA_MAX_CONNECTIONS = int(os.getenv('GAIA_MAX_CONNECTIONS', '100'))
+GAIA_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv('GAIA_MAX_KEEPALIVE_CONNECTIONS', '20'))
+GAIA_KEEPALIVE_EXPIRY = float(os.getenv('GAIA_KEEPALIVE_EXPIRY', '30'))
+GAIA_CONNECT_TIMEOUT = float(os.getenv('GAIA_CONNECT_TIMEOUT', '5'))
+GAIA_CHAT_TIMEOUT = float(os.getenv('GAIA_CHAT_TIMEOUT', '60'))
+GAIA_EMBEDDINGS_TIMEOUT = float(os.getenv('GAIA_EMBEDDINGS_TIMEOUT', '30'))
+
+# Share one upstream call between concurrent identical chat completions
+GAIA_COALESCE_REQUESTS = os.getenv('GAIA_COALESCE_REQUESTS', 'True').lower() == 'true'
+
+# Adaptive concurrency limit and retry policy for Gaia calls
+GAIA_CONCURRENCY_INITIAL = int(os.getenv('GAIA_CONCURRENCY_INITIAL', '20'))
+GAIA_CONCURRENCY_MIN = int(os.getenv('GAIA_CONCURRENCY_MIN', '1'))
+GAIA_CONCURRENCY_MAX = int(os.getenv('GAIA_CONCURRENCY_MAX', '200'))
+GAIA_QUEUE_MAX = int(os.getenv('GAIA_QUEUE_MAX', '1000'))
+GAIA_QUEUE_TIMEOUT = float(os.getenv('GAIA_QUEUE_TIMEOUT', '30'))
+GAIA_MAX_RETRIES = int(os.getenv('GAIA_MAX_RETRIES', '3'))
+GAIA_RETRY_BASE_DELAY = float(os.getenv('GAIA_RETRY_BASE_DELAY', '0.5'))
+GAIA_RETRY_MAX_DELAY = float(os.getenv('GAIA_RETRY_MAX_DELAY', '30'))
+
+# Hedge chat completions that outlive the observed tail latency (off by default)
+GAIA_HEDGE_REQUESTS = os.getenv('GAIA_HEDGE_REQUESTS', 'false').lower() in ('1', 'true', 'yes')
+GAIA_HEDGE_PERCENTILE = float(os.getenv('GAIA_HEDGE_PERCENTILE', '95'))
+GAIA_HEDGE_MIN_SAMPLES = int(os.getenv('GAIA_HEDGE_MIN_SAMPLES', '20'))
+
+# Fail fast once Gaia looks unhealthy
+GAIA_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('GAIA_CIRCUIT_FAILURE_THRESHOLD', '5'))
+GAIA_CIRCUIT_RESET_TIMEOUT = float(os.getenv('GAIA_CIRCUIT_RESET_TIMEOUT', '30'))
+
+# Upstream responses treated as overload: back off and retry
+RETRYABLE_STATUS_CODES = {429, 502, 503, 504}
+# Transport errors raised before the request reached Gaia, so a retry cannot duplicate it.
+# Read and write timeouts are not retried: the request may already be running upstream
+RETRYABLE_TRANSPORT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+# Group concurrent single-text embedding requests into one /embeddings call
+GAIA_EMBED_BATCH_SIZE = int(os.getenv('GAIA_EMBED_BATCH_SIZE', '64'))
+GAIA_EMBED_BATCH_WAIT_MS = float(os.getenv('GAIA_EMBED_BATCH_WAIT_MS', '5'))
 
 class GaiaClient:
-    """Client for interacting with Gaia API."""
+    """
+    Client for interacting with Gaia API.
+    
+    A single pooled httpx.AsyncClient is shared by every call so connections
+    (and their TLS sessions) are kept alive between requests. The pool is
+    opened with start() and released with aclose(); the FastAPI lifespan does
+    both, and the client is created lazily if a call arrives before start().
     
-    def __init__(self, api_key=None, api_endpoint=None, model=None):
+    Concurrent chat completions with an identical payload are coalesced into
+    a single upstream request unless coalescing is disabled, and concurrent
+    embed() calls are micro-batched into shared /embeddings requests. Texts
+    already in the persistent embedding cache are never sent upstream.
+    
+    Every upstream call passes through an adaptive concurrency limiter that
+    shrinks when Gaia slows down or answers 429/503, queues excess calls by
+    priority (disaster work ahead of chat), and retries overload responses
+    with jittered exponential backoff that honours Retry-After.
+    
+    Chat completions can be hedged (a duplicate is sent once the call runs
+    past the observed p95) and are guarded by a circuit breaker that rejects
+    calls immediately while Gaia keeps failing. Both can be chosen per call.
+    """
+    
+    def __init__(
+        self,
+        api_key=None,
+        api_endpoint=None,
+        model=None,
+        http2=None,
+        max_connections=None,
+        max_keepalive_connections=None,
+        keepalive_expiry=None,
+        connect_timeout=None,
+        chat_timeout=None,
+        embeddings_timeout=None,
+        coalesce=None,
+        embed_batch_size=None,
+        embed_batch_wait_ms=None,
+        embedding_cache=None,
+        limiter=None,
+        max_retries=None,
+        hedge=None,
+        circuit_breaker=None
+    ):
         self.api_key = api_key or GAIA_API_KEY
         self.api_endpoint = api_endpoint or GAIA_API_ENDPOINT
         self.model = model or GAIA_MODEL
+        self.embedding_model = GAIA_EMBEDDING_MODEL
         
         if not self.api_key or not self.api_endpoint:
             raise ValueError("GAIA_AGENT_API_KEY and GAIA_AGENT_ENDPOINT must be set")
@@ -82,7 +280,181 @@ class GaiaClient:
             "Authorization": f"Bearer {self.api_key}"
         }
         
-    async def chat_completion(self, messages, temperature=0.7, max_tokens=1000, tools=None):
+        self.http2 = GAIA_HTTP2 if http2 is None else http2
+        if self.http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("GAIA_HTTP2 requested but the 'h2' package is not installed, falling back to HTTP/1.1")
+            self.http2 = False
+        
+        self.limits = httpx.Limits(
+            max_connections=max_connections or GAIA_MAX_CONNECTIONS,
+            max_keepalive_connections=max_keepalive_connections or GAIA_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=keepalive_expiry or GAIA_KEEPALIVE_EXPIRY
+        )
+        self.connect_timeout = connect_timeout or GAIA_CONNECT_TIMEOUT
+        self.chat_timeout = chat_timeout or GAIA_CHAT_TIMEOUT
+        self.embeddings_timeout = embeddings_timeout or GAIA_EMBEDDINGS_TIMEOUT
+        
+        self._client = None
+        self._client_loop = None
+        
+        self.coalesce = GAIA_COALESCE_REQUESTS if coalesce is None else coalesce
+        self.single_flight = SingleFlight()
+        self.embed_batcher = MicroBatcher(
+            self._embed_batch,
+            max_batch_size=embed_batch_size or GAIA_EMBED_BATCH_SIZE,
+            max_wait_ms=GAIA_EMBED_BATCH_WAIT_MS if embed_batch_wait_ms is None else embed_batch_wait_ms
+        )
+        
+        if embedding_cache is None and EMBEDDING_CACHE_DIR:
+            embedding_cache = EmbeddingCache(
+                EMBEDDING_CACHE_DIR, self.embedding_model, EMBEDDING_CACHE_VERSION, max_entries=EMBEDDING_CACHE_MAX_ENTRIES
+            )
+        self.embedding_cache = embedding_cache
+        
+        self.limiter = limiter or AdaptiveConcurrencyLimiter(
+            initial_limit=GAIA_CONCURRENCY_INITIAL,
+            min_limit=GAIA_CONCURRENCY_MIN,
+            max_limit=GAIA_CONCURRENCY_MAX,
+            max_queue=GAIA_QUEUE_MAX,
+            queue_timeout=GAIA_QUEUE_TIMEOUT
+        )
+        self.max_retries = GAIA_MAX_RETRIES if max_retries is None else max_retries
+        self.retries = 0
+        
+        self.hedge = GAIA_HEDGE_REQUESTS if hedge is None else hedge
+        self.hedger = Hedger(percentile=GAIA_HEDGE_PERCENTILE, min_samples=GAIA_HEDGE_MIN_SAMPLES)
+        self.circuit_breaker = circuit_breaker or CircuitBreaker(
+            failure_threshold=GAIA_CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=GAIA_CIRCUIT_RESET_TIMEOUT,
+            name="Gaia"
+        )
+    
+    def _timeout(self, seconds: float) -> httpx.Timeout:
+        """Build a per-call timeout that keeps the pool's connect timeout."""
+        return httpx.Timeout(seconds, connect=min(self.connect_timeout, seconds))
+    
+    async def start(self) -> httpx.AsyncClient:
+        """
+        Open the shared connection pool if it is not already open.
+        
+        Returns:
+            The pooled httpx.AsyncClient
+        """
+        loop = asyncio.get_running_loop()
+        if self._client is not None and not self._client.is_closed and self._client_loop is loop:
+            return self._client
+        
+        # A pool bound to another event loop cannot be reused, so open a new one
+        if self._client is not None and not self._client.is_closed:
+            logger.warning("Gaia connection pool was opened on a different event loop, reopening")
+        
+        self._client = httpx.AsyncClient(
+            http2=self.http2,
+            limits=self.limits,
+            timeout=self._timeout(self.chat_timeout)
+        )
+        self._client_loop = loop
+        logger.info(f"Opened Gaia connection pool (http2={self.http2}, max_connections={self.limits.max_connections})")
+        return self._client
+    
+    async def aclose(self) -> None:
+        """Close the shared connection pool."""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+            logger.info("Closed Gaia connection pool")
+        self._client = None
+        self._client_loop = None
+    
+    async def _post(self, path: str, payload: Dict[str, Any], timeout: float, priority: int) -> Any:
+        """
+        POST to the Gaia API under the concurrency limiter.
+        
+        Overload responses (429/502/503/504) and connection failures are retried
+        up to max_retries times; the limiter slot is released while sleeping.
+        Read and write timeouts are raised without a retry, since the request
+        may already have been processed.
+        
+        Args:
+            path: API path, e.g. "/chat/completions"
+            payload: JSON body
+            timeout: Timeout in seconds for each attempt
+            priority: Limiter queue priority
+        
+        Returns:
+            Decoded JSON response
+        """
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.acquire(priority)
+            started = time.monotonic()
+            overloaded = False
+            retry_after = None
+            try:
+                client = await self.start()
+                response = await client.post(
+                    f"{self.api_endpoint}{path}",
+                    headers=self.headers,
+                    json=payload,
+                    timeout=self._timeout(timeout)
+                )
+                if response.status_code in RETRYABLE_STATUS_CODES:
+                    overloaded = True
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    if attempt == self.max_retries:
+                        response.raise_for_status()
+                else:
+                    response.raise_for_status()
+                    return response.json()
+            except RETRYABLE_TRANSPORT_ERRORS:
+                overloaded = True
+                if attempt == self.max_retries:
+                    raise
+            except httpx.TransportError:
+                overloaded = True
+                raise
+            finally:
+                self.limiter.record(time.monotonic() - started, overloaded)
+                self.limiter.release()
+            
+            delay = backoff_delay(attempt, GAIA_RETRY_BASE_DELAY, GAIA_RETRY_MAX_DELAY, retry_after)
+            self.retries += 1
+            logger.warning(f"Gaia overloaded on {path}, retrying in {delay:.2f}s (attempt {attempt + 1}/{self.max_retries})")
+            await asyncio.sleep(delay)
+    
+    def _is_upstream_failure(self, error: Exception) -> bool:
+        """Whether an error says Gaia itself is unhealthy (as opposed to a bad request)."""
+        if isinstance(error, httpx.TransportError):
+            return True
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code in RETRYABLE_STATUS_CODES or error.response.status_code >= 500
+        return False
+    
+    async def _guarded(self, fn, token: Optional[int]) -> Any:
+        """Run fn() and report its outcome to the circuit breaker under token (None: not guarded)."""
+        if token is None:
+            return await fn()
+        try:
+            result = await fn()
+        except Exception as e:
+            self.circuit_breaker.record(token, False if self._is_upstream_failure(e) else None)
+            raise
+        except BaseException:
+            self.circuit_breaker.record(token, None)
+            raise
+        self.circuit_breaker.record(token, True)
+        return result
+    
+    async def chat_completion(
+        self,
+        messages,
+        temperature=0.7,
+        max_tokens=1000,
+        tools=None,
+        timeout=None,
+        priority=PRIORITY_NORMAL,
+        hedge=None,
+        use_circuit_breaker=True,
+        response_format=None
+    ):
         """
         Send a chat completion request to the Gaia API.
         
@@ -91,9 +463,17 @@ class GaiaClient:
             temperature: Temperature for response generation
             max_tokens: Maximum tokens to generate
             tools: Optional list of tools for function calling
+            timeout: Optional per-call timeout in seconds (defaults to GAIA_CHAT_TIMEOUT)
+            priority: Queue priority when the concurrency limit is reached (lower runs first)
+            hedge: Whether to hedge this call (defaults to the client setting)
+            use_circuit_breaker: Whether to fail fast while the circuit is open
+            response_format: Optional structured-output constraint, e.g. a json_schema
             
         Returns:
             API response
+        
+        Raises:
+            CircuitOpenError: If the circuit breaker is open
         """
         payload = {
             "model": self.model,
@@ -104,53 +484,417 @@ class GaiaClient:
         
         if tools:
             payload["tools"] = tools
+        if response_format:
+            payload["response_format"] = response_format
+        
+        seconds = timeout or self.chat_timeout
+        hedge = self.hedge if hedge is None else hedge
+        
+        async def attempt():
+            return await self._post("/chat/completions", payload, seconds, priority)
+        
+        async def hedged_attempt():
+            # Duplicates are speculative, so they queue behind real work
+            return await self._post("/chat/completions", payload, seconds, PRIORITY_LOW)
+        
+        def has_capacity():
+            return self.limiter.in_flight < self.limiter.limit
+        
+        token = None
+        sent = False
+        
+        async def send():
+            nonlocal sent
+            sent = True
+            if not hedge:
+                return await self._guarded(attempt, token)
+            return await self._guarded(
+                lambda: self.hedger.run(attempt, hedged_attempt, should_hedge=has_capacity),
+                token
+            )
             
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.api_endpoint}/chat/completions",
-                    headers=self.headers,
-                    json=payload,
-                    timeout=60.0
-                )
-                response.raise_for_status()
-                return response.json()
+            if use_circuit_breaker:
+                token = self.circuit_breaker.allow()
+            if not self.coalesce:
+                return await send()
+            return await self.single_flight.do(canonical_key(payload), send)
         except Exception as e:
             logger.error(f"Error calling Gaia API: {str(e)}")
             raise
+        finally:
+            if token is not None and not sent:
+                # Joined an identical in-flight call, whose own caller reports the outcome
+                self.circuit_breaker.record(token, None)
             
-    async def embeddings(self, texts):
+    async def chat_completion_stream(
+        self,
+        messages,
+        temperature=0.7,
+        max_tokens=1000,
+        timeout=None,
+        priority=PRIORITY_NORMAL,
+        use_circuit_breaker=True
+    ) -> AsyncIterator[str]:
+        """
+        Stream a chat completion from the Gaia API token by token.
+        
+        Uses the OpenAI-compatible `stream: true` mode and yields the content
+        deltas as they arrive. Streamed calls are never coalesced or retried,
+        and hold a concurrency slot until the stream ends.
+        
+        Args:
+            messages: List of message dictionaries
+            temperature: Temperature for response generation
+            max_tokens: Maximum tokens to generate
+            timeout: Optional per-call timeout in seconds (defaults to GAIA_CHAT_TIMEOUT)
+            priority: Queue priority when the concurrency limit is reached
+            use_circuit_breaker: Whether to fail fast while the circuit is open
+        
+        Yields:
+            Content fragments of the assistant message
+        
+        Raises:
+            CircuitOpenError: If the circuit breaker is open
+        """
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": True
+        }
+        
+        token = self.circuit_breaker.allow() if use_circuit_breaker else None
+        
+        try:
+            await self.limiter.acquire(priority)
+        except BaseException:
+            if token is not None:
+                self.circuit_breaker.record(token, None)
+            raise
+        overloaded = False
+        healthy = None
+        try:
+            client = await self.start()
+            async with client.stream(
+                "POST",
+                f"{self.api_endpoint}/chat/completions",
+                headers=self.headers,
+                json=payload,
+                timeout=self._timeout(timeout or self.chat_timeout)
+            ) as response:
+                overloaded = response.status_code in RETRYABLE_STATUS_CODES
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    # Server-sent events: only "data:" lines carry chunks
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    
+                    chunk = loads(data)
+                    choices = chunk.get("choices") or [{}]
+                    delta = choices[0].get("delta", {}).get("content")
+                    if delta:
+                        yield delta
+            healthy = True
+        except Exception as e:
+            overloaded = overloaded or isinstance(e, httpx.TransportError)
+            healthy = False if self._is_upstream_failure(e) else None
+            logger.error(f"Error streaming from Gaia API: {str(e)}")
+            raise
+        finally:
+            # Stream duration reflects reply length, so only overload is fed back
+            self.limiter.record(None, overloaded)
+            self.limiter.release()
+            if token is not None:
+                self.circuit_breaker.record(token, healthy)
+    
+    async def embeddings(self, texts, timeout=None):
         """
         Get embeddings for texts using the Gaia API.
         
+        When an embedding cache is configured only the texts it does not hold
+        are sent to Gaia, and the new vectors are added to the cache.
+        
         Args:
             texts: List of strings to embed
+            timeout: Optional per-call timeout in seconds (defaults to GAIA_EMBEDDINGS_TIMEOUT)
             
         Returns:
             List of embeddings
         """
+        if self.embedding_cache is None:
+            return await self._request_embeddings(texts, timeout)
+        
+        # The cache reads files and may wait on another process's lock, so keep it off the event loop
+        loop = asyncio.get_running_loop()
+        cached = await loop.run_in_executor(None, self.embedding_cache.get_many, texts)
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, cached) if vector is None))
+        fresh = {}
+        if missing:
+            data = await self._request_embeddings(missing, timeout)
+            vectors = [item["embedding"] for item in sorted(data, key=lambda item: item.get("index", 0))]
+            await loop.run_in_executor(None, self.embedding_cache.put_many, missing, vectors)
+            fresh = dict(zip(missing, vectors))
+        
+        return [
+            {
+                "object": "embedding",
+                "index": i,
+                "embedding": fresh[text] if vector is None else vector.tolist()
+            }
+            for i, (text, vector) in enumerate(zip(texts, cached))
+        ]
+    
+    async def _request_embeddings(self, texts, timeout=None):
+        """Send one /embeddings request to the Gaia API."""
         payload = {
-            "model": "nomic-embed",  # Using nomic-embed model for embeddings
+            "model": self.embedding_model,  # Using nomic-embed model for embeddings by default
             "input": texts
         }
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.api_endpoint}/embeddings",
-                    headers=self.headers,
-                    json=payload,
-                    timeout=30.0
-                )
-                response.raise_for_status()
-                return response.json()["data"]
+            response = await self._post("/embeddings", payload, timeout or self.embeddings_timeout, PRIORITY_NORMAL)
+            return response["data"]
         except Exception as e:
             logger.error(f"Error getting embeddings from Gaia API: {str(e)}")
             raise
 
+    async def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """Embed a batch of texts and return the vectors in input order."""
+        data = await self.embeddings(texts)
+        return [item["embedding"] for item in sorted(data, key=lambda item: item.get("index", 0))]
+    
+    async def embed(self, text: str) -> List[float]:
+        """
+        Get the embedding for a single text.
+        
+        Concurrent callers are grouped into batched /embeddings requests of up
+        to GAIA_EMBED_BATCH_SIZE texts or GAIA_EMBED_BATCH_WAIT_MS of waiting.
+        
+        Args:
+            text: The string to embed
+        
+        Returns:
+            The embedding vector
+        """
+        return await self.embed_batcher.submit(text)
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get client-side request metrics.
+        
+        Returns:
+            Dictionary of metric groups
+        """
+        return {
+            "coalescing": self.single_flight.stats(),
+            "concurrency": {**self.limiter.stats(), "retries": self.retries},
+            "hedging": self.hedger.stats(),
+            "circuit_breaker": self.circuit_breaker.stats(),
+            "embedding_batches": self.embed_batcher.stats(),
+            "embedding_cache": self.embedding_cache.stats() if self.embedding_cache is not None else None
+        }
+
 # Initialize Gaia client
 gaia_client = GaiaClient()
 
+# Disaster assessment cache configuration
+DISASTER_CACHE_TTL = float(os.getenv('DISASTER_CACHE_TTL', '300'))
+DISASTER_CACHE_MAX_ENTRIES = int(os.getenv('DISASTER_CACHE_MAX_ENTRIES', '1024'))
+DISASTER_CACHE_MAX_BYTES = int(os.getenv('DISASTER_CACHE_MAX_BYTES', str(4 * 1024 * 1024)))
+DISASTER_CACHE_IOT_PRECISION = int(os.getenv('DISASTER_CACHE_IOT_PRECISION', '2'))  # Significant digits
+
+# Cache for LLM-backed risk assessments and recommendations
+disaster_cache = TTLCache(
+    ttl_seconds=DISASTER_CACHE_TTL,
+    max_entries=DISASTER_CACHE_MAX_ENTRIES,
+    max_bytes=DISASTER_CACHE_MAX_BYTES
+)
+
+_READING_PATTERN = re.compile(r"^\s*(-?\d+(?:\.\d+)?)\s*(.*)$")
+
+def normalize_location(location: str) -> str:
+    """Normalize a location for cache keys (case and whitespace insensitive)."""
+    return " ".join(location.lower().split())
+
+def quantize_iot_data(iot_data: Dict) -> Tuple:
+    """
+    Quantize IoT readings so that near-identical sensor values share a cache key.
+    
+    Numeric readings such as "3.24m" are rounded to DISASTER_CACHE_IOT_PRECISION
+    significant digits and keep their unit; other values are used as-is.
+    
+    Args:
+        iot_data: IoT readings keyed by sensor name
+    
+    Returns:
+        Sorted tuple of (sensor, quantized reading) pairs
+    """
+    quantized = []
+    for sensor, reading in iot_data.items():
+        match = _READING_PATTERN.match(str(reading))
+        if match:
+            value = float(f"{float(match.group(1)):.{DISASTER_CACHE_IOT_PRECISION}g}")
+            reading = f"{value:g}{match.group(2)}"
+        quantized.append((sensor, str(reading)))
+    return tuple(sorted(quantized))
+
+def normalize_disaster_type(disaster_type: Optional[str]) -> Optional[str]:
+    """Normalize a disaster type, treating blank values as "any" (None)."""
+    if disaster_type is None:
+        return None
+    return disaster_type.strip().lower() or None
+
+def dedupe_disaster_queries(queries: List[Tuple[str, Optional[str]]]) -> List[Tuple[str, Optional[str], List[int]]]:
+    """
+    Normalize (location, disaster_type) queries and merge duplicates.
+    
+    Locations compare case and whitespace insensitively; the first spelling
+    seen (trimmed) is kept for the prediction.
+    
+    Args:
+        queries: (location, disaster_type) pairs in request order
+    
+    Returns:
+        (location, disaster_type, positions) for each distinct query, in
+        first-seen order, where positions are the indices of its duplicates
+    """
+    unique: Dict[Tuple[str, Optional[str]], Tuple[str, Optional[str], List[int]]] = {}
+    for position, (location, disaster_type) in enumerate(queries):
+        location = " ".join(location.split())
+        disaster_type = normalize_disaster_type(disaster_type)
+        key = (normalize_location(location), disaster_type)
+        if key not in unique:
+            unique[key] = (location, disaster_type, [])
+        unique[key][2].append(position)
+    return list(unique.values())
+
+def risk_cache_key(location: str, disaster_type: Optional[str]) -> Tuple:
+    """Build the cache key for a risk assessment."""
+    return ("risk", normalize_location(location), normalize_disaster_type(disaster_type) or "any")
+
+def recommendations_cache_key(location: str, disaster_type: Optional[str], risk_level: str, iot_data: Dict) -> Tuple:
+    """Build the cache key for a set of recommendations."""
+    return (
+        "recommendations",
+        normalize_location(location),
+        normalize_disaster_type(disaster_type) or "any",
+        risk_level,
+        quantize_iot_data(iot_data)
+    )
+
+def invalidate_disaster_cache(location: Optional[str] = None, disaster_type: Optional[str] = None) -> int:
+    """
+    Invalidate cached risk assessments and recommendations.
+    
+    Call this when the underlying disaster or sensor data changes. With no
+    arguments the whole cache is cleared.
+    
+    Args:
+        location: Optional location to invalidate
+        disaster_type: Optional disaster type to invalidate
+    
+    Returns:
+        Number of entries removed
+    """
+    if location is None and disaster_type is None:
+        removed = len(disaster_cache)
+        disaster_cache.clear()
+        return removed
+    
+    location_key = normalize_location(location) if location is not None else None
+    type_key = (normalize_disaster_type(disaster_type) or "any") if disaster_type is not None else None
+    
+    def matches(key: Tuple) -> bool:
+        return (location_key is None or key[1] == location_key) and (type_key is None or key[2] == type_key)
+    
+    return disaster_cache.invalidate_where(matches)
+
+def invalidate_disaster_change(location: str, disaster_type: Optional[str]) -> None:
+    """Drop predictions a saved or changed disaster may have made stale: its type and "any" type at its location."""
+    removed = invalidate_disaster_cache(location, disaster_type)
+    if disaster_type is not None:
+        removed += invalidate_disaster_cache(location, "any")
+    if removed:
+        logger.info(f"Invalidated {removed} cached predictions for {location} after a disaster update")
+
+disaster_repository.listeners.append(invalidate_disaster_change)
+
+# Ask for risk level and recommendations in one Gaia call (false = two sequential calls)
+DISASTER_FUSED_CALL = os.getenv('DISASTER_FUSED_CALL', 'true').lower() in ('1', 'true', 'yes')
+
+RISK_LEVELS = ("low", "medium", "high")
+
+# Used when Gaia cannot produce recommendations
+FALLBACK_RECOMMENDATIONS = ["Establish evacuation routes", "Stockpile emergency supplies", "Create communication plan"]
+
+# Structured output contract for the fused risk + recommendations call
+DISASTER_ASSESSMENT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "risk_level": {"type": "string", "enum": list(RISK_LEVELS)},
+        "recommendations": {
+            "type": "array",
+            "items": {"type": "string"},
+            "minItems": 3,
+            "maxItems": 5
+        }
+    },
+    "required": ["risk_level", "recommendations"],
+    "additionalProperties": False
+}
+
+DISASTER_ASSESSMENT_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "disaster_assessment", "strict": True, "schema": DISASTER_ASSESSMENT_SCHEMA}
+}
+
+_JSON_OBJECT_PATTERN = re.compile(r"\{.*\}", re.DOTALL)
+_RISK_LEVEL_PATTERN = re.compile(r"\b(high|medium|low)\b", re.IGNORECASE)
+_LIST_ITEM_PATTERN = re.compile(r"^\s*(?:[-*\u2022]|\d+[.)])\s+(.+?)\s*$")
+
+def parse_disaster_assessment(content: str) -> Dict[str, Any]:
+    """
+    Parse a fused risk + recommendations reply, tolerating imperfect output.
+    
+    Accepts strict JSON, JSON wrapped in prose or a Markdown code fence, and
+    plain text with a risk word and a bulleted or numbered list. Values are
+    coerced to the schema: unknown risk levels become "medium" and at most
+    five non-empty string recommendations are kept.
+    
+    Args:
+        content: Message content returned by Gaia
+    
+    Returns:
+        Dictionary with "risk_level" and "recommendations" (possibly empty)
+    """
+    result = None
+    match = _JSON_OBJECT_PATTERN.search(content)
+    if match:
+        try:
+            result = loads(match.group(0))
+        except json.JSONDecodeError:
+            result = None
+    
+    if isinstance(result, dict):
+        risk_level = str(result.get("risk_level", "")).strip().lower()
+        recommendations = result.get("recommendations") or []
+        if isinstance(recommendations, str):
+            recommendations = [recommendations]
+    else:
+        risk_match = _RISK_LEVEL_PATTERN.search(content)
+        risk_level = risk_match.group(1).lower() if risk_match else ""
+        recommendations = [m.group(1) for m in map(_LIST_ITEM_PATTERN.match, content.splitlines()) if m]
+    
+    return {
+        "risk_level": risk_level if risk_level in RISK_LEVELS else "medium",
+        "recommendations": [str(item).strip() for item in recommendations if str(item).strip()][:5]
+    }
+
 # Mock data for demo purposes
 # In production, we would use proper vectorstores
 MOCK_DISASTER_DATA = {
@@ -205,8 +949,41 @@ MENTAL_HEALTH_RESOURCES = [
     )
 ]
 
+# Keywords that route a message to resource types, per language.
+# A trailing "*" matches any word starting with the stem.
+DEFAULT_INTENT_KEYWORDS = {
+    "anxiety": {
+        "en": ["anxiety", "anxious", "worr*", "nervous", "stress*", "panic*"],
+        "sw": ["wasiwasi", "hofu", "msongo"],
+        "hi": ["चिंता", "घबराहट", "तनाव"]
+    },
+    "depression": {
+        "en": ["depress*", "sad", "sadness", "unhappy", "hopeless", "down"],
+        "sw": ["huzuni", "sina matumaini"],
+        "hi": ["उदास", "निराश", "अवसाद"]
+    },
+    "general": {
+        "en": ["help", "support", "advice", "guidance", "tips"],
+        "sw": ["msaada", "ushauri"],
+        "hi": ["मदद", "सलाह"]
+    }
+}
+
+# Optional JSON file in the same {intent: {language: [keywords]}} format
+MENTAL_HEALTH_KEYWORDS_FILE = os.getenv('MENTAL_HEALTH_KEYWORDS_FILE')
+
+# Compiled once; matches all languages in a single pass
+intent_matcher = (
+    KeywordMatcher.from_file(MENTAL_HEALTH_KEYWORDS_FILE) if MENTAL_HEALTH_KEYWORDS_FILE
+    else KeywordMatcher.from_config(DEFAULT_INTENT_KEYWORDS)
+)
+
 # Create a simple mock vector store for mental health resources
-embeddings = OpenAIEmbeddings()
+embeddings = OpenAIEmbeddings(
+    cache=EmbeddingCache(
+        EMBEDDING_CACHE_DIR, OpenAIEmbeddings.model, EMBEDDING_CACHE_VERSION, max_entries=EMBEDDING_CACHE_MAX_ENTRIES
+    ) if EMBEDDING_CACHE_DIR else None
+)
 mental_health_vectorstore = FAISS.from_documents(MENTAL_HEALTH_RESOURCES, embeddings)
 mental_health_retriever = mental_health_vectorstore.as_retriever(
     search_kwargs={"k": 3}
@@ -214,10 +991,26 @@ mental_health_retriever = mental_health_vectorstore.as_retriever(
 
 # Define the disaster response agent using Gaia API
 class DisasterResponseAgent:
-    """Agent for disaster response using Gaia API."""
+    """
+    Agent for disaster response using Gaia API.
     
-    def __init__(self, client=None):
+    `hedge` and `use_circuit_breaker` control tail-latency hedging and
+    fail-fast behaviour for this agent's Gaia calls; hedge=None uses the
+    client default. With `fused` (default DISASTER_FUSED_CALL) the risk level
+    and recommendations for unknown locations come from a single call.
+    `priority` is the limiter priority of those calls, and `refresh` skips
+    cache reads (results are still cached), which the cache warmer uses to
+    recompute entries before they expire.
+    """
+    
+    def __init__(self, client=None, cache=None, hedge=None, use_circuit_breaker=True, fused=None, priority=PRIORITY_HIGH, refresh=False):
         self.client = client or gaia_client
+        self.cache = disaster_cache if cache is None else cache
+        self.hedge = hedge
+        self.use_circuit_breaker = use_circuit_breaker
+        self.fused = DISASTER_FUSED_CALL if fused is None else fused
+        self.priority = priority
+        self.refresh = refresh
     
     async def assess_risk(self, location: str, disaster_type: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -250,6 +1043,12 @@ class DisasterResponseAgent:
                         highest_risk = "medium"
                 return {"risk_level": highest_risk}
         
+        # Reuse a recent prediction for this location if we have one
+        cache_key = risk_cache_key(location, disaster_type)
+        cached = None if self.refresh else self.cache.get(cache_key)
+        if cached is not None:
+            return dict(cached)
+        
         # If location not found, use Gaia API to make a prediction
         messages = [
             {"role": "system", "content": "You are an AI disaster risk assessor. Assess the risk level (low, medium, high) for the following location and disaster type. Return ONLY a JSON object with a 'risk_level' field."},
@@ -257,21 +1056,30 @@ class DisasterResponseAgent:
         ]
         
         try:
-            response = await self.client.chat_completion(messages, temperature=0.2)
+            response = await self.client.chat_completion(
+                messages,
+                temperature=0.2,
+                priority=self.priority,
+                hedge=self.hedge,
+                use_circuit_breaker=self.use_circuit_breaker
+            )
             content = response['choices'][0]['message']['content']
             
             # Try to parse the JSON response
             try:
-                result = json.loads(content)
-                return {"risk_level": result.get("risk_level", "medium")}
+                result = loads(content)
+                assessment = {"risk_level": result.get("risk_level", "medium")}
             except json.JSONDecodeError:
                 # If not valid JSON, extract the risk level from the text
                 if "high" in content.lower():
-                    return {"risk_level": "high"}
+                    assessment = {"risk_level": "high"}
                 elif "medium" in content.lower():
-                    return {"risk_level": "medium"}
+                    assessment = {"risk_level": "medium"}
                 else:
-                    return {"risk_level": "low"}
+                    assessment = {"risk_level": "low"}
+            
+            self.cache.set(cache_key, assessment)
+            return dict(assessment)
         except Exception as e:
             logger.error(f"Error assessing risk with Gaia API: {str(e)}")
             return {"risk_level": "medium", "error": str(e)}
@@ -337,6 +1145,12 @@ class DisasterResponseAgent:
         if location_lower in MOCK_DISASTER_DATA and disaster_type in MOCK_DISASTER_DATA[location_lower]:
             return MOCK_DISASTER_DATA[location_lower][disaster_type]["recommendations"]
         
+        # Reuse recent recommendations for the same scenario if we have them
+        cache_key = recommendations_cache_key(location, disaster_type, risk_level, iot_data)
+        cached = None if self.refresh else self.cache.get(cache_key)
+        if cached is not None:
+            return list(cached)
+        
         # If not, use Gaia API to generate recommendations
         messages = [
             {"role": "system", "content": "You are an AI disaster management expert. Generate 3-5 specific, actionable recommendations for the following disaster scenario. Return ONLY a JSON object with a 'recommendations' field containing an array of strings."},
@@ -351,21 +1165,87 @@ class DisasterResponseAgent:
         ]
         
         try:
-            response = await self.client.chat_completion(messages, temperature=0.3)
+            response = await self.client.chat_completion(
+                messages,
+                temperature=0.3,
+                priority=self.priority,
+                hedge=self.hedge,
+                use_circuit_breaker=self.use_circuit_breaker
+            )
             content = response['choices'][0]['message']['content']
             
             # Try to parse the JSON response
             try:
-                result = json.loads(content)
-                return result.get("recommendations", [])
+                result = loads(content)
+                recommendations = result.get("recommendations", [])
             except json.JSONDecodeError:
                 # If not valid JSON, extract recommendations from the text
                 lines = content.split('\n')
                 recommendations = [line.strip() for line in lines if line.strip() and not line.strip().startswith('{') and not line.strip().endswith('}')] 
-                return recommendations[:5]  # Return up to 5 recommendations
+                recommendations = recommendations[:5]  # Return up to 5 recommendations
+            
+            self.cache.set(cache_key, recommendations)
+            return list(recommendations)
+        except CircuitOpenError:
+            logger.warning("Gaia circuit open, using fallback recommendations")
+            return list(FALLBACK_RECOMMENDATIONS)
         except Exception as e:
             logger.error(f"Error generating recommendations with Gaia API: {str(e)}")
-            return ["Establish evacuation routes", "Stockpile emergency supplies", "Create communication plan"]  # Fallback recommendations
+            return list(FALLBACK_RECOMMENDATIONS)
+    
+    async def assess_and_recommend(self, location: str, disaster_type: Optional[str], iot_data: Dict) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        Assess risk and generate recommendations in a single Gaia call.
+        
+        The reply is constrained to DISASTER_ASSESSMENT_SCHEMA and parsed
+        tolerantly. Results are cached under the same keys as assess_risk and
+        generate_recommendations, so both modes share the cache.
+        
+        Args:
+            location: The location to assess
+            disaster_type: Optional type of disaster to assess
+            iot_data: IoT data for the location
+        
+        Returns:
+            Tuple of (risk assessment, recommendations)
+        """
+        risk_key = risk_cache_key(location, disaster_type)
+        cached_risk = None if self.refresh else self.cache.get(risk_key)
+        if cached_risk is not None:
+            cached_recommendations = self.cache.get(
+                recommendations_cache_key(location, disaster_type, cached_risk["risk_level"], iot_data)
+            )
+            if cached_recommendations is not None:
+                return dict(cached_risk), list(cached_recommendations)
+        
+        messages = [
+            {"role": "system", "content": "You are an AI disaster risk assessor and disaster management expert. Assess the risk level (low, medium, high) for the following location and disaster type, and generate 3-5 specific, actionable recommendations for disaster preparedness and response. Return ONLY a JSON object with a 'risk_level' field and a 'recommendations' field containing an array of strings."},
+            {"role": "user", "content": f"Location: {location}, Disaster type: {disaster_type or 'any'}, IoT data: {json.dumps(iot_data)}"}
+        ]
+        
+        try:
+            response = await self.client.chat_completion(
+                messages,
+                temperature=0.2,
+                max_tokens=400,
+                priority=self.priority,
+                hedge=self.hedge,
+                use_circuit_breaker=self.use_circuit_breaker,
+                response_format=DISASTER_ASSESSMENT_RESPONSE_FORMAT
+            )
+            result = parse_disaster_assessment(response['choices'][0]['message']['content'])
+        except CircuitOpenError as e:
+            logger.warning("Gaia circuit open, using fallback assessment")
+            return {"risk_level": "medium", "error": str(e)}, list(FALLBACK_RECOMMENDATIONS)
+        except Exception as e:
+            logger.error(f"Error assessing disaster with Gaia API: {str(e)}")
+            return {"risk_level": "medium", "error": str(e)}, list(FALLBACK_RECOMMENDATIONS)
+        
+        assessment = {"risk_level": result["risk_level"]}
+        recommendations = result["recommendations"] or list(FALLBACK_RECOMMENDATIONS)
+        self.cache.set(risk_key, assessment)
+        self.cache.set(recommendations_cache_key(location, disaster_type, assessment["risk_level"], iot_data), recommendations)
+        return dict(assessment), list(recommendations)
     
     async def process(self, location: str, disaster_type: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -378,15 +1258,18 @@ class DisasterResponseAgent:
         Returns:
             Assessment results including risk level and recommendations
         """
-        # Step 1: Assess risk
-        risk_assessment = await self.assess_risk(location, disaster_type)
-        risk_level = risk_assessment.get("risk_level", "unknown")
-        
-        # Step 2: Collect IoT data
+        # Collect IoT data
         iot_data = self.collect_iot_data(location, disaster_type)
         
-        # Step 3: Generate recommendations
-        recommendations = await self.generate_recommendations(location, disaster_type, risk_level, iot_data)
+        if self.fused and location and location.lower() not in MOCK_DISASTER_DATA:
+            # One round trip for both the risk level and the recommendations
+            risk_assessment, recommendations = await self.assess_and_recommend(location, disaster_type, iot_data)
+            risk_level = risk_assessment.get("risk_level", "unknown")
+        else:
+            # Assess risk, then generate recommendations for that risk level
+            risk_assessment = await self.assess_risk(location, disaster_type)
+            risk_level = risk_assessment.get("risk_level", "unknown")
+            recommendations = await self.generate_recommendations(location, disaster_type, risk_level, iot_data)
         
         return {
             "location": location,
@@ -396,12 +1279,274 @@ class DisasterResponseAgent:
             "recommendations": recommendations
         }
 
+# Conversation summary configuration
+PROMPT_HISTORY_TOKEN_BUDGET = int(os.getenv('PROMPT_HISTORY_TOKEN_BUDGET', '600'))  # Summary plus recent turns
+SUMMARY_KEEP_RECENT_MESSAGES = int(os.getenv('SUMMARY_KEEP_RECENT_MESSAGES', '4'))  # Always kept verbatim
+SUMMARY_MIN_NEW_MESSAGES = int(os.getenv('SUMMARY_MIN_NEW_MESSAGES', '4'))  # Fold messages in batches of at least this many
+SUMMARY_MAX_TOKENS = int(os.getenv('SUMMARY_MAX_TOKENS', '200'))
+SUMMARY_TTL = float(os.getenv('SUMMARY_TTL', '86400'))
+SUMMARY_MAX_ENTRIES = int(os.getenv('SUMMARY_MAX_ENTRIES', '10000'))
+
+# Number of raw messages the prompt carried before summaries were introduced
+LEGACY_HISTORY_MESSAGES = 5
+
+def format_history(messages: List[Dict]) -> str:
+    """Format chat messages as "User: ..." / "Assistant: ..." lines."""
+    lines = []
+    for msg in messages:
+        role = "User" if msg["role"] == "user" else "Assistant"
+        lines.append(f"{role}: {msg['content']}\n")
+    return "".join(lines)
+
+def unsummarized_messages(chat_history: List[Dict], summary_state: Optional[Dict]) -> List[Dict]:
+    """
+    Get the messages newer than the ones a summary already covers.
+    
+    Args:
+        chat_history: The chat history, oldest first
+        summary_state: Cached summary state, or None if there is no summary
+    
+    Returns:
+        The uncovered tail of chat_history, or all of it if the last folded
+        message is no longer in the history window
+    """
+    last_message_id = summary_state.get("last_message_id") if summary_state else None
+    if not last_message_id:
+        return list(chat_history)
+    # Found by id rather than timestamp: timestamps are local time and may repeat or go back
+    for position in range(len(chat_history) - 1, -1, -1):
+        if chat_history[position].get("id") == last_message_id:
+            return chat_history[position + 1:]
+    return list(chat_history)
+
+def build_history_context(
+    chat_history: List[Dict],
+    summary_state: Optional[Dict] = None,
+    budget: int = PROMPT_HISTORY_TOKEN_BUDGET
+) -> str:
+    """
+    Build the conversation context for a prompt within a token budget.
+    
+    The rolling summary (capped at half the budget) comes first, followed by
+    as many of the newest unsummarized turns as fit in the rest. If even the
+    newest turn does not fit, it is truncated rather than dropped.
+    
+    Args:
+        chat_history: The chat history, oldest first
+        summary_state: Cached summary state, or None if there is no summary
+        budget: Maximum estimated tokens for the whole context
+    
+    Returns:
+        Formatted summary and recent turns
+    """
+    summary = summary_state.get("summary", "") if summary_state else ""
+    summary_line = f"Summary of earlier conversation: {truncate_to_tokens(summary, budget // 2)}\n" if summary else ""
+    remaining = budget - estimate_tokens(summary_line)
+    
+    recent = []
+    for msg in reversed(unsummarized_messages(chat_history, summary_state)):
+        line = format_history([msg])
+        cost = estimate_tokens(line)
+        if cost > remaining:
+            if not recent and remaining > 0:
+                recent.append(truncate_to_tokens(line.rstrip("\n"), remaining) + "\n")
+            break
+        recent.append(line)
+        remaining -= cost
+    recent.reverse()
+    return summary_line + "".join(recent)
+
+class PromptTokenStats:
+    """
+    Tracks estimated prompt sizes against the legacy last-5-messages prompt.
+    
+    `legacy` figures are what the same request would have cost with the raw
+    history the prompt used to carry, so the difference is the saving from
+    rolling summaries and the token budget.
+    """
+    
+    def __init__(self):
+        self.prompts = 0
+        self.prompt_tokens = 0
+        self.legacy_prompt_tokens = 0
+        self.history_tokens = 0
+        self.legacy_history_tokens = 0
+        self.reported = 0
+        self.reported_prompt_tokens = 0
+    
+    def record(self, prompt_tokens: int, history_tokens: int, legacy_history_tokens: int) -> None:
+        self.prompts += 1
+        self.prompt_tokens += prompt_tokens
+        self.history_tokens += history_tokens
+        self.legacy_history_tokens += legacy_history_tokens
+        self.legacy_prompt_tokens += prompt_tokens - history_tokens + legacy_history_tokens
+    
+    def record_usage(self, response: Dict[str, Any]) -> None:
+        """Record the prompt token count Gaia reports, when it reports one."""
+        prompt_tokens = (response.get("usage") or {}).get("prompt_tokens")
+        if isinstance(prompt_tokens, int):
+            self.reported += 1
+            self.reported_prompt_tokens += prompt_tokens
+    
+    def stats(self) -> Dict[str, Any]:
+        prompts = self.prompts or 1
+        return {
+            "prompts": self.prompts,
+            "avg_prompt_tokens": self.prompt_tokens / prompts,
+            "avg_legacy_prompt_tokens": self.legacy_prompt_tokens / prompts,
+            "avg_history_tokens": self.history_tokens / prompts,
+            "avg_legacy_history_tokens": self.legacy_history_tokens / prompts,
+            "saved_ratio": 1 - self.prompt_tokens / self.legacy_prompt_tokens if self.legacy_prompt_tokens else 0.0,
+            "avg_reported_prompt_tokens": self.reported_prompt_tokens / self.reported if self.reported else None
+        }
+
+# Prompt size counters for the mental health agent
+prompt_token_stats = PromptTokenStats()
+
+SUMMARY_SYSTEM_PROMPT = """You maintain a running summary of a conversation between a user and a mental health support assistant.
+Update the existing summary with the new messages. Keep the user's concerns, feelings, circumstances,
+coping strategies already suggested and anything the user asked to be remembered. Drop small talk.
+Reply with the updated summary only, in at most {max_words} words, in the language of the conversation."""
+
+class ConversationSummarizer:
+    """
+    Maintains a rolling per-wallet summary of older chat messages.
+    
+    Messages older than the `keep_recent` newest ones are folded into the
+    cached summary in batches of at least `min_new`, so each update only sends
+    the previous summary and the new messages to Gaia, never the full history.
+    Summary state is {"summary", "last_message_id" (id of the last folded
+    message), "messages" (number of messages folded so far)}.
+    """
+    
+    def __init__(
+        self,
+        client=None,
+        cache: Optional[TTLCache] = None,
+        keep_recent: int = SUMMARY_KEEP_RECENT_MESSAGES,
+        min_new: int = SUMMARY_MIN_NEW_MESSAGES,
+        max_tokens: int = SUMMARY_MAX_TOKENS
+    ):
+        self.client = client or gaia_client
+        self.cache = cache if cache is not None else TTLCache(ttl_seconds=SUMMARY_TTL, max_entries=SUMMARY_MAX_ENTRIES)
+        self.keep_recent = keep_recent
+        self.min_new = max(min_new, 1)
+        self.max_tokens = max_tokens
+        self._updating = set()
+        self.updates = 0
+        self.failures = 0
+        self.messages_summarized = 0
+    
+    def get(self, wallet_address: str) -> Optional[Dict[str, Any]]:
+        """Get the cached summary state for a wallet, if any."""
+        return self.cache.get(wallet_address)
+    
+    async def update(self, wallet_address: str, chat_history: List[Dict]) -> bool:
+        """
+        Fold messages that have left the recent window into the summary.
+        
+        Does nothing if fewer than `min_new` messages are waiting or an update
+        for the same wallet is already running. On failure the previous
+        summary is kept and the messages are retried on the next update.
+        
+        Args:
+            wallet_address: The user's wallet address
+            chat_history: The chat history, oldest first
+        
+        Returns:
+            True if the summary was updated
+        """
+        if wallet_address in self._updating:
+            return False
+        
+        state = self.get(wallet_address) or {"summary": "", "last_message_id": None, "messages": 0}
+        fresh = unsummarized_messages(chat_history, state)
+        to_fold = fresh[:len(fresh) - self.keep_recent] if self.keep_recent else fresh
+        if len(to_fold) < self.min_new:
+            return False
+        
+        self._updating.add(wallet_address)
+        try:
+            summary = await self._summarize(state["summary"], to_fold)
+        except Exception as e:
+            self.failures += 1
+            logger.warning(f"Could not update conversation summary for {wallet_address}: {str(e)}")
+            return False
+        finally:
+            self._updating.discard(wallet_address)
+        
+        self.cache.set(wallet_address, {
+            "summary": summary,
+            "last_message_id": to_fold[-1]["id"],
+            "messages": state["messages"] + len(to_fold)
+        })
+        self.updates += 1
+        self.messages_summarized += len(to_fold)
+        return True
+    
+    async def _summarize(self, summary: str, messages: List[Dict]) -> str:
+        prompt = [
+            {"role": "system", "content": SUMMARY_SYSTEM_PROMPT.format(max_words=self.max_tokens * 3 // 4)},
+            {"role": "user", "content": f"Existing summary:\n{summary or '(none)'}\n\nNew messages:\n{format_history(messages)}"}
+        ]
+        # Summaries are background work: never hedge them or let them jump the queue
+        response = await self.client.chat_completion(
+            messages=prompt,
+            temperature=0.2,
+            max_tokens=self.max_tokens,
+            priority=PRIORITY_LOW,
+            hedge=False
+        )
+        content = response['choices'][0]['message']['content'].strip()
+        if not content:
+            raise ValueError("empty summary")
+        return truncate_to_tokens(content, self.max_tokens)
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "updates": self.updates,
+            "failures": self.failures,
+            "messages_summarized": self.messages_summarized,
+            "in_progress": len(self._updating),
+            "cache": self.cache.stats()
+        }
+
+# Rolling conversation summaries shared by all mental health requests
+conversation_summarizer = ConversationSummarizer(client=gaia_client)
+
+# Response used when Gaia cannot be reached for mental health support
+MENTAL_HEALTH_FALLBACK_RESPONSE = "I'm here to support you. While I'm having some technical difficulties, please know that your feelings are valid and important. If you're in crisis, please reach out to a mental health professional or crisis hotline."
+
 # Define the mental health support agent using Gaia API
 class MentalHealthAgent:
-    """Agent for mental health support using Gaia API."""
+    """
+    Agent for mental health support using Gaia API.
+    
+    `hedge` and `use_circuit_breaker` control tail-latency hedging and
+    fail-fast behaviour for this agent's Gaia calls; hedge=None uses the
+    client default. When a wallet address is given, the prompt carries the
+    wallet's rolling summary plus recent turns within `history_token_budget`.
+    """
     
-    def __init__(self, client=None):
+    def __init__(
+        self,
+        client=None,
+        retriever=None,
+        hedge=None,
+        use_circuit_breaker=True,
+        matcher=None,
+        summarizer=None,
+        history_token_budget=PROMPT_HISTORY_TOKEN_BUDGET,
+        token_stats=None
+    ):
         self.client = client or gaia_client
+        self.retriever = retriever or mental_health_retriever
+        self.matcher = matcher or intent_matcher
+        self.summarizer = summarizer or conversation_summarizer
+        self.history_token_budget = history_token_budget
+        self.token_stats = token_stats or prompt_token_stats
+        self.hedge = hedge
+        self.use_circuit_breaker = use_circuit_breaker
         
     async def retrieve_relevant_content(self, message: str, language: str = "en") -> str:
         """
@@ -414,38 +1559,21 @@ class MentalHealthAgent:
         Returns:
             Relevant content as a string
         """
-        # For MVP, we'll use a simple lookup based on keywords and language
-        relevant_docs = []
+        # Search the user's language partition, falling back to English
+        if not self.retriever.vectorstore.has_partition(language):
+            language = "en"
         
-        # Filter by language if specified
-        language_docs = [doc for doc in MENTAL_HEALTH_RESOURCES if doc.metadata.get("language") == language]
-        if not language_docs:
-            language_docs = [doc for doc in MENTAL_HEALTH_RESOURCES if doc.metadata.get("language") == "en"]
-        
-        # Simple keyword matching
-        keywords = {
-            "anxiety": ["anxiety", "anxious", "worry", "nervous", "stress", "panic"],
-            "depression": ["depression", "depressed", "sad", "unhappy", "hopeless", "down"],
-            "general": ["help", "support", "advice", "guidance", "tips"]
-        }
-        
-        message_lower = message.lower()
-        
-        # Check for keyword matches
-        matched_types = set()
-        for doc_type, words in keywords.items():
-            if any(word in message_lower for word in words):
-                matched_types.add(doc_type)
+        # Match the message against the precompiled keyword index
+        matched_types = self.matcher.match(message)
         
         # If no specific matches, use general
         if not matched_types:
             matched_types.add("general")
             
-        # Get relevant documents
-        for doc in language_docs:
-            doc_type = doc.metadata.get("type")
-            if doc_type in matched_types or "general" in matched_types:
-                relevant_docs.append(doc.page_content)
+        # Rank the matching documents by similarity to the message
+        filters = None if "general" in matched_types else {"type": matched_types}
+        docs = self.retriever.get_relevant_documents(message, partition=language, filter=filters)
+        relevant_docs = [doc.page_content for doc in docs]
         
         # If we have relevant docs, return them
         if relevant_docs:
@@ -454,26 +1582,31 @@ class MentalHealthAgent:
         # Otherwise, return a generic message
         return "Mental health is important. It's okay to seek help and support when needed."
     
-    async def process(self, message: str, chat_history: List[Dict], language: str = "en") -> str:
+    async def build_messages(
+        self,
+        message: str,
+        chat_history: List[Dict],
+        language: str = "en",
+        wallet_address: Optional[str] = None
+    ) -> List[Dict[str, str]]:
         """
-        Process a mental health support request using Gaia API.
+        Build the Gaia chat messages for a mental health support request.
         
         Args:
             message: The user's message
             chat_history: The chat history
             language: The language of the user
+            wallet_address: The user's wallet address, used to look up their conversation summary
             
         Returns:
-            AI response
+            Messages for the chat completion API
         """
         # Get relevant content
         context = await self.retrieve_relevant_content(message, language)
         
-        # Format chat history for the prompt
-        formatted_history = ""
-        for msg in chat_history[-5:]:  # Only use the last 5 messages to keep context manageable
-            role = "User" if msg["role"] == "user" else "Assistant"
-            formatted_history += f"{role}: {msg['content']}\n"
+        # Summary plus as many recent turns as fit in the token budget
+        summary_state = self.summarizer.get(wallet_address) if wallet_address else None
+        formatted_history = build_history_context(chat_history, summary_state, self.history_token_budget)
         
         # Create the messages for Gaia API
         messages = [
@@ -493,19 +1626,159 @@ class MentalHealthAgent:
             {"role": "user", "content": message}
         ]
         
+        legacy_history = format_history(chat_history[-LEGACY_HISTORY_MESSAGES:])
+        self.token_stats.record(
+            estimate_message_tokens(messages),
+            estimate_tokens(formatted_history),
+            estimate_tokens(legacy_history)
+        )
+        return messages
+    
+    async def process(
+        self,
+        message: str,
+        chat_history: List[Dict],
+        language: str = "en",
+        wallet_address: Optional[str] = None
+    ) -> str:
+        """
+        Process a mental health support request using Gaia API.
+        
+        Args:
+            message: The user's message
+            chat_history: The chat history
+            language: The language of the user
+            wallet_address: The user's wallet address, used to look up their conversation summary
+        
+        Returns:
+            AI response
+        """
+        messages = await self.build_messages(message, chat_history, language, wallet_address)
+        
         try:
             # Call Gaia API
             response = await self.client.chat_completion(
                 messages=messages,
                 temperature=0.7,  # Higher temperature for more empathetic responses
-                max_tokens=500
+                max_tokens=500,
+                hedge=self.hedge,
+                use_circuit_breaker=self.use_circuit_breaker
             )
+            self.token_stats.record_usage(response)
             
             return response['choices'][0]['message']['content']
+        except CircuitOpenError:
+            logger.warning("Gaia circuit open, using fallback mental health response")
+            return MENTAL_HEALTH_FALLBACK_RESPONSE
         except Exception as e:
             logger.error(f"Error getting mental health response from Gaia API: {str(e)}")
             # Fallback response
-            return "I'm here to support you. While I'm having some technical difficulties, please know that your feelings are valid and important. If you're in crisis, please reach out to a mental health professional or crisis hotline."
+            return MENTAL_HEALTH_FALLBACK_RESPONSE
+    
+    async def process_stream(
+        self,
+        message: str,
+        chat_history: List[Dict],
+        language: str = "en",
+        wallet_address: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Process a mental health support request, streaming the response.
+        
+        Args:
+            message: The user's message
+            chat_history: The chat history
+            language: The language of the user
+            wallet_address: The user's wallet address, used to look up their conversation summary
+        
+        Yields:
+            Fragments of the AI response as Gaia produces them
+        """
+        messages = await self.build_messages(message, chat_history, language, wallet_address)
+        
+        emitted = False
+        try:
+            async for token in self.client.chat_completion_stream(
+                messages=messages,
+                temperature=0.7,  # Higher temperature for more empathetic responses
+                max_tokens=500,
+                use_circuit_breaker=self.use_circuit_breaker
+            ):
+                emitted = True
+                yield token
+        except Exception as e:
+            logger.error(f"Error streaming mental health response from Gaia API: {str(e)}")
+            # Only fall back if the user has not already seen part of a reply
+            if not emitted:
+                yield MENTAL_HEALTH_FALLBACK_RESPONSE
+
+# Disaster cache warming configuration
+# Off by default: warming spends Gaia quota, so deployments opt in
+DISASTER_WARM_ENABLED = os.getenv('DISASTER_WARM_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+DISASTER_WARM_INTERVAL = float(os.getenv('DISASTER_WARM_INTERVAL', '30'))
+DISASTER_WARM_REFRESH_AHEAD = float(os.getenv('DISASTER_WARM_REFRESH_AHEAD', '60'))  # Seconds before expiry
+DISASTER_WARM_CONCURRENCY = int(os.getenv('DISASTER_WARM_CONCURRENCY', '4'))
+DISASTER_WARM_JITTER = float(os.getenv('DISASTER_WARM_JITTER', '0.2'))
+DISASTER_WARM_TOP_LOCATIONS = int(os.getenv('DISASTER_WARM_TOP_LOCATIONS', '20'))
+DISASTER_WARM_MIN_REQUESTS = float(os.getenv('DISASTER_WARM_MIN_REQUESTS', '2'))
+DISASTER_WARM_HALF_LIFE = float(os.getenv('DISASTER_WARM_HALF_LIFE', '300'))  # Seconds for a request to count half
+
+# Decaying request counts per (location, disaster type), to find hotspots worth warming
+disaster_query_tracker = HotKeyTracker(max_keys=1000, half_life=DISASTER_WARM_HALF_LIFE)
+
+async def disaster_warm_targets() -> List[Tuple[str, Optional[str]]]:
+    """
+    List the (location, disaster_type) predictions to keep warm.
+    
+    These are the active disasters in the database plus the most requested
+    locations. Locations answered from MOCK_DISASTER_DATA without calling
+    Gaia are left out.
+    
+    Returns:
+        Distinct (location, disaster_type) pairs
+    """
+    targets: Dict[Tuple[str, Optional[str]], Tuple[str, Optional[str]]] = {}
+    active, _ = await get_disasters(status="active", fields=("location", "type"))
+    for disaster in active:
+        disaster_type = normalize_disaster_type(disaster.get("type"))
+        targets.setdefault((normalize_location(disaster["location"]), disaster_type), (disaster["location"], disaster_type))
+    
+    for key in disaster_query_tracker.top(DISASTER_WARM_TOP_LOCATIONS, DISASTER_WARM_MIN_REQUESTS):
+        targets.setdefault(key, key)
+    disaster_query_tracker.decay()
+    
+    return [target for key, target in targets.items() if key[0] not in MOCK_DISASTER_DATA]
+
+def disaster_prediction_expires_in(target: Tuple[str, Optional[str]]) -> Optional[float]:
+    """Seconds until the cached risk assessment for a target expires, or None if not cached."""
+    location, disaster_type = target
+    return disaster_cache.expires_in(risk_cache_key(location, disaster_type))
+
+async def warm_disaster_prediction(target: Tuple[str, Optional[str]]) -> None:
+    """
+    Recompute and cache the prediction for a target at low priority.
+    
+    Raises:
+        RuntimeError: If Gaia could not be reached and nothing was cached
+    """
+    location, disaster_type = target
+    agent = DisasterResponseAgent(client=gaia_client, hedge=False, priority=PRIORITY_LOW, refresh=True)
+    await agent.process(location, disaster_type)
+    
+    remaining = disaster_prediction_expires_in(target)
+    if remaining is None or remaining <= DISASTER_WARM_REFRESH_AHEAD:
+        raise RuntimeError("prediction was not refreshed")
+
+# Keeps predictions for hotspots cached; started and stopped by the app lifespan
+disaster_cache_warmer = CacheWarmer(
+    targets=disaster_warm_targets,
+    warm=warm_disaster_prediction,
+    expires_in=disaster_prediction_expires_in,
+    interval=DISASTER_WARM_INTERVAL,
+    refresh_ahead=DISASTER_WARM_REFRESH_AHEAD,
+    concurrency=DISASTER_WARM_CONCURRENCY,
+    jitter=DISASTER_WARM_JITTER
+)
 
 # Helper functions
 async def predict_disaster_risk(location: str, disaster_type: Optional[str] = None) -> Dict[str, Any]:
@@ -519,6 +1792,8 @@ async def predict_disaster_risk(location: str, disaster_type: Optional[str] = No
     Returns:
         Risk assessment
     """
+    if location:
+        disaster_query_tracker.record((normalize_location(location), normalize_disaster_type(disaster_type)))
     agent = DisasterResponseAgent(client=gaia_client)
     return await agent.process(location, disaster_type)
 
@@ -534,7 +1809,12 @@ async def get_disaster_recommendations(risk_assessment: Dict[str, Any]) -> List[
     """
     return risk_assessment.get("recommendations", [])
 
-async def get_mental_health_response(message: str, chat_history: List[Dict], language: str = "en") -> str:
+async def get_mental_health_response(
+    message: str,
+    chat_history: List[Dict],
+    language: str = "en",
+    wallet_address: Optional[str] = None
+) -> str:
     """
     Get a response from the mental health agent using Gaia API.
     
@@ -542,9 +1822,51 @@ async def get_mental_health_response(message: str, chat_history: List[Dict], lan
         message: The user's message
         chat_history: The chat history
         language: The language of the user
+        wallet_address: The user's wallet address, used to look up their conversation summary
         
     Returns:
         AI response
     """
     agent = MentalHealthAgent(client=gaia_client)
-    return await agent.process(message, chat_history, language)
+    return await agent.process(message, chat_history, language, wallet_address)
+
+async def get_mental_health_response_stream(
+    message: str,
+    chat_history: List[Dict],
+    language: str = "en",
+    wallet_address: Optional[str] = None
+) -> AsyncIterator[str]:
+    """
+    Stream a response from the mental health agent using Gaia API.
+    
+    Args:
+        message: The user's message
+        chat_history: The chat history
+        language: The language of the user
+        wallet_address: The user's wallet address, used to look up their conversation summary
+    
+    Yields:
+        Fragments of the AI response
+    """
+    agent = MentalHealthAgent(client=gaia_client)
+    async for token in agent.process_stream(message, chat_history, language, wallet_address):
+        yield token
+
+async def update_conversation_summary(wallet_address: str) -> bool:
+    """
+    Fold a wallet's older chat messages into its rolling summary.
+    
+    Meant to run in the background after each exchange is saved.
+    
+    Args:
+        wallet_address: The user's wallet address
+    
+    Returns:
+        True if the summary was updated
+    """
+    try:
+        chat_history = await get_recent_chat_history(wallet_address)
+        return await conversation_summarizer.update(wallet_address, chat_history)
+    except Exception as e:
+        logger.error(f"Error updating conversation summary: {str(e)}")
+        return False
@@ -5,16 +5,32 @@ via MetaMask SDK for the GuardianLink platform.
 """
 
 import os
+import sys
 import json
 import uuid
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Sequence
 import logging
 import asyncio
-from datetime import datetime, timedelta
+import time
 
 from web3 import Web3
 from dotenv import load_dotenv
 
+from guardianlink.core.stream_table import StreamTable
+from guardianlink.core.versioning import VersionCounter
+from guardianlink.models.records import (
+    WEI_PER_ETH,
+    AidStreamRecord,
+    DelegationRecord,
+    DelegationState,
+    StreamRecord,
+    StreamState,
+    SubscriptionRecord,
+    now_micros,
+    pack_hex,
+    split_id
+)
+
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -98,10 +114,22 @@ ERC7710_ABI = json.loads(os.getenv("ERC7710_ABI", """[
 erc7715_contract = web3.eth.contract(address=ERC7715_ADDRESS, abi=ERC7715_ABI)
 erc7710_contract = web3.eth.contract(address=ERC7710_ADDRESS, abi=ERC7710_ABI)
 
-# Mock database for streams and delegations
+# Mock database for streams and delegations, keyed by the 16 bytes of their IDs
 # In production, these would be stored in a proper database
-STREAMS = {}
-DELEGATIONS = {}
+STREAMS: Dict[bytes, StreamRecord] = {}
+DELEGATIONS: Dict[bytes, DelegationRecord] = {}
+
+# Start, end, amount and status of every stream in NumPy columns, for bulk status queries
+stream_table = StreamTable()
+# Stream states by their status code in stream_table
+STREAM_STATES = tuple(StreamState)
+
+# Microseconds per day and per week, for stream and delegation end times
+DAY_MICROS = 24 * 60 * 60 * 1_000_000
+WEEK_MICROS = 7 * DAY_MICROS
+
+# Change versions of STREAMS and DELEGATIONS, for ETags
+versions = VersionCounter()
 
 async def verify_delegation(wallet_address: str, delegate_to: str, permission_type: str) -> str:
     """
@@ -119,19 +147,23 @@ async def verify_delegation(wallet_address: str, delegate_to: str, permission_ty
         logger.info(f"Verifying delegation from {wallet_address} to {delegate_to} for {permission_type}")
         
         # For MVP, we'll create a mock delegation
-        delegation_id = f"delegation_{uuid.uuid4().hex}"
+        delegation_key = bytes.fromhex(uuid.uuid4().hex)
+        tx_hash = f"0x{uuid.uuid4().hex}"
+        created_at = now_micros()
         
-        DELEGATIONS[delegation_id] = {
-            "delegator": wallet_address,
-            "delegatee": delegate_to,
-            "permission_type": permission_type,
-            "created_at": datetime.now().isoformat(),
-            "expires_at": (datetime.now() + timedelta(days=30)).isoformat(),
-            "status": "active",
-            "tx_hash": f"0x{uuid.uuid4().hex}"
-        }
+        DELEGATIONS[delegation_key] = DelegationRecord(
+            id=delegation_key,
+            delegator=pack_hex(wallet_address),
+            delegatee=pack_hex(delegate_to),
+            permission_type=sys.intern(permission_type),
+            created_at=created_at,
+            expires_at=created_at + 30 * DAY_MICROS,
+            state=DelegationState.ACTIVE,
+            tx_hash=pack_hex(tx_hash)
+        )
+        versions.bump("delegations", delegation_key)
         
-        return DELEGATIONS[delegation_id]["tx_hash"]
+        return tx_hash
     except Exception as e:
         logger.error(f"Error verifying delegation: {str(e)}")
         raise
@@ -159,37 +191,81 @@ async def create_aid_stream(
     try:
         logger.info(f"Creating aid stream for {aid_type} in {location}")
         
+        if duration_days <= 0:
+            raise ValueError("duration_days must be positive")
+        
         # For MVP, we'll create a mock stream
-        stream_id = f"stream_{uuid.uuid4().hex}"
+        stream_key = bytes.fromhex(uuid.uuid4().hex)
         
         # Convert amount to Wei (assuming ETH)
         amount_wei = web3.to_wei(amount, "ether")
         
-        # Calculate rate per second
-        seconds = duration_days * 24 * 60 * 60
-        rate_per_second = amount_wei / seconds
-        
-        STREAMS[stream_id] = {
-            "sender": wallet_address,
-            "recipient": "0x" + uuid.uuid4().hex[:40],  # Mock recipient address
-            "aid_type": aid_type,
-            "location": location,
-            "amount": amount,
-            "amount_wei": amount_wei,
-            "duration_days": duration_days,
-            "rate_per_second": rate_per_second,
-            "start_time": datetime.now().isoformat(),
-            "end_time": (datetime.now() + timedelta(days=duration_days)).isoformat(),
-            "status": "active",
-            "released": 0,
-            "remaining": amount
-        }
+        start_time = now_micros()
+        stream = AidStreamRecord(
+            id=stream_key,
+            sender=pack_hex(wallet_address),
+            recipient=pack_hex("0x" + uuid.uuid4().hex[:40]),  # Mock recipient address
+            amount=amount,
+            amount_wei=amount_wei,
+            start_time=start_time,
+            end_time=start_time + duration_days * DAY_MICROS,
+            state=StreamState.ACTIVE,
+            aid_type=sys.intern(aid_type),
+            location=sys.intern(location),
+            duration_days=duration_days
+        )
+        _add_stream(stream)
         
-        return stream_id
+        return stream.stream_id
     except Exception as e:
         logger.error(f"Error creating aid stream: {str(e)}")
         raise
 
+def _add_stream(stream: StreamRecord) -> None:
+    # The table validates the amount and duration, so add the stream there first
+    stream_table.upsert(stream.id, stream.start_time, stream.end_time, stream.amount_wei, STREAM_STATES.index(stream.state))
+    STREAMS[stream.id] = stream
+    versions.bump("streams", stream.id)
+
+def find_stream(stream_id: str) -> Optional[StreamRecord]:
+    """
+    Look up a stream or subscription by its public ID.
+    
+    Args:
+        stream_id: "stream_<hex>" or "subscription_<hex>"
+        
+    Returns:
+        The stream record, or None if there is no such stream
+    """
+    parsed = split_id(stream_id)
+    if parsed is None:
+        return None
+    prefix, key = parsed
+    stream = STREAMS.get(key)
+    return stream if stream is not None and stream.PREFIX == prefix else None
+
+def get_stream_etag(stream_id: str) -> Optional[str]:
+    """
+    Get a weak ETag for the status of a stream.
+    
+    The released and remaining amounts of a running stream grow continuously,
+    so its tag also changes every second; once the stream has ended, the tag
+    only changes with its version. Completing a stream is not a new version,
+    since it follows from the end time alone.
+    
+    Args:
+        stream_id: The ID of the stream
+        
+    Returns:
+        ETag, or None if the stream does not exist
+    """
+    stream = find_stream(stream_id)
+    if stream is None:
+        return None
+    if stream.state is StreamState.ACTIVE and now_micros() < stream.end_time:
+        return versions.etag("streams", stream.id, int(time.time()))
+    return versions.etag("streams", stream.id)
+
 async def get_stream_status(stream_id: str) -> Dict[str, Any]:
     """
     Get the status of an ERC-7715 aid stream.
@@ -203,35 +279,64 @@ async def get_stream_status(stream_id: str) -> Dict[str, Any]:
     try:
         logger.info(f"Getting status for stream {stream_id}")
         
-        if stream_id not in STREAMS:
+        stream = find_stream(stream_id)
+        if stream is None:
             raise ValueError(f"Stream {stream_id} not found")
         
-        stream = STREAMS[stream_id]
+        # Released and remaining amounts follow from the elapsed time
+        return stream.to_dict(now_micros())
+    except Exception as e:
+        logger.error(f"Error getting stream status: {str(e)}")
+        raise
+
+async def get_stream_statuses(stream_ids: Sequence[str]) -> List[Dict[str, Any]]:
+    """
+    Get the status and amounts of many streams at once.
+    
+    Released and remaining amounts of all found streams are computed in one
+    vectorized pass over stream_table, in exact integer wei; they match
+    get_stream_status(). Wei amounts are returned as decimal strings, since
+    they can exceed what JSON clients hold exactly as numbers.
+    
+    Args:
+        stream_ids: Stream or subscription IDs
         
-        # Calculate elapsed time and released amount
-        start_time = datetime.fromisoformat(stream["start_time"])
-        end_time = datetime.fromisoformat(stream["end_time"])
-        current_time = datetime.now()
+    Returns:
+        One entry per ID, in order: {"id", "status", "released", "remaining",
+        "released_wei", "remaining_wei"}, or {"id", "status": "not_found"}
+    """
+    try:
+        logger.info(f"Getting status for {len(stream_ids)} streams")
         
-        # If stream has ended, all funds are released
-        if current_time >= end_time:
-            stream["released"] = stream["amount"]
-            stream["remaining"] = 0
-            stream["status"] = "completed"
-        else:
-            # Calculate the proportion of time elapsed
-            total_duration = (end_time - start_time).total_seconds()
-            elapsed_duration = (current_time - start_time).total_seconds()
-            proportion = elapsed_duration / total_duration
-            
-            # Calculate released and remaining amounts
-            released = stream["amount"] * proportion
-            stream["released"] = released
-            stream["remaining"] = stream["amount"] - released
+        streams = [find_stream(stream_id) for stream_id in stream_ids]
+        rows = stream_table.rows(stream.id for stream in streams if stream is not None)
+        ended, released, remaining = stream_table.amounts_at(rows, now_micros())
+        ended = ended.tolist()
+        codes = stream_table.statuses(rows).tolist()
         
-        return stream
+        statuses = []
+        found = 0
+        for stream_id, stream in zip(stream_ids, streams):
+            if stream is None:
+                statuses.append({"id": stream_id, "status": "not_found"})
+                continue
+            if ended[found]:
+                status, released_eth, remaining_eth = StreamState.COMPLETED.value, stream.amount, 0
+            else:
+                status = STREAM_STATES[codes[found]].value
+                released_eth, remaining_eth = released[found] / WEI_PER_ETH, remaining[found] / WEI_PER_ETH
+            statuses.append({
+                "id": stream_id,
+                "status": status,
+                "released": released_eth,
+                "remaining": remaining_eth,
+                "released_wei": str(released[found]),
+                "remaining_wei": str(remaining[found])
+            })
+            found += 1
+        return statuses
     except Exception as e:
-        logger.error(f"Error getting stream status: {str(e)}")
+        logger.error(f"Error getting stream statuses: {str(e)}")
         raise
 
 async def subscribe_to_mental_health_service(
@@ -253,8 +358,11 @@ async def subscribe_to_mental_health_service(
     try:
         logger.info(f"Creating mental health subscription for {service_type}")
         
+        if duration_weeks <= 0:
+            raise ValueError("duration_weeks must be positive")
+        
         # For MVP, we'll create a mock subscription
-        subscription_id = f"subscription_{uuid.uuid4().hex}"
+        subscription_key = bytes.fromhex(uuid.uuid4().hex)
         
         # Fixed price for services (in ETH)
         service_prices = {
@@ -269,26 +377,22 @@ async def subscribe_to_mental_health_service(
         # Convert amount to Wei (assuming ETH)
         amount_wei = web3.to_wei(amount, "ether")
         
-        # Calculate rate per second
-        seconds = duration_weeks * 7 * 24 * 60 * 60
-        rate_per_second = amount_wei / seconds
-        
-        STREAMS[subscription_id] = {
-            "sender": wallet_address,
-            "recipient": "0x" + uuid.uuid4().hex[:40],  # Mock service provider address
-            "service_type": service_type,
-            "amount": amount,
-            "amount_wei": amount_wei,
-            "duration_weeks": duration_weeks,
-            "rate_per_second": rate_per_second,
-            "start_time": datetime.now().isoformat(),
-            "end_time": (datetime.now() + timedelta(weeks=duration_weeks)).isoformat(),
-            "status": "active",
-            "released": 0,
-            "remaining": amount
-        }
+        start_time = now_micros()
+        subscription = SubscriptionRecord(
+            id=subscription_key,
+            sender=pack_hex(wallet_address),
+            recipient=pack_hex("0x" + uuid.uuid4().hex[:40]),  # Mock service provider address
+            amount=amount,
+            amount_wei=amount_wei,
+            start_time=start_time,
+            end_time=start_time + duration_weeks * WEEK_MICROS,
+            state=StreamState.ACTIVE,
+            service_type=sys.intern(service_type),
+            duration_weeks=duration_weeks
+        )
+        _add_stream(subscription)
         
-        return subscription_id
+        return subscription.stream_id
     except Exception as e:
         logger.error(f"Error creating mental health subscription: {str(e)}")
         raise
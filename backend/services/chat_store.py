@@ -0,0 +1,675 @@
+"""
+GuardianLink Chat Store
+Pluggable storage backends for mental health chat history: an in-memory
+store for tests and single-process development, and a durable SQLite store
+(WAL mode) that several API workers can share.
+"""
+
+import abc
+import asyncio
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Tuple
+
+from guardianlink.core.versioning import VersionCounter, weak_etag
+from guardianlink.models.records import ChatMessageRecord, pack_uuid, sizeof
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Storage backend: "memory" (default) or "sqlite"
+CHAT_HISTORY_BACKEND = os.getenv('CHAT_HISTORY_BACKEND', 'memory')
+CHAT_HISTORY_SQLITE_PATH = os.getenv('CHAT_HISTORY_SQLITE_PATH', 'guardianlink_chat.db')
+# Most messages committed in one write transaction, and how many may wait for it
+CHAT_HISTORY_WRITE_BATCH = int(os.getenv('CHAT_HISTORY_WRITE_BATCH', '512'))
+CHAT_HISTORY_WRITE_QUEUE = int(os.getenv('CHAT_HISTORY_WRITE_QUEUE', '10000'))
+# Threads (each with its own connection) serving reads
+CHAT_HISTORY_READ_THREADS = int(os.getenv('CHAT_HISTORY_READ_THREADS', '4'))
+
+# Messages read per query when exporting a whole history
+CHAT_HISTORY_EXPORT_CHUNK = int(os.getenv('CHAT_HISTORY_EXPORT_CHUNK', '500'))
+
+# Hot tier: recent messages kept per wallet, memory cap, and idle time before a wallet is evicted
+CHAT_HOT_RECENT_MESSAGES = int(os.getenv('CHAT_HOT_RECENT_MESSAGES', '32'))
+CHAT_HOT_MAX_MB = float(os.getenv('CHAT_HOT_MAX_MB', '256'))
+CHAT_HOT_IDLE_TTL = float(os.getenv('CHAT_HOT_IDLE_TTL', '1800'))
+
+class MessageNotFoundError(LookupError):
+    """Raised when a pagination cursor names a message the wallet does not have."""
+
+class ChatStore(abc.ABC):
+    """
+    Interface of a chat history backend.
+    
+    Messages are dicts with "id", "role", "content" and "timestamp" (ISO 8601),
+    returned oldest first. Each wallet's message count doubles as its version.
+    Backends must implement every abstract method; start(), aclose() and
+    stats() are optional.
+    """
+    
+    # Whether other processes can write to the store, so cached reads must be revalidated
+    shared = False
+    
+    async def start(self) -> None:
+        """Acquire resources; called on application startup."""
+    
+    async def aclose(self) -> None:
+        """Flush pending writes and release resources; called on shutdown."""
+    
+    @abc.abstractmethod
+    async def get_history(self, wallet_address: str) -> List[Dict[str, Any]]:
+        """All of a wallet's messages, oldest first."""
+    
+    @abc.abstractmethod
+    async def get_page(
+        self,
+        wallet_address: str,
+        limit: int,
+        before: Optional[str] = None,
+        after: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Get a page of a wallet's messages relative to a message ID.
+        
+        Args:
+            wallet_address: The user's wallet address
+            limit: Most messages to return
+            before: Return the messages just before this message ID
+            after: Return the messages just after this message ID
+                (with neither, the newest messages are returned)
+        
+        Returns:
+            (messages oldest first; whether more exist beyond them in the paging direction)
+        
+        Raises:
+            MessageNotFoundError: If before/after is not one of the wallet's messages
+        """
+    
+    @abc.abstractmethod
+    def iter_history(self, wallet_address: str, chunk_size: int = CHAT_HISTORY_EXPORT_CHUNK) -> AsyncIterator[Dict[str, Any]]:
+        """Yield all of a wallet's messages, oldest first, reading chunk_size at a time."""
+    
+    @abc.abstractmethod
+    async def get_recent(self, wallet_address: str, limit: int) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Get a wallet's newest messages.
+        
+        Returns:
+            (up to limit newest messages, oldest first; the wallet's total message count)
+        """
+    
+    @abc.abstractmethod
+    async def count(self, wallet_address: str) -> int:
+        """Number of messages stored for a wallet."""
+    
+    @abc.abstractmethod
+    async def append(self, wallet_address: str, message: Dict[str, Any]) -> int:
+        """
+        Store a message.
+        
+        Returns:
+            The wallet's message count including this message
+        """
+    
+    @abc.abstractmethod
+    async def etag(self, wallet_address: str) -> str:
+        """Weak ETag of a wallet's history; changes whenever a message is appended."""
+    
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+class MemoryChatStore(ChatStore):
+    """
+    Process-local chat history in a dict of lists. Lost on restart.
+    
+    Messages are kept as compact ChatMessageRecords and converted back to
+    dicts when read.
+    """
+    
+    def __init__(self, history: Optional[Dict[str, List[ChatMessageRecord]]] = None, versions: Optional[VersionCounter] = None):
+        """
+        Args:
+            history: Dict to store wallet_address -> message records in
+            versions: Version counter to record changes in (for ETags)
+        """
+        self.history = history if history is not None else {}
+        self.versions = versions or VersionCounter()
+    
+    async def get_history(self, wallet_address: str) -> List[Dict[str, Any]]:
+        return [record.to_dict() for record in self.history.get(wallet_address, ())]
+    
+    async def get_page(
+        self,
+        wallet_address: str,
+        limit: int,
+        before: Optional[str] = None,
+        after: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        history = self.history.get(wallet_address, [])
+        anchor = before or after
+        if anchor is None:
+            return [record.to_dict() for record in history[-limit:]], len(history) > limit
+        key = pack_uuid(anchor)
+        position = next((i for i in range(len(history) - 1, -1, -1) if history[i].id == key), None)
+        if position is None:
+            raise MessageNotFoundError(f"Message {anchor} not found")
+        if after:
+            page = history[position + 1:position + 1 + limit]
+            return [record.to_dict() for record in page], len(history) > position + 1 + limit
+        return [record.to_dict() for record in history[max(0, position - limit):position]], position > limit
+    
+    async def iter_history(self, wallet_address: str, chunk_size: int = CHAT_HISTORY_EXPORT_CHUNK) -> AsyncIterator[Dict[str, Any]]:
+        history = self.history.get(wallet_address, [])
+        # Stop at the length seen now, so messages appended mid-export are left out
+        for i in range(len(history)):
+            yield history[i].to_dict()
+    
+    async def get_recent(self, wallet_address: str, limit: int) -> Tuple[List[Dict[str, Any]], int]:
+        history = self.history.get(wallet_address, [])
+        return [record.to_dict() for record in history[-limit:]], len(history)
+    
+    async def count(self, wallet_address: str) -> int:
+        return len(self.history.get(wallet_address, ()))
+    
+    async def append(self, wallet_address: str, message: Dict[str, Any]) -> int:
+        history = self.history.setdefault(wallet_address, [])
+        history.append(ChatMessageRecord.from_dict(message))
+        self.versions.bump("chat_history", wallet_address)
+        return len(history)
+    
+    async def etag(self, wallet_address: str) -> str:
+        return self.versions.etag("chat_history", wallet_address)
+    
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "memory", "wallets": len(self.history)}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS chat_messages (
+    seq INTEGER PRIMARY KEY,
+    wallet_address TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    id TEXT NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS chat_messages_wallet_time ON chat_messages (wallet_address, timestamp);
+CREATE INDEX IF NOT EXISTS chat_messages_id ON chat_messages (id);
+CREATE TABLE IF NOT EXISTS chat_store_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS chat_wallets (wallet_address TEXT PRIMARY KEY, messages INTEGER NOT NULL) WITHOUT ROWID;
+"""
+
+class SQLiteChatStore(ChatStore):
+    """
+    Durable chat history in SQLite, in WAL mode so reads never wait for writes.
+    
+    All writes go through one writer task. Each append is queued and resolves
+    once committed; the writer takes everything queued (up to batch_size) and
+    commits it in a single transaction, so under load many messages share one
+    commit instead of each paying for its own. Reads run on a small thread
+    pool with a connection per thread and use the (wallet_address, timestamp)
+    index. No SQLite call runs on the event loop.
+    
+    Several processes may share the file; SQLite serializes their write
+    transactions. Each wallet's message count is kept in chat_wallets, updated
+    in the same transaction as the messages; ETags come from it and a store ID
+    created with the file, so they stay correct whichever worker wrote last.
+    """
+    
+    shared = True
+    
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = CHAT_HISTORY_WRITE_BATCH,
+        max_queue: int = CHAT_HISTORY_WRITE_QUEUE,
+        read_threads: int = CHAT_HISTORY_READ_THREADS
+    ):
+        """
+        Args:
+            path: SQLite database file
+            batch_size: Most messages committed in one transaction
+            max_queue: Most messages waiting for the writer before append() blocks
+            read_threads: Threads serving reads
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.max_queue = max_queue
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chat-store-writer")
+        self._readers = ThreadPoolExecutor(max_workers=read_threads, thread_name_prefix="chat-store-reader")
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._write_connection: Optional[sqlite3.Connection] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.store_id: Optional[str] = None
+        self.batches = 0
+        self.written = 0
+        self.largest_batch = 0
+        self.write_failures = 0
+    
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        with self._connections_lock:
+            self._connections.append(connection)
+        return connection
+    
+    def _open(self) -> None:
+        """Create the schema and writer connection (runs on the writer thread)."""
+        if self._write_connection is not None:
+            return
+        connection = self._connect()
+        counted = connection.execute("SELECT 1 FROM sqlite_master WHERE name = 'chat_wallets'").fetchone()
+        connection.executescript(_SCHEMA)
+        if counted is None:
+            # Count the messages of a database created before chat_wallets existed
+            connection.execute(
+                "INSERT OR IGNORE INTO chat_wallets SELECT wallet_address, COUNT(*) FROM chat_messages GROUP BY wallet_address"
+            )
+        connection.execute("INSERT OR IGNORE INTO chat_store_meta VALUES ('store_id', ?)", (uuid.uuid4().hex[:12],))
+        self.store_id = connection.execute("SELECT value FROM chat_store_meta WHERE key = 'store_id'").fetchone()[0]
+        self._write_connection = connection
+    
+    def _reader(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = self._connect()
+        return connection
+    
+    async def start(self) -> None:
+        """Open the database and start the writer task on the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._task is not None and not self._task.done() and self._loop is loop:
+            return
+        if self._task is not None and not self._task.done():
+            logger.warning("Chat store writer was started on a different event loop, restarting")
+        await loop.run_in_executor(self._writer, self._open)
+        # Another caller may have started the writer while the database was opening
+        if self._task is not None and not self._task.done() and self._loop is loop:
+            return
+        self._queue = asyncio.Queue(self.max_queue)
+        self._loop = loop
+        self._task = loop.create_task(self._write_loop())
+    
+    async def aclose(self) -> None:
+        """Commit everything queued, stop the writer and close all connections."""
+        if self._task is not None and not self._task.done() and self._loop is asyncio.get_running_loop():
+            await self._queue.put(None)
+            await self._task
+        self._task = None
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            connection.close()
+        self._write_connection = None
+        self._local = threading.local()
+        logger.info("Closed chat store")
+    
+    def _write_batch(self, rows: List[Tuple[str, str, str, str, str]]) -> List[int]:
+        """Insert rows in one transaction; returns each row's wallet message count."""
+        connection = self._write_connection
+        added = Counter(row[0] for row in rows)
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.executemany(
+                "INSERT INTO chat_messages (wallet_address, timestamp, id, role, content) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            connection.executemany(
+                "INSERT INTO chat_wallets VALUES (?, ?) "
+                "ON CONFLICT (wallet_address) DO UPDATE SET messages = messages + excluded.messages",
+                added.items()
+            )
+            totals = {
+                wallet_address: connection.execute(
+                    "SELECT messages FROM chat_wallets WHERE wallet_address = ?", (wallet_address,)
+                ).fetchone()[0]
+                for wallet_address in added
+            }
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+        
+        counts = []
+        seen: Counter = Counter()
+        for wallet_address, *_ in rows:
+            seen[wallet_address] += 1
+            counts.append(totals[wallet_address] - added[wallet_address] + seen[wallet_address])
+        return counts
+    
+    async def _write_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            if batch[-1] is None:
+                stopping = True
+                batch.pop()
+            if not batch:
+                continue
+            
+            try:
+                counts = await loop.run_in_executor(self._writer, self._write_batch, [row for row, _ in batch])
+            except Exception as e:
+                self.write_failures += 1
+                logger.error(f"Error writing {len(batch)} chat messages: {str(e)}")
+                for _, done in batch:
+                    if not done.done():
+                        done.set_exception(e)
+                continue
+            
+            self.batches += 1
+            self.written += len(batch)
+            self.largest_batch = max(self.largest_batch, len(batch))
+            for (_, done), count in zip(batch, counts):
+                if not done.done():
+                    done.set_result(count)
+    
+    async def append(self, wallet_address: str, message: Dict[str, Any]) -> int:
+        """Queue a message for the writer and wait until it is committed."""
+        await self.start()
+        done = self._loop.create_future()
+        row = (wallet_address, message["timestamp"], message["id"], message["role"], message["content"])
+        await self._queue.put((row, done))
+        return await done
+    
+    def _read_history(self, wallet_address: str) -> List[Dict[str, Any]]:
+        rows = self._reader().execute(
+            "SELECT id, role, content, timestamp FROM chat_messages "
+            "WHERE wallet_address = ? ORDER BY timestamp, seq",
+            (wallet_address,)
+        ).fetchall()
+        return [{"id": id_, "role": role, "content": content, "timestamp": timestamp} for id_, role, content, timestamp in rows]
+    
+    def _read_page(
+        self,
+        wallet_address: str,
+        limit: int,
+        before: Optional[str],
+        after: Optional[str]
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        connection = self._reader()
+        anchor = before or after
+        # Messages are ordered by (timestamp, seq); a page is a range of that key next to the anchor
+        condition, key = "", ()
+        if anchor is not None:
+            key = connection.execute(
+                "SELECT timestamp, seq FROM chat_messages WHERE id = ? AND wallet_address = ?", (anchor, wallet_address)
+            ).fetchone()
+            if key is None:
+                raise MessageNotFoundError(f"Message {anchor} not found")
+            condition = " AND (timestamp, seq) > (?, ?)" if after else " AND (timestamp, seq) < (?, ?)"
+        order = "ASC" if after else "DESC"
+        rows = connection.execute(
+            "SELECT id, role, content, timestamp FROM chat_messages "
+            f"WHERE wallet_address = ?{condition} ORDER BY timestamp {order}, seq {order} LIMIT ?",
+            (wallet_address, *key, limit + 1)
+        ).fetchall()
+        more = len(rows) > limit
+        messages = [{"id": id_, "role": role, "content": content, "timestamp": timestamp} for id_, role, content, timestamp in rows[:limit]]
+        if not after:
+            messages.reverse()
+        return messages, more
+    
+    def _read_chunk(self, wallet_address: str, key: Optional[Tuple[str, int]], limit: int) -> List[Tuple]:
+        if key is None:
+            return self._reader().execute(
+                "SELECT id, role, content, timestamp, seq FROM chat_messages "
+                "WHERE wallet_address = ? ORDER BY timestamp, seq LIMIT ?",
+                (wallet_address, limit)
+            ).fetchall()
+        return self._reader().execute(
+            "SELECT id, role, content, timestamp, seq FROM chat_messages "
+            "WHERE wallet_address = ? AND (timestamp, seq) > (?, ?) ORDER BY timestamp, seq LIMIT ?",
+            (wallet_address, *key, limit)
+        ).fetchall()
+    
+    def _read_count(self, wallet_address: str, connection: Optional[sqlite3.Connection] = None) -> int:
+        row = (connection or self._reader()).execute(
+            "SELECT messages FROM chat_wallets WHERE wallet_address = ?", (wallet_address,)
+        ).fetchone()
+        return row[0] if row else 0
+    
+    def _read_recent(self, wallet_address: str, limit: int) -> Tuple[List[Dict[str, Any]], int]:
+        connection = self._reader()
+        # One read transaction, so the messages and the count come from the same snapshot
+        connection.execute("BEGIN")
+        try:
+            rows = connection.execute(
+                "SELECT id, role, content, timestamp FROM chat_messages "
+                "WHERE wallet_address = ? ORDER BY timestamp DESC, seq DESC LIMIT ?",
+                (wallet_address, limit)
+            ).fetchall()
+            count = self._read_count(wallet_address, connection)
+        finally:
+            connection.execute("COMMIT")
+        messages = [{"id": id_, "role": role, "content": content, "timestamp": timestamp} for id_, role, content, timestamp in rows]
+        messages.reverse()
+        return messages, count
+    
+    async def get_history(self, wallet_address: str) -> List[Dict[str, Any]]:
+        await self.start()
+        return await self._loop.run_in_executor(self._readers, self._read_history, wallet_address)
+    
+    async def get_page(
+        self,
+        wallet_address: str,
+        limit: int,
+        before: Optional[str] = None,
+        after: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        await self.start()
+        return await self._loop.run_in_executor(self._readers, self._read_page, wallet_address, limit, before, after)
+    
+    async def iter_history(self, wallet_address: str, chunk_size: int = CHAT_HISTORY_EXPORT_CHUNK) -> AsyncIterator[Dict[str, Any]]:
+        await self.start()
+        key = None
+        while True:
+            rows = await self._loop.run_in_executor(self._readers, self._read_chunk, wallet_address, key, chunk_size)
+            for id_, role, content, timestamp, _ in rows:
+                yield {"id": id_, "role": role, "content": content, "timestamp": timestamp}
+            if len(rows) < chunk_size:
+                return
+            key = (rows[-1][3], rows[-1][4])
+    
+    async def get_recent(self, wallet_address: str, limit: int) -> Tuple[List[Dict[str, Any]], int]:
+        await self.start()
+        return await self._loop.run_in_executor(self._readers, self._read_recent, wallet_address, limit)
+    
+    async def count(self, wallet_address: str) -> int:
+        await self.start()
+        return await self._loop.run_in_executor(self._readers, self._read_count, wallet_address)
+    
+    async def etag(self, wallet_address: str) -> str:
+        return weak_etag(self.store_id, await self.count(wallet_address))
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "sqlite",
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "batches": self.batches,
+            "written": self.written,
+            "mean_batch": self.written / self.batches if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+            "write_failures": self.write_failures
+        }
+
+class _RecentEntry:
+    __slots__ = ("messages", "count", "bytes", "last_used")
+    
+    def __init__(self, messages: Deque[ChatMessageRecord], count: int, size: int, last_used: float):
+        self.messages = messages
+        self.count = count
+        self.bytes = size
+        self.last_used = last_used
+
+# Per-wallet bookkeeping besides the messages: ring buffer, entry with its count and
+# timestamp objects, and roughly 100 bytes for the OrderedDict slot
+_ENTRY_OVERHEAD = sys.getsizeof(deque(maxlen=1)) + sys.getsizeof(_RecentEntry(deque(), 0, 0, 0.0)) + 28 + 24 + 100
+
+class RecentChatCache:
+    """
+    Hot tier for chat history: a ring buffer of each active wallet's newest
+    messages, in front of a ChatStore.
+    
+    Wallets are kept in least-recently-used order. A wallet idle for longer
+    than ttl is dropped, and the least recently used wallets are dropped while
+    the estimated size is above max_bytes, so memory stays bounded however
+    many wallets have ever chatted. Evicted wallets are reloaded from the
+    store on their next read.
+    
+    Each entry remembers the wallet's message count, which serves as its
+    version: appends only extend a buffer whose count is exactly one behind,
+    so a message written elsewhere is never silently skipped.
+    """
+    
+    def __init__(
+        self,
+        max_messages: int = CHAT_HOT_RECENT_MESSAGES,
+        max_bytes: int = int(CHAT_HOT_MAX_MB * 1024 * 1024),
+        ttl: float = CHAT_HOT_IDLE_TTL,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            max_messages: Newest messages kept per wallet
+            max_bytes: Approximate memory cap for all buffered messages
+            ttl: Seconds a wallet may stay idle before it is evicted
+            clock: Time source (for tests)
+        """
+        self.max_messages = max_messages
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.clock = clock
+        self._entries: "OrderedDict[str, _RecentEntry]" = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get(self, wallet_address: str) -> Optional[_RecentEntry]:
+        """Get a wallet's entry (message records oldest first, and count), marking it recently used."""
+        now = self.clock()
+        self._expire(now)
+        entry = self._entries.get(wallet_address)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        entry.last_used = now
+        self._entries.move_to_end(wallet_address)
+        return entry
+    
+    def put(self, wallet_address: str, messages: List[Dict[str, Any]], count: int) -> None:
+        """Store a wallet's newest messages, as loaded from the store, with its message count."""
+        self.discard(wallet_address)
+        buffer = deque(map(ChatMessageRecord.from_dict, messages[-self.max_messages:]), maxlen=self.max_messages)
+        size = _ENTRY_OVERHEAD + sys.getsizeof(wallet_address) + sum(map(sizeof, buffer))
+        self._entries[wallet_address] = _RecentEntry(buffer, count, size, self.clock())
+        self.bytes += size
+        self._evict()
+    
+    def append(self, wallet_address: str, message: Dict[str, Any], count: int) -> bool:
+        """
+        Add a message just stored for a wallet, if the wallet is buffered.
+        
+        Args:
+            wallet_address: The user's wallet address
+            message: The stored message
+            count: The wallet's message count including this message
+        
+        Returns:
+            True if the buffer was extended; a buffer that missed other
+            messages is dropped instead
+        """
+        entry = self._entries.get(wallet_address)
+        if entry is None:
+            return False
+        if entry.count != count - 1:
+            self.discard(wallet_address)
+            return False
+        
+        record = ChatMessageRecord.from_dict(message)
+        size = sizeof(record)
+        if len(entry.messages) == entry.messages.maxlen:
+            size -= sizeof(entry.messages[0])
+        entry.messages.append(record)
+        entry.count = count
+        entry.bytes += size
+        self.bytes += size
+        self._evict()
+        return True
+    
+    def discard(self, wallet_address: str) -> None:
+        entry = self._entries.pop(wallet_address, None)
+        if entry is not None:
+            self.bytes -= entry.bytes
+    
+    def _expire(self, now: float) -> None:
+        # Entries are in least-recently-used order, so expired ones are all at the front
+        while self._entries:
+            wallet_address, entry = next(iter(self._entries.items()))
+            if now - entry.last_used < self.ttl:
+                return
+            self.discard(wallet_address)
+            self.expirations += 1
+    
+    def _evict(self) -> None:
+        while self.bytes > self.max_bytes and len(self._entries) > 1:
+            wallet_address = next(iter(self._entries))
+            self.discard(wallet_address)
+            self.evictions += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "wallets": len(self._entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+def create_chat_store(
+    backend: str = CHAT_HISTORY_BACKEND,
+    history: Optional[Dict[str, List[ChatMessageRecord]]] = None,
+    versions: Optional[VersionCounter] = None
+) -> ChatStore:
+    """
+    Create the configured chat history backend.
+    
+    Args:
+        backend: "memory" or "sqlite"
+        history: Dict backing the memory store
+        versions: Version counter for the memory store's ETags
+    
+    Returns:
+        ChatStore instance
+    """
+    if backend == "sqlite":
+        logger.info(f"Storing chat history in SQLite at {CHAT_HISTORY_SQLITE_PATH}")
+        return SQLiteChatStore(CHAT_HISTORY_SQLITE_PATH)
+    if backend != "memory":
+        raise ValueError(f"Unknown chat history backend {backend!r}, expected 'memory' or 'sqlite'")
+    return MemoryChatStore(history, versions)
@@ -8,16 +8,22 @@ a proper database in production.
 import os
 import json
 import uuid
-from typing import Dict, List, Any, Optional
+import base64
+import bisect
+from typing import AsyncIterator, Callable, Dict, Iterable, Iterator, List, Any, Optional, Sequence, Tuple
 import logging
 from datetime import datetime
 
+from guardianlink.core.geo_index import GeoIndex
+from guardianlink.core.versioning import VersionCounter
+from guardianlink.services.chat_store import MessageNotFoundError, RecentChatCache, create_chat_store
+
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 # Mock databases
-CHAT_HISTORY = {}  # wallet_address -> list of messages
+CHAT_HISTORY = {}  # wallet_address -> list of ChatMessageRecords
 DISASTER_DATA = [
     {
         "id": "disaster_1",
@@ -54,6 +60,180 @@ DISASTER_DATA = [
     }
 ]
 
+# Fields with secondary indexes, usable as /disaster/active filters
+DISASTER_INDEXED_FIELDS = ("status", "type", "severity")
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+def encode_cursor(position: int) -> str:
+    """Encode a record position as an opaque pagination cursor."""
+    return base64.urlsafe_b64encode(str(position).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> int:
+    """Decode a cursor from encode_cursor()."""
+    try:
+        return int(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode())
+    except (ValueError, UnicodeDecodeError):
+        raise InvalidCursorError(f"Invalid cursor {cursor!r}")
+
+class DisasterRepository:
+    """
+    In-memory disaster store with a primary ID index, secondary indexes on
+    DISASTER_INDEXED_FIELDS and a spatial index over coordinates.
+    
+    Every record gets an increasing position when first saved. Each secondary
+    index maps a field value to the sorted positions of the records that have
+    it, so a filtered page starts with a binary search on the most selective
+    index and reads only as many records as it returns (plus any rejected by
+    the other filters), however many disasters have ever been recorded.
+    """
+    
+    def __init__(self, disasters: Iterable[Dict[str, Any]] = (), versions: Optional[VersionCounter] = None):
+        self.versions = versions or VersionCounter()
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._positions: Dict[str, int] = {}
+        self._ids: Dict[int, str] = {}
+        self._all: List[int] = []
+        self._indexes: Dict[str, Dict[Any, List[int]]] = {field: {} for field in DISASTER_INDEXED_FIELDS}
+        # Indexed field values of each record as the indexes hold them; callers may mutate the records
+        self._indexed_values: Dict[str, Dict[str, Any]] = {}
+        # (location, type) of each record as last reported to listeners
+        self._subjects: Dict[str, Tuple[Any, Any]] = {}
+        # Called with (location, disaster type) for each record saved or changed, before and after
+        # the change, so derived data such as cached predictions can be invalidated
+        self.listeners: List[Callable[[str, Optional[str]], None]] = []
+        self.locations = GeoIndex()
+        for disaster in disasters:
+            self.save(disaster)
+    
+    def __len__(self) -> int:
+        return len(self._records)
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(list(self._records.values()))
+    
+    def get(self, disaster_id: str) -> Optional[Dict[str, Any]]:
+        return self._records.get(disaster_id)
+    
+    def save(self, disaster: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Insert a disaster or update the one with the same ID in place.
+        
+        Args:
+            disaster: Disaster data with at least "id" and "coordinates" ({"lat", "lng"})
+            
+        Returns:
+            The stored record
+        """
+        disaster_id = disaster["id"]
+        coordinates = disaster["coordinates"]
+        self.locations.upsert(disaster_id, coordinates["lat"], coordinates["lng"])
+        self.versions.bump("disasters", disaster_id)
+        
+        existing = self._records.get(disaster_id)
+        if existing is None:
+            position = self._all[-1] + 1 if self._all else 0
+            self._records[disaster_id] = disaster
+            self._positions[disaster_id] = position
+            self._ids[position] = disaster_id
+            self._all.append(position)
+            self._indexed_values[disaster_id] = {field: disaster.get(field) for field in DISASTER_INDEXED_FIELDS}
+            for field in DISASTER_INDEXED_FIELDS:
+                self._indexes[field].setdefault(disaster.get(field), []).append(position)
+            self._notify(disaster_id, disaster)
+            return disaster
+        
+        # The caller may pass back the stored dict itself after changing it (read-modify-write),
+        # so compare against the values the indexes hold, and copy the data before clearing
+        position = self._positions[disaster_id]
+        indexed = self._indexed_values[disaster_id]
+        for field in DISASTER_INDEXED_FIELDS:
+            old, new = indexed[field], disaster.get(field)
+            if old != new:
+                self._unindex(field, old, position)
+                bisect.insort(self._indexes[field].setdefault(new, []), position)
+                indexed[field] = new
+        data = dict(disaster)
+        existing.clear()
+        existing.update(data)
+        self._notify(disaster_id, existing)
+        return existing
+    
+    def touch(self, disaster_id: str) -> None:
+        """Report an in-place change to a stored record that leaves its indexed fields alone."""
+        self.versions.bump("disasters", disaster_id)
+        self._notify(disaster_id, self._records[disaster_id])
+    
+    def _notify(self, disaster_id: str, disaster: Dict[str, Any]) -> None:
+        previous = self._subjects.get(disaster_id)
+        subject = (disaster.get("location"), disaster.get("type"))
+        self._subjects[disaster_id] = subject
+        for location, disaster_type in {previous, subject} - {None}:
+            if location is not None:
+                for listener in self.listeners:
+                    listener(location, disaster_type)
+    
+    def _unindex(self, field: str, value: Any, position: int) -> None:
+        positions = self._indexes[field][value]
+        del positions[bisect.bisect_left(positions, position)]
+        if not positions:
+            del self._indexes[field][value]
+    
+    def find(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+        after: Optional[int] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """
+        Get disasters matching every filter, in the order they were first saved.
+        
+        Args:
+            filters: {field: value} over DISASTER_INDEXED_FIELDS
+            limit: Optional maximum number of records
+            after: Only return records positioned after this one (a page cursor)
+            
+        Returns:
+            (records, position of the last record if more remain, else None)
+        """
+        filters = filters or {}
+        unknown = set(filters) - set(DISASTER_INDEXED_FIELDS)
+        if unknown:
+            raise ValueError(f"Cannot filter disasters by {', '.join(sorted(unknown))}")
+        
+        candidates = self._all
+        for field, value in filters.items():
+            positions = self._indexes[field].get(value, [])
+            if len(positions) < len(candidates):
+                candidates = positions
+        
+        start = bisect.bisect_right(candidates, after) if after is not None else 0
+        matches: List[Dict[str, Any]] = []
+        for index in range(start, len(candidates)):
+            record = self._records[self._ids[candidates[index]]]
+            if all(record.get(field) == value for field, value in filters.items()):
+                if limit is not None and len(matches) == limit:
+                    return matches, self._positions[matches[-1]["id"]]
+                matches.append(record)
+        return matches, None
+    
+    def count(self, field: str, value: Any) -> int:
+        """Number of disasters with field == value, for an indexed field."""
+        return len(self._indexes[field].get(value, []))
+
+# Change versions of the stores in this module, for ETags
+versions = VersionCounter()
+
+# Disaster records, indexed; seeded from DISASTER_DATA
+disaster_repository = DisasterRepository(DISASTER_DATA, versions)
+
+# Chat history backend (CHAT_HISTORY_BACKEND); the memory backend keeps it in CHAT_HISTORY
+chat_store = create_chat_store(history=CHAT_HISTORY, versions=versions)
+
+# Hot tier: newest messages of recently active wallets, for building prompts
+recent_chat_cache = RecentChatCache()
+
 async def get_user_chat_history(wallet_address: str) -> List[Dict[str, str]]:
     """
     Get chat history for a user.
@@ -66,15 +246,90 @@ async def get_user_chat_history(wallet_address: str) -> List[Dict[str, str]]:
     """
     try:
         logger.info(f"Getting chat history for {wallet_address}")
-        
-        if wallet_address not in CHAT_HISTORY:
-            CHAT_HISTORY[wallet_address] = []
-            
-        return CHAT_HISTORY[wallet_address]
+        return await chat_store.get_history(wallet_address)
     except Exception as e:
         logger.error(f"Error getting chat history: {str(e)}")
         raise
 
+async def get_chat_history_page(
+    wallet_address: str,
+    limit: int,
+    before: Optional[str] = None,
+    after: Optional[str] = None
+) -> Tuple[List[Dict[str, str]], Optional[str]]:
+    """
+    Get one page of a user's chat history.
+    
+    Without a cursor this is the newest page. The returned cursor continues
+    in the same direction: pass it as before to page back through older
+    messages, or as after to page forward through newer ones.
+    
+    Args:
+        wallet_address: The user's wallet address
+        limit: Messages per page
+        before: Message ID to page back from
+        after: Message ID to page forward from
+        
+    Returns:
+        (chat messages oldest first, cursor for the next page or None if this was the last)
+    
+    Raises:
+        MessageNotFoundError: If the cursor is not one of the wallet's messages
+    """
+    try:
+        messages, more = await chat_store.get_page(wallet_address, limit, before=before, after=after)
+        if not more or not messages:
+            return messages, None
+        return messages, messages[-1]["id"] if after else messages[0]["id"]
+    except MessageNotFoundError:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting chat history page: {str(e)}")
+        raise
+
+def iter_chat_history(wallet_address: str) -> AsyncIterator[Dict[str, str]]:
+    """
+    Stream a user's whole chat history, oldest first.
+    
+    Messages are read from the chat store a chunk at a time, so an export
+    never holds the full history in memory.
+    
+    Args:
+        wallet_address: The user's wallet address
+        
+    Returns:
+        Async iterator over chat messages
+    """
+    logger.info(f"Exporting chat history for {wallet_address}")
+    return chat_store.iter_history(wallet_address)
+
+async def get_recent_chat_history(wallet_address: str, limit: Optional[int] = None) -> List[Dict[str, str]]:
+    """
+    Get a user's most recent chat messages from the hot tier.
+    
+    Served from memory while the wallet is active; otherwise (or if another
+    worker has written to a shared store since) the newest messages are
+    loaded from the chat store and buffered again.
+    
+    Args:
+        wallet_address: The user's wallet address
+        limit: Optional number of messages, at most CHAT_HOT_RECENT_MESSAGES
+        
+    Returns:
+        Up to limit newest chat messages, oldest first
+    """
+    try:
+        entry = recent_chat_cache.get(wallet_address)
+        if entry is not None and (not chat_store.shared or await chat_store.count(wallet_address) == entry.count):
+            messages = [record.to_dict() for record in entry.messages]
+        else:
+            messages, count = await chat_store.get_recent(wallet_address, recent_chat_cache.max_messages)
+            recent_chat_cache.put(wallet_address, messages, count)
+        return messages[-limit:] if limit else messages
+    except Exception as e:
+        logger.error(f"Error getting recent chat history: {str(e)}")
+        raise
+
 async def save_chat_message(wallet_address: str, role: str, content: str) -> None:
     """
     Save a chat message to the database.
@@ -87,33 +342,85 @@ async def save_chat_message(wallet_address: str, role: str, content: str) -> Non
     try:
         logger.info(f"Saving chat message for {wallet_address}")
         
-        if wallet_address not in CHAT_HISTORY:
-            CHAT_HISTORY[wallet_address] = []
-            
-        CHAT_HISTORY[wallet_address].append({
+        message = {
             "id": str(uuid.uuid4()),
             "role": role,
             "content": content,
             "timestamp": datetime.now().isoformat()
-        })
+        }
+        count = await chat_store.append(wallet_address, message)
+        recent_chat_cache.append(wallet_address, message, count)
     except Exception as e:
         logger.error(f"Error saving chat message: {str(e)}")
         raise
 
+async def get_chat_history_etag(wallet_address: str) -> str:
+    """Weak ETag of a user's chat history; changes whenever a message is saved."""
+    return await chat_store.etag(wallet_address)
+
+def get_disasters_etag() -> str:
+    """Weak ETag of the disaster collection; changes whenever any disaster does."""
+    return versions.etag("disasters")
+
 async def get_disaster_data() -> List[Dict[str, Any]]:
     """
-    Get data on active disasters.
+    Get data on all disasters, whatever their status.
     
     Returns:
         List of disaster data
     """
     try:
         logger.info("Getting disaster data")
-        return DISASTER_DATA
+        return list(disaster_repository)
     except Exception as e:
         logger.error(f"Error getting disaster data: {str(e)}")
         raise
 
+async def get_disasters(
+    status: Optional[str] = None,
+    disaster_type: Optional[str] = None,
+    severity: Optional[str] = None,
+    fields: Optional[Sequence[str]] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Get a page of disasters matching the given filters.
+    
+    Args:
+        status: Optional status filter (e.g. "active")
+        disaster_type: Optional disaster type filter
+        severity: Optional severity filter
+        fields: Optional fields to return ("id" is always included)
+        limit: Optional page size
+        cursor: Cursor returned with the previous page
+        
+    Returns:
+        (disasters, cursor for the next page or None if this is the last)
+        
+    Raises:
+        InvalidCursorError: If the cursor cannot be decoded
+    """
+    try:
+        logger.info(f"Getting disasters (status={status}, type={disaster_type}, severity={severity})")
+        
+        filters = {
+            field: value
+            for field, value in (("status", status), ("type", disaster_type), ("severity", severity))
+            if value is not None
+        }
+        after = decode_cursor(cursor) if cursor else None
+        disasters, last = disaster_repository.find(filters, limit, after)
+        
+        if fields is not None:
+            keep = ["id"] + [field for field in fields if field != "id"]
+            disasters = [{field: disaster[field] for field in keep if field in disaster} for disaster in disasters]
+        
+        return disasters, encode_cursor(last) if last is not None else None
+    except Exception as e:
+        logger.error(f"Error getting disasters: {str(e)}")
+        raise
+
 async def get_disaster_by_id(disaster_id: str) -> Optional[Dict[str, Any]]:
     """
     Get disaster data by ID.
@@ -126,12 +433,7 @@ async def get_disaster_by_id(disaster_id: str) -> Optional[Dict[str, Any]]:
     """
     try:
         logger.info(f"Getting disaster with ID {disaster_id}")
-        
-        for disaster in DISASTER_DATA:
-            if disaster["id"] == disaster_id:
-                return disaster
-                
-        return None
+        return disaster_repository.get(disaster_id)
     except Exception as e:
         logger.error(f"Error getting disaster by ID: {str(e)}")
         raise
@@ -150,15 +452,65 @@ async def add_aid_stream_to_disaster(disaster_id: str, stream_id: str) -> bool:
     try:
         logger.info(f"Adding aid stream {stream_id} to disaster {disaster_id}")
         
-        for disaster in DISASTER_DATA:
-            if disaster["id"] == disaster_id:
-                if "aid_streams" not in disaster:
-                    disaster["aid_streams"] = []
+        disaster = disaster_repository.get(disaster_id)
+        if disaster is None:
+            return False
                     
-                disaster["aid_streams"].append(stream_id)
-                return True
-                
-        return False
+        disaster.setdefault("aid_streams", []).append(stream_id)
+        disaster_repository.touch(disaster_id)
+        return True
     except Exception as e:
         logger.error(f"Error adding aid stream to disaster: {str(e)}")
         raise
+
+async def save_disaster(disaster: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Add a disaster, or replace the one with the same ID.
+    
+    Args:
+        disaster: Disaster data with at least "id" and "coordinates" ({"lat", "lng"})
+    
+    Returns:
+        The saved disaster
+    """
+    try:
+        logger.info(f"Saving disaster {disaster['id']}")
+        return disaster_repository.save(disaster)
+    except Exception as e:
+        logger.error(f"Error saving disaster: {str(e)}")
+        raise
+
+async def get_disasters_near(
+    lat: float,
+    lng: float,
+    radius_km: Optional[float] = None,
+    k: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Get disasters near a point, nearest first.
+    
+    With only radius_km, returns every disaster within the radius; with k,
+    returns the k nearest (no further than radius_km, if given).
+    
+    Args:
+        lat: Latitude in degrees
+        lng: Longitude in degrees
+        radius_km: Optional search radius in kilometres
+        k: Optional number of nearest disasters to return
+    
+    Returns:
+        Disaster data, each with an added "distance_km"
+    """
+    try:
+        logger.info(f"Getting disasters near ({lat}, {lng})")
+        
+        locations = disaster_repository.locations
+        if k is not None:
+            matches = locations.nearest(lat, lng, k, max_radius_km=radius_km)
+        else:
+            matches = locations.near(lat, lng, radius_km)
+        
+        return [{**disaster_repository.get(disaster_id), "distance_km": round(distance, 3)} for disaster_id, distance in matches]
+    except Exception as e:
+        logger.error(f"Error getting nearby disasters: {str(e)}")
+        raise
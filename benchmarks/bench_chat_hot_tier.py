@@ -0,0 +1,128 @@
+"""
+GuardianLink Chat Hot Tier Benchmark
+Measures resident memory of chat history under a synthetic million-wallet
+workload: every message kept in per-wallet in-memory lists (the old
+CHAT_HISTORY) vs. the RecentChatCache hot tier with its memory cap, which
+keeps only the newest messages of recently active wallets and reloads the
+rest from the persistent store.
+
+Wallet activity is skewed (a few wallets chat a lot, most rarely) and spread
+over a simulated day, so idle wallets expire. Store reads on a miss are
+simulated; only the hot tier itself is resident. Each mode runs in its own
+process so resident set sizes do not mix.
+
+Usage:
+    python -m benchmarks.bench_chat_hot_tier --wallets 1000000 --messages 3000000 --cap-mb 256
+"""
+
+import argparse
+import gc
+import json
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict
+
+import numpy as np
+
+from guardianlink.services.chat_store import RecentChatCache
+
+CONTENTS = [
+    "I feel anxious about the flooding and I cannot stop thinking about it",
+    "Thank you, the breathing exercise helped a little tonight",
+    "It sounds like you are carrying a lot right now. Try a slow breathing exercise.",
+    "I can't sleep since the earthquake and my children are scared too"
+]
+
+def rss_mb() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+def make_message(i: int, start: datetime) -> Dict[str, str]:
+    return {
+        "id": str(uuid.UUID(int=i)),
+        "role": "user" if i % 2 == 0 else "ai",
+        "content": f"{CONTENTS[i % len(CONTENTS)]} ({i})",
+        "timestamp": (start + timedelta(milliseconds=i)).isoformat()
+    }
+
+def run(mode: str, wallets: int, messages: int, cap_mb: float, recent: int, ttl: float, day: float) -> Dict:
+    rng = np.random.default_rng(0)
+    # Skewed activity: wallet = wallets * u^3 puts most traffic on a small fraction of wallets
+    senders = (wallets * rng.random(messages) ** 3).astype(np.int64)
+    addresses = [f"0x{i:040x}" for i in range(wallets)]
+    start = datetime(2025, 1, 1)
+    clock = {"now": 0.0}
+    counts = np.zeros(wallets, dtype=np.int64)  # stands in for the store's per-wallet counts
+    gc.collect()
+    baseline = rss_mb()
+    
+    began = time.perf_counter()
+    if mode == "unbounded":
+        history: Dict[str, list] = {}
+        for i, sender in enumerate(senders.tolist()):
+            history.setdefault(addresses[sender], []).append(make_message(i, start))
+        resident_wallets = len(history)
+        resident_messages = messages
+        extra = {}
+    else:
+        cache = RecentChatCache(max_messages=recent, max_bytes=int(cap_mb * 1024 * 1024), ttl=ttl, clock=lambda: clock["now"])
+        for i, sender in enumerate(senders.tolist()):
+            clock["now"] = i / messages * day
+            address = addresses[sender]
+            # A chat turn reads the recent history, then saves the new message
+            if cache.get(address) is None:
+                count = int(counts[sender])
+                loaded = [make_message(j, start) for j in range(max(0, count - recent), count)]
+                cache.put(address, loaded, count)
+            counts[sender] += 1
+            cache.append(address, make_message(i, start), int(counts[sender]))
+        stats = cache.stats()
+        resident_wallets = stats["wallets"]
+        resident_messages = sum(len(entry.messages) for entry in cache._entries.values())
+        extra = {"estimated_mb": stats["bytes"] / 2**20, "hit_rate": stats["hit_rate"], "evictions": stats["evictions"], "expirations": stats["expirations"]}
+    elapsed = time.perf_counter() - began
+    
+    gc.collect()
+    return {
+        "mode": mode,
+        "rss_mb": rss_mb() - baseline,
+        "wallets": resident_wallets,
+        "messages": resident_messages,
+        "messages_per_s": messages / elapsed,
+        **extra
+    }
+
+def main(args: argparse.Namespace) -> None:
+    active = len(np.unique((args.wallets * np.random.default_rng(0).random(args.messages) ** 3).astype(np.int64)))
+    print(f"{args.messages:,} messages from {active:,} of {args.wallets:,} wallets over a simulated day; "
+          f"hot tier: {args.recent} messages/wallet, {args.cap_mb:.0f} MB cap, {args.ttl:.0f} s idle TTL\n")
+    print(f"{'mode':<12}{'RSS MB':>10}{'est. MB':>10}{'wallets':>12}{'messages':>12}{'hit rate':>10}{'msgs/s':>12}")
+    for mode in ("unbounded", "hot"):
+        command = [sys.executable, "-m", "benchmarks.bench_chat_hot_tier", "--run", mode] + [
+            f"--{name.replace('_', '-')}={value}" for name, value in vars(args).items() if name != "run" and value is not None
+        ]
+        result = json.loads(subprocess.check_output(command).decode().strip().splitlines()[-1])
+        estimate = f"{result['estimated_mb']:>10.0f}" if "estimated_mb" in result else f"{'-':>10}"
+        hit_rate = f"{result['hit_rate']:>10.1%}" if "hit_rate" in result else f"{'-':>10}"
+        print(f"{mode:<12}{result['rss_mb']:>10.0f}{estimate}{result['wallets']:>12,}{result['messages']:>12,}{hit_rate}{result['messages_per_s']:>12,.0f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--wallets", type=int, default=1_000_000)
+    parser.add_argument("--messages", type=int, default=3_000_000)
+    parser.add_argument("--cap-mb", type=float, default=256)
+    parser.add_argument("--recent", type=int, default=32, help="Messages kept per wallet")
+    parser.add_argument("--ttl", type=float, default=1800, help="Idle seconds before a wallet is evicted")
+    parser.add_argument("--day", type=float, default=86400, help="Simulated seconds the messages are spread over")
+    parser.add_argument("--run", choices=("unbounded", "hot"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.run:
+        print(json.dumps(run(args.run, args.wallets, args.messages, args.cap_mb, args.recent, args.ttl, args.day)))
+    else:
+        main(args)
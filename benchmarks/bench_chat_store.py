@@ -0,0 +1,165 @@
+"""
+GuardianLink Chat Store Benchmark
+Measures the SQLite chat history backend with many stored messages: append
+throughput with one commit per message vs. the batching writer, history
+read latency through the (wallet_address, timestamp) index, and how long
+the event loop is blocked while both run.
+
+The database is preloaded directly with --messages rows spread over
+--wallets wallets (10M rows take a few GB of disk and a few minutes; pass
+--db to reuse a file between runs).
+
+Usage:
+    python -m benchmarks.bench_chat_store --messages 10000000 --wallets 100000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+import numpy as np
+
+from guardianlink.services.chat_store import SQLiteChatStore
+
+def preload(path: str, messages: int, wallets: int, chunk: int = 100000) -> float:
+    """Fill the store with synthetic history; returns seconds taken."""
+    store = SQLiteChatStore(path)
+    store._open()
+    store._write_connection.close()
+    connection = sqlite3.connect(path, isolation_level=None)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=OFF")
+    existing = connection.execute("SELECT COUNT(*) FROM chat_messages").fetchone()[0]
+    rng = random.Random(0)
+    start_time = datetime(2024, 1, 1)
+    start = time.perf_counter()
+    for offset in range(existing, messages, chunk):
+        rows = [
+            (
+                f"0x{rng.randrange(wallets):040x}",
+                (start_time + timedelta(seconds=i)).isoformat(),
+                f"msg-{i}",
+                "user" if i % 2 == 0 else "ai",
+                "I have been feeling anxious since the flood and cannot sleep well."
+            )
+            for i in range(offset, min(offset + chunk, messages))
+        ]
+        connection.execute("BEGIN")
+        connection.executemany(
+            "INSERT INTO chat_messages (wallet_address, timestamp, id, role, content) VALUES (?, ?, ?, ?, ?)", rows
+        )
+        connection.execute("COMMIT")
+    connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    connection.close()
+    return time.perf_counter() - start
+
+class LoopLag:
+    """Records how late a 1 ms timer fires, i.e. how long the loop was blocked."""
+    
+    def __init__(self):
+        self.lags: List[float] = []
+        self._task = None
+    
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            before = loop.time()
+            await asyncio.sleep(0.001)
+            self.lags.append(loop.time() - before - 0.001)
+    
+    def __enter__(self) -> "LoopLag":
+        self._task = asyncio.ensure_future(self._run())
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        self._task.cancel()
+    
+    @property
+    def max_ms(self) -> float:
+        return max(self.lags, default=0.0) * 1000
+
+async def write_throughput(path: str, batch_size: int, writers: int, per_writer: int, wallets: int) -> dict:
+    store = SQLiteChatStore(path, batch_size=batch_size)
+    await store.start()
+    rng = random.Random(batch_size)
+    
+    async def writer(w: int) -> None:
+        for i in range(per_writer):
+            await store.append(f"0x{rng.randrange(wallets):040x}", {
+                "id": f"bench-{batch_size}-{w}-{i}",
+                "role": "user",
+                "content": "Thank you, the breathing exercise helped a little.",
+                "timestamp": datetime.now().isoformat()
+            })
+    
+    with LoopLag() as lag:
+        start = time.perf_counter()
+        await asyncio.gather(*(writer(w) for w in range(writers)))
+        elapsed = time.perf_counter() - start
+    stats = store.stats()
+    await store.aclose()
+    return {
+        "messages_per_s": writers * per_writer / elapsed,
+        "mean_batch": stats["mean_batch"],
+        "max_loop_lag_ms": lag.max_ms
+    }
+
+async def read_latency(path: str, reads: int, wallets: int, concurrency: int) -> dict:
+    store = SQLiteChatStore(path)
+    await store.start()
+    rng = random.Random(1)
+    latencies: List[float] = []
+    sizes: List[int] = []
+    
+    async def reader(count: int) -> None:
+        for _ in range(count):
+            start = time.perf_counter()
+            history = await store.get_history(f"0x{rng.randrange(wallets):040x}")
+            latencies.append(time.perf_counter() - start)
+            sizes.append(len(history))
+    
+    with LoopLag() as lag:
+        await asyncio.gather(*(reader(reads // concurrency) for _ in range(concurrency)))
+    await store.aclose()
+    values = np.asarray(latencies) * 1000
+    return {
+        "p50_ms": float(np.percentile(values, 50)),
+        "p99_ms": float(np.percentile(values, 99)),
+        "mean_messages": float(np.mean(sizes)),
+        "max_loop_lag_ms": lag.max_ms
+    }
+
+def main(args: argparse.Namespace) -> None:
+    path = args.db or os.path.join(tempfile.mkdtemp(prefix="chat-store-"), "chat.db")
+    seconds = preload(path, args.messages, args.wallets)
+    size_gb = os.path.getsize(path) / 1e9
+    print(f"{args.messages:,} messages over {args.wallets:,} wallets in {path} ({size_gb:.2f} GB), preloaded in {seconds:.1f} s\n")
+    
+    print(f"{'writes':<28}{'msgs/s':>12}{'mean batch':>12}{'max loop lag':>14}")
+    for label, batch_size in (("one commit per message", 1), (f"batched (up to {args.batch})", args.batch)):
+        result = asyncio.run(write_throughput(path, batch_size, args.writers, args.writes // args.writers, args.wallets))
+        print(f"{label:<28}{result['messages_per_s']:>12,.0f}{result['mean_batch']:>12.1f}{result['max_loop_lag_ms']:>12.1f}ms")
+    
+    print(f"\n{'history reads':<28}{'p50':>10}{'p99':>10}{'msgs/read':>12}{'max loop lag':>14}")
+    for concurrency in (1, args.read_concurrency):
+        result = asyncio.run(read_latency(path, args.reads, args.wallets, concurrency))
+        print(f"{f'{concurrency} concurrent':<28}{result['p50_ms']:>8.2f}ms{result['p99_ms']:>8.2f}ms"
+              f"{result['mean_messages']:>12.1f}{result['max_loop_lag_ms']:>12.1f}ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=10_000_000)
+    parser.add_argument("--wallets", type=int, default=100_000)
+    parser.add_argument("--writes", type=int, default=20000, help="Messages appended per write run")
+    parser.add_argument("--writers", type=int, default=200, help="Concurrent appending coroutines")
+    parser.add_argument("--batch", type=int, default=512)
+    parser.add_argument("--reads", type=int, default=2000)
+    parser.add_argument("--read-concurrency", type=int, default=16)
+    parser.add_argument("--db", help="Database file to use (and keep)")
+    main(parser.parse_args())
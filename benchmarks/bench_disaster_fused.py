@@ -0,0 +1,80 @@
+"""
+GuardianLink Fused Disaster Assessment Benchmark
+Compares end-to-end /disaster/predict latency for unknown locations with the
+fused single-call assessment against the two-step risk-then-recommendations
+calls, using the Gaia stub server.
+
+Usage:
+    python -m benchmarks.bench_disaster_fused --requests 200 --concurrency 10 --latency-ms 200
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from typing import Dict, List
+
+import httpx
+import numpy as np
+
+from benchmarks.stub_gaia import StubServer, create_stub_app
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    """Summarize latencies (seconds) as milliseconds."""
+    values = np.asarray(latencies) * 1000
+    return {
+        "mean_ms": float(values.mean()),
+        "p50_ms": float(np.percentile(values, 50)),
+        "p95_ms": float(np.percentile(values, 95)),
+        "p99_ms": float(np.percentile(values, 99))
+    }
+
+async def run(client: httpx.AsyncClient, prefix: str, requests: int, concurrency: int) -> List[float]:
+    """POST /disaster/predict for `requests` distinct locations, `concurrency` at a time."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    
+    async def one(i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            # A new location per request so neither mode is served from the cache
+            response = await client.post("/disaster/predict", json={"location": f"{prefix} town {i}", "disaster_type": "flood"})
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+    
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return latencies
+
+async def main(requests: int, concurrency: int, latency_ms: float, distribution: str) -> None:
+    stub_app = create_stub_app(latency_ms=latency_ms, distribution=distribution, seed=0)
+    with StubServer(stub_app) as stub:
+        # The API reads its Gaia endpoint at import time
+        os.environ["GAIA_AGENT_API_KEY"] = "bench"
+        os.environ["GAIA_AGENT_ENDPOINT"] = stub.url
+        from guardianlink.api.app import create_app
+        from guardianlink.services import ai_engine
+        
+        transport = httpx.ASGITransport(app=create_app())
+        results: Dict[str, Dict[str, float]] = {}
+        async with httpx.AsyncClient(transport=transport, base_url="http://guardianlink", timeout=120.0) as client:
+            for mode, fused in (("two-step", False), ("fused", True)):
+                ai_engine.DISASTER_FUSED_CALL = fused
+                await run(client, f"warmup {mode}", 10, concurrency)
+                
+                calls_before = stub_app.state.counters["chat_completions"]
+                results[mode] = summarize(await run(client, mode, requests, concurrency))
+                results[mode]["gaia_calls"] = (stub_app.state.counters["chat_completions"] - calls_before) / requests
+        await ai_engine.gaia_client.aclose()
+    
+    print(f"{'mode':<10}{'mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}   (ms){'gaia calls/req':>18}")
+    for mode, stats in results.items():
+        print(f"{mode:<10}" + "".join(f"{stats[k]:>10.1f}" for k in ("mean_ms", "p50_ms", "p95_ms", "p99_ms")) + f"{stats['gaia_calls']:>23.2f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="Stub Gaia latency per call")
+    parser.add_argument("--distribution", default="lognormal", help="Stub latency distribution")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.latency_ms, args.distribution))
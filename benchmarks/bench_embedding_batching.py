@@ -0,0 +1,59 @@
+"""
+GuardianLink Embedding Micro-Batching Load Test
+Drives many concurrent GaiaClient.embed() callers against the local Gaia stub
+and reports how throughput scales with the micro-batch size.
+
+Usage:
+    python -m benchmarks.bench_embedding_batching --texts 2000 --concurrency 256
+"""
+
+import argparse
+import asyncio
+import time
+
+from benchmarks.stub_gaia import StubServer, create_stub_app
+from guardianlink.services.ai_engine import GaiaClient
+
+async def run(url: str, batch_size: int, wait_ms: float, texts: int, concurrency: int) -> dict:
+    """Embed `texts` strings through a fresh client and collect its metrics."""
+    client = GaiaClient(api_key="bench", api_endpoint=url, embed_batch_size=batch_size, embed_batch_wait_ms=wait_ms)
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def one(i):
+        async with semaphore:
+            await client.embed(f"resource document {i}")
+    
+    await client.start()
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(texts)))
+        elapsed = time.perf_counter() - start
+    finally:
+        await client.aclose()
+    
+    stats = client.embed_batcher.stats()
+    return {
+        "batch_size": batch_size,
+        "texts_per_s": texts / elapsed,
+        "requests": stats["batches"],
+        "avg_batch": stats["avg_batch_size"],
+        "avg_wait_ms": stats["avg_queue_wait_ms"],
+    }
+
+async def main(texts: int, concurrency: int, wait_ms: float, latency_ms: float, sizes) -> None:
+    with StubServer(create_stub_app(latency_ms=latency_ms)) as stub:
+        rows = [await run(stub.url, size, wait_ms, texts, concurrency) for size in sizes]
+    
+    print(f"{'batch':>6}{'texts/s':>12}{'requests':>10}{'avg batch':>11}{'avg wait ms':>13}")
+    for row in rows:
+        print(f"{row['batch_size']:>6}{row['texts_per_s']:>12.0f}{row['requests']:>10}{row['avg_batch']:>11.1f}{row['avg_wait_ms']:>13.2f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=256)
+    parser.add_argument("--wait-ms", type=float, default=5.0)
+    parser.add_argument("--latency-ms", type=float, default=10.0, help="Stub server latency per request")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 4, 16, 64, 128])
+    args = parser.parse_args()
+    asyncio.run(main(args.texts, args.concurrency, args.wait_ms, args.latency_ms, args.sizes))
@@ -0,0 +1,87 @@
+"""
+GuardianLink Gaia Connection Pool Benchmark
+Compares per-call latency of a fresh httpx.AsyncClient per request (the old
+behaviour) against the pooled, keep-alive GaiaClient.
+
+Usage:
+    python -m benchmarks.bench_gaia_pool --requests 500 --concurrency 1
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.stub_gaia import StubServer
+from guardianlink.services.ai_engine import GaiaClient
+
+MESSAGES = [{"role": "user", "content": "Location: Accra, Disaster type: flood"}]
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    """Summarize latencies (seconds) as milliseconds."""
+    ordered = sorted(latencies)
+    return {
+        "mean_ms": statistics.mean(ordered) * 1000,
+        "p50_ms": ordered[len(ordered) // 2] * 1000,
+        "p95_ms": ordered[int(len(ordered) * 0.95) - 1] * 1000,
+        "p99_ms": ordered[int(len(ordered) * 0.99) - 1] * 1000,
+    }
+
+async def run(call, requests: int, concurrency: int) -> List[float]:
+    """Issue `requests` calls with at most `concurrency` in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            await call()
+            latencies.append(time.perf_counter() - start)
+    
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return latencies
+
+async def main(requests: int, concurrency: int, http2: bool) -> None:
+    with StubServer() as stub:
+        client = GaiaClient(api_key="bench", api_endpoint=stub.url, http2=http2)
+        
+        async def unpooled():
+            # Mirrors the previous implementation: one client per call
+            async with httpx.AsyncClient() as fresh:
+                response = await fresh.post(
+                    f"{stub.url}/chat/completions",
+                    headers=client.headers,
+                    json={"model": client.model, "messages": MESSAGES},
+                    timeout=60.0
+                )
+                response.raise_for_status()
+                return response.json()
+        
+        async def pooled():
+            return await client.chat_completion(MESSAGES)
+        
+        await client.start()
+        try:
+            # Warm up both paths so imports and the server are hot
+            await run(unpooled, 20, 1)
+            await run(pooled, 20, 1)
+            
+            before = summarize(await run(unpooled, requests, concurrency))
+            after = summarize(await run(pooled, requests, concurrency))
+        finally:
+            await client.aclose()
+    
+    print(f"{'mode':<10}{'mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}   (ms)")
+    for name, stats in (("per-call", before), ("pooled", after)):
+        print(f"{name:<10}" + "".join(f"{stats[k]:>10.2f}" for k in ("mean_ms", "p50_ms", "p95_ms", "p99_ms")))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--http2", action="store_true", help="Enable HTTP/2 on the pooled client")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.http2))
@@ -0,0 +1,113 @@
+"""
+GuardianLink Geospatial Index Micro-Benchmark
+Measures radius and k-nearest disaster queries over synthetic events: a
+per-record Python haversine scan over the disaster dicts (what a linear
+scan of DISASTER_DATA costs) vs. a vectorized NumPy scan of every point vs.
+the grid-bucketed GeoIndex, plus the cost of incremental updates.
+
+Usage:
+    python -m benchmarks.bench_geo_index --events 100000 --queries 200
+"""
+
+import argparse
+import math
+import random
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from guardianlink.core.geo_index import EARTH_RADIUS_KM, GeoIndex, haversine_km
+
+def build_events(count: int, seed: int = 0) -> List[Dict]:
+    """Synthetic disasters clustered around populated areas, like real events."""
+    rng = random.Random(seed)
+    centres = [(rng.uniform(-55, 65), rng.uniform(-180, 180)) for _ in range(300)]
+    events = []
+    for i in range(count):
+        lat, lng = rng.choice(centres)
+        events.append({
+            "id": f"disaster_{i}",
+            "coordinates": {
+                "lat": max(-90.0, min(90.0, rng.gauss(lat, 3))),
+                "lng": (rng.gauss(lng, 3) + 180) % 360 - 180
+            }
+        })
+    return events
+
+def python_haversine(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(a, 1.0)))
+
+def time_per_call(fn: Callable[[tuple], object], queries: List[tuple]) -> float:
+    """Mean microseconds per call."""
+    start = time.perf_counter()
+    for query in queries:
+        fn(query)
+    return (time.perf_counter() - start) / len(queries) * 1e6
+
+def main(events: int, queries: int, radius_km: float, k: int) -> None:
+    data = build_events(events)
+    rng = random.Random(1)
+    points = [(event["coordinates"]["lat"], event["coordinates"]["lng"]) for event in rng.sample(data, queries)]
+    
+    start = time.perf_counter()
+    index = GeoIndex()
+    for event in data:
+        index.upsert(event["id"], event["coordinates"]["lat"], event["coordinates"]["lng"])
+    build_ms = (time.perf_counter() - start) * 1000
+    
+    lats = np.array([event["coordinates"]["lat"] for event in data])
+    lngs = np.array([event["coordinates"]["lng"] for event in data])
+    ids = np.array([event["id"] for event in data], dtype=object)
+    
+    def linear_near(point):
+        found = [(event["id"], d) for event in data
+                 if (d := python_haversine(point[0], point[1], event["coordinates"]["lat"], event["coordinates"]["lng"])) <= radius_km]
+        return sorted(found, key=lambda pair: pair[1])
+    
+    def numpy_near(point):
+        distances = haversine_km(point[0], point[1], lats, lngs)
+        inside = np.flatnonzero(distances <= radius_km)
+        order = inside[np.argsort(distances[inside])]
+        return list(zip(ids[order], distances[order]))
+    
+    def numpy_nearest(point):
+        distances = haversine_km(point[0], point[1], lats, lngs)
+        best = np.argpartition(distances, k)[:k]
+        best = best[np.argsort(distances[best])]
+        return list(zip(ids[best], distances[best]))
+    
+    assert [key for key, _ in numpy_near(points[0])] == [key for key, _ in index.near(*points[0], radius_km)]
+    assert [key for key, _ in numpy_nearest(points[0])] == [key for key, _ in index.nearest(*points[0], k)]
+    
+    print(f"{events:,} events / {queries} queries / radius {radius_km:g} km / k={k}")
+    print(f"GeoIndex build: {build_ms:.0f} ms ({build_ms * 1000 / events:.1f} us per upsert), {index.stats()['occupied_cells']:,} occupied cells\n")
+    print(f"{'query':<34}{'us/query':>12}")
+    linear_sample = points[:max(1, queries // 10)]
+    print(f"{'radius: python scan of dicts':<34}{time_per_call(linear_near, linear_sample):>12.0f}")
+    print(f"{'radius: numpy scan of all points':<34}{time_per_call(numpy_near, points):>12.0f}")
+    print(f"{'radius: GeoIndex.near':<34}{time_per_call(lambda p: index.near(p[0], p[1], radius_km), points):>12.0f}")
+    print(f"{'k-nearest: numpy argpartition':<34}{time_per_call(numpy_nearest, points):>12.0f}")
+    print(f"{'k-nearest: GeoIndex.nearest':<34}{time_per_call(lambda p: index.nearest(p[0], p[1], k), points):>12.0f}")
+    
+    moves = [(f"disaster_{rng.randrange(events)}", rng.uniform(-60, 60), rng.uniform(-180, 180)) for _ in range(10000)]
+    start = time.perf_counter()
+    for key, lat, lng in moves:
+        index.upsert(key, lat, lng)
+    move_us = (time.perf_counter() - start) / len(moves) * 1e6
+    start = time.perf_counter()
+    for key, _, _ in moves[:1000]:
+        index.remove(key)
+    remove_us = (time.perf_counter() - start) / 1000 * 1e6
+    print(f"\nincremental update: {move_us:.1f} us per move, {remove_us:.1f} us per remove")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--radius-km", type=float, default=100.0)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+    main(args.events, args.queries, args.radius_km, args.k)
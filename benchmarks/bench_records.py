@@ -0,0 +1,180 @@
+"""
+GuardianLink Records Benchmark
+Measures resident memory of 1M chat messages, aid streams and delegations
+held as the old plain dicts (ISO timestamp strings, UUID strings, repeated
+keys) vs. the compact slotted records in guardianlink.models.records, plus
+the cost of building each and of converting a record back to its JSON dict
+at the API boundary.
+
+Records and dicts are built the way the services build them. Message texts
+come from a small shared pool, so the figures are per-record overhead rather
+than text. Each type and representation runs in its own process so resident
+set sizes do not mix.
+
+Usage:
+    python -m benchmarks.bench_records --records 1000000
+"""
+
+import argparse
+import gc
+import json
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Tuple, Union
+
+from guardianlink.models.records import (
+    AidStreamRecord,
+    ChatMessageRecord,
+    DelegationRecord,
+    DelegationState,
+    StreamState,
+    now_micros,
+    pack_hex
+)
+
+CONTENTS = [
+    "I feel anxious about the flooding and I cannot stop thinking about it",
+    "Thank you, the breathing exercise helped a little tonight",
+    "It sounds like you are carrying a lot right now. Try a slow breathing exercise.",
+    "I can't sleep since the earthquake and my children are scared too"
+]
+
+DAY_MICROS = 24 * 60 * 60 * 1_000_000
+
+def rss_mb() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+# Each builder returns a (key, value) pair, as the services would store it
+def chat_dict(i: int) -> Tuple[str, Dict[str, Any]]:
+    message_id = str(uuid.uuid4())
+    return message_id, {
+        "id": message_id,
+        "role": "user" if i % 2 == 0 else "ai",
+        "content": CONTENTS[i % len(CONTENTS)],
+        "timestamp": datetime.now().isoformat()
+    }
+
+def chat_record(i: int) -> Tuple[Union[bytes, str], ChatMessageRecord]:
+    record = ChatMessageRecord.from_dict(chat_dict(i)[1])
+    return record.id, record
+
+def stream_dict(i: int) -> Tuple[str, Dict[str, Any]]:
+    amount = 1.5
+    amount_wei = 1_500_000_000_000_000_000
+    return f"stream_{uuid.uuid4().hex}", {
+        "sender": f"0x{i:040x}",
+        "recipient": "0x" + uuid.uuid4().hex[:40],
+        "aid_type": "food",
+        "location": "lagos",
+        "amount": amount,
+        "amount_wei": amount_wei,
+        "duration_days": 7,
+        "rate_per_second": amount_wei / (7 * 24 * 60 * 60),
+        "start_time": datetime.now().isoformat(),
+        "end_time": (datetime.now() + timedelta(days=7)).isoformat(),
+        "status": "active",
+        "released": 0,
+        "remaining": amount
+    }
+
+def stream_record(i: int) -> Tuple[bytes, AidStreamRecord]:
+    key = bytes.fromhex(uuid.uuid4().hex)
+    start_time = now_micros()
+    return key, AidStreamRecord(
+        id=key,
+        sender=pack_hex(f"0x{i:040x}"),
+        recipient=pack_hex("0x" + uuid.uuid4().hex[:40]),
+        amount=1.5,
+        amount_wei=1_500_000_000_000_000_000,
+        start_time=start_time,
+        end_time=start_time + 7 * DAY_MICROS,
+        state=StreamState.ACTIVE,
+        aid_type=sys.intern("food"),
+        location=sys.intern("lagos"),
+        duration_days=7
+    )
+
+def delegation_dict(i: int) -> Tuple[str, Dict[str, Any]]:
+    return f"delegation_{uuid.uuid4().hex}", {
+        "delegator": f"0x{i:040x}",
+        "delegatee": f"0x{i + 1:040x}",
+        "permission_type": "disaster_response",
+        "created_at": datetime.now().isoformat(),
+        "expires_at": (datetime.now() + timedelta(days=30)).isoformat(),
+        "status": "active",
+        "tx_hash": f"0x{uuid.uuid4().hex}"
+    }
+
+def delegation_record(i: int) -> Tuple[bytes, DelegationRecord]:
+    key = bytes.fromhex(uuid.uuid4().hex)
+    created_at = now_micros()
+    return key, DelegationRecord(
+        id=key,
+        delegator=pack_hex(f"0x{i:040x}"),
+        delegatee=pack_hex(f"0x{i + 1:040x}"),
+        permission_type=sys.intern("disaster_response"),
+        created_at=created_at,
+        expires_at=created_at + 30 * DAY_MICROS,
+        state=DelegationState.ACTIVE,
+        tx_hash=pack_hex(f"0x{uuid.uuid4().hex}")
+    )
+
+# type -> (dict builder, record builder)
+BUILDERS: Dict[str, Tuple[Callable[[int], Tuple[Any, Any]], Callable[[int], Tuple[Any, Any]]]] = {
+    "chat": (chat_dict, chat_record),
+    "stream": (stream_dict, stream_record),
+    "delegation": (delegation_dict, delegation_record)
+}
+
+def run(kind: str, mode: str, records: int) -> Dict[str, Any]:
+    build_dict, build_record = BUILDERS[kind]
+    build = build_dict if mode == "dict" else build_record
+    gc.collect()
+    baseline = rss_mb()
+    
+    began = time.perf_counter()
+    store = dict(build(i) for i in range(records))
+    elapsed = time.perf_counter() - began
+    gc.collect()
+    resident = rss_mb() - baseline
+    
+    sample = list(store.values())[:100_000]
+    began = time.perf_counter()
+    if mode == "record":
+        for value in sample:
+            value.to_dict()
+    to_dict_us = (time.perf_counter() - began) / len(sample) * 1e6
+    return {
+        "rss_mb": resident,
+        "bytes_per_record": resident * 2**20 / records,
+        "build_us": elapsed / records * 1e6,
+        "to_dict_us": to_dict_us if mode == "record" else 0.0
+    }
+
+def main(args: argparse.Namespace) -> None:
+    print(f"{args.records:,} records per type, each stored in a dict keyed by ID\n")
+    print(f"{'type':<12}{'as':<8}{'RSS MB':>10}{'B/record':>10}{'build us':>10}{'to_dict us':>12}")
+    for kind in BUILDERS:
+        for mode in ("dict", "record"):
+            command = [sys.executable, "-m", "benchmarks.bench_records", "--run", f"{kind}:{mode}", f"--records={args.records}"]
+            result = json.loads(subprocess.check_output(command).decode().strip().splitlines()[-1])
+            to_dict = f"{result['to_dict_us']:>12.2f}" if mode == "record" else f"{'-':>12}"
+            print(f"{kind:<12}{mode:<8}{result['rss_mb']:>10.0f}{result['bytes_per_record']:>10.0f}{result['build_us']:>10.2f}{to_dict}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--run", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.run:
+        kind, mode = args.run.split(":")
+        print(json.dumps(run(kind, mode, args.records)))
+    else:
+        main(args)
@@ -0,0 +1,114 @@
+"""
+GuardianLink Retrieval Micro-Benchmark
+Measures per-message cost of intent matching and resource retrieval with
+thousands of keywords and documents: the previous per-call keyword dict and
+substring scan vs. a flat alternation regex vs. the precompiled trie-shaped
+KeywordMatcher, and a language list-comprehension filter vs. the
+partitioned vector store.
+
+Usage:
+    python -m benchmarks.bench_retrieval --keywords 5000 --documents 5000 --messages 2000
+"""
+
+import argparse
+import asyncio
+import random
+import re
+import string
+import time
+from typing import Callable, Dict, List
+
+from guardianlink.core.keyword_matcher import KeywordMatcher
+from guardianlink.services.ai_engine import Document, FAISS, MentalHealthAgent, OpenAIEmbeddings
+
+LANGUAGES = ["en", "sw", "hi", "fr"]
+DEVANAGARI = [chr(c) for c in range(0x0915, 0x0939)] + ["ि", "ा", "ं", "े"]
+
+def random_word(rng: random.Random, language: str) -> str:
+    alphabet = DEVANAGARI if language == "hi" else string.ascii_lowercase
+    return "".join(rng.choice(alphabet) for _ in range(rng.randint(4, 10)))
+
+def build_corpus(keywords: int, intents: int, documents: int, messages: int, seed: int = 0):
+    """Synthetic multilingual keyword config, documents and messages."""
+    rng = random.Random(seed)
+    config: Dict[str, Dict[str, List[str]]] = {f"intent_{i}": {language: [] for language in LANGUAGES} for i in range(intents)}
+    vocabulary = []
+    for i in range(keywords):
+        language = LANGUAGES[i % len(LANGUAGES)]
+        word = random_word(rng, language)
+        config[f"intent_{i % intents}"][language].append(word)
+        vocabulary.append(word)
+    
+    docs = [
+        Document(
+            page_content=" ".join(random_word(rng, "en") for _ in range(20)),
+            metadata={"language": LANGUAGES[i % len(LANGUAGES)], "type": f"intent_{rng.randrange(intents)}"}
+        )
+        for i in range(documents)
+    ]
+    texts = []
+    for _ in range(messages):
+        words = [random_word(rng, "en") for _ in range(18)] + rng.sample(vocabulary, 2)
+        rng.shuffle(words)
+        texts.append(" ".join(words))
+    return config, docs, texts
+
+def time_per_call(fn: Callable[[str], object], messages: List[str]) -> float:
+    """Mean microseconds per call."""
+    start = time.perf_counter()
+    for message in messages:
+        fn(message)
+    return (time.perf_counter() - start) / len(messages) * 1e6
+
+def main(keywords: int, intents: int, documents: int, messages: int) -> None:
+    config, docs, texts = build_corpus(keywords, intents, documents, messages)
+    flat = {intent: [word for words in languages.values() for word in words] for intent, languages in config.items()}
+    
+    def legacy_match(message: str):
+        # Previous behaviour: the keyword dict is rebuilt per call and every keyword substring-tested
+        keyword_dict = {intent: list(words) for intent, words in flat.items()}
+        message_lower = message.lower()
+        return {intent for intent, words in keyword_dict.items() if any(word in message_lower for word in words)}
+    
+    start = time.perf_counter()
+    alternation = re.compile(r"\b(?:" + "|".join(map(re.escape, sorted({w for ws in flat.values() for w in ws}, key=len, reverse=True))) + r")\b")
+    alternation_build = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    matcher = KeywordMatcher.from_config(config)
+    matcher_build = time.perf_counter() - start
+    
+    print(f"{keywords:,} keywords / {intents} intents / {documents:,} documents / {messages:,} messages\n")
+    print(f"{'intent matching':<36}{'build ms':>10}{'us/message':>14}")
+    print(f"{'per-call dict + substring (before)':<36}{'-':>10}{time_per_call(legacy_match, texts):>14.1f}")
+    print(f"{'flat alternation regex':<36}{alternation_build * 1000:>10.1f}{time_per_call(lambda m: alternation.findall(m.lower()), texts):>14.1f}")
+    print(f"{'trie KeywordMatcher':<36}{matcher_build * 1000:>10.1f}{time_per_call(matcher.match, texts):>14.1f}")
+    
+    start = time.perf_counter()
+    store = FAISS.from_documents(docs, OpenAIEmbeddings())
+    index_build = time.perf_counter() - start
+    retriever = store.as_retriever(search_kwargs={"k": 3})
+    
+    def legacy_filter(message: str):
+        types = matcher.match(message)
+        return [doc for doc in docs if doc.metadata["language"] == "en" and doc.metadata["type"] in types]
+    
+    agent = MentalHealthAgent(client=object(), retriever=retriever, matcher=matcher)
+    loop = asyncio.new_event_loop()
+    
+    def retrieve_in_loop(message: str):
+        return loop.run_until_complete(agent.retrieve_relevant_content(message, "en"))
+    
+    print(f"\n{'document selection':<36}{'build ms':>10}{'us/message':>14}")
+    print(f"{'language list comprehension':<36}{'-':>10}{time_per_call(legacy_filter, texts):>14.1f}")
+    print(f"{'retrieve_relevant_content (ranked)':<36}{index_build * 1000:>10.1f}{time_per_call(retrieve_in_loop, texts):>14.1f}")
+    loop.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--keywords", type=int, default=5000)
+    parser.add_argument("--intents", type=int, default=20)
+    parser.add_argument("--documents", type=int, default=5000)
+    parser.add_argument("--messages", type=int, default=2000)
+    args = parser.parse_args()
+    main(args.keywords, args.intents, args.documents, args.messages)
@@ -0,0 +1,121 @@
+"""
+GuardianLink Serialization Micro-Benchmark
+Measures the CPU cost of turning route results into response bytes for
+/disaster/active and /mental-health/history/{wallet}: FastAPI's default
+jsonable_encoder + stdlib json vs. typed response models (pydantic-core
+serializers) rendered with FastJSONResponse. Also times decoding of Gaia
+output (assessment JSON and streamed chunks) with stdlib json vs. the fast
+decoder.
+
+Usage:
+    python -m benchmarks.bench_serialization --disasters 1000 --messages 500 --iterations 200
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from guardianlink.core.serialization import FastJSONResponse, loads, orjson
+from guardianlink.models.schemas import ChatHistoryMessage, DisasterData
+
+DISASTER_TYPES = ["flood", "cyclone", "earthquake", "wildfire", "drought"]
+
+def build_disasters(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    return [
+        {
+            "id": f"disaster_{i}",
+            "type": rng.choice(DISASTER_TYPES),
+            "location": f"City {i}, Country {i % 50}",
+            "coordinates": {"lat": rng.uniform(-90, 90), "lng": rng.uniform(-180, 180)},
+            "severity": rng.choice(["low", "medium", "high"]),
+            "start_date": "2025-05-01T00:00:00Z",
+            "status": rng.choice(["active", "recovery"]),
+            "affected_population": rng.randint(1000, 1000000),
+            "aid_streams": [f"stream_{uuid.UUID(int=rng.getrandbits(128)).hex}" for _ in range(rng.randint(0, 4))]
+        }
+        for i in range(count)
+    ]
+
+def build_history(count: int, seed: int = 0) -> List[Dict[str, str]]:
+    rng = random.Random(seed)
+    start = datetime(2025, 5, 1)
+    return [
+        {
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "role": "user" if i % 2 == 0 else "ai",
+            "content": "I have been feeling anxious about the flood and cannot sleep. " * rng.randint(1, 6),
+            "timestamp": (start + timedelta(seconds=30 * i)).isoformat()
+        }
+        for i in range(count)
+    ]
+
+def time_per_call(fn: Callable[[], object], iterations: int) -> float:
+    """Mean microseconds per call."""
+    fn()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+def compare_routes(name: str, payload: List[Dict], model: Any, iterations: int) -> None:
+    field = create_response_field(name=f"Response_{name}", type_=List[model])
+    loop = asyncio.new_event_loop()
+    plain = JSONResponse(None)
+    fast = FastJSONResponse(None)
+    
+    def before():
+        # Untyped route: jsonable_encoder walks the result in Python, stdlib json renders it
+        return plain.render(jsonable_encoder(payload))
+    
+    def typed_stdlib():
+        return plain.render(loop.run_until_complete(serialize_response(field=field, response_content=payload)))
+    
+    def after():
+        return fast.render(loop.run_until_complete(serialize_response(field=field, response_content=payload)))
+    
+    assert json.loads(before()) == json.loads(after())
+    print(f"\n{name} ({len(payload):,} items, {len(before()):,} bytes)")
+    print(f"{'path':<44}{'us/response':>14}")
+    baseline = time_per_call(before, iterations)
+    print(f"{'jsonable_encoder + json (before)':<44}{baseline:>14.1f}")
+    print(f"{'response_model + json':<44}{time_per_call(typed_stdlib, iterations):>14.1f}")
+    fast_time = time_per_call(after, iterations)
+    print(f"{'response_model + FastJSONResponse (after)':<44}{fast_time:>14.1f}  ({baseline / fast_time:.1f}x)")
+    loop.close()
+
+def compare_decoding(iterations: int) -> None:
+    assessment = json.dumps({
+        "risk_level": "high",
+        "recommendations": ["Move to higher ground", "Store clean water", "Charge phones and radios", "Check on neighbours", "Follow official alerts"]
+    })
+    chunk = json.dumps({"id": "c", "object": "chat.completion.chunk", "model": "llama", "choices": [{"index": 0, "delta": {"content": "breathe "}}]})
+    print(f"\n{'Gaia output decoding':<44}{'json us':>10}{'fast us':>10}")
+    for name, text in (("assessment reply", assessment), ("stream chunk", chunk)):
+        stdlib = time_per_call(lambda: json.loads(text), iterations * 50)
+        fast = time_per_call(lambda: loads(text), iterations * 50)
+        print(f"{name:<44}{stdlib:>10.2f}{fast:>10.2f}")
+
+def main(disasters: int, messages: int, iterations: int) -> None:
+    print(f"JSON backend: {'orjson ' + orjson.__version__ if orjson is not None else 'stdlib json (orjson not installed)'}")
+    compare_routes("/disaster/active", build_disasters(disasters), DisasterData, iterations)
+    compare_routes("/mental-health/history/{wallet}", build_history(messages), ChatHistoryMessage, iterations)
+    compare_decoding(iterations)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--disasters", type=int, default=1000)
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    main(args.disasters, args.messages, args.iterations)
@@ -0,0 +1,121 @@
+"""
+GuardianLink Stream Status Benchmark
+Measures stream status polling with many streams: the old per-stream dict
+computation (two fromisoformat parses, float math and a dict update per
+stream), the per-stream record path behind /disaster/stream/{id}, and the
+vectorized StreamTable pass behind /disaster/streams/status. Also compares
+fetching the same streams over HTTP one request at a time vs. in one bulk
+request (in process, through httpx's ASGI transport).
+
+Amounts range up to 5,000 ETH, well past the int64 wei limit (about 9.2 ETH),
+so the exact limb arithmetic is exercised.
+
+Usage:
+    python -m benchmarks.bench_stream_status --streams 100000 --ids 5000
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+
+import httpx
+
+from guardianlink.api.app import app
+from guardianlink.services import blockchain
+from guardianlink.services.blockchain import create_aid_stream, find_stream, get_stream_status, get_stream_statuses
+
+def old_stream_dict(stream_id: str) -> Dict[str, Any]:
+    """The stream as the old STREAMS dict held it."""
+    stream = find_stream(stream_id).to_dict()
+    stream.update(status="active", released=0, remaining=stream["amount"])
+    return stream
+
+def old_get_stream_status(stream: Dict[str, Any]) -> Dict[str, Any]:
+    """The old per-stream computation, on one dict."""
+    start_time = datetime.fromisoformat(stream["start_time"])
+    end_time = datetime.fromisoformat(stream["end_time"])
+    current_time = datetime.now()
+    if current_time >= end_time:
+        stream["released"] = stream["amount"]
+        stream["remaining"] = 0
+        stream["status"] = "completed"
+    else:
+        total_duration = (end_time - start_time).total_seconds()
+        elapsed_duration = (current_time - start_time).total_seconds()
+        proportion = elapsed_duration / total_duration
+        released = stream["amount"] * proportion
+        stream["released"] = released
+        stream["remaining"] = stream["amount"] - released
+    return stream
+
+async def timed(fn, repeat: int) -> float:
+    """Best of repeat runs, in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+async def main(args: argparse.Namespace) -> None:
+    # Quieten the per-call INFO logs so they do not dominate the timings
+    logging.disable(logging.INFO)
+    rng = random.Random(0)
+    stream_ids: List[str] = []
+    start = time.perf_counter()
+    for _ in range(args.streams):
+        stream_ids.append(await create_aid_stream(
+            "0x" + "a" * 40, "food", "lagos", round(rng.uniform(0.01, 5000), 6), rng.randint(1, 90)
+        ))
+    print(f"{args.streams:,} streams created in {time.perf_counter() - start:.1f} s "
+          f"(stream table: {blockchain.stream_table.stats()})\n")
+    
+    ids = rng.sample(stream_ids, args.ids)
+    old_streams = [old_stream_dict(stream_id) for stream_id in ids]
+    
+    async def old_loop():
+        for stream in old_streams:
+            old_get_stream_status(stream)
+    
+    async def record_loop():
+        for stream_id in ids:
+            await get_stream_status(stream_id)
+    
+    async def bulk():
+        await get_stream_statuses(ids)
+    
+    print(f"{f'status of {args.ids:,} streams':<44}{'total':>10}{'per stream':>14}")
+    for label, fn in (
+        ("old dicts, one at a time", old_loop),
+        ("records, one at a time (/stream/{id})", record_loop),
+        ("StreamTable, one pass (/streams/status)", bulk)
+    ):
+        ms = await timed(fn, args.repeat)
+        print(f"{label:<44}{ms:>8.1f}ms{ms * 1000 / args.ids:>12.2f}us")
+    
+    http_ids = ids[:args.http_ids]
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one_by_one():
+            for stream_id in http_ids:
+                (await client.get(f"/disaster/stream/{stream_id}")).raise_for_status()
+        
+        async def one_request():
+            (await client.post("/disaster/streams/status", json={"stream_ids": http_ids})).raise_for_status()
+        
+        print(f"\n{f'HTTP, {len(http_ids):,} streams':<44}{'total':>10}{'per stream':>14}")
+        for label, fn in (("GET /disaster/stream/{id} each", one_by_one), ("POST /disaster/streams/status", one_request)):
+            ms = await timed(fn, args.repeat)
+            print(f"{label:<44}{ms:>8.1f}ms{ms * 1000 / len(http_ids):>12.2f}us")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--streams", type=int, default=100_000)
+    parser.add_argument("--ids", type=int, default=5000, help="Streams whose status is computed per run")
+    parser.add_argument("--http-ids", type=int, default=1000, help="Streams fetched over HTTP per run")
+    parser.add_argument("--repeat", type=int, default=5)
+    asyncio.run(main(parser.parse_args()))
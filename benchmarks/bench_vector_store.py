@@ -0,0 +1,75 @@
+"""
+GuardianLink Vector Store Benchmark
+Measures exact top-k query latency of the in-process VectorStore over a
+large synthetic corpus of resource chunks split across language partitions,
+at the 256 dimensions of the app's OpenAIEmbeddings by default.
+
+Usage:
+    python -m benchmarks.bench_vector_store --documents 1000000 --dim 256
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from guardianlink.core.vector_store import VectorStore
+from guardianlink.services.ai_engine import Document
+
+LANGUAGES = ["en", "sw", "hi", "fr"]
+TYPES = ["anxiety", "depression", "trauma", "grief", "evacuation"]
+
+def build(documents: int, dim: int, chunk: int = 100_000) -> VectorStore:
+    """Fill a store with random unit vectors, in chunks to bound peak memory."""
+    rng = np.random.default_rng(0)
+    store = VectorStore(dim=dim, initial_capacity=documents // len(LANGUAGES) + 1)
+    for start in range(0, documents, chunk):
+        count = min(chunk, documents - start)
+        docs = [
+            Document(page_content="", metadata={"language": LANGUAGES[i % len(LANGUAGES)], "type": TYPES[i % len(TYPES)]})
+            for i in range(start, start + count)
+        ]
+        store.add_documents(docs, rng.standard_normal((count, dim), dtype=np.float32), ids=[str(i) for i in range(start, start + count)])
+    return store
+
+def measure(store: VectorStore, dim: int, queries: int, batch: int, **search_kwargs) -> dict:
+    """Time `queries` searches issued in batches of `batch`."""
+    rng = np.random.default_rng(1)
+    latencies = []
+    for _ in range(queries // batch):
+        vectors = rng.standard_normal((batch, dim), dtype=np.float32)
+        start = time.perf_counter()
+        store.search(vectors, k=10, **search_kwargs)
+        latencies.append((time.perf_counter() - start) / batch)
+    latencies.sort()
+    return {
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p95_ms": latencies[max(int(len(latencies) * 0.95) - 1, 0)] * 1000,
+        "mean_ms": statistics.mean(latencies) * 1000,
+    }
+
+def main(documents: int, dim: int, queries: int) -> None:
+    start = time.perf_counter()
+    store = build(documents, dim)
+    print(f"built {documents:,} x {dim} in {time.perf_counter() - start:.1f}s "
+          f"({store.stats()['matrix_bytes'] / 2**20:.0f} MiB)")
+    
+    scenarios = [
+        ("all partitions", 1, {}),
+        ("one language", 1, {"partition": "en"}),
+        ("language + type", 1, {"partition": "en", "filters": {"type": "anxiety"}}),
+        ("one language, batch 32", 32, {"partition": "en"}),
+    ]
+    print(f"{'scenario':<26}{'p50 ms':>10}{'p95 ms':>10}{'mean ms':>10}   (per query)")
+    for name, batch, kwargs in scenarios:
+        stats = measure(store, dim, queries, batch, **kwargs)
+        print(f"{name:<26}{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}{stats['mean_ms']:>10.2f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=1_000_000)
+    parser.add_argument("--dim", type=int, default=256, help="Embedding width; 256 matches OpenAIEmbeddings")
+    parser.add_argument("--queries", type=int, default=64)
+    args = parser.parse_args()
+    main(args.documents, args.dim, args.queries)
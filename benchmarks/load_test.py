@@ -0,0 +1,416 @@
+"""
+GuardianLink End-to-End Load Test
+Drives a running GuardianLink API at a target request rate and reports
+throughput and p50/p95/p99 latency per endpoint.
+
+By default the harness starts the Gaia stub server and a GuardianLink API
+process pointed at it, so runs are reproducible and need no API key. Pass
+--target to load an already running deployment instead.
+
+Requests are sent open-loop: each one is scheduled at a fixed offset from
+the start of the run and its latency is measured from that scheduled time,
+so a slow server cannot hide queueing delay by slowing the generator down.
+
+GET requests replay the last ETag seen for their URL in If-None-Match, as a
+polling dashboard would, and the report shows response bytes, 304s and the
+API process's CPU time; pass --no-etags for the unconditional baseline.
+
+Results are written as JSON; pass --compare with an earlier results file to
+print the change per endpoint and fail on latency regressions.
+
+Usage:
+    python -m benchmarks.load_test --rps 50 --duration 30 --gaia-latency-ms 300 --gaia-distribution lognormal
+    python -m benchmarks.load_test --rps 50 --duration 30 --output after.json --compare before.json
+    python -m benchmarks.load_test --mix poll_active=1,poll_history=1,stream_status=1,chat=1 --no-etags
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+
+from benchmarks.stub_gaia import add_stub_arguments, stub_options
+
+# Scenario name -> relative weight in the request mix
+DEFAULT_MIX = "predict=4,chat=3,create_stream=1,stream_status=2,poll_active=2,poll_history=2"
+
+# Known locations are answered from mock data; the rest go to Gaia
+LOCATIONS = ["lagos", "mumbai", "Accra", "Nairobi", "Dhaka", "Manila", "Jakarta", "Lima", "Karachi", "Cairo"]
+DISASTER_TYPES = ["flood", "earthquake", "cyclone", "drought", None]
+MESSAGES = [
+    "I feel anxious about the flooding",
+    "I can't sleep since the earthquake",
+    "I feel hopeless and down",
+    "How can I support my children?",
+    "I'm worried about my family"
+]
+
+class Scenarios:
+    """Builds requests for each load-test scenario."""
+    
+    def __init__(self, seed: Optional[int] = None, wallets: int = 100):
+        self.random = random.Random(seed)
+        self.wallets = [f"0x{i:040x}" for i in range(1, wallets + 1)]
+        self.stream_ids: List[str] = []
+    
+    def predict(self) -> Tuple[str, str, Dict]:
+        body = {"location": self.random.choice(LOCATIONS), "disaster_type": self.random.choice(DISASTER_TYPES)}
+        return "POST", "/disaster/predict", body
+    
+    def chat(self) -> Tuple[str, str, Dict]:
+        body = {"wallet_address": self.random.choice(self.wallets), "message": self.random.choice(MESSAGES), "language": "en"}
+        return "POST", "/mental-health/chat", body
+    
+    def create_stream(self) -> Tuple[str, str, Dict]:
+        body = {
+            "wallet_address": self.random.choice(self.wallets),
+            "aid_type": self.random.choice(["food", "water", "shelter"]),
+            "location": self.random.choice(LOCATIONS),
+            "amount": round(self.random.uniform(0.1, 10.0), 4),
+            "duration_days": self.random.randint(1, 90)
+        }
+        return "POST", "/disaster/create-stream", body
+    
+    def stream_status(self) -> Tuple[str, str, Optional[Dict]]:
+        if not self.stream_ids:
+            return self.create_stream()
+        return "GET", f"/disaster/stream/{self.random.choice(self.stream_ids)}", None
+    
+    def poll_active(self) -> Tuple[str, str, None]:
+        return "GET", "/disaster/active", None
+    
+    def poll_history(self) -> Tuple[str, str, None]:
+        return "GET", f"/mental-health/history/{self.random.choice(self.wallets)}", None
+    
+    def build(self, name: str) -> Tuple[str, str, Optional[Dict]]:
+        return getattr(self, name)()
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """Parse "name=weight,..." into a weight mapping."""
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if not hasattr(Scenarios, name) or name == "build":
+            raise ValueError(f"Unknown scenario {name!r}")
+        weights[name] = float(weight or 1)
+    return weights
+
+def summarize(
+    latencies: List[float],
+    errors: int,
+    duration: float,
+    response_bytes: int = 0,
+    not_modified: int = 0
+) -> Dict[str, Any]:
+    """Summarize latencies (seconds), response body bytes and 304s for one endpoint."""
+    count = len(latencies)
+    result = {
+        "requests": count,
+        "errors": errors,
+        "error_rate": errors / count if count else 0.0,
+        "throughput_rps": count / duration if duration else 0.0,
+        "response_bytes": response_bytes,
+        "not_modified": not_modified
+    }
+    if count:
+        values = np.asarray(latencies) * 1000
+        result.update({
+            "mean_ms": float(values.mean()),
+            "p50_ms": float(np.percentile(values, 50)),
+            "p95_ms": float(np.percentile(values, 95)),
+            "p99_ms": float(np.percentile(values, 99)),
+            "max_ms": float(values.max())
+        })
+    return result
+
+async def run_load(
+    target: str,
+    rps: float,
+    duration: float,
+    weights: Dict[str, float],
+    connections: int,
+    seed: Optional[int],
+    warmup: int,
+    etags: bool = True
+) -> Dict[str, Any]:
+    """
+    Send requests at `rps` for `duration` seconds.
+    
+    With etags, GET requests send the last ETag received for their URL in
+    If-None-Match.
+    
+    Returns:
+        Per-endpoint and overall summaries
+    """
+    scenarios = Scenarios(seed)
+    names = list(weights)
+    cumulative = np.cumsum([weights[name] for name in names])
+    limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+    
+    latencies: Dict[str, List[float]] = {name: [] for name in names}
+    errors: Dict[str, int] = {name: 0 for name in names}
+    response_bytes: Dict[str, int] = {name: 0 for name in names}
+    not_modified: Dict[str, int] = {name: 0 for name in names}
+    status_codes: Dict[str, int] = {}
+    known_etags: Dict[str, str] = {}
+    
+    async with httpx.AsyncClient(base_url=target, limits=limits, timeout=120.0) as client:
+        server_cpu_before = await _server_cpu_seconds(client)
+        
+        # Create a few streams so status lookups have something to read
+        for _ in range(warmup):
+            method, path, body = scenarios.create_stream()
+            response = await client.request(method, path, json=body)
+            if response.status_code == 200:
+                scenarios.stream_ids.append(response.json()["stream_id"])
+        
+        async def one(name: str, scheduled: float) -> None:
+            method, path, body = scenarios.build(name)
+            headers = None
+            if etags and method == "GET" and path in known_etags:
+                headers = {"If-None-Match": known_etags[path]}
+            try:
+                response = await client.request(method, path, json=body, headers=headers)
+                status = str(response.status_code)
+                response_bytes[name] += len(response.content)
+                if response.status_code == 304:
+                    not_modified[name] += 1
+                elif etags and "etag" in response.headers:
+                    known_etags[path] = response.headers["etag"]
+                if response.status_code == 200 and path == "/disaster/create-stream":
+                    scenarios.stream_ids.append(response.json()["stream_id"])
+                if response.status_code >= 400:
+                    errors[name] += 1
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+                errors[name] += 1
+            latencies[name].append(time.perf_counter() - scheduled)
+            status_codes[status] = status_codes.get(status, 0) + 1
+        
+        total = int(rps * duration)
+        interval = 1.0 / rps
+        tasks = []
+        start = time.perf_counter()
+        for i in range(total):
+            scheduled = start + i * interval
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            name = names[int(np.searchsorted(cumulative, scenarios.random.random() * cumulative[-1], side="right"))]
+            tasks.append(asyncio.create_task(one(name, scheduled)))
+        sent_for = time.perf_counter() - start
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+        
+        try:
+            metrics = (await client.get("/metrics")).json()
+        except (httpx.HTTPError, ValueError):
+            metrics = None
+        server_cpu_after = await _server_cpu_seconds(client)
+    
+    all_latencies = [value for values in latencies.values() for value in values]
+    server_cpu = None
+    if server_cpu_before is not None and server_cpu_after is not None:
+        server_cpu = server_cpu_after - server_cpu_before
+    return {
+        "overall": summarize(
+            all_latencies, sum(errors.values()), elapsed, sum(response_bytes.values()), sum(not_modified.values())
+        ),
+        "endpoints": {
+            name: summarize(latencies[name], errors[name], elapsed, response_bytes[name], not_modified[name])
+            for name in names
+        },
+        "etags": etags,
+        "server_cpu_seconds": server_cpu,
+        "status_codes": status_codes,
+        "achieved_send_rate_rps": total / sent_for if sent_for else 0.0,
+        "elapsed_s": elapsed,
+        "server_metrics": metrics
+    }
+
+async def _server_cpu_seconds(client: httpx.AsyncClient) -> Optional[float]:
+    """CPU time used so far by the API process, as reported by /metrics."""
+    try:
+        return (await client.get("/metrics")).json()["process"]["cpu_seconds"]
+    except (httpx.HTTPError, ValueError, KeyError, TypeError):
+        return None
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def _wait_until_up(url: str, process: subprocess.Popen, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{url} exited with code {process.returncode} during startup")
+        try:
+            httpx.get(url, timeout=1.0)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    raise RuntimeError(f"{url} did not start within {timeout}s")
+
+def start_services(args: argparse.Namespace) -> Tuple[str, str, List[subprocess.Popen]]:
+    """
+    Start the Gaia stub and a GuardianLink API process pointed at it.
+    
+    Returns:
+        (API base URL, stub base URL, processes to stop afterwards)
+    """
+    stub_port, api_port = _free_port(), _free_port()
+    stub_command = [sys.executable, "-m", "benchmarks.stub_gaia", "--port", str(stub_port)]
+    for name, value in stub_options(args, prefix="gaia-").items():
+        if value is not None:
+            stub_command += [f"--{name.replace('_', '-')}", str(value)]
+    
+    stub_url = f"http://127.0.0.1:{stub_port}/v1"
+    env = dict(os.environ, GAIA_AGENT_API_KEY="load-test", GAIA_AGENT_ENDPOINT=stub_url)
+    env.update(dict(item.split("=", 1) for item in args.env))
+    api_command = [
+        sys.executable, "-m", "uvicorn", "guardianlink.api.app:app",
+        "--host", "127.0.0.1", "--port", str(api_port), "--log-level", "warning", "--no-access-log"
+    ]
+    
+    processes = []
+    try:
+        processes.append(subprocess.Popen(stub_command))
+        _wait_until_up(f"{stub_url}/stats", processes[-1])
+        processes.append(subprocess.Popen(api_command, env=env, stdout=subprocess.DEVNULL))
+        _wait_until_up(f"http://127.0.0.1:{api_port}/", processes[-1])
+    except Exception:
+        stop_services(processes)
+        raise
+    return f"http://127.0.0.1:{api_port}", stub_url, processes
+
+def stop_services(processes: List[subprocess.Popen]) -> None:
+    for process in reversed(processes):
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], max_regression: Optional[float]) -> bool:
+    """
+    Print the change against a baseline run.
+    
+    Returns:
+        False if any endpoint's p99 regressed by more than max_regression percent
+    """
+    ok = True
+    print(f"\n{'vs baseline':<16}{'rps':>12}{'p50':>12}{'p95':>12}{'p99':>12}")
+    rows = [("overall", current["overall"], baseline["overall"])]
+    rows += [
+        (name, stats, baseline["endpoints"][name])
+        for name, stats in current["endpoints"].items()
+        if name in baseline.get("endpoints", {})
+    ]
+    for name, now, before in rows:
+        cells = []
+        for key in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms"):
+            if key in now and before.get(key):
+                cells.append(f"{(now[key] - before[key]) / before[key] * 100:>+11.1f}%")
+            else:
+                cells.append(f"{'-':>12}")
+        print(f"{name:<16}" + "".join(cells))
+        if name == "overall" and before.get("response_bytes"):
+            change = (now.get("response_bytes", 0) - before["response_bytes"]) / before["response_bytes"] * 100
+            print(f"{'response bytes':<16}{change:>+11.1f}%")
+        if max_regression is not None and before.get("p99_ms") and "p99_ms" in now:
+            if now["p99_ms"] > before["p99_ms"] * (1 + max_regression / 100):
+                ok = False
+    if current.get("server_cpu_seconds") is not None and baseline.get("server_cpu_seconds"):
+        change = (current["server_cpu_seconds"] - baseline["server_cpu_seconds"]) / baseline["server_cpu_seconds"] * 100
+        print(f"{'server cpu':<16}{change:>+11.1f}%")
+    return ok
+
+def print_report(results: Dict[str, Any]) -> None:
+    print(f"\n{'endpoint':<16}{'requests':>10}{'errors':>8}{'rps':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'304s':>8}{'KiB':>10}")
+    rows = list(results["endpoints"].items()) + [("overall", results["overall"])]
+    for name, stats in rows:
+        latency = "".join(f"{stats.get(key, float('nan')):>10.1f}" for key in ("p50_ms", "p95_ms", "p99_ms"))
+        transfer = f"{stats.get('not_modified', 0):>8}{stats.get('response_bytes', 0) / 1024:>10.1f}"
+        print(f"{name:<16}{stats['requests']:>10}{stats['errors']:>8}{stats['throughput_rps']:>10.1f}{latency}{transfer}")
+    print(f"\nachieved send rate: {results['achieved_send_rate_rps']:.1f} rps, status codes: {results['status_codes']}")
+    if results.get("server_cpu_seconds") is not None:
+        print(f"server cpu: {results['server_cpu_seconds']:.2f} s (etags {'on' if results.get('etags') else 'off'})")
+    if results.get("gaia_stub"):
+        print(f"gaia stub calls: {results['gaia_stub']}")
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", help="Base URL of a running GuardianLink API (default: start one against the stub)")
+    parser.add_argument("--rps", type=float, default=20.0, help="Target request rate")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to send for")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Scenario weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--connections", type=int, default=200, help="Client connection pool size")
+    parser.add_argument("--warmup-streams", type=int, default=10, help="Aid streams created before the run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--env", action="append", default=[], metavar="NAME=VALUE", help="Extra environment for the started API")
+    parser.add_argument("--output", default="load_test_results.json", help="Where to write JSON results")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    parser.add_argument("--max-regression", type=float, default=None, help="Fail if any p99 grows by more than this percent")
+    parser.add_argument("--no-etags", dest="etags", action="store_false", help="Do not send If-None-Match on GET requests")
+    add_stub_arguments(parser, prefix="gaia-")
+    args = parser.parse_args()
+    
+    weights = parse_mix(args.mix)
+    processes = []
+    stub_url = None
+    target = args.target
+    if target is None:
+        target, stub_url, processes = start_services(args)
+    
+    try:
+        results = asyncio.run(run_load(
+            target, args.rps, args.duration, weights, args.connections, args.seed, args.warmup_streams, args.etags
+        ))
+        if stub_url is not None:
+            results["gaia_stub"] = httpx.get(f"{stub_url}/stats").json()
+    finally:
+        stop_services(processes)
+    
+    results = {
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            "target": args.target or "local",
+            "rps": args.rps,
+            "duration_s": args.duration,
+            "mix": weights,
+            "connections": args.connections,
+            "seed": args.seed,
+            "etags": args.etags,
+            "env": args.env,
+            "gaia_stub": stub_options(args, prefix="gaia-") if args.target is None else None
+        },
+        **results
+    }
+    
+    print_report(results)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"results written to {args.output}")
+    
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if not compare(results, baseline, args.max_regression):
+            print(f"p99 regressed by more than {args.max_regression}%")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,259 @@
+"""
+GuardianLink Gaia Stub Server
+A minimal OpenAI-compatible stand-in for the Gaia API, used by the benchmarks
+so that performance numbers can be collected without calling the real service.
+
+Latency can follow a fixed, uniform, exponential or lognormal distribution,
+a fraction of requests can be failed with 429/503, and `stream: true` chat
+requests are answered as server-sent events.
+
+Usage:
+    python -m benchmarks.stub_gaia --port 8081 --latency-ms 300 --distribution lognormal --error-rate 0.01
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import socket
+import threading
+import time
+from typing import Dict, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+
+RISK_REPLY = '{"risk_level": "medium", "confidence": 0.7, "factors": ["seasonal rainfall"]}'
+RECOMMENDATIONS_REPLY = '{"recommendations": ["Move to higher ground", "Store clean water", "Charge phones and radios"]}'
+ASSESSMENT_REPLY = '{"risk_level": "medium", "recommendations": ["Move to higher ground", "Store clean water", "Charge phones and radios"]}'
+CHAT_REPLY = "It sounds like you are carrying a lot right now. Try a slow breathing exercise, and consider reaching out to someone you trust."
+
+class LatencyModel:
+    """Samples artificial server-side latency in seconds."""
+    
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        distribution: str = "fixed",
+        jitter_ms: float = 0.0,
+        sigma: float = 0.5,
+        seed: Optional[int] = None
+    ):
+        """
+        Args:
+            latency_ms: Fixed latency, uniform centre, exponential mean or lognormal median
+            distribution: One of DISTRIBUTIONS
+            jitter_ms: Half-width of the uniform distribution
+            sigma: Shape of the lognormal distribution (larger = heavier tail)
+            seed: Optional random seed for reproducible runs
+        """
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution {distribution!r}, expected one of {DISTRIBUTIONS}")
+        self.latency_ms = latency_ms
+        self.distribution = distribution
+        self.jitter_ms = jitter_ms
+        self.sigma = sigma
+        self.random = random.Random(seed)
+    
+    def sample(self) -> float:
+        if self.latency_ms <= 0:
+            return 0.0
+        if self.distribution == "uniform":
+            ms = self.random.uniform(self.latency_ms - self.jitter_ms, self.latency_ms + self.jitter_ms)
+        elif self.distribution == "exponential":
+            ms = self.random.expovariate(1.0 / self.latency_ms)
+        elif self.distribution == "lognormal":
+            ms = self.latency_ms * self.random.lognormvariate(0.0, self.sigma)
+        else:
+            ms = self.latency_ms
+        return max(ms, 0.0) / 1000
+
+def _reply_for(payload: Dict) -> str:
+    """Pick a canned reply that the GuardianLink agents can parse."""
+    system = " ".join(m.get("content", "") for m in payload.get("messages", []) if m.get("role") == "system")
+    if "'risk_level' field and a 'recommendations' field" in system:
+        return ASSESSMENT_REPLY
+    if "'recommendations' field" in system:
+        return RECOMMENDATIONS_REPLY
+    if "'risk_level' field" in system:
+        return RISK_REPLY
+    return CHAT_REPLY
+
+def create_stub_app(
+    latency_ms: float = 0.0,
+    distribution: str = "fixed",
+    jitter_ms: float = 0.0,
+    sigma: float = 0.5,
+    error_rate: float = 0.0,
+    error_status: int = 503,
+    retry_after: Optional[float] = None,
+    stream_chunks: int = 8,
+    chunk_delay_ms: float = 0.0,
+    embedding_dim: int = 3,
+    seed: Optional[int] = None
+) -> FastAPI:
+    """
+    Create the stub Gaia application.
+    
+    Args:
+        latency_ms: Artificial server-side latency added to every response
+        distribution: Latency distribution (see LatencyModel)
+        jitter_ms: Half-width of the uniform latency distribution
+        sigma: Shape of the lognormal latency distribution
+        error_rate: Fraction of requests answered with error_status
+        error_status: Status code for injected errors (429 or 503 exercise client backoff)
+        retry_after: Optional Retry-After seconds sent with injected errors
+        stream_chunks: Number of SSE chunks a streamed reply is split into
+        chunk_delay_ms: Delay between streamed chunks
+        embedding_dim: Length of the returned embedding vectors
+        seed: Optional random seed for reproducible runs
+    
+    Returns:
+        FastAPI application serving /chat/completions and /embeddings
+    """
+    app = FastAPI(title="Gaia Stub")
+    latency = LatencyModel(latency_ms, distribution, jitter_ms, sigma, seed)
+    errors = random.Random(seed)
+    counters = {"chat_completions": 0, "streamed": 0, "embeddings": 0, "embedded_texts": 0, "errors": 0}
+    app.state.counters = counters
+    
+    def injected_error() -> Optional[JSONResponse]:
+        if error_rate <= 0 or errors.random() >= error_rate:
+            return None
+        counters["errors"] += 1
+        headers = {"Retry-After": str(retry_after)} if retry_after is not None else None
+        return JSONResponse({"error": {"message": "stub overloaded"}}, status_code=error_status, headers=headers)
+    
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        payload = await request.json()
+        counters["chat_completions"] += 1
+        delay = latency.sample()
+        if delay:
+            await asyncio.sleep(delay)
+        error = injected_error()
+        if error is not None:
+            return error
+        
+        content = _reply_for(payload)
+        if payload.get("stream"):
+            counters["streamed"] += 1
+            return StreamingResponse(_stream(content, payload), media_type="text/event-stream")
+        
+        return {
+            "id": "stub-completion",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload.get("model", "stub"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop"
+                }
+            ]
+        }
+    
+    async def _stream(content: str, payload: Dict):
+        size = max(1, -(-len(content) // max(stream_chunks, 1)))
+        for start in range(0, len(content), size):
+            if chunk_delay_ms and start:
+                await asyncio.sleep(chunk_delay_ms / 1000)
+            chunk = {
+                "id": "stub-completion",
+                "object": "chat.completion.chunk",
+                "model": payload.get("model", "stub"),
+                "choices": [{"index": 0, "delta": {"content": content[start:start + size]}}]
+            }
+            yield f"data: {json.dumps(chunk)}\n\n"
+        yield "data: [DONE]\n\n"
+    
+    @app.post("/v1/embeddings")
+    async def embeddings(request: Request):
+        payload = await request.json()
+        texts = payload.get("input", [])
+        counters["embeddings"] += 1
+        counters["embedded_texts"] += len(texts)
+        delay = latency.sample()
+        if delay:
+            await asyncio.sleep(delay)
+        error = injected_error()
+        if error is not None:
+            return error
+        return {
+            "object": "list",
+            "data": [
+                {"object": "embedding", "index": i, "embedding": [0.1 * (j + 1) for j in range(embedding_dim)]}
+                for i, _ in enumerate(texts)
+            ]
+        }
+    
+    @app.get("/v1/stats")
+    async def stats():
+        return counters
+    
+    return app
+
+def _free_port() -> int:
+    """Ask the OS for a free local TCP port."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+class StubServer:
+    """Runs the stub Gaia app (or any ASGI app) with uvicorn in a background thread."""
+    
+    def __init__(self, app: Optional[FastAPI] = None, port: Optional[int] = None):
+        self.app = app or create_stub_app()
+        self.port = port or _free_port()
+        self.server = uvicorn.Server(
+            uvicorn.Config(self.app, host="127.0.0.1", port=self.port, log_level="warning")
+        )
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+    
+    @property
+    def url(self) -> str:
+        """Base URL to use as GAIA_AGENT_ENDPOINT."""
+        return f"http://127.0.0.1:{self.port}/v1"
+    
+    def __enter__(self) -> "StubServer":
+        self.thread.start()
+        deadline = time.monotonic() + 10
+        while not self.server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError("Gaia stub server did not start")
+            time.sleep(0.01)
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        self.server.should_exit = True
+        self.thread.join(timeout=10)
+
+def add_stub_arguments(parser: argparse.ArgumentParser, prefix: str = "") -> None:
+    """Add the stub behaviour options to an argument parser."""
+    parser.add_argument(f"--{prefix}latency-ms", type=float, default=0.0)
+    parser.add_argument(f"--{prefix}distribution", choices=DISTRIBUTIONS, default="fixed")
+    parser.add_argument(f"--{prefix}jitter-ms", type=float, default=0.0)
+    parser.add_argument(f"--{prefix}sigma", type=float, default=0.5)
+    parser.add_argument(f"--{prefix}error-rate", type=float, default=0.0)
+    parser.add_argument(f"--{prefix}error-status", type=int, default=503)
+    parser.add_argument(f"--{prefix}retry-after", type=float, default=None)
+    parser.add_argument(f"--{prefix}chunk-delay-ms", type=float, default=0.0)
+    parser.add_argument(f"--{prefix}seed", type=int, default=None)
+
+def stub_options(args: argparse.Namespace, prefix: str = "") -> Dict:
+    """Collect the options added by add_stub_arguments() as create_stub_app() kwargs."""
+    prefix = prefix.replace("-", "_")
+    names = ("latency_ms", "distribution", "jitter_ms", "sigma", "error_rate", "error_status", "retry_after", "chunk_delay_ms", "seed")
+    return {name: getattr(args, prefix + name) for name in names}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+    uvicorn.run(create_stub_app(**stub_options(args)), host=args.host, port=args.port, log_level="warning")
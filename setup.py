@@ -19,8 +19,10 @@ setup(
         "faiss-cpu>=1.7.4",
         "web3>=6.11.3",
         "python-multipart>=0.0.6",
+        "orjson>=3.9.10",
         "httpx>=0.25.2",
         "tenacity>=8.2.3",
+        "numpy>=1.24.0",
         "pytest>=7.4.0",
         "pytest-cov>=4.1.0",
     ],
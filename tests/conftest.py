@@ -75,3 +75,16 @@ def sample_chat_history():
             "timestamp": "2025-05-10T12:00:01Z"
         }
     ]
+
+def pytest_addoption(parser):
+    """Add the --runslow option."""
+    parser.addoption("--runslow", action="store_true", default=False, help="run tests marked as slow")
+
+def pytest_collection_modifyitems(config, items):
+    """Skip tests marked as slow unless --runslow is given."""
+    if config.getoption("--runslow"):
+        return
+    skip_slow = pytest.mark.skip(reason="slow test, use --runslow to run")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip_slow)
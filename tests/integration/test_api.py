@@ -2,8 +2,10 @@
 Integration tests for the API endpoints.
 """
 
+import asyncio
 import pytest
 from fastapi.testclient import TestClient
+import json
 from unittest.mock import patch, MagicMock
 
 from guardianlink.api.app import app
@@ -191,3 +193,231 @@ def test_get_chat_history(mock_get_user_chat_history):
     assert len(response.json()) == 2
     assert response.json()[0]["role"] == "user"
     assert response.json()[1]["role"] == "ai"
+
+@patch("guardianlink.api.routes.get_mental_health_response_stream")
+def test_chat_with_ai_stream(mock_get_mental_health_response_stream):
+    """Test the streaming chat endpoint."""
+    async def tokens(*args, **kwargs):
+        for token in ["Take a ", "deep breath."]:
+            yield token
+    mock_get_mental_health_response_stream.side_effect = tokens
+    wallet_address = "0x" + "c" * 40
+    
+    response = client.post(
+        "/mental-health/chat/stream",
+        json={
+            "wallet_address": wallet_address,
+            "message": "I'm feeling anxious",
+            "language": "en"
+        }
+    )
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert 'data: {"token":"Take a "}' in response.text
+    assert "event: done" in response.text
+    
+    history = client.get(f"/mental-health/history/{wallet_address}").json()
+    assert [msg["content"] for msg in history] == ["I'm feeling anxious", "Take a deep breath."]
+
+@pytest.mark.asyncio
+async def test_background_work_is_tracked_and_failures_logged(caplog):
+    """Test that fire-and-forget work keeps a reference until it finishes and logs errors."""
+    from guardianlink.api.routes import background_tasks, run_in_background
+    
+    async def fail():
+        raise RuntimeError("disk full")
+    
+    task = run_in_background(fail(), "chat save")
+    assert task in background_tasks
+    await asyncio.gather(task, return_exceptions=True)
+    await asyncio.sleep(0)
+    
+    assert task not in background_tasks
+    assert "Background chat save failed: disk full" in caplog.text
+
+@pytest.mark.asyncio
+async def test_chat_stream_disconnect_during_save_stores_each_message_once():
+    """Test that a client leaving while the exchange is being saved does not save it twice."""
+    from guardianlink.api.routes import background_tasks, chat_with_ai_stream
+    from guardianlink.models.schemas import ChatMessage
+    
+    saved = []
+    saving_reply = asyncio.Event()
+    finish_save = asyncio.Event()
+    
+    async def tokens(*args, **kwargs):
+        yield "Breathe."
+    
+    async def save_chat_message(wallet_address, role, content):
+        if role == "ai":
+            saving_reply.set()
+            await finish_save.wait()
+        saved.append((role, content))
+    
+    with patch("guardianlink.api.routes.get_mental_health_response_stream", side_effect=tokens), \
+            patch("guardianlink.api.routes.save_chat_message", side_effect=save_chat_message), \
+            patch("guardianlink.api.routes.update_conversation_summary", side_effect=lambda wallet: asyncio.sleep(0)):
+        response = await chat_with_ai_stream(ChatMessage(wallet_address="0x" + "e" * 40, message="Help", language="en"))
+        
+        async def consume():
+            async for _ in response.body_iterator:
+                pass
+        
+        client_task = asyncio.ensure_future(consume())
+        await saving_reply.wait()
+        client_task.cancel()  # The client disconnects mid-save
+        await asyncio.gather(client_task, return_exceptions=True)
+        finish_save.set()
+        await asyncio.gather(*list(background_tasks))
+    
+    assert saved == [("user", "Help"), ("ai", "Breathe.")]
+
+@patch("guardianlink.api.routes.predict_disaster_risk")
+def test_predict_disaster_batch(mock_predict_disaster_risk):
+    """Test that batch predictions are deduplicated and failures stay per item."""
+    async def predict(location, disaster_type):
+        if location == "Atlantis":
+            raise ValueError("Unknown region")
+        return {"location": location, "risk_level": "high", "recommendations": ["Evacuate"]}
+    mock_predict_disaster_risk.side_effect = predict
+    
+    response = client.post(
+        "/disaster/predict/batch",
+        json={"queries": [
+            {"location": "Accra", "disaster_type": "flood"},
+            {"location": " accra", "disaster_type": "FLOOD"},
+            {"location": "Atlantis"},
+            {"location": ""}
+        ]}
+    )
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = {tuple(line["indices"]): line for line in map(json.loads, response.text.splitlines())}
+    assert set(lines) == {(0, 1), (2,), (3,)}
+    assert lines[(0, 1)]["status"] == "ok"
+    assert lines[(0, 1)]["result"]["recommendations"] == ["Evacuate"]
+    assert lines[(2,)] == {"indices": [2], "location": "Atlantis", "disaster_type": None, "status": "error", "error": "Unknown region"}
+    assert lines[(3,)]["error"] == "Location not provided"
+    assert mock_predict_disaster_risk.call_count == 2
+
+def test_predict_disaster_batch_too_large():
+    """Test that oversized batches are rejected up front."""
+    with patch("guardianlink.api.routes.DISASTER_BATCH_MAX_QUERIES", 1):
+        response = client.post(
+            "/disaster/predict/batch",
+            json={"queries": [{"location": "Accra"}, {"location": "Lagos"}]}
+        )
+    
+    assert response.status_code == 400
+
+def test_get_nearby_disasters():
+    """Test radius and k-nearest disaster queries."""
+    response = client.get("/disaster/nearby", params={"lat": 6.45, "lng": 3.39, "radius_km": 50})
+    
+    assert response.status_code == 200
+    assert [disaster["id"] for disaster in response.json()] == ["disaster_1"]
+    assert response.json()[0]["distance_km"] < 10
+    
+    response = client.get("/disaster/nearby", params={"lat": 20.0, "lng": 75.0, "k": 2})
+    assert [disaster["id"] for disaster in response.json()] == ["disaster_2", "disaster_3"]
+    
+    assert client.get("/disaster/nearby", params={"lat": 20.0, "lng": 75.0}).status_code == 400
+    assert client.get("/disaster/nearby", params={"lat": 95.0, "lng": 75.0, "k": 1}).status_code == 422
+
+def test_active_disasters_filters_projection_and_pages():
+    """Test status filtering, field projection and cursor pagination of /disaster/active."""
+    response = client.get("/disaster/active", params={"limit": 1, "fields": "location"})
+    
+    assert response.status_code == 200
+    assert response.json() == [{"id": "disaster_1", "location": "Lagos, Nigeria"}]
+    
+    cursor = response.headers["X-Next-Cursor"]
+    response = client.get("/disaster/active", params={"limit": 1, "fields": "location", "cursor": cursor})
+    assert response.json() == [{"id": "disaster_2", "location": "Mumbai, India"}]
+    assert "X-Next-Cursor" not in response.headers
+    
+    recovering = client.get("/disaster/active", params={"status": "recovery", "type": "earthquake"}).json()
+    assert [disaster["id"] for disaster in recovering] == ["disaster_3"]
+    assert recovering[0]["coordinates"] == {"lat": 27.7172, "lng": 85.3240}
+    
+    assert client.get("/disaster/active", params={"fields": "secret"}).status_code == 400
+    assert client.get("/disaster/active", params={"cursor": "???"}).status_code == 400
+
+def test_conditional_get_with_etags():
+    """Test that If-None-Match gets a 304 until the underlying data changes."""
+    import asyncio
+    from guardianlink.services.database import save_chat_message
+    
+    wallet = "0x" + "e" * 40
+    asyncio.run(save_chat_message(wallet, "user", "Hello"))
+    
+    response = client.get(f"/mental-health/history/{wallet}")
+    etag = response.headers["ETag"]
+    assert response.status_code == 200 and etag.startswith('W/"')
+    
+    response = client.get(f"/mental-health/history/{wallet}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+    
+    asyncio.run(save_chat_message(wallet, "ai", "Hi there"))
+    response = client.get(f"/mental-health/history/{wallet}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+    assert response.headers["ETag"] != etag
+    
+    etag = client.get("/disaster/active").headers["ETag"]
+    assert client.get("/disaster/active", headers={"If-None-Match": f'"other", {etag}'}).status_code == 304
+
+def test_chat_history_pages_and_export():
+    """Test paging the chat history with cursors and exporting it as NDJSON."""
+    import asyncio
+    import json
+    from guardianlink.services.database import save_chat_message
+    
+    wallet = "0x" + "f" * 40
+    for i in range(5):
+        asyncio.run(save_chat_message(wallet, "user", f"message {i}"))
+    
+    response = client.get(f"/mental-health/history/{wallet}", params={"limit": 2})
+    assert [m["content"] for m in response.json()] == ["message 3", "message 4"]
+    cursor = response.headers["X-Next-Cursor"]
+    assert cursor == response.json()[0]["id"]
+    
+    response = client.get(f"/mental-health/history/{wallet}", params={"limit": 2, "before": cursor})
+    assert [m["content"] for m in response.json()] == ["message 1", "message 2"]
+    response = client.get(f"/mental-health/history/{wallet}", params={"limit": 2, "before": response.headers["X-Next-Cursor"]})
+    assert [m["content"] for m in response.json()] == ["message 0"]
+    assert "X-Next-Cursor" not in response.headers
+    
+    response = client.get(f"/mental-health/history/{wallet}", params={"limit": 3, "after": response.json()[0]["id"]})
+    assert [m["content"] for m in response.json()] == ["message 1", "message 2", "message 3"]
+    assert response.headers["X-Next-Cursor"] == response.json()[-1]["id"]
+    
+    assert client.get(f"/mental-health/history/{wallet}", params={"before": "missing"}).status_code == 400
+    assert client.get(f"/mental-health/history/{wallet}", params={"before": cursor, "after": cursor}).status_code == 400
+    
+    response = client.get(f"/mental-health/history/{wallet}/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert [json.loads(line)["content"] for line in response.text.splitlines()] == [f"message {i}" for i in range(5)]
+
+def test_bulk_stream_status():
+    """Test the bulk stream status endpoint."""
+    import asyncio
+    from guardianlink.services.blockchain import create_aid_stream
+    
+    stream_ids = [asyncio.run(create_aid_stream("0x" + "a" * 40, "water", "lagos", 20.0, 7)) for _ in range(3)]
+    
+    response = client.post("/disaster/streams/status", json={"stream_ids": stream_ids + ["stream_unknown"]})
+    assert response.status_code == 200
+    statuses = response.json()
+    assert [status["id"] for status in statuses] == stream_ids + ["stream_unknown"]
+    assert all(status["status"] == "active" for status in statuses[:3])
+    assert int(statuses[0]["released_wei"]) + int(statuses[0]["remaining_wei"]) == 20 * 10**18
+    assert statuses[3]["status"] == "not_found"
+    
+    response = client.post("/disaster/streams/status", json={"stream_ids": ["stream_x"] * 10001})
+    assert response.status_code == 400
@@ -3,14 +3,31 @@ Unit tests for the AI engine module.
 """
 
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 
+from guardianlink.core.cache import TTLCache
+from guardianlink.core.circuit_breaker import CircuitOpenError
+from guardianlink.core.tokens import estimate_tokens
 from guardianlink.services.ai_engine import (
+    MENTAL_HEALTH_FALLBACK_RESPONSE,
+    ConversationSummarizer,
     DisasterResponseAgent,
     MentalHealthAgent,
+    PromptTokenStats,
+    build_history_context,
+    dedupe_disaster_queries,
+    disaster_cache,
+    disaster_query_tracker,
+    disaster_warm_targets,
+    invalidate_disaster_cache,
+    parse_disaster_assessment,
     predict_disaster_risk,
     get_disaster_recommendations,
-    get_mental_health_response
+    get_mental_health_response,
+    quantize_iot_data,
+    recommendations_cache_key,
+    risk_cache_key,
+    unsummarized_messages
 )
 
 @pytest.fixture
@@ -105,3 +122,260 @@ async def test_get_mental_health_response():
         result = await get_mental_health_response("test message", [], "en")
         
         assert result == "Test response"
+
+@pytest.mark.asyncio
+async def test_assess_risk_uses_cache():
+    """Test that repeated assessments for an unknown location hit the cache."""
+    client = MagicMock()
+    client.chat_completion = AsyncMock(return_value={
+        "choices": [{"message": {"content": '{"risk_level": "high"}'}}]
+    })
+    agent = DisasterResponseAgent(client=client, cache=TTLCache(ttl_seconds=60, max_entries=10))
+    
+    first = await agent.assess_risk("Accra", "flood")
+    second = await agent.assess_risk("  accra ", "flood")
+    
+    assert first == second == {"risk_level": "high"}
+    assert client.chat_completion.call_count == 1
+    assert agent.cache.stats()["hits"] == 1
+
+@pytest.mark.asyncio
+async def test_open_circuit_falls_back():
+    """Test that both agents return their fallbacks when the circuit is open."""
+    client = MagicMock()
+    client.chat_completion = AsyncMock(side_effect=CircuitOpenError("open"))
+    
+    disaster_agent = DisasterResponseAgent(client=client, cache=TTLCache(ttl_seconds=60, max_entries=10), hedge=True)
+    recommendations = await disaster_agent.generate_recommendations("Accra", "flood", "high", {})
+    assert recommendations == ["Establish evacuation routes", "Stockpile emergency supplies", "Create communication plan"]
+    assert client.chat_completion.call_args.kwargs["hedge"] is True
+    
+    mental_health_agent = MentalHealthAgent(client=client, use_circuit_breaker=False)
+    assert await mental_health_agent.process("I feel anxious", [], "en") == MENTAL_HEALTH_FALLBACK_RESPONSE
+    assert client.chat_completion.call_args.kwargs["use_circuit_breaker"] is False
+
+@pytest.mark.asyncio
+async def test_fused_process_uses_one_call():
+    """Test that fused mode gets risk and recommendations from a single Gaia call."""
+    client = MagicMock()
+    client.chat_completion = AsyncMock(return_value={
+        "choices": [{"message": {"content": '{"risk_level": "high", "recommendations": ["Evacuate", "Boil water", "Stay tuned"]}'}}]
+    })
+    cache = TTLCache(ttl_seconds=60, max_entries=10)
+    agent = DisasterResponseAgent(client=client, cache=cache, fused=True)
+    
+    result = await agent.process("Accra", "flood")
+    again = await agent.process("Accra", "flood")
+    
+    assert result["risk_level"] == again["risk_level"] == "high"
+    assert result["recommendations"] == ["Evacuate", "Boil water", "Stay tuned"]
+    assert client.chat_completion.call_count == 1
+    assert client.chat_completion.call_args.kwargs["response_format"]["json_schema"]["strict"] is True
+    
+    # The two-step path reads the entries the fused call cached
+    two_step = DisasterResponseAgent(client=client, cache=cache, fused=False)
+    assert (await two_step.process("Accra", "flood"))["recommendations"] == result["recommendations"]
+    assert recommendations_cache_key("Accra", "flood", "high", {}) in cache
+    assert client.chat_completion.call_count == 1
+
+@pytest.mark.asyncio
+async def test_two_step_process_uses_two_calls():
+    """Test that the two-step flag keeps the sequential risk then recommendations calls."""
+    client = MagicMock()
+    client.chat_completion = AsyncMock(side_effect=[
+        {"choices": [{"message": {"content": '{"risk_level": "low"}'}}]},
+        {"choices": [{"message": {"content": '{"recommendations": ["Check drains"]}'}}]}
+    ])
+    agent = DisasterResponseAgent(client=client, cache=TTLCache(ttl_seconds=60, max_entries=10), fused=False)
+    
+    result = await agent.process("Accra", "flood")
+    
+    assert result["risk_level"] == "low"
+    assert result["recommendations"] == ["Check drains"]
+    assert client.chat_completion.call_count == 2
+
+def test_parse_disaster_assessment_is_tolerant():
+    """Test parsing of fenced JSON, invalid values and plain-text replies."""
+    fenced = 'Here you go:\n```json\n{"risk_level": "HIGH", "recommendations": ["a", "", "b", "c", "d", "e", "f"]}\n```'
+    assert parse_disaster_assessment(fenced) == {"risk_level": "high", "recommendations": ["a", "b", "c", "d", "e"]}
+    
+    assert parse_disaster_assessment('{"risk_level": "severe"}') == {"risk_level": "medium", "recommendations": []}
+    
+    text = "Risk: Low\n1. Clear gutters\n2) Pack a go-bag\n- Know your route"
+    assert parse_disaster_assessment(text) == {
+        "risk_level": "low",
+        "recommendations": ["Clear gutters", "Pack a go-bag", "Know your route"]
+    }
+
+def test_dedupe_disaster_queries():
+    """Test that queries are normalized and duplicates merged in first-seen order."""
+    queries = [("Accra", "Flood"), ("  accra ", "flood"), ("Nairobi", ""), ("nairobi", None), ("Accra", None)]
+    
+    assert dedupe_disaster_queries(queries) == [
+        ("Accra", "flood", [0, 1]),
+        ("Nairobi", None, [2, 3]),
+        ("Accra", None, [4])
+    ]
+
+def test_quantize_iot_data():
+    """Test that close sensor readings share a cache key."""
+    assert quantize_iot_data({"water_level": "3.24m", "rainfall": "121mm/day"}) == \
+        quantize_iot_data({"rainfall": "118mm/day", "water_level": "3.21m"})
+    assert quantize_iot_data({"drainage_capacity": "65%"}) == (("drainage_capacity", "65%"),)
+
+def test_invalidate_disaster_cache():
+    """Test invalidation by location."""
+    disaster_cache.set(risk_cache_key("Accra", "flood"), {"risk_level": "high"})
+    disaster_cache.set(risk_cache_key("Nairobi", "flood"), {"risk_level": "low"})
+    
+    assert invalidate_disaster_cache(location="ACCRA") == 1
+    assert risk_cache_key("Nairobi", "flood") in disaster_cache
+    
+    invalidate_disaster_cache()
+    assert len(disaster_cache) == 0
+
+def test_disaster_save_invalidates_cached_predictions():
+    """Test that saving a disaster drops the cached predictions for its location."""
+    from guardianlink.services.database import disaster_repository
+    
+    disaster_cache.set(risk_cache_key("Lagos ", "Flood "), {"risk_level": "high"})
+    disaster_cache.set(risk_cache_key("lagos", None), {"risk_level": "high"})
+    disaster_cache.set(risk_cache_key("Lagos", "earthquake"), {"risk_level": "low"})
+    assert risk_cache_key("Lagos ", "Flood ") == risk_cache_key("lagos", "flood")
+    
+    disaster_repository.save({
+        "id": "disaster_test_invalidation",
+        "type": "flood",
+        "location": "Lagos",
+        "coordinates": {"lat": 6.5, "lng": 3.4},
+        "severity": "high",
+        "status": "active",
+        "aid_streams": []
+    })
+    
+    assert risk_cache_key("lagos", "flood") not in disaster_cache
+    assert risk_cache_key("lagos", None) not in disaster_cache
+    assert risk_cache_key("lagos", "earthquake") in disaster_cache
+    invalidate_disaster_cache()
+
+def _history(count):
+    return [
+        {"id": f"m{i}", "role": "user" if i % 2 == 0 else "ai", "content": f"message {i}", "timestamp": f"2025-05-01T00:00:{i:02d}"}
+        for i in range(count)
+    ]
+
+@pytest.mark.asyncio
+async def test_summarizer_folds_only_new_messages():
+    """Test that summary updates are incremental and keep the recent window raw."""
+    client = MagicMock()
+    client.chat_completion = AsyncMock(side_effect=[
+        {"choices": [{"message": {"content": "First summary"}}]},
+        {"choices": [{"message": {"content": "Second summary"}}]}
+    ])
+    summarizer = ConversationSummarizer(client=client, cache=TTLCache(ttl_seconds=60, max_entries=10), keep_recent=2, min_new=2)
+    history = _history(3)
+    
+    # Only one message has left the recent window: not worth a call yet
+    assert await summarizer.update("0xabc", history) is False
+    
+    history = _history(6)
+    assert await summarizer.update("0xabc", history) is True
+    assert summarizer.get("0xabc") == {"summary": "First summary", "last_message_id": "m3", "messages": 4}
+    
+    history = _history(8)
+    assert await summarizer.update("0xabc", history) is True
+    prompt = client.chat_completion.call_args.kwargs["messages"][1]["content"]
+    assert "First summary" in prompt
+    assert "message 4" in prompt and "message 5" in prompt and "message 3" not in prompt
+    assert summarizer.get("0xabc")["messages"] == 6
+
+@pytest.mark.asyncio
+async def test_summarizer_keeps_summary_on_failure():
+    """Test that a failed update keeps the old summary and retries the same messages."""
+    client = MagicMock()
+    client.chat_completion = AsyncMock(side_effect=CircuitOpenError("open"))
+    cache = TTLCache(ttl_seconds=60, max_entries=10)
+    cache.set("0xabc", {"summary": "Old", "last_message_id": "m1", "messages": 2})
+    summarizer = ConversationSummarizer(client=client, cache=cache, keep_recent=0, min_new=1)
+    
+    assert await summarizer.update("0xabc", _history(4)) is False
+    assert summarizer.get("0xabc")["summary"] == "Old"
+    assert summarizer.stats()["failures"] == 1
+
+def test_unsummarized_messages_by_id():
+    """Test that covered messages are found by id, whatever their timestamps."""
+    history = _history(6)
+    # Clocks set back (e.g. a DST fall-back) and messages sharing a timestamp
+    for msg in history[3:]:
+        msg["timestamp"] = "2025-05-01T00:00:00"
+    
+    assert [m["id"] for m in unsummarized_messages(history, {"last_message_id": "m3"})] == ["m4", "m5"]
+    assert unsummarized_messages(history, {"last_message_id": "m5"}) == []
+    # The last folded message has left the history window: everything loaded is newer
+    assert unsummarized_messages(history[4:], {"last_message_id": "m3"}) == history[4:]
+
+def test_build_history_context_respects_budget():
+    """Test that the context holds the summary and the newest turns that fit."""
+    history = _history(10)
+    state = {"summary": "User is anxious about exams.", "last_message_id": "m5", "messages": 6}
+    
+    context = build_history_context(history, state, budget=30)
+    
+    assert context.startswith("Summary of earlier conversation: User is anxious about exams.")
+    assert "message 9" in context and "message 8" in context
+    assert "message 5" not in context
+    assert estimate_tokens(context) <= 30
+    
+    # Without a summary, a single oversized turn is truncated rather than dropped
+    long_turn = [{"role": "user", "content": "word " * 200, "timestamp": "2025-05-01T00:00:00"}]
+    assert build_history_context(long_turn, None, budget=10).startswith("User: word")
+
+@pytest.mark.asyncio
+async def test_build_messages_records_prompt_savings():
+    """Test that prompt token stats compare against the legacy raw history."""
+    client = MagicMock()
+    stats = PromptTokenStats()
+    summarizer = ConversationSummarizer(client=client, cache=TTLCache(ttl_seconds=60, max_entries=10))
+    history = [{"role": "user", "content": "x" * 4000, "timestamp": f"2025-05-01T00:00:0{i}"} for i in range(5)]
+    agent = MentalHealthAgent(client=client, summarizer=summarizer, history_token_budget=100, token_stats=stats)
+    
+    await agent.build_messages("hello", history, "en", "0xabc")
+    
+    result = stats.stats()
+    assert result["prompts"] == 1
+    assert result["avg_history_tokens"] <= 100
+    assert result["avg_legacy_history_tokens"] > 5000
+    assert result["saved_ratio"] > 0.5
+
+@pytest.mark.asyncio
+async def test_refresh_agent_recomputes_cached_prediction():
+    """Test that a refreshing agent skips cache reads but updates the cache."""
+    client = MagicMock()
+    client.chat_completion = AsyncMock(side_effect=[
+        {"choices": [{"message": {"content": '{"risk_level": "low", "recommendations": ["Check drains"]}'}}]},
+        {"choices": [{"message": {"content": '{"risk_level": "high", "recommendations": ["Evacuate"]}'}}]}
+    ])
+    cache = TTLCache(ttl_seconds=60, max_entries=10)
+    
+    await DisasterResponseAgent(client=client, cache=cache, fused=True).process("Accra", "flood")
+    await DisasterResponseAgent(client=client, cache=cache, fused=True, priority=2, refresh=True).process("Accra", "flood")
+    result = await DisasterResponseAgent(client=client, cache=cache, fused=True).process("Accra", "flood")
+    
+    assert result["risk_level"] == "high"
+    assert client.chat_completion.call_count == 2
+    assert client.chat_completion.call_args.kwargs["priority"] == 2
+
+@pytest.mark.asyncio
+async def test_disaster_warm_targets():
+    """Test that active disasters and hot locations are warmed, mock locations are not."""
+    for _ in range(3):
+        disaster_query_tracker.record(("accra", "flood"))
+        disaster_query_tracker.record(("lagos", "flood"))
+    
+    targets = await disaster_warm_targets()
+    
+    assert ("Lagos, Nigeria", "flood") in targets
+    assert ("Mumbai, India", "cyclone") in targets
+    assert ("Kathmandu, Nepal", "earthquake") not in targets  # In recovery
+    assert ("accra", "flood") in targets
+    assert ("lagos", "flood") not in targets  # Served from MOCK_DISASTER_DATA
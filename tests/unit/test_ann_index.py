@@ -0,0 +1,142 @@
+"""
+Unit tests for the IVF approximate nearest-neighbour index, including a
+recall-vs-latency comparison against exact search.
+"""
+
+import time
+
+import numpy as np
+import pytest
+
+from guardianlink.core.ann_index import IVFIndex
+from guardianlink.core.vector_store import VectorStore
+from guardianlink.services.ai_engine import Document
+
+def clustered_vectors(count, dim, clusters, seed=0):
+    """Gaussian blobs around random centres, like real embedding corpora."""
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, count)
+    return centres[labels] + 0.35 * rng.standard_normal((count, dim)).astype(np.float32)
+
+def make_docs(count, languages=("en", "sw")):
+    return [Document(page_content=str(i), metadata={"language": languages[i % len(languages)]}) for i in range(count)]
+
+def build_pair(count, dim, nlist):
+    vectors = clustered_vectors(count, dim, clusters=nlist)
+    docs = make_docs(count)
+    ids = [str(i) for i in range(count)]
+    exact = VectorStore(dim=dim)
+    exact.add_documents(docs, vectors, ids=ids)
+    ann = IVFIndex(dim=dim, nlist=nlist, train_threshold=count)
+    ann.add_documents(docs, vectors, ids=ids)
+    return exact, ann
+
+def recall_at_k(exact, ann, queries, k, **search_kwargs):
+    """Fraction of exact top-k neighbours found by the ANN index."""
+    truth = exact.search(queries, k=k, **{key: value for key, value in search_kwargs.items() if key != "nprobe"})
+    found = ann.search(queries, k=k, **search_kwargs)
+    hits = sum(
+        len({doc.page_content for doc, _ in expected} & {doc.page_content for doc, _ in approx})
+        for expected, approx in zip(truth, found)
+    )
+    return hits / (k * len(queries))
+
+def test_untrained_index_is_exact():
+    """Test that search is exhaustive before training."""
+    index = IVFIndex(dim=2, nlist=4)
+    index.add_documents(make_docs(3), [[1, 0], [0, 1], [1, 1]], ids=["a", "b", "c"])
+    
+    assert not index.is_trained
+    assert [doc.page_content for doc, _ in index.search([1, 0], k=2)[0]] == ["0", "2"]
+
+def test_recall_improves_with_nprobe():
+    """Test that recall is high and grows with nprobe."""
+    exact, ann = build_pair(4000, 16, nlist=32)
+    queries = clustered_vectors(50, 16, clusters=32, seed=1)
+    
+    low = recall_at_k(exact, ann, queries, 10, nprobe=1)
+    high = recall_at_k(exact, ann, queries, 10, nprobe=8)
+    
+    assert ann.is_trained
+    assert high >= low
+    assert high >= 0.9
+
+def test_partition_filter_and_incremental_insert():
+    """Test partition filtering and inserts after training."""
+    _, ann = build_pair(2000, 8, nlist=16)
+    new_vector = np.ones(8, dtype=np.float32)
+    ann.add_documents([Document(page_content="new", metadata={"language": "hi"})], [new_vector], ids=["new"])
+    
+    results = ann.search(new_vector, k=3, partition="hi", nprobe=16)[0]
+    
+    assert [doc.page_content for doc, _ in results] == ["new"]
+    assert ann.partition_size("hi") == 1
+
+def test_filtered_search_reads_only_probed_rows(monkeypatch):
+    """Test that filtered searches on a trained index match exact results without a full-size mask."""
+    exact, ann = build_pair(2000, 8, nlist=8)
+    ann.delete(["0", "1"])
+    exact.delete(["0", "1"])
+    queries = clustered_vectors(5, 8, clusters=8, seed=4)
+    
+    def full_mask(*args):
+        raise AssertionError("trained searches must not build a mask over every row")
+    
+    monkeypatch.setattr(ann, "_mask", full_mask)
+    found = ann.search(queries, k=5, partition="sw", nprobe=8)
+    expected = exact.search(queries, k=5, partition="sw")
+    
+    for approx, truth in zip(found, expected):
+        assert [doc.page_content for doc, _ in approx] == [doc.page_content for doc, _ in truth]
+        assert all(doc.metadata["language"] == "sw" for doc, _ in approx)
+
+def test_delete_and_reuse_has_no_duplicates():
+    """Test that reused rows are not returned twice."""
+    _, ann = build_pair(1000, 8, nlist=8)
+    vector = np.ones(8, dtype=np.float32)
+    ann.add_documents([Document(page_content="x", metadata={"language": "en"})], [vector], ids=["x"])
+    ann.delete(["x"])
+    ann.add_documents([Document(page_content="y", metadata={"language": "en"})], [vector], ids=["y"])
+    
+    results = ann.search(vector, k=2, nprobe=8)[0]
+    
+    assert [doc.page_content for doc, _ in results].count("y") == 1
+    assert "x" not in [doc.page_content for doc, _ in results]
+
+def test_snapshot_round_trip(tmp_path):
+    """Test save/load keeps documents, centroids and results."""
+    _, ann = build_pair(1000, 8, nlist=8)
+    query = clustered_vectors(1, 8, clusters=8, seed=2)
+    before = [doc.page_content for doc, _ in ann.search(query, k=5)[0]]
+    
+    ann.save(str(tmp_path))
+    restored = IVFIndex.load(str(tmp_path), document_factory=Document)
+    
+    assert restored.is_trained
+    assert np.allclose(restored.centroids, ann.centroids)
+    assert [doc.page_content for doc, _ in restored.search(query, k=5)[0]] == before
+
+@pytest.mark.slow
+def test_recall_vs_latency_against_exact():
+    """Benchmark recall@10 and per-query latency across nprobe values."""
+    count, dim, nlist = 200_000, 64, 512
+    exact, ann = build_pair(count, dim, nlist)
+    queries = clustered_vectors(100, dim, clusters=nlist, seed=3)
+    
+    def latency(index, **kwargs):
+        start = time.perf_counter()
+        for query in queries:
+            index.search(query, k=10, **kwargs)
+        return (time.perf_counter() - start) / len(queries) * 1000
+    
+    exact_ms = latency(exact)
+    print(f"\nexact: {exact_ms:.2f} ms/query")
+    rows = []
+    for nprobe in (1, 4, 16, 64):
+        rows.append((nprobe, recall_at_k(exact, ann, queries, 10, nprobe=nprobe), latency(ann, nprobe=nprobe)))
+        print(f"nprobe={nprobe:<4} recall@10={rows[-1][1]:.3f} {rows[-1][2]:.2f} ms/query")
+    
+    assert [recall for _, recall, _ in rows] == sorted(recall for _, recall, _ in rows)
+    assert rows[2][1] >= 0.9
+    assert rows[1][2] < exact_ms
@@ -0,0 +1,52 @@
+"""
+Unit tests for the micro-batching queue.
+"""
+
+import asyncio
+import pytest
+
+from guardianlink.core.batching import MicroBatcher
+
+@pytest.mark.asyncio
+async def test_concurrent_items_share_a_batch():
+    """Test that concurrent submissions are sent together and results routed back."""
+    batches = []
+    
+    async def upper(items):
+        batches.append(list(items))
+        return [item.upper() for item in items]
+    
+    batcher = MicroBatcher(upper, max_batch_size=10, max_wait_ms=5)
+    results = await asyncio.gather(*(batcher.submit(text) for text in ["a", "b", "c"]))
+    
+    assert results == ["A", "B", "C"]
+    assert batches == [["a", "b", "c"]]
+    assert batcher.stats()["avg_batch_size"] == 3
+
+@pytest.mark.asyncio
+async def test_full_batch_is_sent_without_waiting():
+    """Test that batches are split at max_batch_size."""
+    sizes = []
+    
+    async def echo(items):
+        sizes.append(len(items))
+        return items
+    
+    batcher = MicroBatcher(echo, max_batch_size=4, max_wait_ms=1000)
+    results = await asyncio.wait_for(batcher.submit_many(list(range(8))), timeout=1)
+    
+    assert results == list(range(8))
+    assert sizes == [4, 4]
+    assert batcher.stats()["batch_size_histogram"] == {4: 2}
+
+@pytest.mark.asyncio
+async def test_batch_failure_reaches_every_caller():
+    """Test that an upstream error is raised to each waiter."""
+    async def fail(items):
+        raise RuntimeError("upstream down")
+    
+    batcher = MicroBatcher(fail, max_batch_size=10, max_wait_ms=1)
+    results = await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+    
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert batcher.stats()["failed_batches"] == 1
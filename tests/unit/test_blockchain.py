@@ -2,6 +2,7 @@
 Unit tests for the blockchain module.
 """
 
+import dataclasses
 import pytest
 from unittest.mock import patch, MagicMock
 import uuid
@@ -9,8 +10,12 @@ import uuid
 from guardianlink.services.blockchain import (
     verify_delegation,
     create_aid_stream,
+    find_stream,
+    get_stream_etag,
     get_stream_status,
-    subscribe_to_mental_health_service
+    get_stream_statuses,
+    subscribe_to_mental_health_service,
+    STREAMS
 )
 
 @pytest.mark.asyncio
@@ -106,3 +111,43 @@ async def test_subscribe_to_mental_health_service():
         
         assert subscription_id.startswith("subscription_")
         assert len(subscription_id) > 15
+
+@pytest.mark.asyncio
+async def test_get_stream_etag():
+    """Test that a stream's ETag is stable once it has ended and changes with its version."""
+    assert get_stream_etag("stream_missing") is None
+    
+    stream_id = await create_aid_stream("0x" + "a" * 40, "water", "lagos", 1.0, 1)
+    assert get_stream_etag(stream_id).count("-") == 2  # running: tagged with the current second
+    
+    stream = find_stream(stream_id)
+    STREAMS[stream.id] = dataclasses.replace(stream, end_time=stream.start_time)
+    ended = get_stream_etag(stream_id)
+    await get_stream_status(stream_id)
+    assert get_stream_etag(stream_id) == ended
+    
+    other = await create_aid_stream("0x" + "a" * 40, "food", "lagos", 1.0, 1)
+    assert get_stream_etag(stream_id) == ended
+    assert get_stream_etag(other) != ended
+
+@pytest.mark.asyncio
+async def test_get_stream_statuses():
+    """Test that bulk statuses match the single-stream status, in request order."""
+    large = await create_aid_stream("0x" + "a" * 40, "shelter", "lagos", 2500.0, 30)
+    small = await subscribe_to_mental_health_service("0x" + "a" * 40, "anxiety_support", 4)
+    stream = find_stream(large)
+    
+    with patch("guardianlink.services.blockchain.now_micros", return_value=stream.start_time + 10 * 86400 * 10**6):
+        statuses = await get_stream_statuses([small, "stream_missing", large])
+        single = await get_stream_status(large)
+    
+    assert [status["id"] for status in statuses] == [small, "stream_missing", large]
+    assert statuses[1] == {"id": "stream_missing", "status": "not_found"}
+    assert statuses[2]["status"] == "active"
+    assert int(statuses[2]["released_wei"]) == 2500 * 10**18 // 3  # 10 of 30 days, exact
+    assert int(statuses[2]["released_wei"]) + int(statuses[2]["remaining_wei"]) == 2500 * 10**18
+    assert (statuses[2]["released"], statuses[2]["remaining"]) == (single["released"], single["remaining"])
+    
+    with patch("guardianlink.services.blockchain.now_micros", return_value=stream.end_time):
+        ended = (await get_stream_statuses([large]))[0]
+    assert (ended["status"], ended["released"], ended["remaining"]) == ("completed", 2500.0, 0)
@@ -0,0 +1,78 @@
+"""
+Unit tests for the TTL + LRU result cache.
+"""
+
+import pytest
+
+from guardianlink.core.cache import TTLCache
+
+class FakeClock:
+    """Manually advanced clock for TTL tests."""
+    
+    def __init__(self):
+        self.now = 0.0
+        
+    def __call__(self):
+        return self.now
+
+def test_get_set_and_ratios():
+    """Test hits, misses and ratios."""
+    cache = TTLCache(ttl_seconds=60, max_entries=10)
+    
+    assert cache.get("lagos") is None
+    cache.set("lagos", {"risk_level": "high"})
+    assert cache.get("lagos") == {"risk_level": "high"}
+    
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_ratio"] == 0.5
+
+def test_entries_expire_after_ttl():
+    """Test that entries are dropped after their TTL."""
+    clock = FakeClock()
+    cache = TTLCache(ttl_seconds=10, max_entries=10, clock=clock)
+    cache.set("lagos", "high")
+    
+    clock.now = 9
+    assert cache.expires_in("lagos") == 1
+    assert cache.get("lagos") == "high"
+    
+    clock.now = 10
+    assert cache.get("lagos") is None
+    assert cache.stats()["expirations"] == 1
+
+def test_lru_eviction_by_entry_count():
+    """Test that the least recently used entry is evicted first."""
+    cache = TTLCache(ttl_seconds=60, max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+    assert cache.stats()["evictions"] == 1
+
+def test_lru_eviction_by_memory():
+    """Test that the byte budget is enforced."""
+    cache = TTLCache(ttl_seconds=60, max_entries=100, max_bytes=100, sizeof=lambda key, value: 40)
+    for key in range(5):
+        cache.set(key, "x")
+    
+    assert len(cache) == 2
+    assert cache.bytes == 80
+
+def test_invalidation():
+    """Test explicit invalidation."""
+    cache = TTLCache(ttl_seconds=60, max_entries=10)
+    cache.set(("risk", "lagos", "flood"), "high")
+    cache.set(("risk", "lagos", "any"), "high")
+    cache.set(("risk", "accra", "flood"), "low")
+    
+    assert cache.invalidate(("risk", "accra", "flood")) is True
+    assert cache.invalidate(("risk", "accra", "flood")) is False
+    assert cache.invalidate_where(lambda key: key[1] == "lagos") == 2
+    assert len(cache) == 0
+    assert cache.bytes == 0
@@ -0,0 +1,128 @@
+"""
+Unit tests for the cache warmer and hot key tracking.
+"""
+
+import asyncio
+import pytest
+
+from guardianlink.core.cache import TTLCache
+from guardianlink.core.cache_warmer import CacheWarmer, HotKeyTracker
+
+async def no_sleep(seconds):
+    pass
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+def test_hot_key_tracker_ranks_and_decays():
+    """Test ranking, the minimum count filter and decay of stale keys over time."""
+    clock = FakeClock()
+    tracker = HotKeyTracker(max_keys=10, half_life=60, min_count=0.6, clock=clock)
+    for key, count in (("lagos", 5), ("mumbai", 3), ("accra", 1)):
+        for _ in range(count):
+            tracker.record(key)
+    
+    assert tracker.top(2) == ["lagos", "mumbai"]
+    assert tracker.top(5, min_count=2) == ["lagos", "mumbai"]
+    
+    clock.now = 60
+    assert tracker.count("lagos") == 2.5
+    tracker.decay()
+    assert "accra" not in tracker.counts
+    assert tracker.count("lagos") == 2.5
+    
+    tracker.record("accra")
+    assert tracker.top(5, min_count=1) == ["lagos", "mumbai", "accra"]
+
+def test_hot_key_tracker_decay_follows_time_not_calls():
+    """Test that counts age by elapsed time however often decay() runs."""
+    clock = FakeClock()
+    often = HotKeyTracker(half_life=30, min_count=0.01, clock=clock)
+    rarely = HotKeyTracker(half_life=30, min_count=0.01, clock=clock)
+    for tracker in (often, rarely):
+        for _ in range(8):
+            tracker.record("lagos")
+    
+    for second in range(1, 91):
+        clock.now = second
+        often.decay()
+    rarely.decay()
+    
+    assert often.count("lagos") == pytest.approx(1.0)
+    assert rarely.count("lagos") == pytest.approx(1.0)
+
+def test_hot_key_tracker_is_bounded():
+    """Test that rarely requested keys are pruned when the tracker fills up."""
+    tracker = HotKeyTracker(max_keys=5)
+    for _ in range(3):
+        tracker.record("hot")
+    for i in range(20):
+        tracker.record(f"cold_{i}")
+    
+    assert len(tracker) <= 10
+    assert tracker.top(1) == ["hot"]
+
+@pytest.mark.asyncio
+async def test_run_once_refreshes_only_due_keys():
+    """Test that fresh entries are skipped and missing or expiring ones recomputed."""
+    now = [0.0]
+    cache = TTLCache(ttl_seconds=100, max_entries=10, clock=lambda: now[0])
+    cache.set("fresh", 1)
+    cache.set("expiring", 1, ttl_seconds=5)
+    warmed = []
+    
+    async def targets():
+        return ["fresh", "expiring", "missing"]
+    
+    async def warm(key):
+        warmed.append(key)
+        cache.set(key, 2)
+    
+    warmer = CacheWarmer(targets, warm, cache.expires_in, interval=10, refresh_ahead=20, concurrency=2, sleep=no_sleep)
+    
+    assert await warmer.run_once() == 2
+    assert sorted(warmed) == ["expiring", "missing"]
+    assert warmer.stats()["skipped"] == 1
+    
+    # Nothing is due right after a refresh
+    assert await warmer.run_once() == 0
+
+@pytest.mark.asyncio
+async def test_failures_do_not_stop_other_refreshes():
+    """Test that one failing key is counted and the rest still refresh."""
+    async def targets():
+        return ["a", "b", "c"]
+    
+    async def warm(key):
+        if key == "b":
+            raise RuntimeError("Gaia unavailable")
+    
+    warmer = CacheWarmer(targets, warm, lambda key: None, sleep=no_sleep)
+    
+    assert await warmer.run_once() == 2
+    assert warmer.stats()["failures"] == 1
+
+@pytest.mark.asyncio
+async def test_start_and_stop():
+    """Test that the background loop runs cycles until stopped."""
+    cycles = asyncio.Event()
+    
+    async def targets():
+        cycles.set()
+        return []
+    
+    async def warm(key):
+        pass
+    
+    warmer = CacheWarmer(targets, warm, lambda key: None, interval=0.01, jitter=0)
+    warmer.start()
+    await asyncio.wait_for(cycles.wait(), timeout=1)
+    assert warmer.running
+    
+    await warmer.stop()
+    assert not warmer.running
+    assert warmer.stats()["cycles"] >= 1
@@ -0,0 +1,184 @@
+"""
+Unit tests for the chat history backends.
+"""
+
+import asyncio
+import sqlite3
+
+import pytest
+
+from guardianlink.services.chat_store import (
+    ChatStore,
+    MemoryChatStore,
+    MessageNotFoundError,
+    RecentChatCache,
+    SQLiteChatStore,
+    create_chat_store
+)
+
+def message(i, timestamp=None):
+    return {
+        "id": f"m{i}",
+        "role": "user" if i % 2 == 0 else "ai",
+        "content": f"message {i}",
+        "timestamp": timestamp or f"2025-01-01T00:00:{i:02d}"
+    }
+
+@pytest.mark.asyncio
+async def test_memory_store():
+    """Test the in-memory backend and its ETags."""
+    store = MemoryChatStore()
+    etag = await store.etag("0xa")
+    
+    await store.append("0xa", message(0))
+    
+    assert await store.get_history("0xa") == [message(0)]
+    assert await store.get_history("0xb") == []
+    assert await store.etag("0xa") != etag
+    with pytest.raises(ValueError):
+        create_chat_store("postgres")
+
+def test_incomplete_backend_cannot_be_created():
+    """Test that a backend missing part of the interface fails on construction, not on first use."""
+    class AppendOnlyStore(ChatStore):
+        async def append(self, wallet_address, message):
+            return 1
+    
+    with pytest.raises(TypeError, match="get_history"):
+        AppendOnlyStore()
+
+@pytest.mark.asyncio
+async def test_sqlite_store_batches_concurrent_writes(tmp_path):
+    """Test that concurrent appends are committed together and read back in order."""
+    store = SQLiteChatStore(str(tmp_path / "chat.db"), batch_size=64)
+    await store.start()
+    
+    await asyncio.gather(*(store.append(f"0x{i % 4}", message(i)) for i in range(40)))
+    
+    history = await store.get_history("0x1")
+    assert [m["id"] for m in history] == [f"m{i}" for i in range(1, 40, 4)]
+    assert history[0] == message(1)
+    assert store.written == 40
+    assert store.batches < 40
+    await store.aclose()
+
+@pytest.mark.asyncio
+async def test_sqlite_store_is_durable(tmp_path):
+    """Test WAL mode, persistence across reopening and ETags taken from the database."""
+    path = str(tmp_path / "chat.db")
+    store = SQLiteChatStore(path)
+    await store.append("0xa", message(2))
+    await store.append("0xa", message(1))
+    etag = await store.etag("0xa")
+    await store.aclose()
+    
+    reopened = SQLiteChatStore(path)
+    assert [m["id"] for m in await reopened.get_history("0xa")] == ["m1", "m2"]
+    assert await reopened.etag("0xa") == etag
+    assert await reopened.etag("0xb") != etag
+    
+    await reopened.append("0xa", message(0))
+    assert await reopened.etag("0xa") != etag
+    await reopened.aclose()
+    
+    connection = sqlite3.connect(path)
+    assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    plan = connection.execute(
+        "EXPLAIN QUERY PLAN SELECT id FROM chat_messages WHERE wallet_address = ? ORDER BY timestamp", ("0xa",)
+    ).fetchall()
+    assert "chat_messages_wallet_time" in str(plan)
+    connection.close()
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+def test_recent_cache_ring_buffer_and_versions():
+    """Test that buffers keep the newest messages and drop themselves on a missed write."""
+    cache = RecentChatCache(max_messages=3, max_bytes=10**6)
+    assert cache.get("0xa") is None
+    
+    cache.put("0xa", [message(i) for i in range(5)], 5)
+    assert cache.append("0xa", message(5), 6)
+    entry = cache.get("0xa")
+    assert [m.to_dict() for m in entry.messages] == [message(3), message(4), message(5)]
+    assert entry.count == 6
+    
+    # Count 8 means message 7 was written elsewhere: the buffer is stale
+    assert not cache.append("0xa", message(8), 8)
+    assert cache.get("0xa") is None
+    assert not cache.append("0xb", message(0), 1)
+    assert cache.bytes == 0
+
+def test_recent_cache_evicts_idle_and_least_recently_used():
+    """Test TTL expiry and the memory cap."""
+    clock = FakeClock()
+    one_wallet = RecentChatCache(max_messages=4, clock=clock)
+    one_wallet.put("0xa", [message(i) for i in range(4)], 4)
+    cap = one_wallet.bytes * 2
+    
+    cache = RecentChatCache(max_messages=4, max_bytes=cap, ttl=60, clock=clock)
+    cache.put("0xa", [message(i) for i in range(4)], 4)
+    cache.put("0xb", [message(i) for i in range(4)], 4)
+    clock.now = 30
+    cache.get("0xa")
+    cache.put("0xc", [message(i) for i in range(4)], 4)
+    
+    assert cache.get("0xb") is None
+    assert cache.evictions == 1
+    assert cache.bytes <= cap
+    
+    clock.now = 89
+    assert cache.get("0xc") is not None
+    clock.now = 120
+    assert cache.get("0xa") is None
+    assert len(cache) == 1 and cache.expirations == 1
+
+@pytest.mark.asyncio
+async def test_sqlite_store_counts_per_wallet_across_writers(tmp_path):
+    """Test per-wallet counts and recent reads when two stores share one file, like two workers."""
+    path = str(tmp_path / "chat.db")
+    first, second = SQLiteChatStore(path), SQLiteChatStore(path)
+    
+    counts = await asyncio.gather(*(first.append("0xa", message(i)) for i in range(5)))
+    assert sorted(counts) == [1, 2, 3, 4, 5]
+    assert await second.append("0xa", message(5)) == 6
+    assert await first.append("0xb", message(0)) == 1
+    
+    recent, count = await first.get_recent("0xa", 2)
+    assert [m["id"] for m in recent] == ["m4", "m5"]
+    assert count == 6 == await first.count("0xa")
+    assert await first.count("0xc") == 0
+    await first.aclose()
+    await second.aclose()
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+async def test_pages_and_export(tmp_path, backend):
+    """Test cursor pages in both directions and the chunked export on both backends."""
+    store = MemoryChatStore() if backend == "memory" else SQLiteChatStore(str(tmp_path / "chat.db"))
+    for i in range(7):
+        await store.append("0xa", message(i))
+    await store.append("0xb", message(7))
+    
+    page, more = await store.get_page("0xa", 3)
+    assert [m["id"] for m in page] == ["m4", "m5", "m6"] and more
+    page, more = await store.get_page("0xa", 3, before="m4")
+    assert [m["id"] for m in page] == ["m1", "m2", "m3"] and more
+    page, more = await store.get_page("0xa", 3, before="m1")
+    assert [m["id"] for m in page] == ["m0"] and not more
+    page, more = await store.get_page("0xa", 3, after="m2")
+    assert [m["id"] for m in page] == ["m3", "m4", "m5"] and more
+    page, more = await store.get_page("0xa", 3, after="m5")
+    assert [m["id"] for m in page] == ["m6"] and not more
+    assert await store.get_page("0xa", 3, after="m6") == ([], False)
+    with pytest.raises(MessageNotFoundError):
+        await store.get_page("0xa", 3, before="m7")
+    
+    exported = [m async for m in store.iter_history("0xa", chunk_size=2)]
+    assert exported == [message(i) for i in range(7)]
+    assert [m async for m in store.iter_history("0xc")] == []
+    await store.aclose()
@@ -0,0 +1,95 @@
+"""
+Unit tests for the circuit breaker.
+"""
+
+import pytest
+
+from guardianlink.core.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+def test_opens_after_consecutive_failures():
+    """Test that the circuit opens at the failure threshold and rejects calls."""
+    breaker = CircuitBreaker(failure_threshold=3, clock=FakeClock())
+    
+    for _ in range(3):
+        breaker.record(breaker.allow(), False)
+    
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+    assert breaker.stats() == {"state": "open", "consecutive_failures": 3, "rejected": 1, "opened": 1, "stale": 0}
+
+def test_success_resets_failure_count():
+    """Test that only consecutive failures count."""
+    breaker = CircuitBreaker(failure_threshold=2, clock=FakeClock())
+    
+    breaker.record(breaker.allow(), False)
+    breaker.record(breaker.allow(), True)
+    breaker.record(breaker.allow(), False)
+    
+    assert breaker.state == "closed"
+
+def test_half_open_probe():
+    """Test that one probe is allowed after the reset timeout."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.record(breaker.allow(), False)
+    
+    clock.now = 10
+    probe = breaker.allow()
+    assert breaker.state == "half_open"
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+    
+    # A failed probe reopens for another timeout
+    breaker.record(probe, False)
+    assert breaker.state == "open"
+    clock.now = 15
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+    
+    clock.now = 20
+    breaker.record(breaker.allow(), True)
+    assert breaker.state == "closed"
+    breaker.allow()
+
+def test_neutral_outcome_releases_probe():
+    """Test that a cancelled probe lets the next call probe instead."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=1, clock=clock)
+    breaker.record(breaker.allow(), False)
+    clock.now = 1
+    
+    breaker.record(breaker.allow(), None)
+    
+    breaker.allow()
+    assert breaker.state == "half_open"
+
+def test_stale_outcomes_are_ignored():
+    """Test that calls admitted before the circuit opened cannot close it or free the probe slot."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    slow_success = breaker.allow()
+    slow_failure = breaker.allow()
+    breaker.record(breaker.allow(), False)
+    assert breaker.state == "open"
+    
+    breaker.record(slow_success, True)
+    assert breaker.state == "open"
+    
+    clock.now = 10
+    probe = breaker.allow()
+    breaker.record(slow_failure, None)
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()  # The probe is still running
+    breaker.record(slow_success, True)
+    assert breaker.state == "half_open"
+    
+    breaker.record(probe, True)
+    assert breaker.state == "closed"
+    assert breaker.stats()["stale"] == 3
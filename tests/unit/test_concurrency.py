@@ -0,0 +1,152 @@
+"""
+Unit tests for the adaptive concurrency limiter.
+"""
+
+import asyncio
+import pytest
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+from guardianlink.core.concurrency import (
+    PRIORITY_HIGH,
+    PRIORITY_LOW,
+    PRIORITY_NORMAL,
+    AdaptiveConcurrencyLimiter,
+    ConcurrencyLimitExceeded,
+    backoff_delay,
+    map_as_completed,
+    parse_retry_after
+)
+
+@pytest.mark.asyncio
+async def test_high_priority_waiters_are_served_first():
+    """Test that queued disaster calls run before queued chat calls."""
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=1)
+    order = []
+    
+    async def call(name, priority):
+        await limiter.acquire(priority)
+        order.append(name)
+        limiter.release()
+    
+    await limiter.acquire()
+    tasks = [
+        asyncio.create_task(call("chat", PRIORITY_NORMAL)),
+        asyncio.create_task(call("disaster", PRIORITY_HIGH))
+    ]
+    await asyncio.sleep(0)
+    assert limiter.stats()["queue_depth"] == 2
+    
+    limiter.release()
+    await asyncio.gather(*tasks)
+    
+    assert order == ["disaster", "chat"]
+    assert limiter.in_flight == 0
+
+@pytest.mark.asyncio
+async def test_full_queue_sheds_lowest_priority():
+    """Test that a full queue rejects or evicts the least important request."""
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=1, max_queue=1)
+    await limiter.acquire()
+    
+    low = asyncio.create_task(limiter.acquire(PRIORITY_LOW))
+    await asyncio.sleep(0)
+    
+    with pytest.raises(ConcurrencyLimitExceeded):
+        await limiter.acquire(PRIORITY_LOW)
+    
+    high = asyncio.create_task(limiter.acquire(PRIORITY_HIGH))
+    await asyncio.sleep(0)
+    with pytest.raises(ConcurrencyLimitExceeded):
+        await low
+    
+    limiter.release()
+    await high
+    assert limiter.stats()["rejected"] == 2
+    limiter.release()
+
+@pytest.mark.asyncio
+async def test_queue_timeout_rejects():
+    """Test that waiting past queue_timeout raises."""
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=1, queue_timeout=0.01)
+    await limiter.acquire()
+    
+    with pytest.raises(ConcurrencyLimitExceeded):
+        await limiter.acquire()
+    
+    assert limiter.queue_depth == 0
+
+def test_overload_decreases_and_success_increases_limit():
+    """Test the additive-increase / multiplicative-decrease policy."""
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=10, backoff_ratio=0.5)
+    
+    limiter.record(0.1)
+    assert limiter.limit > 10
+    
+    limiter.record(0.1, overloaded=True)
+    assert int(limiter.limit) == 5
+    assert limiter.stats()["overloads"] == 1
+    
+    # A second signal within the same round trip does not decrease again
+    limiter.record(0.1, overloaded=True)
+    assert int(limiter.limit) == 5
+
+def test_latency_spike_counts_as_congestion():
+    """Test that a sustained latency rise shrinks the limit."""
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=10, latency_tolerance=2.0)
+    for _ in range(200):
+        limiter.record(0.01)
+    before = limiter.limit
+    
+    limiter.record(0.5)
+    
+    assert limiter.limit < before
+    assert limiter.stats()["limit_decreases"] == 1
+
+def test_latency_jitter_is_not_congestion():
+    """Test that noisy but stable latency keeps growing the limit."""
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=10)
+    
+    for latency in [0.03, 0.1, 0.25, 0.08, 0.12, 0.05, 0.2, 0.1] * 20:
+        limiter.record(latency)
+    
+    assert limiter.stats()["limit_decreases"] == 0
+    assert limiter.limit > 10
+
+def test_parse_retry_after():
+    """Test Retry-After parsing for both seconds and HTTP dates."""
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    
+    later = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    assert 25 <= parse_retry_after(later) <= 30
+
+def test_backoff_delay_respects_retry_after_and_cap():
+    """Test that backoff never undercuts Retry-After nor exceeds the cap."""
+    for attempt in range(6):
+        assert 0 <= backoff_delay(attempt, 0.5, 4.0) <= 4.0
+    assert backoff_delay(0, 0.5, 30.0, retry_after=10) >= 10
+    assert backoff_delay(0, 0.5, 4.0, retry_after=10) == 4.0
+
+@pytest.mark.asyncio
+async def test_map_as_completed_bounds_concurrency_and_isolates_errors():
+    """Test completion-order results, the in-flight cap and per-item failures."""
+    running = 0
+    peak = 0
+    
+    async def work(item):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(item / 1000)
+        running -= 1
+        if item == 3:
+            raise ValueError("bad item")
+        return item * 10
+    
+    results = [r async for r in map_as_completed(work, [20, 3, 1, 10], limit=2)]
+    
+    assert peak == 2
+    assert [(item, result) for item, result, error in results if error is None] == [(1, 10), (10, 100), (20, 200)]
+    assert [str(error) for _, _, error in results if error is not None] == ["bad item"]
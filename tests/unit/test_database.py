@@ -0,0 +1,101 @@
+"""
+Unit tests for the in-memory disaster repository.
+"""
+
+import pytest
+
+from guardianlink.services.database import DisasterRepository, InvalidCursorError, decode_cursor, encode_cursor
+
+def make_disaster(i, status="active", disaster_type="flood", severity="high"):
+    return {
+        "id": f"disaster_{i}",
+        "type": disaster_type,
+        "location": f"City {i}",
+        "coordinates": {"lat": 0.0, "lng": float(i % 180)},
+        "severity": severity,
+        "status": status,
+        "aid_streams": []
+    }
+
+@pytest.fixture
+def repository():
+    disasters = [
+        make_disaster(i, status="active" if i % 3 else "recovery", disaster_type="flood" if i % 2 else "cyclone")
+        for i in range(30)
+    ]
+    return DisasterRepository(disasters)
+
+def test_find_filters_with_indexes(repository):
+    """Test that filters combine and results keep insertion order."""
+    found, last = repository.find({"status": "active", "type": "flood"})
+    
+    assert [d["id"] for d in found] == [f"disaster_{i}" for i in range(30) if i % 3 and i % 2]
+    assert last is None
+    assert repository.count("status", "recovery") == 10
+    
+    with pytest.raises(ValueError):
+        repository.find({"location": "City 1"})
+
+def test_find_paginates_without_gaps(repository):
+    """Test that walking pages returns every match exactly once."""
+    seen, after = [], None
+    while True:
+        page, after = repository.find({"status": "active"}, limit=7, after=after)
+        seen.extend(d["id"] for d in page)
+        if after is None:
+            break
+    
+    assert seen == [f"disaster_{i}" for i in range(30) if i % 3]
+
+def test_save_updates_indexes_in_place(repository):
+    """Test that changing an indexed field moves the record between indexes."""
+    record = repository.get("disaster_1")
+    updated = repository.save({**record, "status": "recovery", "coordinates": {"lat": 10.0, "lng": 10.0}})
+    
+    assert updated is record and record["status"] == "recovery"
+    assert "disaster_1" not in [d["id"] for d in repository.find({"status": "active"})[0]]
+    assert repository.find({"status": "recovery"})[0][0]["id"] == "disaster_0"
+    assert repository.find({"status": "recovery"})[0][1]["id"] == "disaster_1"
+    assert repository.locations.nearest(10.0, 10.0, 1)[0][0] == "disaster_1"
+    
+    repository.save(make_disaster(99))
+    assert len(repository) == 31
+    assert repository.find({"status": "active"})[0][-1]["id"] == "disaster_99"
+
+def test_save_mutated_stored_record(repository):
+    """Test saving back the dict returned by get() after changing it."""
+    record = repository.get("disaster_1")
+    record["status"] = "recovery"
+    record["severity"] = "low"
+    saved = repository.save(record)
+    
+    assert saved is record
+    assert repository.get("disaster_1")["status"] == "recovery"
+    assert repository.get("disaster_1")["location"] == "City 1"
+    assert "disaster_1" in [d["id"] for d in repository.find({"status": "recovery"})[0]]
+    assert "disaster_1" not in [d["id"] for d in repository.find({"status": "active"})[0]]
+    assert [d["id"] for d in repository.find({"severity": "low"})[0]] == ["disaster_1"]
+    assert repository.count("severity", "high") == 29
+
+def test_save_notifies_listeners(repository):
+    """Test that listeners hear about the old and new location and type of a changed record."""
+    changes = []
+    repository.listeners.append(lambda location, disaster_type: changes.append((location, disaster_type)))
+    
+    repository.save({**repository.get("disaster_1"), "location": "City 100", "type": "cyclone"})
+    assert sorted(changes) == [("City 1", "flood"), ("City 100", "cyclone")]
+    
+    changes.clear()
+    repository.get("disaster_2")["aid_streams"].append("stream_1")
+    repository.touch("disaster_2")
+    assert changes == [("City 2", "cyclone")]
+    
+    changes.clear()
+    repository.save(make_disaster(99))
+    assert changes == [("City 99", "flood")]
+
+def test_cursor_round_trip():
+    """Test cursor encoding and rejection of garbage."""
+    assert decode_cursor(encode_cursor(12345)) == 12345
+    with pytest.raises(InvalidCursorError):
+        decode_cursor("not a cursor!")
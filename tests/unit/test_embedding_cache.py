@@ -0,0 +1,143 @@
+"""
+Unit tests for the persistent embedding cache.
+"""
+
+import os
+import threading
+
+import numpy as np
+import pytest
+from unittest.mock import patch
+
+from guardianlink.core import embedding_cache
+from guardianlink.core.embedding_cache import KEY_SIZE, EmbeddingCache
+from guardianlink.services.ai_engine import GaiaClient, OpenAIEmbeddings
+
+def test_put_and_get(tmp_path):
+    """Test a round trip through the memory-mapped file."""
+    cache = EmbeddingCache(str(tmp_path), "nomic-embed")
+    
+    assert cache.get("stay calm") is None
+    assert cache.put_many(["stay calm", "breathe"], [[1.0, 2.0], [3.0, 4.0]]) == 2
+    assert cache.put_many(["stay calm"], [[9.0, 9.0]]) == 0
+    
+    vector = cache.get("breathe")
+    assert vector.dtype == np.float32
+    assert vector.tolist() == [3.0, 4.0]
+    assert cache.stats()["entries"] == 2
+
+def test_entries_are_shared_between_instances(tmp_path):
+    """Test that a second process-like instance sees appended rows."""
+    writer = EmbeddingCache(str(tmp_path), "nomic-embed")
+    reader = EmbeddingCache(str(tmp_path), "nomic-embed")
+    
+    writer.put_many(["evacuate"], [[0.5, 0.25]])
+    
+    assert reader.get("evacuate").tolist() == [0.5, 0.25]
+
+def test_version_bump_starts_fresh_namespace(tmp_path):
+    """Test that bumping the version isolates old vectors."""
+    old = EmbeddingCache(str(tmp_path), "nomic-embed", version=1)
+    old.put_many(["flood"], [[1.0]])
+    
+    new = EmbeddingCache(str(tmp_path), "nomic-embed", version=2)
+    assert new.get("flood") is None
+    
+    assert len(new.purge_other_versions()) == 1
+
+def test_compact_keeps_only_requested_entries(tmp_path):
+    """Test that compaction drops rows and other instances reload."""
+    cache = EmbeddingCache(str(tmp_path), "nomic-embed")
+    other = EmbeddingCache(str(tmp_path), "nomic-embed")
+    cache.put_many(["a", "b", "c"], [[1.0], [2.0], [3.0]])
+    
+    assert cache.compact(keep=["c"]) == 2
+    assert cache.get("a") is None
+    assert other.get("c").tolist() == [3.0]
+    assert other.get("b") is None
+
+def test_compact_shrinks_files(tmp_path):
+    """Test that eviction by max_entries and dropping an orphaned vector tail shrink the files."""
+    cache = EmbeddingCache(str(tmp_path), "nomic-embed")
+    cache.put_many([f"text {i}" for i in range(10)], [[float(i)] * 4 for i in range(10)])
+    assert os.path.getsize(cache.keys_path) == 10 * KEY_SIZE
+    assert os.path.getsize(cache.vectors_path) == 10 * 4 * 4
+    
+    assert cache.compact() == 0
+    assert cache.compact(max_entries=3) == 7
+    assert os.path.getsize(cache.keys_path) == 3 * KEY_SIZE
+    assert os.path.getsize(cache.vectors_path) == 3 * 4 * 4
+    assert cache.get("text 6") is None
+    assert cache.get("text 9").tolist() == [9.0] * 4
+    
+    # A vector written without its key (the writer died between the two appends)
+    with open(cache.vectors_path, "ab") as f:
+        f.write(np.zeros(4, dtype=np.float32).tobytes())
+    assert cache.compact() == 0
+    assert os.path.getsize(cache.vectors_path) == 3 * 4 * 4
+    assert len(cache) == 3
+
+@pytest.mark.asyncio
+async def test_gaia_embeddings_only_requests_misses(tmp_path):
+    """Test that cached texts are not sent to Gaia."""
+    cache = EmbeddingCache(str(tmp_path), "nomic-embed")
+    cache.put_many(["cached"], [[1.0, 1.0]])
+    client = GaiaClient(api_key="test", api_endpoint="https://test.gaia.domains/v1", embedding_cache=cache)
+    
+    async def request(texts, timeout=None):
+        return [{"index": i, "embedding": [2.0, 2.0]} for i, _ in enumerate(texts)]
+    
+    with patch.object(client, "_request_embeddings", side_effect=request) as mock_request:
+        data = await client.embeddings(["cached", "new", "new"])
+    
+    mock_request.assert_called_once_with(["new"], None)
+    assert [item["embedding"] for item in data] == [[1.0, 1.0], [2.0, 2.0], [2.0, 2.0]]
+    assert cache.get("new").tolist() == [2.0, 2.0]
+
+def test_embeddings_shim_uses_cache(tmp_path):
+    """Test that the shim caches document vectors but embeds queries without touching the cache."""
+    cache = EmbeddingCache(str(tmp_path), "mock-embed")
+    shim = OpenAIEmbeddings(cache=cache)
+    
+    first = shim.embed_documents(["hello"])
+    assert shim.embed_documents(["hello"]) == first
+    assert cache.stats()["hits"] >= 1
+    
+    lookups = cache.hits + cache.misses
+    assert shim.embed_query("hello") == pytest.approx(first[0])
+    assert shim.embed_query("a brand new user message") is not None
+    assert cache.hits + cache.misses == lookups
+    assert len(cache) == 1
+
+def test_size_cap_triggers_compaction(tmp_path):
+    """Test that put_many() evicts the oldest entries once the cache grows past its cap."""
+    cache = EmbeddingCache(str(tmp_path), "nomic-embed", max_entries=8)
+    for i in range(10):
+        cache.put_many([f"text {i}"], [[float(i)]])
+    
+    assert len(cache) == 10  # Within the slack of a quarter of the cap
+    cache.put_many(["text 10"], [[10.0]])
+    
+    assert len(cache) == 8
+    assert os.path.getsize(cache.keys_path) == 8 * KEY_SIZE
+    assert cache.get("text 2") is None
+    assert cache.get("text 10").tolist() == [10.0]
+
+@pytest.mark.skipif(embedding_cache.fcntl is None, reason="needs fcntl file locks")
+def test_refresh_waits_for_writer_lock(tmp_path):
+    """Test that a reader does not index the files while another process holds the writer lock."""
+    fcntl = embedding_cache.fcntl
+    reader = EmbeddingCache(str(tmp_path), "nomic-embed")
+    EmbeddingCache(str(tmp_path), "nomic-embed").put_many(["late"], [[4.0]])
+    results = []
+    
+    with open(reader.lock_path, "a+") as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        thread = threading.Thread(target=lambda: results.append(reader.get("late")))
+        thread.start()
+        thread.join(0.2)
+        assert thread.is_alive()
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+    
+    thread.join(5)
+    assert results[0].tolist() == [4.0]
@@ -2,10 +2,13 @@
 Unit tests for the Gaia API client.
 """
 
+import asyncio
 import pytest
 import json
-from unittest.mock import patch, AsyncMock
+import httpx
+from unittest.mock import patch, AsyncMock, MagicMock
 
+from guardianlink.core.circuit_breaker import CircuitOpenError
 from guardianlink.services.ai_engine import GaiaClient
 
 @pytest.fixture
@@ -105,3 +108,215 @@ class TestGaiaClient:
             assert kwargs["json"]["model"] == "nomic-embed"
             assert kwargs["json"]["input"] == texts
             assert kwargs["headers"] == gaia_client.headers
+    
+    @pytest.mark.asyncio
+    async def test_connection_pool_is_shared(self, gaia_client):
+        """Test that calls share one pooled client until it is closed."""
+        first = await gaia_client.start()
+        second = await gaia_client.start()
+        
+        assert first is second
+        assert not first.is_closed
+        
+        await gaia_client.aclose()
+        
+        assert first.is_closed
+        assert gaia_client._client is None
+    
+    @pytest.mark.asyncio
+    async def test_per_call_timeout(self, gaia_client):
+        """Test that a per-call timeout overrides the default."""
+        with patch("httpx.AsyncClient.post") as mock_post:
+            mock_post.return_value = AsyncMock()
+            
+            await gaia_client.chat_completion([{"role": "user", "content": "Hi"}], timeout=2.5)
+            
+            args, kwargs = mock_post.call_args
+            assert kwargs["timeout"].read == 2.5
+        
+        await gaia_client.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_identical_chat_completions_are_coalesced(self, gaia_client):
+        """Test that concurrent identical payloads issue one upstream call."""
+        async def slow_post(*args, **kwargs):
+            await asyncio.sleep(0.01)
+            return MagicMock(json=MagicMock(return_value={"choices": []}))
+        
+        with patch("httpx.AsyncClient.post", side_effect=slow_post) as mock_post:
+            messages = [{"role": "user", "content": "Location: Accra"}]
+            
+            await asyncio.gather(*(gaia_client.chat_completion(messages) for _ in range(5)))
+            
+            assert mock_post.call_count == 1
+            assert gaia_client.stats()["coalescing"]["coalesced"] == 4
+        
+        await gaia_client.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_chat_completion_stream(self, gaia_client):
+        """Test that streamed deltas are yielded as they arrive."""
+        def handler(request):
+            assert json.loads(request.content)["stream"] is True
+            chunks = [
+                {"choices": [{"delta": {"role": "assistant"}}]},
+                {"choices": [{"delta": {"content": "You are "}}]},
+                {"choices": [{"delta": {"content": "not alone."}}]}
+            ]
+            body = "".join(f"data: {json.dumps(chunk)}\n\n" for chunk in chunks) + "data: [DONE]\n\n"
+            return httpx.Response(200, text=body, headers={"Content-Type": "text/event-stream"})
+        
+        gaia_client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        gaia_client._client_loop = asyncio.get_running_loop()
+        
+        tokens = [token async for token in gaia_client.chat_completion_stream([{"role": "user", "content": "Hi"}])]
+        
+        assert tokens == ["You are ", "not alone."]
+        await gaia_client.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_embed_batches_concurrent_callers(self, gaia_client):
+        """Test that concurrent embed() calls share one /embeddings request."""
+        async def embeddings(texts):
+            return [{"index": i, "embedding": [float(len(text))]} for i, text in reversed(list(enumerate(texts)))]
+        
+        with patch.object(gaia_client, "embeddings", side_effect=embeddings) as mock_embeddings:
+            vectors = await asyncio.gather(gaia_client.embed("a"), gaia_client.embed("bb"), gaia_client.embed("ccc"))
+        
+        assert vectors == [[1.0], [2.0], [3.0]]
+        mock_embeddings.assert_called_once_with(["a", "bb", "ccc"])
+    
+    @pytest.mark.asyncio
+    async def test_chat_completion_retries_on_429(self, gaia_client):
+        """Test that 429 responses are retried and shrink the concurrency limit."""
+        calls = []
+        
+        def handler(request):
+            calls.append(request)
+            if len(calls) == 1:
+                return httpx.Response(429, headers={"Retry-After": "0"})
+            return httpx.Response(200, json={"choices": [{"message": {"content": "ok"}}]})
+        
+        gaia_client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        gaia_client._client_loop = asyncio.get_running_loop()
+        initial_limit = gaia_client.limiter.limit
+        
+        with patch("guardianlink.services.ai_engine.GAIA_RETRY_BASE_DELAY", 0):
+            response = await gaia_client.chat_completion([{"role": "user", "content": "Hi"}])
+        
+        stats = gaia_client.stats()["concurrency"]
+        assert response["choices"][0]["message"]["content"] == "ok"
+        assert len(calls) == 2
+        assert stats["retries"] == 1
+        assert stats["overloads"] == 1
+        assert gaia_client.limiter.limit < initial_limit
+        assert stats["in_flight"] == 0
+        await gaia_client.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_chat_completion_gives_up_after_max_retries(self, gaia_client):
+        """Test that persistent overload surfaces the HTTP error."""
+        gaia_client.max_retries = 1
+        gaia_client._client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(503)))
+        gaia_client._client_loop = asyncio.get_running_loop()
+        
+        with patch("guardianlink.services.ai_engine.GAIA_RETRY_BASE_DELAY", 0):
+            with pytest.raises(httpx.HTTPStatusError):
+                await gaia_client.chat_completion([{"role": "user", "content": "Hi"}])
+        
+        assert gaia_client.stats()["concurrency"]["retries"] == 1
+        assert gaia_client.limiter.in_flight == 0
+        await gaia_client.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_stale_call_does_not_close_circuit_or_hold_probe(self, gaia_client):
+        """Test that a call admitted before the circuit opened is ignored, and a probe that joined it is released."""
+        release = asyncio.Event()
+        
+        async def handler(request):
+            await release.wait()
+            return httpx.Response(200, json={"choices": [{"message": {"content": "late"}}]})
+        
+        gaia_client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        gaia_client._client_loop = asyncio.get_running_loop()
+        breaker = gaia_client.circuit_breaker
+        breaker.failure_threshold = 1
+        breaker.reset_timeout = 0
+        messages = [{"role": "user", "content": "Hi"}]
+        
+        slow = asyncio.ensure_future(gaia_client.chat_completion(messages, hedge=False))
+        await asyncio.sleep(0)
+        breaker.record(breaker.allow(), False)  # Another call fails and opens the circuit
+        
+        # Half-open: this caller takes the probe slot but joins the identical in-flight call
+        joined = asyncio.ensure_future(gaia_client.chat_completion(messages, hedge=False))
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(slow, joined)
+        
+        assert breaker.state == "half_open"
+        assert breaker.stats()["stale"] == 1
+        breaker.allow()  # The probe slot was released
+        await gaia_client.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_read_timeout_is_not_retried(self, gaia_client):
+        """Test that a request that may have reached Gaia is not sent again, while a failed connect is."""
+        calls = []
+        
+        def handler(request):
+            calls.append(request)
+            raise httpx.ReadTimeout("timed out", request=request)
+        
+        gaia_client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        gaia_client._client_loop = asyncio.get_running_loop()
+        
+        with patch("guardianlink.services.ai_engine.GAIA_RETRY_BASE_DELAY", 0):
+            with pytest.raises(httpx.ReadTimeout):
+                await gaia_client.chat_completion([{"role": "user", "content": "Hi"}], use_circuit_breaker=False)
+            assert len(calls) == 1
+            assert gaia_client.stats()["concurrency"]["retries"] == 0
+            
+            def refuse(request):
+                calls.append(request)
+                if len(calls) == 2:
+                    raise httpx.ConnectError("refused", request=request)
+                return httpx.Response(200, json={"choices": [{"message": {"content": "ok"}}]})
+            
+            gaia_client._client = httpx.AsyncClient(transport=httpx.MockTransport(refuse))
+            response = await gaia_client.chat_completion([{"role": "user", "content": "Hello"}], use_circuit_breaker=False)
+        
+        assert response["choices"][0]["message"]["content"] == "ok"
+        assert len(calls) == 3
+        assert gaia_client.stats()["concurrency"]["retries"] == 1
+        assert gaia_client.limiter.in_flight == 0
+        await gaia_client.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_open_circuit_fails_fast(self, gaia_client):
+        """Test that repeated upstream failures open the circuit and skip the network."""
+        calls = []
+        
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(500)
+        
+        gaia_client.circuit_breaker.failure_threshold = 2
+        gaia_client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        gaia_client._client_loop = asyncio.get_running_loop()
+        messages = [{"role": "user", "content": "Hi"}]
+        
+        for _ in range(2):
+            with pytest.raises(httpx.HTTPStatusError):
+                await gaia_client.chat_completion(messages)
+        with pytest.raises(CircuitOpenError):
+            await gaia_client.chat_completion(messages)
+        
+        assert len(calls) == 2
+        assert gaia_client.stats()["circuit_breaker"]["state"] == "open"
+        
+        # Callers that opt out still reach the upstream
+        with pytest.raises(httpx.HTTPStatusError):
+            await gaia_client.chat_completion(messages, use_circuit_breaker=False)
+        assert len(calls) == 3
+        await gaia_client.aclose()
@@ -0,0 +1,76 @@
+"""
+Unit tests for the geospatial index.
+"""
+
+import numpy as np
+import pytest
+
+from guardianlink.core.geo_index import GeoIndex, haversine_km
+
+@pytest.fixture
+def points():
+    rng = np.random.default_rng(0)
+    lats = np.degrees(np.arcsin(rng.uniform(-1, 1, 2000)))
+    lngs = rng.uniform(-180, 180, 2000)
+    return {f"p{i}": (lat, lng) for i, (lat, lng) in enumerate(zip(lats, lngs))}
+
+def brute_force(points, lat, lng):
+    ids = list(points)
+    coords = np.array([points[key] for key in ids])
+    distances = haversine_km(lat, lng, coords[:, 0], coords[:, 1])
+    return sorted(zip(ids, distances), key=lambda pair: pair[1])
+
+def test_haversine_km():
+    """Test known great-circle distances."""
+    assert haversine_km(6.5244, 3.3792, 6.5244, 3.3792) == 0
+    assert haversine_km(51.5074, -0.1278, 48.8566, 2.3522) == pytest.approx(343.5, abs=1)
+    assert haversine_km(0, 179.5, 0, -179.5) == pytest.approx(111.2, abs=0.5)
+
+@pytest.mark.parametrize("lat,lng,radius_km", [
+    (6.52, 3.38, 800),
+    (0.0, 179.9, 1500),  # Crosses the antimeridian
+    (88.0, 40.0, 600),  # Contains the pole
+    (-30.0, -60.0, 25000)  # Whole globe
+])
+def test_near_matches_brute_force(points, lat, lng, radius_km):
+    """Test that radius queries return exactly the points inside the circle, nearest first."""
+    index = GeoIndex(cell_degrees=2.0)
+    for key, (plat, plng) in points.items():
+        index.upsert(key, plat, plng)
+    
+    expected = [key for key, distance in brute_force(points, lat, lng) if distance <= radius_km]
+    
+    assert [key for key, _ in index.near(lat, lng, radius_km)] == expected
+    assert [key for key, _ in index.near(lat, lng, radius_km, limit=5)] == expected[:5]
+
+def test_nearest_matches_brute_force(points):
+    """Test exact k-nearest results, including a distance cap."""
+    index = GeoIndex()
+    for key, (plat, plng) in points.items():
+        index.upsert(key, plat, plng)
+    
+    expected = brute_force(points, -33.9, 18.4)
+    found = index.nearest(-33.9, 18.4, k=10)
+    
+    assert [key for key, _ in found] == [key for key, _ in expected[:10]]
+    assert found[0][1] == pytest.approx(expected[0][1])
+    assert index.nearest(-33.9, 18.4, k=10, max_radius_km=expected[3][1]) == found[:4]
+
+def test_incremental_updates():
+    """Test that moved and removed points are reflected immediately."""
+    index = GeoIndex()
+    index.upsert("lagos", 6.5244, 3.3792)
+    index.upsert("mumbai", 19.0760, 72.8777)
+    index.upsert("kathmandu", 27.7172, 85.3240)
+    
+    index.upsert("lagos", 19.0, 72.9)
+    assert [key for key, _ in index.near(19.0760, 72.8777, 50)] == ["mumbai", "lagos"]
+    assert index.near(6.5244, 3.3792, 50) == []
+    
+    assert index.remove("mumbai") is True
+    assert index.remove("mumbai") is False
+    assert len(index) == 2
+    assert [key for key, _ in index.nearest(27.0, 85.0, k=5)] == ["kathmandu", "lagos"]
+    
+    with pytest.raises(ValueError):
+        index.upsert("nowhere", 91.0, 0.0)
@@ -0,0 +1,87 @@
+"""
+Unit tests for request hedging.
+"""
+
+import asyncio
+import pytest
+
+from guardianlink.core.hedging import Hedger, LatencyTracker
+
+def test_latency_tracker_percentile():
+    """Test percentile lookup over the rolling window."""
+    tracker = LatencyTracker(window=100)
+    assert tracker.percentile(95) is None
+    
+    for i in range(200):
+        tracker.record(float(i))
+    
+    assert len(tracker) == 100
+    assert tracker.percentile(0) == 100.0
+    assert tracker.percentile(100) == 199.0
+
+@pytest.mark.asyncio
+async def test_no_hedging_until_warmed_up():
+    """Test that calls are not hedged before enough latencies are known."""
+    hedger = Hedger(min_samples=3)
+    
+    async def call():
+        return "ok"
+    
+    assert await hedger.run(call) == "ok"
+    assert hedger.delay() is None
+    assert hedger.stats()["hedges"] == 0
+
+@pytest.mark.asyncio
+async def test_slow_primary_is_hedged():
+    """Test that a duplicate is sent after the tail latency and wins."""
+    hedger = Hedger(min_samples=1)
+    hedger.latencies.record(0.01)
+    cancelled = []
+    
+    async def slow():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+        return "slow"
+    
+    async def fast():
+        return "fast"
+    
+    assert await hedger.run(slow, fast) == "fast"
+    await asyncio.sleep(0)
+    
+    stats = hedger.stats()
+    assert stats["hedges"] == 1
+    assert stats["hedge_wins"] == 1
+    assert cancelled == [True]
+
+@pytest.mark.asyncio
+async def test_failed_primary_waits_for_hedge():
+    """Test that a hedge can rescue a primary that fails after hedging began."""
+    hedger = Hedger(min_samples=1)
+    hedger.latencies.record(0.01)
+    
+    async def failing():
+        await asyncio.sleep(0.02)
+        raise RuntimeError("boom")
+    
+    async def backup():
+        await asyncio.sleep(0.05)
+        return "backup"
+    
+    assert await hedger.run(failing, backup) == "backup"
+
+@pytest.mark.asyncio
+async def test_should_hedge_can_veto():
+    """Test that hedging is skipped when should_hedge() says no."""
+    hedger = Hedger(min_samples=1)
+    hedger.latencies.record(0.001)
+    
+    async def call():
+        await asyncio.sleep(0.01)
+        return "primary"
+    
+    assert await hedger.run(call, should_hedge=lambda: False) == "primary"
+    assert hedger.stats()["hedges"] == 0
@@ -0,0 +1,57 @@
+"""
+Unit tests for the precompiled keyword matcher.
+"""
+
+import json
+
+from guardianlink.core.keyword_matcher import KeywordMatcher
+
+def make_matcher():
+    return KeywordMatcher.from_config({
+        "anxiety": {"en": ["anxious", "worr*", "panic attack"], "hi": ["चिंता"], "sw": ["wasiwasi"]},
+        "depression": {"en": ["sad", "down", "depress*"]},
+        "general": {"en": ["help"]}
+    })
+
+def test_matches_whole_words_only():
+    """Test that keywords do not match inside longer words."""
+    matcher = make_matcher()
+    
+    assert matcher.match("I feel sad and down") == {"depression"}
+    assert matcher.match("The download made me helpful") == set()
+    assert matcher.match("Sadness") == set()
+
+def test_prefix_keywords_and_phrases():
+    """Test stem keywords ending in '*' and multi-word keywords."""
+    matcher = make_matcher()
+    
+    assert matcher.match("I keep WORRYING") == {"anxiety"}
+    assert matcher.match("so depressed, need help") == {"depression", "general"}
+    assert matcher.match("I had a panic attack") == {"anxiety"}
+    assert matcher.match("I had a panic") == set()
+
+def test_non_latin_scripts():
+    """Test that scripts with combining marks match whole words."""
+    matcher = make_matcher()
+    
+    assert matcher.match("मुझे चिंता है") == {"anxiety"}
+    assert matcher.match("मुझे चिंताएं हैं") == set()
+    assert matcher.match("Nina wasiwasi, I'm sad") == {"anxiety", "depression"}
+
+def test_keyword_shared_by_intents():
+    """Test that one keyword can signal several intents."""
+    matcher = KeywordMatcher({"anxiety": ["stress"], "general": ["stress", "tips"]})
+    
+    assert matcher.match("stress tips") == {"anxiety", "general"}
+    assert matcher.keyword_count == 2
+
+def test_from_file(tmp_path):
+    """Test loading keyword configuration from JSON."""
+    path = tmp_path / "keywords.json"
+    path.write_text(json.dumps({"anxiety": {"en": ["nervous"]}}), encoding="utf-8")
+    
+    assert KeywordMatcher.from_file(str(path)).match("so nervous") == {"anxiety"}
+
+def test_empty_matcher():
+    """Test that a matcher without keywords never matches."""
+    assert KeywordMatcher({}).match("anything at all") == set()
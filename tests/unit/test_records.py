@@ -0,0 +1,128 @@
+"""
+Unit tests for the compact record types.
+"""
+
+import sys
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from guardianlink.models.records import (
+    AidStreamRecord,
+    ChatMessageRecord,
+    DelegationRecord,
+    DelegationState,
+    Role,
+    StreamRecord,
+    StreamState,
+    SubscriptionRecord,
+    format_time,
+    pack_hex,
+    pack_time,
+    sizeof,
+    split_id,
+    to_micros
+)
+
+def test_chat_message_round_trip_and_fallbacks():
+    """Test that messages convert back to the exact dict, packing only what round-trips."""
+    message = {
+        "id": str(uuid.uuid4()),
+        "role": "user",
+        "content": "I feel anxious about the flooding",
+        "timestamp": datetime.now().isoformat()
+    }
+    record = ChatMessageRecord.from_dict(message)
+    assert isinstance(record.id, bytes) and len(record.id) == 16
+    assert record.role is Role.USER
+    assert isinstance(record.timestamp, int)
+    assert record.to_dict() == message
+    
+    custom = {"id": "msg1", "role": "system", "content": "Hi", "timestamp": "2025-05-10T12:00:00Z"}
+    record = ChatMessageRecord.from_dict(custom)
+    assert record.id == "msg1" and record.role == "system" and record.timestamp == custom["timestamp"]
+    assert record.to_dict() == custom
+    
+    compact = sizeof(ChatMessageRecord.from_dict(message))
+    as_dict = sys.getsizeof(message) + sum(sys.getsizeof(value) for value in message.values())
+    assert compact < as_dict
+
+def test_time_and_id_packing():
+    """Test epoch microsecond timestamps and binary IDs and addresses."""
+    moment = datetime(2025, 3, 1, 8, 30, 15, 123456)
+    assert format_time(to_micros(moment)) == moment.isoformat()
+    assert format_time(to_micros(moment.replace(microsecond=0))) == "2025-03-01T08:30:15"
+    assert pack_time("2025-03-01T08:30:15+00:00") == "2025-03-01T08:30:15+00:00"
+    assert pack_time("yesterday") == "yesterday"
+    
+    assert pack_hex("0x" + "ab" * 20) == bytes([0xab] * 20)
+    assert pack_hex("0x" + "AB" * 20) == "0x" + "AB" * 20  # checksummed: kept as is
+    assert pack_hex("0x123") == "0x123"
+    
+    assert split_id("stream_" + "0f" * 16) == ("stream", bytes([0x0f] * 16))
+    assert split_id("subscription_" + "0f" * 16)[0] == "subscription"
+    assert split_id("stream_1234") is None
+    assert split_id("stream_" + "zz" * 16) is None
+
+def test_stream_records_match_dict_shape():
+    """Test the stream status dicts, with amounts computed for the requested time."""
+    start = to_micros(datetime(2025, 1, 1))
+    day = 24 * 60 * 60 * 1_000_000
+    stream = AidStreamRecord(
+        id=bytes(16), sender=pack_hex("0x" + "a" * 40), recipient=pack_hex("0x" + "b" * 32),
+        amount=2.0, amount_wei=2 * 10**18, start_time=start, end_time=start + 4 * day,
+        state=StreamState.ACTIVE, aid_type="food", location="lagos", duration_days=4
+    )
+    assert stream.stream_id == "stream_" + "0" * 32
+    
+    status = stream.to_dict(start + day)
+    assert list(status) == [
+        "sender", "recipient", "aid_type", "location", "amount", "amount_wei", "duration_days",
+        "rate_per_second", "start_time", "end_time", "status", "released", "remaining"
+    ]
+    assert status["sender"] == "0x" + "a" * 40
+    assert status["start_time"] == "2025-01-01T00:00:00"
+    assert status["end_time"] == (datetime(2025, 1, 1) + timedelta(days=4)).isoformat()
+    assert status["rate_per_second"] == 2 * 10**18 / (4 * 24 * 60 * 60)
+    assert (status["status"], status["released"], status["remaining"]) == ("active", 0.5, 1.5)
+    
+    ended = stream.to_dict(start + 5 * day)
+    assert (ended["status"], ended["released"], ended["remaining"]) == ("completed", 2.0, 0)
+    
+    subscription = SubscriptionRecord(
+        id=bytes(16), sender="0xA", recipient="0xB", amount=0.4, amount_wei=4 * 10**17,
+        start_time=start, end_time=start + 28 * day, state=StreamState.ACTIVE,
+        service_type="anxiety_support", duration_weeks=4
+    )
+    assert subscription.stream_id.startswith("subscription_")
+    assert subscription.to_dict(start)["service_type"] == "anxiety_support"
+    assert subscription.to_dict(start)["released"] == 0
+
+def test_stream_record_is_abstract():
+    """Test that the base stream record cannot be built without a duration."""
+    with pytest.raises(TypeError):
+        StreamRecord(
+            id=bytes(16), sender="0xA", recipient="0xB", amount=1.0, amount_wei=10**18,
+            start_time=0, end_time=1, state=StreamState.ACTIVE
+        )
+
+def test_delegation_record_to_dict():
+    """Test the delegation dict shape."""
+    created = to_micros(datetime(2025, 1, 1, 12))
+    tx_hash = "0x" + uuid.uuid4().hex
+    delegation = DelegationRecord(
+        id=bytes(16), delegator=pack_hex("0x" + "a" * 40), delegatee=pack_hex("0x" + "b" * 40),
+        permission_type="disaster_response", created_at=created, expires_at=created + 30 * 24 * 60 * 60 * 1_000_000,
+        state=DelegationState.ACTIVE, tx_hash=pack_hex(tx_hash)
+    )
+    assert delegation.delegation_id == "delegation_" + "0" * 32
+    assert delegation.to_dict() == {
+        "delegator": "0x" + "a" * 40,
+        "delegatee": "0x" + "b" * 40,
+        "permission_type": "disaster_response",
+        "created_at": "2025-01-01T12:00:00",
+        "expires_at": "2025-01-31T12:00:00",
+        "status": "active",
+        "tx_hash": tx_hash
+    }
@@ -0,0 +1,37 @@
+"""
+Unit tests for fast JSON serialization.
+"""
+
+import json
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from guardianlink.core.serialization import FastJSONResponse, dumps, loads
+
+def test_dumps_matches_stdlib_output():
+    """Test compact encoding of common API values."""
+    payload = {"location": "Mumbai", "risk": np.float32(0.5), "counts": np.array([1, 2]), "at": datetime(2025, 5, 1)}
+    
+    assert json.loads(dumps(payload)) == {"location": "Mumbai", "risk": 0.5, "counts": [1, 2], "at": "2025-05-01T00:00:00"}
+    assert dumps({"text": "चिंता"}) == '{"text":"चिंता"}'.encode("utf-8")
+
+def test_dumps_keeps_large_integers_exact():
+    """Test that wei amounts beyond 64 bits are not rejected or rounded."""
+    amount_wei = 25 * 10 ** 18
+    
+    assert json.loads(dumps({"amount_wei": amount_wei}))["amount_wei"] == amount_wei
+
+def test_loads_raises_json_decode_error():
+    """Test that callers catching json.JSONDecodeError keep working."""
+    assert loads(b'{"risk_level": "high"}') == {"risk_level": "high"}
+    with pytest.raises(json.JSONDecodeError):
+        loads("Risk: high")
+
+def test_fast_json_response_renders_bytes():
+    """Test the default response class body and content type."""
+    response = FastJSONResponse({"ok": True})
+    
+    assert response.body == b'{"ok":true}'
+    assert response.headers["content-type"] == "application/json"
@@ -0,0 +1,73 @@
+"""
+Unit tests for the single-flight request coalescer.
+"""
+
+import asyncio
+import pytest
+
+from guardianlink.core.singleflight import SingleFlight, canonical_key
+
+def test_canonical_key_ignores_dict_order():
+    """Test that logically equal payloads share a key."""
+    first = {"model": "llama", "messages": [{"role": "user", "content": "hi"}], "temperature": 0.2}
+    second = {"temperature": 0.2, "messages": [{"content": "hi", "role": "user"}], "model": "llama"}
+    
+    assert canonical_key(first) == canonical_key(second)
+    assert canonical_key(first) != canonical_key({**first, "temperature": 0.3})
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_request():
+    """Test that identical concurrent calls are coalesced."""
+    single_flight = SingleFlight()
+    calls = 0
+    
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"risk_level": "high"}
+    
+    results = await asyncio.gather(*(single_flight.do("lagos", fetch) for _ in range(10)))
+    
+    assert calls == 1
+    assert all(result == {"risk_level": "high"} for result in results)
+    assert single_flight.stats() == {"issued": 1, "coalesced": 9, "in_flight": 0}
+
+@pytest.mark.asyncio
+async def test_failure_is_shared_and_key_released():
+    """Test that errors reach every waiter and the key can be retried."""
+    single_flight = SingleFlight()
+    
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+    
+    results = await asyncio.gather(
+        single_flight.do("key", fail),
+        single_flight.do("key", fail),
+        return_exceptions=True
+    )
+    
+    assert all(isinstance(result, RuntimeError) for result in results)
+    
+    async def succeed():
+        return "ok"
+    
+    assert await single_flight.do("key", succeed) == "ok"
+    assert single_flight.issued == 2
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_shared_call():
+    """Test that cancelling one waiter leaves the others unaffected."""
+    single_flight = SingleFlight()
+    
+    async def fetch():
+        await asyncio.sleep(0.02)
+        return "done"
+    
+    first = asyncio.ensure_future(single_flight.do("key", fetch))
+    second = asyncio.ensure_future(single_flight.do("key", fetch))
+    await asyncio.sleep(0)
+    first.cancel()
+    
+    assert await second == "done"
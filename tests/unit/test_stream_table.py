@@ -0,0 +1,52 @@
+"""
+Unit tests for the columnar stream table.
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from guardianlink.core.stream_table import MAX_AMOUNT_WEI, StreamTable, released_wei
+
+def test_amounts_are_exact_for_large_amounts():
+    """Test the vectorized limb arithmetic against Python integers, up to 2**96 wei."""
+    rng = random.Random(0)
+    table = StreamTable(initial_capacity=2)
+    streams = {}
+    for i in range(2000):
+        start = rng.randrange(10**15, 2 * 10**15)
+        end = start + rng.choice([1, 86400, 4 * 7 * 86400, 2**32 - 1, rng.randrange(1, 2**32)]) * 1_000_000
+        amount = rng.choice([0, 10**18, rng.randrange(2**64), rng.randrange(2**96), MAX_AMOUNT_WEI])
+        table.upsert(i, start, end, amount, status=i % 2)
+        streams[i] = (amount, start, end)
+    assert len(table) == 2000
+    
+    rows = table.rows(streams)
+    for now in (10**15, 15 * 10**14, 2 * 10**15, 10**17):
+        ended, released, remaining = table.amounts_at(rows, now)
+        for (amount, start, end), done, paid, left in zip(streams.values(), ended, released, remaining):
+            assert paid == released_wei(amount, start, end, now)
+            assert left == amount - paid
+            assert done == (now >= end)
+    assert table.statuses(rows[:4]).tolist() == [0, 1, 0, 1]
+
+def test_released_per_whole_second_and_lookups():
+    """Test second granularity, updates, unknown keys and validation."""
+    table = StreamTable()
+    table.upsert("a", 0, 4_000_000, 10**18)
+    ended, released, remaining = table.amounts_at(table.rows(["a"]), 1_999_999)
+    assert not ended[0] and released == [25 * 10**16] and remaining == [75 * 10**16]
+    
+    table.upsert("a", 0, 4_000_000, 4)
+    assert table.amounts_at(table.rows(["a"]), 3_000_000)[1:] == ([3], [1])
+    assert table.amounts_at(table.rows(["a"]), 5_000_000)[0].tolist() == [True]
+    assert table.rows(["a", "missing"]).tolist() == [0, -1]
+    assert "a" in table and "missing" not in table
+    assert table.amounts_at(np.array([], dtype=np.int64), 0)[1] == []
+    
+    with pytest.raises(ValueError):
+        table.upsert("b", 0, 1_000_000, MAX_AMOUNT_WEI + 1)
+    with pytest.raises(ValueError):
+        table.upsert("b", 0, 2**32 * 1_000_000, 1)
+    assert "b" not in table
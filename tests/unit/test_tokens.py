@@ -0,0 +1,22 @@
+"""
+Unit tests for prompt token estimates.
+"""
+
+from guardianlink.core.tokens import estimate_message_tokens, estimate_tokens, truncate_to_tokens
+
+def test_estimate_tokens():
+    """Test that estimates scale with UTF-8 size, not characters."""
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcd") == 1
+    assert estimate_tokens("abcde") == 2
+    assert estimate_tokens("चिंता") > estimate_tokens("worry")
+    assert estimate_message_tokens([{"role": "user", "content": "abcd"}]) == 5
+
+def test_truncate_to_tokens():
+    """Test truncation to a budget without splitting characters."""
+    assert truncate_to_tokens("short", 10) == "short"
+    
+    clipped = truncate_to_tokens("चिंता " * 50, 10)
+    assert clipped.endswith("...")
+    assert estimate_tokens(clipped) <= 10
+    assert truncate_to_tokens("a long sentence", 1) == ""
@@ -0,0 +1,67 @@
+"""
+Unit tests for the in-process vector store.
+"""
+
+import numpy as np
+import pytest
+
+from guardianlink.core.vector_store import VectorStore, top_k
+from guardianlink.services.ai_engine import Document
+
+def make_doc(text, language="en", doc_type="anxiety"):
+    return Document(page_content=text, metadata={"language": language, "type": doc_type})
+
+@pytest.fixture
+def store():
+    """A small store with axis-aligned vectors."""
+    store = VectorStore(dim=3, initial_capacity=2)
+    store.add_documents(
+        [
+            make_doc("breathing", "en", "anxiety"),
+            make_doc("routine", "en", "depression"),
+            make_doc("kupumua", "sw", "anxiety"),
+            make_doc("sleep", "en", "anxiety")
+        ],
+        [[1, 0, 0], [0, 1, 0], [1, 0, 0], [0.7, 0.7, 0]],
+        ids=["a", "b", "c", "d"]
+    )
+    return store
+
+def test_top_k_orders_best_first():
+    """Test argpartition-based selection."""
+    indices, scores = top_k(np.array([[0.1, 0.9, 0.5, 0.7]]), 2)
+    
+    assert indices.tolist() == [[1, 3]]
+    assert scores[0].tolist() == pytest.approx([0.9, 0.7])
+
+def test_search_ranks_by_cosine(store):
+    """Test ranking across all partitions."""
+    results = store.search([1, 0, 0], k=3)[0]
+    
+    assert [doc.page_content for doc, _ in results][:2] in (["breathing", "kupumua"], ["kupumua", "breathing"])
+    assert results[2][0].page_content == "sleep"
+    assert results[0][1] == pytest.approx(1.0)
+
+def test_search_partition_and_filter(store):
+    """Test language partitions and metadata bitmaps."""
+    results = store.search([1, 0, 0], k=5, partition="en", filters={"type": {"depression"}})[0]
+    
+    assert [doc.page_content for doc, _ in results] == ["routine"]
+
+def test_batched_queries(store):
+    """Test several queries in one call."""
+    results = store.search([[1, 0, 0], [0, 1, 0]], k=1, partition="en")
+    
+    assert results[0][0][0].page_content == "breathing"
+    assert results[1][0][0].page_content == "routine"
+
+def test_delete_and_reuse_rows(store):
+    """Test deletes without rebuilding and row reuse on add."""
+    assert store.delete(["a", "missing"]) == 1
+    assert [doc.page_content for doc, _ in store.search([1, 0, 0], k=1, partition="en")[0]] == ["sleep"]
+    
+    store.add_documents([make_doc("grounding")], [[1, 0, 0]], ids=["e"])
+    
+    assert store.partitions["en"].size == 3
+    assert store.search([1, 0, 0], k=1, partition="en")[0][0][0].page_content == "grounding"
+    assert store.search([1, 0, 0], k=5, filters={"type": "anxiety", "language": "en"})[0][0][0].page_content == "grounding"
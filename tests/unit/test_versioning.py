@@ -0,0 +1,33 @@
+"""
+Unit tests for version counters and ETag matching.
+"""
+
+from guardianlink.core.versioning import VersionCounter, etag_matches, weak_etag
+
+def test_versions_per_collection_and_entity():
+    """Test that bumps advance the collection and only the changed entity."""
+    versions = VersionCounter(epoch="e")
+    assert versions.version("streams") == 0
+    
+    versions.bump("streams", "a")
+    versions.bump("streams", "b")
+    versions.bump("delegations", "a")
+    
+    assert versions.version("streams") == 2
+    assert versions.version("streams", "a") == 1
+    assert versions.version("streams", "b") == 2
+    assert versions.version("delegations", "a") == 3
+    assert versions.etag("streams", "a") == 'W/"e-1"'
+    assert versions.etag("streams", "a", 99) == 'W/"e-1-99"'
+    assert VersionCounter().epoch != "e"
+
+def test_etag_matches_uses_weak_comparison():
+    """Test If-None-Match parsing: lists, weak/strong forms and "*"."""
+    etag = weak_etag("e", 7)
+    
+    assert etag_matches(etag, etag)
+    assert etag_matches('"e-7"', etag)
+    assert etag_matches('"other", W/"e-7"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('W/"e-8"', etag)